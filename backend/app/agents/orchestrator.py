@@ -4,9 +4,12 @@ Simple, effective agent coordination for call screening
 """
 
 import asyncio
-from typing import Dict, List, Any, Literal, Optional
+from typing import Awaitable, Callable, Dict, List, Any, Literal, Optional, Set, Tuple
 from dataclasses import dataclass
 
+from app.core.config import settings
+from app.services.local_intelligence import local_intelligence
+
 
 # ======================
 # INTENT TYPES
@@ -15,6 +18,9 @@ from dataclasses import dataclass
 Intent = Literal["friend", "family", "appointment", "sales", "scam", "unknown"]
 Decision = Literal["pass_through", "screen_continue", "block", "transfer"]
 
+# Which cascade tier settled the scam verdict
+Tier = Literal["local_scam", "local_benign", "llm"]
+
 
 @dataclass
 class CallContext:
@@ -27,6 +33,128 @@ class CallContext:
     caller_name: Optional[str] = None
 
 
+# ======================
+# SINGLE-FLIGHT COALESCING
+# ======================
+
+class _Flight:
+    """One in-flight run for a key, plus the (at most one) queued follow-up"""
+    __slots__ = ("pending_call", "pending_future", "pending_leader")
+
+    def __init__(self):
+        self.pending_call: Optional[Tuple[tuple, dict]] = None
+        self.pending_future: Optional[asyncio.Future] = None
+        # Token of the request whose arguments the follow-up will run with
+        self.pending_leader: Optional[object] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent runs of the same work per key
+
+    - Nothing in flight → run now
+    - Already in flight → absorbed: the request waits for ONE follow-up run
+      that starts when the current run finishes, using the newest arguments
+      (later requests replace the queued arguments of earlier ones)
+
+    So at most one run per key is active, and bursts of N requests cost at
+    most two runs. Runs execute in a driver task, so a cancelled caller does
+    not cancel the work others are waiting on.
+
+    run() returns (result, is_leader): the leader is the one request whose
+    arguments the run used. Waiters get the same result, so side effects
+    (acting on a verdict, saving the input) belong to the leader only.
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self._flights: Dict[str, _Flight] = {}
+        # Strong references: the loop only keeps weak ones to running tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.runs = 0
+        self.coalesced = 0
+
+    async def run(
+        self,
+        key: Optional[str],
+        func: Callable[..., Awaitable[Any]],
+        *args,
+        **kwargs
+    ) -> Tuple[Any, bool]:
+        """
+        Run func(*args, **kwargs) for key, or join the key's follow-up run
+
+        Returns:
+            (result, is_leader); a None key is never coalesced (always leader)
+        """
+        if key is None:
+            self.runs += 1
+            return await func(*args, **kwargs), True
+
+        loop = asyncio.get_running_loop()
+        token = object()
+        flight = self._flights.get(key)
+
+        if flight is not None:
+            if flight.pending_future is None:
+                flight.pending_future = loop.create_future()
+            flight.pending_call = (args, kwargs)
+            flight.pending_leader = token
+            self.coalesced += 1
+            result, leader = await asyncio.shield(flight.pending_future)
+            return result, leader is token
+
+        flight = _Flight()
+        self._flights[key] = flight
+        future = loop.create_future()
+        task = asyncio.create_task(self._drive(key, flight, func, (args, kwargs), token, future))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        result, _ = await asyncio.shield(future)
+        return result, True
+
+    async def _drive(
+        self,
+        key: str,
+        flight: _Flight,
+        func: Callable[..., Awaitable[Any]],
+        call: Tuple[tuple, dict],
+        leader: object,
+        future: asyncio.Future
+    ) -> None:
+        """Run the current call, then the queued follow-up while one exists"""
+        try:
+            while True:
+                self.runs += 1
+                try:
+                    future.set_result((await func(*call[0], **call[1]), leader))
+                except BaseException as e:
+                    # Waiters must always be released, even on cancellation
+                    future.set_exception(e)
+                    if not isinstance(e, Exception):
+                        raise
+
+                if flight.pending_future is None:
+                    break
+
+                call, future, leader = flight.pending_call, flight.pending_future, flight.pending_leader
+                flight.pending_call = flight.pending_future = flight.pending_leader = None
+        finally:
+            self._flights.pop(key, None)
+            if flight.pending_future is not None and not flight.pending_future.done():
+                flight.pending_future.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters for the /metrics endpoint"""
+        return {
+            "name": self.name,
+            "in_flight": len(self._flights),
+            "runs": self.runs,
+            "coalesced": self.coalesced
+        }
+
+
 # ======================
 # SIMPLE ORCHESTRATOR
 # ======================
@@ -45,12 +173,21 @@ class GatekeeperOrchestrator:
     - ScamDetectorAgent: Analyzes for fraud patterns (parallel)
     - ContactMatcherAgent: Fast whitelist check
     - DecisionAgent: Makes final routing decision
+
+    Cascade (CASCADE_ENABLED):
+    - Local tier first: LocalIntelligence score (sub-millisecond, free)
+    - Score >= CASCADE_SCAM_THRESHOLD → scam, no Gemini calls at all
+    - Score <= CASCADE_BENIGN_THRESHOLD → no scam LLM call, intent still classified
+    - Anything in between → escalate to both Gemini agents
     """
 
     def __init__(self):
         # Lazy import agents (only load when needed)
         self.agents = {}
 
+        # How many analyses each cascade tier decided
+        self.tier_counts: Dict[str, int] = {"local_scam": 0, "local_benign": 0, "llm": 0}
+
     def _get_agent(self, agent_name: str):
         """Lazy load agents"""
         if agent_name not in self.agents:
@@ -108,34 +245,98 @@ class GatekeeperOrchestrator:
 
         ADK pattern: Don't wait when you don't have to!
         Both analyses are independent and can run simultaneously
+
+        With the cascade enabled, the local score runs first and decides
+        clear-cut calls on its own; only the uncertain band reaches Gemini.
         """
-        print(f"[Orchestrator] Parallel analysis: Scam detection + Intent classification")
+        # Local tier: only the newly appended part of the transcript is scanned
+        local_analysis = local_intelligence.analyze_incremental(context.call_sid, context.transcript)
+        tier = self._select_tier(local_analysis["scam_score"])
+        self.tier_counts[tier] += 1
+
+        if tier == "local_scam":
+            print(f"🚨 [Orchestrator] Local tier decided: scam (score {local_analysis['scam_score']:.2f})")
+            scam_analysis = self._local_scam_analysis(local_analysis)
+            intent_analysis = self._local_scam_intent(local_analysis)
+
+        elif tier == "local_benign":
+            print("[Orchestrator] Local tier decided: no scam signals, classifying intent only")
+            scam_analysis = self._local_scam_analysis(local_analysis)
+            intent_analysis = await self._classify_intent(context)
 
-        # These run in parallel (independent)
-        tasks = [
-            # Scam detection (vector similarity + LLM)
-            self._detect_scam(context),
+        else:
+            print("[Orchestrator] Parallel analysis: Scam detection + Intent classification")
 
-            # Intent classification (Gemini 2.0 Flash)
-            self._classify_intent(context)
-        ]
+            # These run in parallel (independent)
+            tasks = [
+                # Scam detection (vector similarity + LLM)
+                self._detect_scam(context),
 
-        # Wait for both to complete
-        scam_analysis, intent_analysis = await asyncio.gather(*tasks)
+                # Intent classification (Gemini 2.0 Flash)
+                self._classify_intent(context)
+            ]
+
+            # Wait for both to complete
+            scam_analysis, intent_analysis = await asyncio.gather(*tasks)
 
         # Combine results
         return {
             "scam": scam_analysis,
             "intent": intent_analysis,
+            "local": local_analysis,
+            "tier": tier,
             "transcript": context.transcript
         }
 
+    def _select_tier(self, local_score: float) -> Tier:
+        """Pick the cascade tier for a local scam score"""
+        if not settings.CASCADE_ENABLED:
+            return "llm"
+        if local_score >= settings.CASCADE_SCAM_THRESHOLD:
+            return "local_scam"
+        if local_score <= settings.CASCADE_BENIGN_THRESHOLD:
+            return "local_benign"
+        return "llm"
+
+    def _local_scam_analysis(self, local_analysis: Dict) -> Dict:
+        """Local verdict in ScamDetectorAgent's result shape"""
+        is_scam = local_analysis["scam_score"] >= settings.CASCADE_SCAM_THRESHOLD
+        return {
+            "is_scam": is_scam,
+            "scam_type": local_analysis["scam_type"],
+            "confidence": local_analysis["scam_score"],
+            "red_flags": local_analysis["red_flags"][:5],
+            "recommendation": "block" if is_scam else "allow"
+        }
+
+    def _local_scam_intent(self, local_analysis: Dict) -> Dict:
+        """Intent for a call the local tier already marked as a scam"""
+        return {
+            "intent": "scam",
+            "confidence": local_analysis["scam_score"],
+            "reasoning": "Local scam indicators: " + ", ".join(local_analysis["red_flags"]),
+            "should_pass_through": False,
+            "next_question": None
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cascade tier counters (share of analyses that skipped Gemini)"""
+        total = sum(self.tier_counts.values())
+        local = total - self.tier_counts["llm"]
+        return {
+            "cascade_enabled": settings.CASCADE_ENABLED,
+            "tiers": dict(self.tier_counts),
+            "total": total,
+            "local_decision_rate": local / total if total else 0.0
+        }
+
     async def _detect_scam(self, context: CallContext) -> Dict:
         """Helper: Run scam detection"""
         scam_detector = self._get_agent("scam_detector")
         return await scam_detector.run(
             transcript=context.transcript,
-            caller_number=context.caller_number
+            caller_number=context.caller_number,
+            call_sid=context.call_sid
         )
 
     async def _classify_intent(self, context: CallContext) -> Dict:
@@ -143,7 +344,8 @@ class GatekeeperOrchestrator:
         screener = self._get_agent("screener")
         return await screener.classify_intent(
             transcript=context.transcript,
-            caller_name=context.caller_name
+            caller_name=context.caller_name,
+            call_sid=context.call_sid
         )
 
     # ========================
@@ -169,7 +371,9 @@ class GatekeeperOrchestrator:
             context=context
         )
 
-        print(f"✅ [Orchestrator] Decision: {decision['action']}")
+        decision["decided_by"] = analysis.get("tier", "llm")
+
+        print(f"✅ [Orchestrator] Decision: {decision['action']} (tier: {decision['decided_by']})")
 
         return decision
 
@@ -214,6 +418,9 @@ class GatekeeperOrchestrator:
 
 orchestrator = GatekeeperOrchestrator()
 
+# One ongoing-call analysis in flight per call_sid
+analysis_flights = SingleFlight(name="ongoing_call_analysis")
+
 
 # ======================
 # SIMPLE API
@@ -245,7 +452,8 @@ async def screen_incoming_call(
             "action": "pass_through" | "screen_continue" | "block",
             "reason": "whitelisted_contact" | "scam_detected" | "sales_call",
             "message": "AI response to caller",
-            "confidence": 0.0-1.0
+            "confidence": 0.0-1.0,
+            "decided_by": "local_scam" | "local_benign" | "llm"
         }
     """
     context = CallContext(
@@ -269,6 +477,12 @@ async def analyze_ongoing_call(
     """
     Analyze ongoing call (transcript updated)
 
+    Single-flight per call_sid: while an analysis is running, later updates
+    for the same call are absorbed into one follow-up run on the newest
+    transcript, so LLM traffic stays at one analysis per active call.
+    Only the update whose transcript was analyzed gets leader=True; the
+    absorbed ones share its verdict and must not act on it again.
+
     Usage:
         analysis = await analyze_ongoing_call(
             user_id="user_123",
@@ -282,9 +496,31 @@ async def analyze_ongoing_call(
             "should_block": bool,
             "scam_score": 0.0-1.0,
             "intent": "scam" | "sales" | "friend",
-            "recommendation": "continue" | "block" | "transfer"
+            "recommendation": "continue" | "block" | "transfer",
+            "red_flags": List[str],
+            "local_scam_score": 0.0-1.0,
+            "decided_by": "local_scam" | "local_benign" | "llm",
+            "leader": bool
         }
     """
+    analysis, leader = await analysis_flights.run(
+        call_sid,
+        _analyze_ongoing_call,
+        user_id,
+        caller_number,
+        call_sid,
+        updated_transcript
+    )
+    return {**analysis, "leader": leader}
+
+
+async def _analyze_ongoing_call(
+    user_id: str,
+    caller_number: str,
+    call_sid: str,
+    updated_transcript: str
+) -> Dict[str, Any]:
+    """One ongoing-call analysis run (see analyze_ongoing_call)"""
     context = CallContext(
         user_id=user_id,
         user_name="",  # Not needed for analysis
@@ -295,6 +531,7 @@ async def analyze_ongoing_call(
 
     # Just run parallel analysis (skip whitelist check)
     analysis = await orchestrator.analyze_call_parallel(context)
+    local_analysis = analysis["local"]
 
     scam_score = analysis["scam"].get("confidence", 0.0)
     should_block = scam_score >= 0.85  # Threshold
@@ -303,5 +540,8 @@ async def analyze_ongoing_call(
         "should_block": should_block,
         "scam_score": scam_score,
         "intent": analysis["intent"].get("intent", "unknown"),
-        "recommendation": "block" if should_block else "continue"
+        "recommendation": "block" if should_block else "continue",
+        "red_flags": local_analysis["red_flags"],
+        "local_scam_score": local_analysis["scam_score"],
+        "decided_by": analysis["tier"]
     }
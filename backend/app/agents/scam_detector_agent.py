@@ -3,10 +3,12 @@ Scam Detector Agent: Fraud pattern detection
 Uses vector similarity + LLM analysis to detect scams
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from app.services.gemini_service import get_gemini_service
+from app.services.vector_store import vector_store
 
 logger = logging.getLogger(__name__)
 
@@ -51,12 +53,13 @@ class ScamDetectorAgent:
     """
 
     def __init__(self):
-        self.vector_db = None  # TODO: Initialize vector store in vector_store.py
+        self.vector_db = vector_store
 
     async def run(
         self,
         transcript: str,
-        caller_number: str
+        caller_number: str,
+        call_sid: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Detect if call is a scam
@@ -64,6 +67,7 @@ class ScamDetectorAgent:
         Args:
             transcript: Call transcript
             caller_number: Caller's phone number
+            call_sid: Call being screened (lets Gemini reuse its last verdict)
 
         Returns:
             {
@@ -71,7 +75,8 @@ class ScamDetectorAgent:
                 "scam_type": "irs" | "tech_support" | null,
                 "confidence": 0.0-1.0,
                 "red_flags": List[str],
-                "recommendation": "block" | "flag" | "allow"
+                "recommendation": "block" | "flag" | "allow",
+                "vector_similarity": 0.0-1.0 (absent on the keyword fast path)
             }
         """
         logger.info(f"[ScamDetector] Analyzing call from {caller_number}")
@@ -90,16 +95,41 @@ class ScamDetectorAgent:
                 "recommendation": "block"
             }
 
-        # Deep LLM analysis (slower, more accurate)
+        # Deep LLM analysis (slower, more accurate), alongside the vector search
         gemini_service = get_gemini_service()
-        llm_analysis = await gemini_service.analyze_scam_indicators(
-            transcript=transcript,
-            caller_number=caller_number
+        llm_analysis, similarity = await asyncio.gather(
+            gemini_service.analyze_scam_indicators(
+                transcript=transcript,
+                caller_number=caller_number,
+                call_sid=call_sid
+            ),
+            self.check_vector_similarity(transcript),
         )
 
-        logger.info(f"[ScamDetector] LLM analysis: {llm_analysis.get('recommendation')}")
+        analysis = self._merge_similarity(llm_analysis, similarity)
 
-        return llm_analysis
+        logger.info(f"[ScamDetector] LLM analysis: {analysis.get('recommendation')}")
+
+        return analysis
+
+    def _merge_similarity(self, llm_analysis: Dict[str, Any], similarity: float) -> Dict[str, Any]:
+        """
+        Fold the closest known-script similarity into the LLM verdict
+
+        A match at or above the store's threshold marks the call as a scam
+        and raises confidence to at least the similarity score
+        """
+        analysis = dict(llm_analysis)
+        analysis["vector_similarity"] = similarity
+
+        if similarity >= self.vector_db.threshold:
+            logger.warning(f"🚨 [ScamDetector] Matches a known scam script: {similarity:.3f}")
+            analysis["is_scam"] = True
+            analysis["confidence"] = max(analysis.get("confidence") or 0.0, similarity)
+            analysis["red_flags"] = list(analysis.get("red_flags") or []) + ["matches known scam script"]
+            analysis["recommendation"] = "block"
+
+        return analysis
 
     def _check_keywords(self, transcript: str) -> float:
         """
@@ -155,12 +185,13 @@ class ScamDetectorAgent:
         Returns:
             Similarity score 0.0-1.0 (higher = more similar to known scams)
         """
-        # TODO: Implement vector search
-        # This will use Vertex AI Vector Search to find similar scam scripts
-        # For now, return 0.0 (not implemented)
-
-        logger.debug("[ScamDetector] Vector search not implemented yet")
-        return 0.0
+        try:
+            similarity = await self.vector_db.max_similarity(transcript)
+        except Exception as e:
+            logger.error(f"❌ [ScamDetector] Vector similarity failed: {e}")
+            return 0.0
+        logger.debug(f"[ScamDetector] Closest known scam script: {similarity:.3f}")
+        return similarity
 
 
 def create_scam_detector_agent() -> ScamDetectorAgent:
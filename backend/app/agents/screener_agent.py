@@ -43,7 +43,8 @@ class ScreenerAgent:
     async def classify_intent(
         self,
         transcript: str,
-        caller_name: Optional[str] = None
+        caller_name: Optional[str] = None,
+        call_sid: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Classify caller's intent using Gemini
@@ -51,6 +52,7 @@ class ScreenerAgent:
         Args:
             transcript: Conversation so far
             caller_name: Caller's stated name
+            call_sid: Call being screened (lets Gemini reuse its last verdict)
 
         Returns:
             {
@@ -66,7 +68,8 @@ class ScreenerAgent:
         gemini_service = get_gemini_service()
         result = await gemini_service.classify_caller_intent(
             transcript=transcript,
-            caller_name=caller_name
+            caller_name=caller_name,
+            call_sid=call_sid
         )
 
         # Add next question if intent unclear
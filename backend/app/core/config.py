@@ -5,7 +5,7 @@ Handles environment variables, secrets, and service credentials.
 
 from pydantic_settings import BaseSettings
 from pydantic import Field, validator
-from typing import Optional
+from typing import Dict, Optional
 import os
 from pathlib import Path
 
@@ -64,6 +64,15 @@ class Settings(BaseSettings):
         description="Public WebSocket URL for Twilio to connect"
     )
 
+    # REST API (async adapter over the shared HTTP pool)
+    TWILIO_API_BASE_URL: str = Field(default="https://api.twilio.com", description="Twilio REST base URL (point at a fake server in tests)")
+    TWILIO_API_TIMEOUTS: Dict[str, float] = Field(
+        default={"hangup": 3.0, "dial": 5.0, "fetch_call": 5.0, "send_sms": 10.0},
+        description="Per-operation request timeout (seconds)"
+    )
+    TWILIO_API_MAX_ATTEMPTS: int = Field(default=3, ge=1, description="Attempts per operation (retries only where safe)")
+    TWILIO_API_BACKOFF_BASE_SECONDS: float = Field(default=0.2, description="First retry delay (doubles per attempt, with jitter)")
+
     @validator("TWILIO_PHONE_NUMBER")
     def validate_phone_number(cls, v):
         """Ensure phone number is in E.164 format"""
@@ -111,6 +120,17 @@ class Settings(BaseSettings):
     GOOGLE_CALENDAR_ID: str = Field(default="primary", description="Calendar ID to check")
     GOOGLE_CALENDAR_TIMEZONE: str = Field(default="America/New_York", description="User timezone")
 
+    # Cloud Storage (recordings, transcripts, scam evidence)
+    STORAGE_BACKEND: str = Field(default="gcs", description="Object store: gcs or local (tests, air-gapped deployments)")
+    STORAGE_LOCAL_PATH: str = Field(default="./data/storage", description="Root directory for STORAGE_BACKEND=local")
+    STORAGE_MANIFEST_BACKEND: str = Field(default="database", description="Index of stored objects (stats, retention sweeps): database (shared by all instances) or local (single instance)")
+    STORAGE_MANIFEST_PATH: str = Field(default="./data/storage_manifest.sqlite", description="SQLite index for STORAGE_MANIFEST_BACKEND=local")
+    STORAGE_UPLOAD_WORKERS: int = Field(default=4, ge=1, description="Threads running blocking storage calls")
+    STORAGE_UPLOAD_DEBOUNCE_SECONDS: float = Field(default=2.0, description="Quiet period before a call's latest transcript is uploaded")
+    STORAGE_UPLOAD_MAX_DELAY_SECONDS: float = Field(default=10.0, description="Longest a changing transcript waits before being uploaded anyway")
+    SIGNED_URL_CACHE_MAX_ENTRIES: int = Field(default=10000, ge=1, description="Signed URLs kept for reuse (per object and method)")
+    SIGNED_URL_REUSE_FRACTION: float = Field(default=0.5, ge=0.0, le=1.0, description="Share of a signed URL's lifetime during which it is reused")
+
     # ============================================================================
     # Supabase Configuration
     # ============================================================================
@@ -119,6 +139,27 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_ROLE_KEY: str = Field(default="demo_service_role_key", description="Supabase service role key")
     SUPABASE_ANON_KEY: Optional[str] = Field(default=None, description="Supabase anon key (for frontend)")
 
+    # Data access
+    DATABASE_BACKEND: str = Field(default="supabase", description="supabase, local (SQLite stand-in for tests/offline)")
+    LOCAL_DB_PATH: str = Field(default="./data/local_db.sqlite", description="SQLite file for DATABASE_BACKEND=local")
+    DB_POOL_SIZE: int = Field(default=8, ge=1, description="Max concurrent database requests (worker threads)")
+    DB_QUERY_TIMEOUT_SECONDS: float = Field(default=10.0, description="Per-query timeout")
+
+    # Read-through cache for hot-path lookups (users, voice profiles, contacts)
+    LOOKUP_CACHE_MAX_ENTRIES: int = Field(default=4096, description="Max cached rows per lookup type")
+    LOOKUP_CACHE_TTL_SECONDS: int = Field(default=300, description="Cached row lifetime (seconds)")
+    LOOKUP_CACHE_NEGATIVE_TTL_SECONDS: int = Field(default=30, description="How long a definite not-found is remembered")
+
+    # Per-day dashboard rollups (call_analytics), updated on every call write
+    ANALYTICS_ROLLUPS_ENABLED: bool = Field(default=True, description="Maintain call_analytics counters on call writes")
+
+    # Write-behind queue for in-call writes (call updates, transcripts, scam reports)
+    WRITE_BEHIND_ENABLED: bool = Field(default=True, description="Batch in-call writes instead of awaiting each one")
+    WRITE_BEHIND_FLUSH_INTERVAL_MS: int = Field(default=500, description="Max time a write waits before being flushed")
+    WRITE_BEHIND_MAX_BATCH: int = Field(default=200, description="Pending calls that trigger an immediate flush")
+    WRITE_BEHIND_SPOOL_PATH: str = Field(default="./data/write_behind.sqlite", description="Local spool replayed on restart (':memory:' disables durability)")
+    WRITE_BEHIND_MAX_ATTEMPTS: int = Field(default=20, description="Flushes a call's writes may fail (or wait for its call row) before being dead-lettered/dropped")
+
     # ============================================================================
     # LLM Configuration (Optional - if using Vertex AI directly)
     # ============================================================================
@@ -131,14 +172,18 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = Field(None, description="OpenAI API key (if using)")
 
     # ============================================================================
-    # Vector Database (ChromaDB)
+    # Vector Database (local memory-mapped index, app/services/vector_index.py)
     # ============================================================================
 
     VECTOR_DB_PATH: str = Field(
         default="./data/vector_store",
-        description="Path to ChromaDB persistence"
+        description="Directory holding the on-disk vector index"
     )
     VECTOR_DB_COLLECTION: str = Field(default="scam_scripts", description="Collection name")
+    VECTOR_INDEX_IVF_MIN_ROWS: int = Field(default=5000, description="Partition the index (IVF) at startup once it has this many rows; smaller indexes are searched exactly")
+    VECTOR_INDEX_IVF_LISTS: int = Field(default=0, description="IVF partitions (0 = sqrt(rows))")
+    VECTOR_INDEX_IVF_PROBES: int = Field(default=8, description="IVF partitions scanned per query")
+    GEMINI_EMBEDDING_MODEL: str = Field(default="models/text-embedding-004", description="Gemini embedding model for scam-script similarity")
 
     # Embedding Model
     EMBEDDING_MODEL: str = Field(
@@ -154,6 +199,69 @@ class Settings(BaseSettings):
         description="Cosine similarity threshold for scam detection"
     )
 
+    # ============================================================================
+    # Analysis Cascade (local score gates the Gemini calls)
+    # ============================================================================
+
+    CASCADE_ENABLED: bool = Field(
+        default=True,
+        description="Run the local scam score first and only call Gemini when it is inconclusive"
+    )
+    CASCADE_SCAM_THRESHOLD: float = Field(
+        default=0.85,
+        ge=0.0,
+        le=1.0,
+        description="Local scam score at or above which the call is treated as a scam without Gemini"
+    )
+    CASCADE_BENIGN_THRESHOLD: float = Field(
+        default=0.1,
+        ge=0.0,
+        le=1.0,
+        description="Local scam score at or below which Gemini scam analysis is skipped"
+    )
+
+    # ============================================================================
+    # LLM Result Cache
+    # ============================================================================
+
+    LLM_CACHE_ENABLED: bool = Field(default=True, description="Reuse Gemini verdicts for unchanged transcripts")
+    LLM_CACHE_MAX_ENTRIES: int = Field(default=1024, description="Max cached verdicts per analysis type")
+    LLM_CACHE_TTL_SECONDS: int = Field(default=300, description="Cached verdict lifetime (seconds)")
+    LLM_CACHE_DELTA_TOKENS: int = Field(
+        default=8,
+        description="Reuse the call's last verdict if the transcript grew by fewer tokens than this and no red-flag phrase appeared"
+    )
+
+    # Embeddings (content-hash keyed, persisted across restarts)
+    EMBEDDING_CACHE_ENABLED: bool = Field(default=True, description="Reuse embeddings of previously seen texts")
+    EMBEDDING_CACHE_PATH: str = Field(default="./data/embedding_cache.sqlite", description="SQLite file backing the embedding cache")
+    EMBEDDING_CACHE_MEMORY_ENTRIES: int = Field(default=2048, description="Embeddings kept in memory in front of the SQLite file")
+    EMBEDDING_CACHE_MAX_ROWS: int = Field(default=200_000, ge=1, description="Embeddings kept in the SQLite file (oldest pruned beyond this)")
+    EMBEDDING_BATCH_SIZE: int = Field(default=100, ge=1, le=100, description="Texts per batch embedding request (Gemini allows 100)")
+
+    # ============================================================================
+    # Phone Reputation Cache (RAGService.check_phone_number)
+    # ============================================================================
+
+    REPUTATION_CACHE_MAX_ENTRIES: int = Field(default=10000, description="Phone numbers kept in memory per process")
+    REPUTATION_CACHE_TTL_SECONDS: int = Field(default=86400, description="Lifetime of a 'known scammer' result")
+    REPUTATION_CACHE_NEGATIVE_TTL_SECONDS: int = Field(default=3600, description="Lifetime of a 'not a known scammer' result")
+    REPUTATION_CACHE_BACKEND: str = Field(default="sqlite", description="sqlite (shared by workers on this host), memory (per process)")
+    REPUTATION_CACHE_PATH: str = Field(default="./data/phone_reputation.sqlite", description="SQLite file for REPUTATION_CACHE_BACKEND=sqlite")
+    REPUTATION_CACHE_WARM_ENTRIES: int = Field(default=5000, description="Recently checked numbers loaded into memory on startup")
+
+    # ============================================================================
+    # Outbound HTTP (shared connection pool)
+    # ============================================================================
+
+    HTTP_MAX_CONNECTIONS: int = Field(default=100, description="Max open connections across all hosts")
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20, description="Idle connections kept warm")
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = Field(default=30.0, description="Idle connection lifetime")
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = Field(default=20, description="Max concurrent requests per upstream host")
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = Field(default=3.0, description="TCP/TLS connect timeout")
+    HTTP_READ_TIMEOUT_SECONDS: float = Field(default=10.0, description="Default read/write/pool timeout")
+    HTTP_ENABLE_HTTP2: bool = Field(default=True, description="Use HTTP/2 when the h2 package is installed")
+
     # ============================================================================
     # Security & Authentication
     # ============================================================================
@@ -204,6 +312,31 @@ class Settings(BaseSettings):
         description="Path to blocked numbers"
     )
 
+    # Known-scammer pre-screen (blacklist file + scam_reports), checked at call arrival
+    BLOCKLIST_PRESCREEN_ENABLED: bool = Field(default=True, description="Reject blocklisted callers before any database or ElevenLabs work")
+    BLOCKLIST_FILE_POLL_SECONDS: float = Field(default=5.0, description="How often the blacklist file's mtime is checked for hot reload")
+    BLOCKLIST_DB_REFRESH_SECONDS: int = Field(default=300, description="How often reported scam numbers are reloaded from scam_reports")
+    BLOCKLIST_MIN_REPORT_CONFIDENCE: float = Field(default=0.9, description="Scam report confidence needed to blocklist the caller")
+    BLOCKLIST_BLOOM_FALSE_POSITIVE_RATE: float = Field(default=0.001, description="Bloom filter false-positive rate (confirmed against the exact set)")
+
+    # ============================================================================
+    # Workflow Actions
+    # ============================================================================
+
+    WORKFLOW_MAX_PARALLEL_ACTIONS: int = Field(default=8, ge=1, description="Actions of one workflow run that may execute at once")
+    WORKFLOW_ACTION_TIMEOUT_SECONDS: float = Field(default=15.0, description="Default per-action timeout (actions may set \"timeout\")")
+
+    # Durable action queue: non-routing actions run off the call path with retries
+    ACTION_QUEUE_ENABLED: bool = Field(default=True, description="Enqueue notification/business actions instead of awaiting them")
+    ACTION_QUEUE_PATH: str = Field(default="./data/action_queue.sqlite", description="SQLite file holding queued, finished and dead-lettered jobs")
+    ACTION_QUEUE_CONCURRENCY: int = Field(default=4, ge=1, description="Jobs of one executor type running at once")
+    ACTION_QUEUE_TYPE_CONCURRENCY: Dict[str, int] = Field(default={}, description="Per action type overrides, e.g. {\"google_sheets\": 2}")
+    ACTION_QUEUE_MAX_ATTEMPTS: int = Field(default=6, ge=1, description="Attempts before a job is dead-lettered")
+    ACTION_QUEUE_BACKOFF_BASE_SECONDS: float = Field(default=2.0, description="First retry delay (doubles per attempt, with jitter)")
+    ACTION_QUEUE_BACKOFF_MAX_SECONDS: float = Field(default=300.0, description="Retry delay cap")
+    ACTION_QUEUE_POLL_SECONDS: float = Field(default=1.0, description="Max time between checks for due retries")
+    ACTION_QUEUE_DONE_RETENTION_HOURS: int = Field(default=72, description="How long finished jobs are kept (idempotency window)")
+
     # ============================================================================
     # Logging & Monitoring
     # ============================================================================
@@ -214,6 +347,14 @@ class Settings(BaseSettings):
     # Sentry (Optional)
     SENTRY_DSN: Optional[str] = Field(None, description="Sentry error tracking DSN")
 
+    # Event loop monitor (lag histogram + blocking call sites, see /debug/loop)
+    LOOP_MONITOR_ENABLED: bool = Field(default=False, description="Start the loop monitor on startup (can be toggled at runtime)")
+    LOOP_MONITOR_SAMPLE_INTERVAL_MS: float = Field(default=50.0, ge=1, description="How often loop lag is sampled")
+    LOOP_MONITOR_BLOCK_THRESHOLD_MS: float = Field(default=100.0, ge=1, description="Loop stall length at which the blocking stack is captured")
+    LOOP_MONITOR_TOP_SITES: int = Field(default=20, description="Call sites returned by /debug/loop")
+    DEBUG_ENDPOINTS_ENABLED: bool = Field(default=False, description="Mount /debug/* (any environment)")
+    DEBUG_ADMIN_TOKEN: Optional[str] = Field(default=None, description="Token required in X-Admin-Token by /debug/* (unset → all requests rejected)")
+
     # ============================================================================
     # System Prompt Configuration
     # ============================================================================
@@ -263,6 +404,10 @@ Constraints:
     AUDIO_CHANNELS: int = Field(default=1, description="Mono audio")
     AUDIO_CHUNK_SIZE: int = Field(default=160, description="20ms at 8kHz")
 
+    # Outbound audio (AI → caller) send queue, per call
+    OUTBOUND_AUDIO_MAX_BUFFERED_MS: int = Field(default=2000, description="Queued audio beyond this is dropped (oldest first)")
+    OUTBOUND_AUDIO_COALESCE_MS: int = Field(default=100, description="Max audio merged into one Twilio media message")
+
     # VAD (Voice Activity Detection)
     VAD_AGGRESSIVENESS: int = Field(default=3, ge=0, le=3, description="0=least, 3=most")
 
@@ -0,0 +1,296 @@
+"""
+Event Loop Monitor: continuous loop-lag measurement and blocking-call capture
+Finds the hidden blocking calls (sync SDK .execute(), file I/O, CPU work)
+that stall every concurrent call on a worker
+
+- A sampler task wakes every LOOP_MONITOR_SAMPLE_INTERVAL_MS; how late it
+  wakes up is the loop lag, recorded in a histogram
+- A watchdog thread checks the sampler's heartbeat. When the loop has not
+  run for LOOP_MONITOR_BLOCK_THRESHOLD_MS, it snapshots the loop thread's
+  stack: the innermost app frame is the offending call site
+- Switchable at runtime (POST /debug/loop); the watchdog and sampler only
+  exist while enabled
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds (ms); the last bucket is open-ended
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_APP_ROOT = str(Path(__file__).resolve().parent.parent)
+
+
+class LagHistogram:
+    """Fixed-bucket latency histogram with count/sum/max"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LAG_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value_ms <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile (None past the last bound)"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else None
+        return None
+
+    def as_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}ms" for bound in self.buckets] + [f"gt_{self.buckets[-1]}ms"]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": self.percentile(0.50),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+
+class CallSite:
+    """Aggregated stalls attributed to one line of code"""
+
+    __slots__ = ("site", "blocking_in", "count", "total_ms", "max_ms", "last_stack", "last_seen")
+
+    def __init__(self, site: str, blocking_in: str):
+        self.site = site
+        self.blocking_in = blocking_in
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_stack: List[str] = []
+        self.last_seen = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "site": self.site,
+            "blocking_in": self.blocking_in,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 1),
+            "max_ms": round(self.max_ms, 1),
+            "last_seen": self.last_seen,
+            "last_stack": self.last_stack
+        }
+
+
+def _frame_label(frame: traceback.FrameSummary) -> str:
+    filename = frame.filename
+    if filename.startswith(_APP_ROOT):
+        filename = "app" + filename[len(_APP_ROOT):]
+    return f"{filename}:{frame.lineno} in {frame.name}"
+
+
+class LoopMonitor:
+    """
+    Loop lag histogram + blocking call-site profiler
+
+    Usage:
+        await loop_monitor.enable()      # from the loop being watched
+        loop_monitor.get_stats()         # {"lag": {...}, "top_sites": [...]}
+        await loop_monitor.disable()
+    """
+
+    def __init__(self):
+        self.interval_ms = settings.LOOP_MONITOR_SAMPLE_INTERVAL_MS
+        self.threshold_ms = settings.LOOP_MONITOR_BLOCK_THRESHOLD_MS
+
+        self.lag = LagHistogram()
+        self.sites: Dict[str, CallSite] = {}
+        self.stalls = 0
+        self.unattributed_stalls = 0
+
+        self._task: Optional[asyncio.Task] = None
+        # Serializes enable()/disable() (concurrent POST /debug/loop)
+        self._lock = asyncio.Lock()
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = 0.0
+        # Set by the watchdog, consumed by the sampler: (site, blocking_in, stack)
+        self._captured: Optional[Tuple[str, str, List[str]]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None
+
+    # ========================
+    # Lifecycle
+    # ========================
+
+    async def enable(self, interval_ms: Optional[float] = None, threshold_ms: Optional[float] = None) -> None:
+        """Start sampling the running loop (restarts with new settings if already enabled)"""
+        async with self._lock:
+            await self._stop_sampling()
+            self._start_sampling(interval_ms, threshold_ms)
+
+    async def disable(self) -> None:
+        """Stop sampling (collected stats are kept)"""
+        async with self._lock:
+            await self._stop_sampling()
+
+    def _start_sampling(self, interval_ms: Optional[float], threshold_ms: Optional[float]) -> None:
+        if interval_ms is not None:
+            self.interval_ms = interval_ms
+        if threshold_ms is not None:
+            self.threshold_ms = threshold_ms
+
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._captured = None
+        self._stop.clear()
+        self._task = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+        logger.info(f"🩺 Loop monitor enabled (interval={self.interval_ms}ms, block threshold={self.threshold_ms}ms)")
+
+    async def _stop_sampling(self) -> None:
+        if not self.enabled:
+            return
+        self._stop.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._watchdog.join(timeout=1)
+        self._watchdog = None
+        logger.info("🩺 Loop monitor disabled")
+
+    def reset(self) -> None:
+        """Clear collected stats"""
+        self.lag = LagHistogram()
+        self.sites.clear()
+        self.stalls = 0
+        self.unattributed_stalls = 0
+
+    # ========================
+    # Sampler (event loop)
+    # ========================
+
+    async def _sample(self) -> None:
+        interval = self.interval_ms / 1000
+        while True:
+            expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            self._heartbeat = now
+
+            lag_ms = max(0.0, (now - expected) * 1000)
+            self.lag.observe(lag_ms)
+            if lag_ms >= self.threshold_ms:
+                self._record_stall(lag_ms)
+            else:
+                self._captured = None
+
+    def _record_stall(self, lag_ms: float) -> None:
+        self.stalls += 1
+        captured, self._captured = self._captured, None
+        if captured is None:
+            # Stall ended before the watchdog looked
+            self.unattributed_stalls += 1
+            return
+
+        site_label, blocking_in, stack = captured
+        site = self.sites.get(site_label)
+        if site is None:
+            site = self.sites[site_label] = CallSite(site_label, blocking_in)
+        site.count += 1
+        site.total_ms += lag_ms
+        site.max_ms = max(site.max_ms, lag_ms)
+        site.blocking_in = blocking_in
+        site.last_stack = stack
+        site.last_seen = time.time()
+
+        if lag_ms >= self.threshold_ms * 5:
+            logger.warning(f"🐢 Event loop blocked {lag_ms:.0f}ms at {site_label} ({blocking_in})")
+
+    # ========================
+    # Watchdog (own thread)
+    # ========================
+
+    def _watch(self) -> None:
+        poll = max(self.threshold_ms / 4, 5) / 1000
+        limit = (self.interval_ms + self.threshold_ms) / 1000
+        last_captured_heartbeat = None
+
+        while not self._stop.wait(poll):
+            heartbeat = self._heartbeat
+            if time.monotonic() - heartbeat < limit or heartbeat == last_captured_heartbeat:
+                continue
+            # Loop has not run for threshold past its due time: snapshot what it is doing
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._captured = self._describe(traceback.extract_stack(frame))
+            last_captured_heartbeat = heartbeat
+
+    @staticmethod
+    def _describe(stack: traceback.StackSummary) -> Tuple[str, str, List[str]]:
+        """(innermost app frame, innermost frame, formatted stack)"""
+        innermost = stack[-1]
+        app_frames = [frame for frame in stack if frame.filename.startswith(_APP_ROOT) and not frame.filename.endswith("loop_monitor.py")]
+        site = app_frames[-1] if app_frames else innermost
+        formatted = [f"{_frame_label(frame)}: {frame.line}" for frame in stack[-15:]]
+        return _frame_label(site), _frame_label(innermost), formatted
+
+    # ========================
+    # Metrics
+    # ========================
+
+    def get_stats(self, top: Optional[int] = None) -> Dict[str, Any]:
+        """Lag histogram and the worst call sites (by total blocked time)"""
+        top = top or settings.LOOP_MONITOR_TOP_SITES
+        sites = sorted(self.sites.values(), key=lambda site: site.total_ms, reverse=True)[:top]
+        return {
+            "enabled": self.enabled,
+            "sample_interval_ms": self.interval_ms,
+            "block_threshold_ms": self.threshold_ms,
+            "lag": self.lag.as_dict(),
+            "stalls": self.stalls,
+            "unattributed_stalls": self.unattributed_stalls,
+            "top_sites": [site.as_dict() for site in sites]
+        }
+
+
+# Singleton instance
+loop_monitor = LoopMonitor()
+
+
+async def init_loop_monitor() -> None:
+    """Start the monitor on startup when LOOP_MONITOR_ENABLED"""
+    if settings.LOOP_MONITOR_ENABLED:
+        await loop_monitor.enable()
+
+
+async def close_loop_monitor() -> None:
+    await loop_monitor.disable()
@@ -0,0 +1,28 @@
+"""
+Local SQLite files
+One opener for the on-disk caches, spools and queues (embedding and
+reputation caches, write-behind spool, action queue, storage manifest)
+
+Every file is opened in WAL mode with synchronous=NORMAL: readers never
+block the writer, and a commit is a sequential append to the WAL without
+an fsync per transaction. Committed data survives a process crash; an OS
+crash or power loss can drop the last few commits, but never corrupts the
+file. ":memory:" (tests) skips the directory and WAL setup.
+"""
+
+import os
+import sqlite3
+
+
+def open_sqlite(path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Connect to a SQLite file (creating its directory), in WAL mode with synchronous=NORMAL"""
+    if path != ":memory:":
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    db = sqlite3.connect(path, check_same_thread=check_same_thread)
+    if path != ":memory:":
+        db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
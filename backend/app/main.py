@@ -10,9 +10,16 @@ import logging
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.routers import telephony_optimized as telephony, webhooks, contacts, calls_log as calls, analytics, elevenlabs_tools
-from app.services.database import init_database
+from app.routers import telephony_optimized as telephony, webhooks, contacts, calls_log as calls, analytics, elevenlabs_tools, debug
+from app.core.loop_monitor import init_loop_monitor, close_loop_monitor
+from app.services.database import init_database, close_database
+from app.services.http_client import init_http_client, close_http_client
+from app.services.write_behind import init_write_behind, close_write_behind
 from app.services.vector_store import init_vector_store
+from app.services.rag_service import init_rag_service, close_rag_service
+from app.services.reputation_index import init_reputation_index, close_reputation_index
+from app.workflows.action_queue import init_action_queue, close_action_queue
+from app.services.gcs_service import init_storage, close_storage
 
 # Configure logging
 logging.basicConfig(
@@ -50,17 +57,46 @@ async def lifespan(app: FastAPI):
     logger.info("📊 Initializing database...")
     await init_database()
 
+    # Batched in-call writes (replays anything spooled by the previous run)
+    await init_write_behind()
+
+    # Known-scammer blocklist checked at call arrival (blacklist file + scam_reports)
+    await init_reputation_index()
+
+    # Workflow side-effects (SMS, email, Sheets, MCP) run off the call path
+    await init_action_queue()
+
+    # Shared outbound HTTP pool (ElevenLabs, search)
+    await init_http_client()
+
     # Initialize vector store for scam detection
     if settings.ENABLE_SCAM_DETECTION:
         logger.info("🔍 Initializing scam detection vector store...")
         await init_vector_store()
 
+    # Recently checked caller numbers, so only new numbers go to search
+    await init_rag_service()
+
+    # Recordings / transcripts / evidence uploads (background worker pool)
+    await init_storage()
+
+    # Event loop lag / blocking call-site monitor (toggle at runtime via /debug/loop)
+    await init_loop_monitor()
+
     logger.info("✅ AI Gatekeeper started successfully!")
 
     yield
 
     # Shutdown
     logger.info("🛑 Shutting down AI Gatekeeper...")
+    await close_loop_monitor()
+    await close_action_queue()
+    await close_storage()
+    await close_write_behind()
+    await close_rag_service()
+    await close_reputation_index()
+    await close_http_client()
+    await close_database()
 
 
 # Create FastAPI application
@@ -122,6 +158,42 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """
+    Cache and cascade counters (JSON, scraped by monitoring)
+    """
+    from app.agents.orchestrator import analysis_flights, orchestrator
+    from app.services.database import db_service
+    from app.services.gcs_service import gcs_service
+    from app.services.gemini_service import get_gemini_service
+    from app.services.http_client import http_client
+    from app.services.rag_service import rag_service
+    from app.services.reputation_index import reputation_index
+    from app.services.twilio_rest import twilio_rest
+    from app.services.vector_store import vector_store
+    from app.routers.telephony import get_outbound_audio_stats
+    from app.services.write_behind import write_behind
+    from app.workflows.action_queue import action_queue
+
+    return {
+        "llm_cache": get_gemini_service().get_cache_stats(),
+        "lookup_cache": db_service.get_cache_stats(),
+        "http_pool": http_client.get_stats(),
+        "cascade": orchestrator.get_stats(),
+        "analysis_single_flight": analysis_flights.get_stats(),
+        "write_behind": write_behind.get_stats(),
+        "vector_index": vector_store.get_stats(),
+        "phone_reputation": rag_service.cache.get_stats(),
+        "blocklist": reputation_index.get_stats(),
+        "action_queue": action_queue.get_stats(),
+        "storage_uploads": gcs_service.uploader.get_stats(),
+        "signed_urls": gcs_service.signed_urls.get_stats(),
+        "twilio_api": twilio_rest.get_stats(),
+        "outbound_audio": get_outbound_audio_stats()
+    }
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -170,6 +242,14 @@ app.include_router(
     tags=["ElevenLabs Tools"],
 )
 
+# Diagnostics (opt-in, admin token required)
+if settings.DEBUG_ENDPOINTS_ENABLED:
+    app.include_router(
+        debug.router,
+        prefix="/debug",
+        tags=["Debug"],
+    )
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -8,6 +8,7 @@ from fastapi import APIRouter
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
 
+from app.services import analytics_rollups
 from app.services.database import db_service
 from app.services.gemini_service import get_gemini_service
 from app.core.config import settings
@@ -104,29 +105,27 @@ async def get_dashboard_stats(user_id: str = "00000000-0000-0000-0000-0000000000
                 "avg_call_duration": 0,
             }
 
-        # Get all calls for user from Supabase
-        all_calls = db_service.client.table('calls').select('*').eq('user_id', user_id).execute()
-        calls_data = all_calls.data if all_calls.data else []
-        
-        logger.info(f"Found {len(calls_data)} calls in database for user {user_id}")
+        # Per-day rollups (call_analytics): O(days) rows, not O(calls)
+        rollups = await db_service.get_call_analytics(user_id)
+        totals = analytics_rollups.summarize(rollups)
+
+        logger.info(f"Found {totals['total_calls']} calls across {len(rollups)} days for user {user_id}")
 
-        total_calls = len(calls_data)
-        scams_blocked = sum(1 for call in calls_data if call.get('intent') == 'scam' and call.get('status') == 'blocked')
+        total_calls = totals["total_calls"]
+        scams_blocked = totals["scams_blocked"]
 
-        # Get today's calls
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        today_calls_response = db_service.client.table('calls').select('*').eq('user_id', user_id).gte('started_at', today_start.isoformat()).execute()
-        today_calls_data = today_calls_response.data if today_calls_response.data else []
-        today_calls = len(today_calls_data)
+        # Today's bucket
+        today = datetime.utcnow().date().isoformat()
+        today_calls = sum(row.get("total_calls") or 0 for row in rollups if row.get("date") == today)
 
         # Calculate block rate
-        scam_calls = [c for c in calls_data if c.get('intent') == 'scam']
-        blocked_scams = sum(1 for call in scam_calls if call.get('status') == 'blocked')
-        block_rate = blocked_scams / len(scam_calls) if len(scam_calls) > 0 else 1.0
+        scam_calls = totals["intent_counts"].get("scam", 0)
+        block_rate = scams_blocked / scam_calls if scam_calls > 0 else 1.0
 
         # Calculate average call duration
-        durations = [c.get('duration_seconds', 0) for c in calls_data if c.get('duration_seconds')]
-        avg_call_duration = sum(durations) / len(durations) if durations else 45
+        avg_call_duration = (
+            totals["duration_seconds_total"] / totals["duration_count"] if totals["duration_count"] else 45
+        )
 
         # Calculate time saved (blocked calls * avg duration / 60)
         time_saved_minutes = int((scams_blocked * avg_call_duration) / 60)
@@ -212,28 +211,23 @@ async def get_user_stats(user_id: str) -> Dict[str, Any]:
             logger.warning("Database not initialized, returning demo stats")
             return demo_stats
 
-        # Get today's calls
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-
-        # Count calls by outcome
-        calls_today_response = db_service.client.table('calls').select('action_taken').eq('user_id', user_id).gte('created_at', today_start.isoformat()).execute()
-
-        calls_data = calls_today_response.data if calls_today_response.data else []
+        # Last 7 days of per-day rollups (today is the last bucket)
+        today = datetime.utcnow().date()
+        week_start = today - timedelta(days=7)
+        rollups = await db_service.get_call_analytics(user_id, since=week_start.isoformat())
 
-        scams_blocked = sum(1 for call in calls_data if call.get('action_taken') == 'blocked')
-        calls_handled = sum(1 for call in calls_data if call.get('action_taken') == 'screened')
-        calls_today = len(calls_data)
+        today_totals = analytics_rollups.summarize(row for row in rollups if row.get("date") == today.isoformat())
+        week_totals = analytics_rollups.summarize(rollups)
 
-        # Get week's calls for time saved calculation
-        week_start = datetime.utcnow() - timedelta(days=7)
-        week_calls_response = db_service.client.table('calls').select('*').eq('user_id', user_id).gte('created_at', week_start.isoformat()).execute()
+        calls_today = today_totals["total_calls"]
+        scams_blocked = today_totals["calls_blocked"]
+        calls_handled = today_totals["calls_screened"]
 
-        week_calls = week_calls_response.data if week_calls_response.data else []
         # Assuming average call duration of 2 minutes for now
-        time_saved_minutes = len(week_calls) * 2
+        time_saved_minutes = week_totals["total_calls"] * 2
 
         # Get whitelist count
-        whitelist_response = db_service.client.table('contacts').select('id', count='exact').eq('user_id', user_id).execute()
+        whitelist_response = await db_service.execute(db_service.client.table('contacts').select('id', count='exact').eq('user_id', user_id))
         whitelist_count = len(whitelist_response.data) if whitelist_response.data else 0
 
         return {
@@ -242,7 +236,7 @@ async def get_user_stats(user_id: str) -> Dict[str, Any]:
             "calls_handled": calls_handled,
             "time_saved_minutes": time_saved_minutes,
             "whitelist_count": whitelist_count,
-            "total_calls_week": len(week_calls)
+            "total_calls_week": week_totals["total_calls"]
         }
 
     except Exception as e:
@@ -287,7 +281,7 @@ async def get_recent_calls(user_id: str, limit: int = 10) -> List[Dict[str, Any]
             logger.warning("Database not initialized, returning demo calls")
             return demo_calls
 
-        response = db_service.client.table('calls').select('*').eq('user_id', user_id).order('created_at', desc=True).limit(limit).execute()
+        response = await db_service.execute(db_service.client.table('calls').select('*').eq('user_id', user_id).order('created_at', desc=True).limit(limit))
 
         return response.data if response.data else demo_calls
 
@@ -129,12 +129,13 @@ async def get_recent_calls(limit: int = 20, user_id: str = "demo_user"):
             return demo_calls[:limit]
 
         # Get recent calls from database
-        response = db_service.client.table('calls') \
-            .select('*, call_transcripts(summary)') \
-            .eq('user_id', user_id) \
-            .order('started_at', desc=True) \
-            .limit(limit) \
-            .execute()
+        response = await db_service.execute(
+            db_service.client.table('calls')
+            .select('*, call_transcripts(summary)')
+            .eq('user_id', user_id)
+            .order('started_at', desc=True)
+            .limit(limit)
+        )
 
         if not response.data:
             logger.info("No calls found in database, returning demo calls")
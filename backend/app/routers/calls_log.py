@@ -59,8 +59,8 @@ async def log_call(request: CallLogRequest):
         
         logger.info(f"Logging call: {call_data['caller_number']} - scam_score: {request.scam_score}")
         
-        # Insert call record
-        db_service.client.table('calls').insert(call_data).execute()
+        # Insert call record (and count it in the day's analytics rollup)
+        await db_service.insert_call(call_data)
         
         # Generate AI summary if transcript exists
         summary = f"Voice call - scam score: {request.scam_score:.2f}"
@@ -86,7 +86,7 @@ async def log_call(request: CallLogRequest):
                 "summary": summary
             }
             
-            db_service.client.table('call_transcripts').insert(transcript_data).execute()
+            await db_service.execute(db_service.client.table('call_transcripts').insert(transcript_data))
             logger.info(f"Transcript and summary logged for call {call_id}: {summary}")
         
         return {
@@ -114,12 +114,13 @@ async def get_calls(user_id: str = "00000000-0000-0000-0000-000000000001", limit
         return {"calls": [], "error": "Database not connected"}
     
     try:
-        response = db_service.client.table('calls') \
-            .select('*') \
-            .eq('user_id', user_id) \
-            .order('started_at', desc=True) \
-            .limit(limit) \
-            .execute()
+        response = await db_service.execute(
+            db_service.client.table('calls')
+            .select('*')
+            .eq('user_id', user_id)
+            .order('started_at', desc=True)
+            .limit(limit)
+        )
         
         calls = response.data if response.data else []
         logger.info(f"Retrieved {len(calls)} calls for user {user_id}")
@@ -141,14 +142,14 @@ async def get_call_details(call_id: str):
 
     try:
         # Fetch call data
-        call_response = db_service.client.table('calls').select('*').eq('id', call_id).single().execute()
+        call_response = await db_service.execute(db_service.client.table('calls').select('*').eq('id', call_id).single())
         if not call_response.data:
             raise HTTPException(status_code=404, detail="Call not found")
             
         call_data = call_response.data
 
         # Fetch transcript
-        transcript_response = db_service.client.table('call_transcripts').select('*').eq('call_id', call_id).execute()
+        transcript_response = await db_service.execute(db_service.client.table('call_transcripts').select('*').eq('call_id', call_id))
         transcript_data = transcript_response.data[0] if transcript_response.data else None
 
         return {
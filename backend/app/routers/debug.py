@@ -0,0 +1,68 @@
+"""
+Debug Router: runtime diagnostics
+Event loop lag histogram and blocking call sites (see app.core.loop_monitor)
+
+Mounted only with DEBUG_ENDPOINTS_ENABLED; every request must carry
+DEBUG_ADMIN_TOKEN in the X-Admin-Token header
+"""
+
+import hmac
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.core.loop_monitor import loop_monitor
+
+logger = logging.getLogger(__name__)
+
+
+async def require_admin_token(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """Reject requests without the configured admin token (all of them if none is configured)"""
+    expected = settings.DEBUG_ADMIN_TOKEN
+    if not expected or not x_admin_token or not hmac.compare_digest(x_admin_token, expected):
+        logger.warning("⚠️ Rejected /debug request without a valid admin token")
+        raise HTTPException(status_code=401, detail="Admin token required")
+
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+
+class LoopMonitorUpdate(BaseModel):
+    enabled: bool
+    sample_interval_ms: Optional[float] = Field(default=None, ge=1)
+    block_threshold_ms: Optional[float] = Field(default=None, ge=1)
+    reset: bool = False
+
+
+@router.get("/loop")
+async def get_loop_stats(top: Optional[int] = Query(default=None, ge=1)):
+    """
+    Event loop lag histogram and the call sites that blocked it longest
+
+    Each top_sites entry names the innermost app frame that was running
+    while the loop was stalled, the innermost frame overall (usually the
+    blocking library call) and the last captured stack.
+    """
+    return loop_monitor.get_stats(top)
+
+
+@router.post("/loop")
+async def update_loop_monitor(update: LoopMonitorUpdate):
+    """Switch the monitor on/off at runtime (optionally with new interval/threshold)"""
+    if update.reset:
+        loop_monitor.reset()
+    if update.enabled:
+        await loop_monitor.enable(update.sample_interval_ms, update.block_threshold_ms)
+    else:
+        await loop_monitor.disable()
+    return loop_monitor.get_stats()
+
+
+@router.delete("/loop")
+async def reset_loop_stats():
+    """Clear collected lag and call-site stats"""
+    loop_monitor.reset()
+    return loop_monitor.get_stats()
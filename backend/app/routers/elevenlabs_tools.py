@@ -247,7 +247,7 @@ async def transfer_call(request: Request):
         # Update call via Twilio to dial user
         from app.services.twilio_service import twilio_service
 
-        twilio_service.dial_user(user_phone, call_sid)
+        await twilio_service.dial_user(user_phone, call_sid)
 
         return {
             "success": True,
@@ -369,7 +369,7 @@ async def block_scam(request: Request):
 
         # End call via Twilio
         from app.services.twilio_service import twilio_service
-        twilio_service.hangup_call(call_sid)
+        await twilio_service.hangup_call(call_sid)
 
         # Log scam report to Supabase
         await db_service.create_scam_report(
@@ -5,11 +5,14 @@ This is the CORE routing logic that bridges Twilio ↔ ElevenLabs
 
 import logging
 import asyncio
+import base64
 import json
+from collections import deque
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Request, Response
-from typing import Dict, Optional
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
 
 from app.services.twilio_service import twilio_service
+from app.services.audio_codec import MulawCodec
 from app.services.elevenlabs_service import create_elevenlabs_service
 from app.services.gemini_service import get_gemini_service
 from app.services.database import db_service
@@ -20,6 +23,194 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+# 8kHz mu-law: one byte per sample
+MULAW_BYTES_PER_MS = 8
+
+
+class OutboundAudioQueue:
+    """
+    Per-call AI → caller audio sender
+
+    One writer task drains a bounded buffer of mu-law chunks:
+    - Ordering: chunks go out exactly in arrival order
+    - Coalescing: adjacent chunks are merged into one media message
+      (up to OUTBOUND_AUDIO_COALESCE_MS of audio), so one base64 + one
+      JSON string per message instead of per chunk
+    - Backpressure: if the socket falls behind by more than
+      OUTBOUND_AUDIO_MAX_BUFFERED_MS, the oldest audio is dropped
+    - Barge-in: clear() empties the buffer at once and sends Twilio's
+      "clear" event in order with the media messages
+    - Failure: if a send fails the writer stops, queued audio is counted
+      as dropped and on_error (the session closes the stream) is awaited
+    """
+
+    def __init__(
+        self,
+        max_buffered_ms: Optional[int] = None,
+        coalesce_ms: Optional[int] = None
+    ):
+        self.max_bytes = MULAW_BYTES_PER_MS * (max_buffered_ms or settings.OUTBOUND_AUDIO_MAX_BUFFERED_MS)
+        self.coalesce_bytes = MULAW_BYTES_PER_MS * (coalesce_ms or settings.OUTBOUND_AUDIO_COALESCE_MS)
+
+        self._chunks: Deque[bytes] = deque()
+        self._buffered = 0
+        self._clear_pending = False
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._send_text: Optional[Callable[[str], Awaitable[Any]]] = None
+        self._on_error: Optional[Callable[[Exception], Awaitable[Any]]] = None
+        self._closed = False
+        self._media_prefix = ""
+        self._clear_message = ""
+
+        # Counters
+        self.max_depth_bytes = 0
+        self.sent_messages = 0
+        self.sent_bytes = 0
+        self.dropped_bytes = 0
+        self.cleared_bytes = 0
+        self.writer_failures = 0
+
+    def start(
+        self,
+        send_text: Callable[[str], Awaitable[Any]],
+        stream_sid: str,
+        on_error: Optional[Callable[[Exception], Awaitable[Any]]] = None
+    ) -> None:
+        """Bind to the Twilio socket once the stream SID is known"""
+        sid = json.dumps(stream_sid)
+        self._send_text = send_text
+        self._on_error = on_error
+        self._media_prefix = '{"event": "media", "streamSid": ' + sid + ', "media": {"payload": "'
+        self._clear_message = '{"event": "clear", "streamSid": ' + sid + '}'
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run())
+
+    @property
+    def started(self) -> bool:
+        """Writer running (False before start() and after a failed send)"""
+        return self._writer is not None and not self._writer.done()
+
+    @property
+    def depth_bytes(self) -> int:
+        return self._buffered
+
+    @property
+    def depth_ms(self) -> float:
+        return self._buffered / MULAW_BYTES_PER_MS
+
+    def put(self, mulaw: bytes) -> None:
+        """Queue a mu-law chunk (never blocks; drops oldest audio when full)"""
+        if not mulaw:
+            return
+
+        self._chunks.append(mulaw)
+        self._buffered += len(mulaw)
+
+        while self._buffered > self.max_bytes and len(self._chunks) > 1:
+            dropped = self._chunks.popleft()
+            self._buffered -= len(dropped)
+            self.dropped_bytes += len(dropped)
+
+        self.max_depth_bytes = max(self.max_depth_bytes, self._buffered)
+        self._wakeup.set()
+
+    def clear(self) -> None:
+        """Barge-in: drop everything queued and tell Twilio to stop playback"""
+        self.cleared_bytes += self._buffered
+        self._chunks.clear()
+        self._buffered = 0
+        self._clear_pending = True
+        self._wakeup.set()
+
+    def _take_batch(self) -> bytes:
+        """Pop adjacent chunks up to coalesce_bytes (at least one chunk)"""
+        parts = [self._chunks.popleft()]
+        size = len(parts[0])
+
+        while self._chunks and size + len(self._chunks[0]) <= self.coalesce_bytes:
+            chunk = self._chunks.popleft()
+            parts.append(chunk)
+            size += len(chunk)
+
+        self._buffered -= size
+        return parts[0] if len(parts) == 1 else b"".join(parts)
+
+    async def _run(self) -> None:
+        """Writer task: the only coroutine that sends audio to Twilio"""
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+
+                while self._clear_pending or self._chunks:
+                    if self._clear_pending:
+                        self._clear_pending = False
+                        await self._send_text(self._clear_message)
+                        continue
+
+                    batch = self._take_batch()
+                    payload = base64.b64encode(batch).decode("ascii")
+                    await self._send_text(self._media_prefix + payload + '"}}')
+                    self.sent_messages += 1
+                    self.sent_bytes += len(batch)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The socket is gone or broken: stop buffering audio nobody will hear
+            self.writer_failures += 1
+            self.dropped_bytes += self._buffered
+            self._chunks.clear()
+            self._buffered = 0
+            logger.error(f"❌ Outbound audio writer stopped: {e}", exc_info=True)
+            if self._on_error is not None:
+                try:
+                    await self._on_error(e)
+                except Exception as close_error:
+                    logger.error(f"❌ Outbound audio failure handler failed: {close_error}")
+
+    async def close(self) -> None:
+        """Stop the writer and drop queued audio"""
+        self._chunks.clear()
+        self._buffered = 0
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+
+        if not self._closed:
+            self._closed = True
+            for key in _closed_queue_totals:
+                _closed_queue_totals[key] += getattr(self, key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and throughput counters"""
+        return {
+            "depth_bytes": self._buffered,
+            "depth_ms": self.depth_ms,
+            "max_depth_bytes": self.max_depth_bytes,
+            "sent_messages": self.sent_messages,
+            "sent_bytes": self.sent_bytes,
+            "dropped_bytes": self.dropped_bytes,
+            "cleared_bytes": self.cleared_bytes,
+            "writer_failures": self.writer_failures
+        }
+
+
+# Counters of closed queues, so /metrics totals outlive the calls
+_closed_queue_totals: Dict[str, int] = {
+    "sent_messages": 0,
+    "sent_bytes": 0,
+    "dropped_bytes": 0,
+    "cleared_bytes": 0,
+    "writer_failures": 0
+}
+
+
 class CallSession:
     """
     Manages state for a single call session
@@ -45,6 +236,13 @@ class CallSession:
         # Audio buffers
         self.audio_buffer = bytearray()
 
+        # Per-direction transcoders (reuse scratch buffers across 20ms frames)
+        self.inbound_codec = MulawCodec()
+        self.outbound_codec = MulawCodec()
+
+        # AI → caller audio (single ordered writer, started with the stream)
+        self.outbound_audio = OutboundAudioQueue()
+
     async def handle_twilio_websocket(self, websocket: WebSocket) -> None:
         """
         Main handler for Twilio Media Streams WebSocket
@@ -118,6 +316,9 @@ class CallSession:
                 self.stream_sid = start_data.get("streamSid")
                 logger.info(f"📡 Call {self.call_sid} - Stream SID: {self.stream_sid}")
 
+                if self.twilio_ws and self.stream_sid:
+                    self.outbound_audio.start(self.twilio_ws.send_text, self.stream_sid, on_error=self._on_outbound_audio_failed)
+
                 # Check if caller is whitelisted
                 await self._check_whitelist()
 
@@ -127,8 +328,9 @@ class CallSession:
                 audio_payload = media_data.get("payload")  # Base64 mu-law
 
                 if audio_payload:
-                    # Decode mu-law to PCM
-                    pcm_audio = twilio_service.decode_mulaw_audio(audio_payload)
+                    # Decode mu-law to PCM (view into inbound_codec's buffer,
+                    # consumed before the next frame is decoded)
+                    pcm_audio = self.inbound_codec.decode_payload(audio_payload)
 
                     # Forward to ElevenLabs
                     await self.elevenlabs_service.send_audio(pcm_audio)
@@ -144,41 +346,26 @@ class CallSession:
     def _on_elevenlabs_audio(self, audio_bytes: bytes) -> None:
         """
         Callback: Received audio from ElevenLabs (AI response)
-        Send it to Twilio (caller hears this)
+        Queue it for Twilio (caller hears this)
 
         Args:
             audio_bytes: PCM audio from AI
         """
         try:
-            # Encode PCM to mu-law for Twilio
-            mulaw_audio = twilio_service.encode_pcm_to_mulaw(audio_bytes)
+            if not self.outbound_audio.started:
+                return
 
-            # Send to Twilio WebSocket
-            if self.twilio_ws and self.stream_sid:
-                asyncio.create_task(self._send_audio_to_twilio(mulaw_audio))
+            # Encode PCM to mu-law (copied out of the codec's scratch buffer)
+            self.outbound_audio.put(bytes(self.outbound_codec.encode(audio_bytes)))
 
         except Exception as e:
             logger.error(f"❌ Error sending audio to Twilio: {e}")
 
-    async def _send_audio_to_twilio(self, mulaw_base64: str) -> None:
-        """
-        Send audio to Twilio Media Streams
-
-        Args:
-            mulaw_base64: Base64-encoded mu-law audio
-        """
-        if not self.twilio_ws or not self.stream_sid:
-            return
-
-        message = {
-            "event": "media",
-            "streamSid": self.stream_sid,
-            "media": {
-                "payload": mulaw_base64
-            }
-        }
-
-        await self.twilio_ws.send_text(json.dumps(message))
+    async def _on_outbound_audio_failed(self, error: Exception) -> None:
+        """The caller can no longer hear the AI: close the stream (ends the session)"""
+        logger.error(f"❌ Call {self.call_sid} - Outbound audio failed, closing stream: {error}")
+        if self.twilio_ws is not None:
+            await self.twilio_ws.close(code=1011)
 
     def _on_elevenlabs_transcript(self, text: str) -> None:
         """
@@ -199,24 +386,13 @@ class CallSession:
         Callback: User interrupted AI (barge-in detected)
         Need to clear Twilio's audio buffer
         """
-        logger.debug(f"🛑 Call {self.call_sid} - Interruption detected")
-
-        # Send clear command to Twilio
-        if self.twilio_ws and self.stream_sid:
-            asyncio.create_task(self._clear_twilio_buffer())
-
-    async def _clear_twilio_buffer(self) -> None:
-        """Clear Twilio's audio playback buffer (for interruptions)"""
-        if not self.twilio_ws or not self.stream_sid:
-            return
-
-        message = {
-            "event": "clear",
-            "streamSid": self.stream_sid
-        }
+        logger.debug(
+            f"🛑 Call {self.call_sid} - Interruption detected, "
+            f"dropping {self.outbound_audio.depth_ms:.0f}ms of queued audio"
+        )
 
-        await self.twilio_ws.send_text(json.dumps(message))
-        logger.debug("✅ Cleared Twilio buffer")
+        # Drop queued audio and send clear command to Twilio (in order)
+        self.outbound_audio.clear()
 
     async def _check_whitelist(self) -> None:
         """Check if caller is in user's contact whitelist"""
@@ -241,7 +417,8 @@ class CallSession:
             gemini_service = get_gemini_service()
             result = await gemini_service.classify_caller_intent(
                 transcript=self.transcript,
-                caller_name=None  # TODO: Extract from transcript
+                caller_name=None,  # TODO: Extract from transcript
+                call_sid=self.call_sid
             )
 
             self.intent = result.get("intent")
@@ -278,7 +455,7 @@ class CallSession:
         user = await db_service.get_user_by_id(self.user_id)
         user_phone = user.get("phone_number")
 
-        twilio_service.dial_user(user_phone, self.call_sid)
+        await twilio_service.dial_user(user_phone, self.call_sid)
 
     async def _block_scam(self) -> None:
         """Block a detected scam call"""
@@ -320,7 +497,7 @@ class CallSession:
     async def _hangup(self) -> None:
         """Terminate the call"""
         try:
-            twilio_service.hangup_call(self.call_sid)
+            await twilio_service.hangup_call(self.call_sid)
             await self._cleanup()
         except Exception as e:
             logger.error(f"❌ Failed to hang up: {e}")
@@ -331,6 +508,10 @@ class CallSession:
 
         self.status = "ended"
 
+        # Stop sending AI audio
+        logger.debug(f"🔈 Call {self.call_sid} - Outbound audio: {self.outbound_audio.get_stats()}")
+        await self.outbound_audio.close()
+
         # Disconnect ElevenLabs
         await self.elevenlabs_service.disconnect()
 
@@ -351,6 +532,21 @@ class CallSession:
 active_sessions: Dict[str, CallSession] = {}
 
 
+def get_outbound_audio_stats() -> Dict[str, Any]:
+    """Outbound audio queue depth (live calls) and counters (all calls) for the /metrics endpoint"""
+    queues = [session.outbound_audio for session in active_sessions.values()]
+    totals = dict(_closed_queue_totals)
+    for queue in queues:
+        for key in totals:
+            totals[key] += getattr(queue, key)
+    return {
+        "active_streams": sum(1 for queue in queues if queue.started),
+        "depth_bytes": sum(queue.depth_bytes for queue in queues),
+        "max_depth_ms": max((queue.depth_ms for queue in queues), default=0.0),
+        **totals
+    }
+
+
 @router.post("/webhooks/twilio/voice")
 async def twilio_voice_webhook(request: Request):
     """
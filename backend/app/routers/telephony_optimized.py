@@ -7,14 +7,17 @@ Intelligence runs via webhooks (zero latency impact)
 
 import logging
 import json
-import httpx
 from fastapi import APIRouter, Request, Response, BackgroundTasks
 from fastapi.responses import PlainTextResponse
 from typing import Dict
 
 from app.services.database import db_service
 from app.services.rag_service import rag_service
+from app.services.reputation_index import reputation_index
 from app.services.gcs_service import gcs_service
+from app.services.http_client import http_client
+from app.services.local_intelligence import local_intelligence
+from app.services.write_behind import write_behind
 from app.agents.orchestrator import analyze_ongoing_call
 from app.core.config import settings
 
@@ -45,6 +48,14 @@ async def incoming_call(request: Request, background_tasks: BackgroundTasks):
 
     logger.info(f"📞 Incoming call: {call_sid} from {caller_number}")
 
+    # Fastest path: known scammer (in-memory blocklist, no I/O)
+    if settings.BLOCKLIST_PRESCREEN_ENABLED and reputation_index.is_blocked(caller_number):
+        logger.info(f"🚫 Rejected blocklisted caller {caller_number} ({call_sid})")
+        return PlainTextResponse(
+            content='<Response><Reject reason="rejected"/></Response>',
+            media_type="application/xml"
+        )
+
     # Fast path: Check whitelist (local database lookup, <10ms)
     try:
         user = await db_service.get_user_by_twilio_number(to_number)
@@ -130,37 +141,35 @@ async def incoming_call(request: Request, background_tasks: BackgroundTasks):
         # Call ElevenLabs Register Call API to get TwiML
         # This returns correct TwiML for connecting to Conversational AI agent
         try:
-            async with httpx.AsyncClient() as client:
-                elevenlabs_response = await client.post(
-                    "https://api.elevenlabs.io/v1/convai/twilio/register-call",
-                    headers={
-                        "xi-api-key": settings.ELEVENLABS_API_KEY,
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "agent_id": settings.ELEVENLABS_AGENT_ID,
-                        "from_number": caller_number,
-                        "to_number": to_number,
-                        "conversation_initiation_client_data": {
-                            "user_id": user_id,
-                            "call_sid": call_sid,
-                            "user_name": user.get("name", "User"),
-                            "mode": user_mode,
-                            "voice_id": voice_id,
-                            "accessibility_mode": is_accessibility_mode
-                        }
-                    },
-                    timeout=10.0
-                )
-
-                if elevenlabs_response.status_code == 200:
-                    # ElevenLabs returns ready-to-use TwiML
-                    twiml = elevenlabs_response.text
-                    logger.info(f"✅ ElevenLabs TwiML received for call {call_sid}")
-                    return PlainTextResponse(content=twiml, media_type="application/xml")
-                else:
-                    logger.error(f"❌ ElevenLabs API error: {elevenlabs_response.status_code} - {elevenlabs_response.text}")
-                    raise Exception(f"ElevenLabs API failed: {elevenlabs_response.status_code}")
+            elevenlabs_response = await http_client.post(
+                "https://api.elevenlabs.io/v1/convai/twilio/register-call",
+                headers={
+                    "xi-api-key": settings.ELEVENLABS_API_KEY,
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "agent_id": settings.ELEVENLABS_AGENT_ID,
+                    "from_number": caller_number,
+                    "to_number": to_number,
+                    "conversation_initiation_client_data": {
+                        "user_id": user_id,
+                        "call_sid": call_sid,
+                        "user_name": user.get("name", "User"),
+                        "mode": user_mode,
+                        "voice_id": voice_id,
+                        "accessibility_mode": is_accessibility_mode
+                    }
+                }
+            )
+
+            if elevenlabs_response.status_code == 200:
+                # ElevenLabs returns ready-to-use TwiML
+                twiml = elevenlabs_response.text
+                logger.info(f"✅ ElevenLabs TwiML received for call {call_sid}")
+                return PlainTextResponse(content=twiml, media_type="application/xml")
+            else:
+                logger.error(f"❌ ElevenLabs API error: {elevenlabs_response.status_code} - {elevenlabs_response.text}")
+                raise Exception(f"ElevenLabs API failed: {elevenlabs_response.status_code}")
 
         except Exception as e:
             logger.error(f"❌ Failed to connect to ElevenLabs: {e}")
@@ -258,6 +267,11 @@ async def analyze_call_realtime(
             updated_transcript=transcript
         )
 
+        # Absorbed into a newer update's analysis: that run acts on the verdict
+        # and saves its (newer) transcript
+        if not analysis.get("leader", True):
+            return
+
         scam_score = analysis.get("scam_score", 0.0)
         should_block = analysis.get("should_block", False)
         intent = analysis.get("intent", "unknown")
@@ -272,22 +286,20 @@ async def analyze_call_realtime(
             from app.services.twilio_service import twilio_service
             await twilio_service.end_call(call_sid)
 
-            # Update database
-            await db_service.update_call(
-                call_sid=call_sid,
-                updates={
-                    "intent": "scam",
-                    "scam_score": scam_score,
-                    "action_taken": "blocked"
-                }
+            # Update database (write-behind: batched with other calls' writes)
+            await write_behind.update_call(
+                call_sid,
+                intent="scam",
+                scam_score=scam_score,
+                action_taken="blocked"
             )
 
             # Save scam report
-            await db_service.create_scam_report(
+            await write_behind.create_scam_report(
                 call_sid=call_sid,
                 scam_type=intent,  # "scam" from intent classification
-                red_flags=[],  # TODO: Extract from orchestrator analysis
-                confidence=scam_score
+                confidence=scam_score,
+                pattern_matched=", ".join(analysis.get("red_flags", []))
             )
 
             # Upload evidence to GCS (immutable)
@@ -324,19 +336,17 @@ async def analyze_call_realtime(
                     from app.services.twilio_service import twilio_service
                     await twilio_service.end_call(call_sid)
 
-                    await db_service.update_call(
-                        call_sid=call_sid,
-                        updates={
-                            "intent": "scam",
-                            "scam_score": combined_score,
-                            "action_taken": "blocked"
-                        }
+                    await write_behind.update_call(
+                        call_sid,
+                        intent="scam",
+                        scam_score=combined_score,
+                        action_taken="blocked"
                     )
 
-        # 4. Save transcript
-        await db_service.update_call_transcript(call_sid, transcript)
+        # 4. Save transcript (queued; repeated updates collapse to the latest)
+        await write_behind.save_transcript(call_sid, transcript)
 
-        # 5. Upload to GCS with ADK analysis metadata
+        # 5. Upload to GCS with ADK analysis metadata (debounced: latest version wins)
         await gcs_service.upload_transcript(
             call_sid=call_sid,
             user_id=user_id,
@@ -355,24 +365,15 @@ async def analyze_call_realtime(
 
 async def finalize_call(call_sid: str, duration: int):
     """Finalize call record when call ends"""
-    try:
-        # Update duration
-        await db_service.update_call(
-            call_sid=call_sid,
-            updates={"duration": duration}
-        )
+    # Drop the incremental transcript state kept for this call
+    local_intelligence.end_stream(call_sid)
 
-        # Update analytics
-        call = await db_service.get_call_by_sid(call_sid)
+    try:
+        # Update duration (the day's analytics rollup follows the call row)
+        await write_behind.update_call(call_sid, duration_seconds=duration)
 
-        if call:
-            await db_service.update_analytics(
-                user_id=call["user_id"],
-                date=call["created_at"].date(),
-                total_calls_increment=1,
-                scams_blocked_increment=1 if call.get("action_taken") == "blocked" else 0,
-                time_saved_minutes=duration // 60 if call.get("action_taken") in ["blocked", "screened"] else 0
-            )
+        # Upload the final transcript now instead of waiting out the debounce
+        await gcs_service.flush_call(call_sid)
 
         logger.info(f"✅ Finalized call: {call_sid} ({duration}s)")
 
@@ -0,0 +1,120 @@
+"""
+Analytics Rollups: per-user, per-day call counters (call_analytics table)
+Keeps the dashboard at O(days) reads instead of scanning every call row
+
+Each call contributes a fixed set of facets to the bucket of the day it
+started (counted once, scam blocked, duration, intent, ...). When a call
+row changes, only the difference between its old and new facets is sent
+to the increment_call_analytics function, so re-classifying a call moves
+its counts instead of adding them twice.
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional
+
+# Call columns that affect a call's facets
+ROLLUP_FIELDS = frozenset({
+    "user_id", "started_at", "created_at",
+    "status", "intent", "action_taken", "passed_through", "duration_seconds"
+})
+
+# Integer counters on call_analytics (intent_counts is a jsonb map beside them)
+COUNTERS = (
+    "total_calls",
+    "scams_blocked",
+    "sales_blocked",
+    "contacts_passed",
+    "unknown_screened",
+    "calls_blocked",
+    "calls_screened",
+    "duration_seconds_total",
+    "duration_count",
+)
+
+
+def call_facets(call: Dict[str, Any]) -> Dict[str, Any]:
+    """A call's contribution to its day's rollup row"""
+    intent = call.get("intent") or "unknown"
+    status_blocked = call.get("status") == "blocked"
+    passed = bool(call.get("passed_through"))
+    duration = int(call.get("duration_seconds") or 0)
+
+    return {
+        "total_calls": 1,
+        "scams_blocked": int(intent == "scam" and status_blocked),
+        "sales_blocked": int(intent == "sales" and status_blocked),
+        "contacts_passed": int(passed),
+        "unknown_screened": int(intent == "unknown" and not status_blocked and not passed),
+        "calls_blocked": int(call.get("action_taken") == "blocked"),
+        "calls_screened": int(call.get("action_taken") == "screened"),
+        "duration_seconds_total": duration,
+        "duration_count": int(duration > 0),
+        "intent_counts": {intent: 1},
+    }
+
+
+def facet_deltas(before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Counter changes that turn `before` into `after` (None = call absent)
+
+    Returns:
+        {"total_calls": 1, ..., "intent_counts": {"scam": 1, "unknown": -1}}
+        with zero entries dropped; empty when nothing changed
+    """
+    old = call_facets(before) if before else {}
+    new = call_facets(after) if after else {}
+
+    deltas: Dict[str, Any] = {}
+    for counter in COUNTERS:
+        change = new.get(counter, 0) - old.get(counter, 0)
+        if change:
+            deltas[counter] = change
+
+    intents: Dict[str, int] = {}
+    for intent, count in new.get("intent_counts", {}).items():
+        intents[intent] = intents.get(intent, 0) + count
+    for intent, count in old.get("intent_counts", {}).items():
+        intents[intent] = intents.get(intent, 0) - count
+    intents = {intent: count for intent, count in intents.items() if count}
+    if intents:
+        deltas["intent_counts"] = intents
+
+    return deltas
+
+
+def merge_deltas(into: Dict[str, Any], deltas: Dict[str, Any]) -> Dict[str, Any]:
+    """Add one set of deltas into another (several calls → one increment per day bucket)"""
+    for key, change in deltas.items():
+        if isinstance(change, dict):
+            counts = into.setdefault(key, {})
+            for intent, count in change.items():
+                counts[intent] = counts.get(intent, 0) + count
+        else:
+            into[key] = into.get(key, 0) + change
+    return into
+
+
+def rollup_day(call: Dict[str, Any]) -> str:
+    """ISO date of the bucket a call counts towards (its start day, UTC)"""
+    for column in ("started_at", "created_at"):
+        value = call.get(column)
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()[:10]
+        if value:
+            return str(value)[:10]
+    return datetime.utcnow().date().isoformat()
+
+
+def summarize(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum call_analytics rows (any date range) into one set of counters"""
+    totals: Dict[str, Any] = {counter: 0 for counter in COUNTERS}
+    intents: Dict[str, int] = {}
+
+    for row in rows:
+        for counter in COUNTERS:
+            totals[counter] += int(row.get(counter) or 0)
+        for intent, count in (row.get("intent_counts") or {}).items():
+            intents[intent] = intents.get(intent, 0) + int(count)
+
+    totals["intent_counts"] = intents
+    return totals
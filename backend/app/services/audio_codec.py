@@ -0,0 +1,177 @@
+"""
+Audio Codec: G.711 mu-law ↔ 16-bit PCM with NumPy lookup tables
+Drop-in replacement for audioop.ulaw2lin / lin2ulaw / rms (audioop is gone in Python 3.13)
+
+Both directions are a single table lookup per sample:
+- decode: 256-entry table (mu-law byte → int16)
+- encode: 65536-entry table (int16 bit pattern → mu-law byte)
+
+Tables are bit-exact with audioop. MulawCodec keeps per-stream scratch
+buffers so 20ms frames are transcoded without per-frame array allocation.
+Lookups use mode="clip": indices can never be out of range (uint8/uint16
+into 256/65536 entries), and it lets np.take write straight into `out`.
+"""
+
+import base64
+import binascii
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# Twilio Media Streams: 8kHz mono, 20ms frames
+FRAME_SAMPLES = 160
+
+_BIAS = 0x84
+_CLIP = 8159  # 14-bit magnitude limit used by audioop
+_SEG_END = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF], dtype=np.int32)
+
+
+def _build_decode_table() -> np.ndarray:
+    """mu-law byte → linear int16 (audioop st_ulaw2linear16)"""
+    u_val = ~np.arange(256, dtype=np.int32) & 0xFF
+    t = ((u_val & 0x0F) << 3) + _BIAS
+    t <<= (u_val & 0x70) >> 4
+    return np.where(u_val & 0x80, _BIAS - t, t - _BIAS).astype(np.int16)
+
+
+def _build_encode_table() -> np.ndarray:
+    """int16 bit pattern (as uint16) → mu-law byte (audioop st_14linear2ulaw)"""
+    samples = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32)
+    pcm_val = samples >> 2  # audioop works on 14-bit samples
+
+    mask = np.where(pcm_val < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(pcm_val), _CLIP) + (_BIAS >> 2)
+
+    segment = np.searchsorted(_SEG_END, magnitude)  # First segment whose end >= magnitude
+    mantissa = (magnitude >> np.minimum(segment + 1, 31)) & 0x0F
+    encoded = np.where(segment >= 8, 0x7F, (segment << 4) | mantissa)
+    return (encoded ^ mask).astype(np.uint8)
+
+
+ULAW_TO_PCM = _build_decode_table()
+PCM_TO_ULAW = _build_encode_table()
+
+
+class MulawCodec:
+    """
+    Per-stream transcoder with reusable buffers
+
+    Usage:
+        codec = MulawCodec()
+        pcm = codec.decode_payload(twilio_media_payload)   # memoryview of PCM16
+        payload = codec.encode_payload(pcm_from_elevenlabs) # base64 mu-law str
+
+    Returned memoryviews point into the codec's scratch buffers and are only
+    valid until the next call on the same codec; copy (bytes(view)) to keep.
+    One codec per stream, used from one task at a time.
+    """
+
+    def __init__(self, frame_samples: int = FRAME_SAMPLES):
+        self._pcm = np.empty(frame_samples, dtype=np.int16)
+        self._mulaw = np.empty(frame_samples, dtype=np.uint8)
+
+    def _pcm_buffer(self, samples: int) -> np.ndarray:
+        if self._pcm.size < samples:
+            self._pcm = np.empty(samples, dtype=np.int16)
+        return self._pcm[:samples]
+
+    def _mulaw_buffer(self, samples: int) -> np.ndarray:
+        if self._mulaw.size < samples:
+            self._mulaw = np.empty(samples, dtype=np.uint8)
+        return self._mulaw[:samples]
+
+    # ========================
+    # Single frames
+    # ========================
+
+    def decode(self, mulaw: BytesLike) -> memoryview:
+        """mu-law bytes → PCM16 (little-endian) view"""
+        codes = np.frombuffer(mulaw, dtype=np.uint8)
+        out = self._pcm_buffer(codes.size)
+        np.take(ULAW_TO_PCM, codes, out=out, mode="clip")
+        return memoryview(out).cast("B")
+
+    def encode(self, pcm: BytesLike) -> memoryview:
+        """PCM16 (little-endian) bytes → mu-law view (a trailing odd byte is ignored)"""
+        view = memoryview(pcm).cast("B")
+        samples = np.frombuffer(view[:len(view) - len(view) % 2], dtype="<u2")
+        out = self._mulaw_buffer(samples.size)
+        np.take(PCM_TO_ULAW, samples, out=out, mode="clip")
+        return memoryview(out).cast("B")
+
+    def decode_payload(self, base64_payload: Union[str, bytes]) -> memoryview:
+        """Twilio media payload (base64 mu-law) → PCM16 view"""
+        return self.decode(binascii.a2b_base64(base64_payload))
+
+    def encode_payload(self, pcm: BytesLike) -> str:
+        """PCM16 bytes → Twilio media payload (base64 mu-law)"""
+        return base64.b64encode(self.encode(pcm)).decode("ascii")
+
+
+# ========================
+# Batched API (many frames / many calls per tick)
+# ========================
+
+def decode_frames(frames: Sequence[BytesLike], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Decode equal-length mu-law frames in one lookup
+
+    Returns:
+        int16 array shaped (len(frames), frame_samples); written into out if given
+    """
+    codes = np.frombuffer(b"".join(frames), dtype=np.uint8).reshape(len(frames), -1)
+    if out is None:
+        out = np.empty(codes.shape, dtype=np.int16)
+    np.take(ULAW_TO_PCM, codes, out=out, mode="clip")
+    return out
+
+
+def encode_frames(pcm_frames: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Encode an int16 array of frames (any shape) in one lookup
+
+    Returns:
+        uint8 mu-law array of the same shape; written into out if given
+    """
+    indices = np.ascontiguousarray(pcm_frames, dtype=np.int16).view(np.uint16)
+    if out is None:
+        out = np.empty(indices.shape, dtype=np.uint8)
+    np.take(PCM_TO_ULAW, indices, out=out, mode="clip")
+    return out
+
+
+# ========================
+# Stateless helpers (allocate; fine off the per-frame hot path)
+# ========================
+
+def ulaw2lin(mulaw: BytesLike) -> bytes:
+    """audioop.ulaw2lin(mulaw, 2) equivalent"""
+    return ULAW_TO_PCM[np.frombuffer(mulaw, dtype=np.uint8)].tobytes()
+
+
+def lin2ulaw(pcm: BytesLike) -> bytes:
+    """audioop.lin2ulaw(pcm, 2) equivalent"""
+    view = memoryview(pcm).cast("B")
+    samples = np.frombuffer(view[:len(view) - len(view) % 2], dtype="<u2")
+    return PCM_TO_ULAW[samples].tobytes()
+
+
+def decode_payload(base64_payload: Union[str, bytes]) -> bytes:
+    """Twilio media payload (base64 mu-law) → PCM16 bytes"""
+    return ulaw2lin(binascii.a2b_base64(base64_payload))
+
+
+def encode_payload(pcm: BytesLike) -> str:
+    """PCM16 bytes → Twilio media payload (base64 mu-law)"""
+    return base64.b64encode(lin2ulaw(pcm)).decode("ascii")
+
+
+def rms(pcm: BytesLike) -> int:
+    """audioop.rms(pcm, 2) equivalent (integer RMS of 16-bit samples)"""
+    view = memoryview(pcm).cast("B")
+    samples = np.frombuffer(view[:len(view) - len(view) % 2], dtype="<i2")
+    if samples.size == 0:
+        return 0
+    return int(np.sqrt(np.dot(samples.astype(np.float64), samples) / samples.size))
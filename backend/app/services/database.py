@@ -3,14 +3,21 @@ Database Service: Supabase PostgreSQL client
 Handles all database operations for AI Gatekeeper
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Optional
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set
 from supabase import create_client, Client
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.services import analytics_rollups
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
 
 class DatabaseService:
     """
@@ -22,14 +29,45 @@ class DatabaseService:
     - calls: Call records
     - call_transcripts: Full transcripts
     - scam_reports: Detected scams
+    - call_analytics: Per-user, per-day counters (kept current on call writes)
+
+    The supabase-py client is synchronous, so every query runs on a bounded
+    worker pool (DB_POOL_SIZE threads) via execute() and never blocks the
+    event loop.
+
+    Hot-path lookups (user by Twilio number, voice profile, contact) are
+    read-through cached; writers call the invalidate_* hooks.
+
+    Call writes (insert_call / update_call) roll their effect on the day's
+    counters into call_analytics, so the dashboard never scans calls.
     """
 
     def __init__(self):
         self.client: Optional[Client] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Read-through caches: key → row, or None for a definite not-found
+        self.user_cache = self._lookup_cache("users_by_twilio_number")
+        self.voice_profile_cache = self._lookup_cache("voice_profiles")
+        self.contact_cache = self._lookup_cache("contacts")
+
+    @staticmethod
+    def _lookup_cache(name: str) -> TTLCache:
+        return TTLCache(
+            max_size=settings.LOOKUP_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LOOKUP_CACHE_TTL_SECONDS,
+            name=name
+        )
 
     async def init(self) -> None:
         """Initialize Supabase client"""
         try:
+            if settings.DATABASE_BACKEND == "local":
+                from app.services.local_db import LocalDatabaseClient
+                self.client = LocalDatabaseClient(settings.LOCAL_DB_PATH)
+                logger.info("✅ Database initialized (local SQLite backend)")
+                return
+
             # Check for valid keys or Demo Mode
             # If keys are placeholders ("demo_"), and DEMO_MODE is True, use mock.
             # If keys are REAL, connect even if DEMO_MODE is True (Partial Live Mode).
@@ -54,6 +92,80 @@ class DatabaseService:
                 return
             raise
 
+    # ========================
+    # QUERY EXECUTION
+    # ========================
+
+    async def execute(self, query: Any) -> Any:
+        """
+        Run a built query (table(...)...., rpc(...)) without blocking the loop
+
+        Usage:
+            response = await db_service.execute(
+                db_service.client.table("calls").select("*").eq("call_sid", call_sid)
+            )
+            response.data
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.DB_POOL_SIZE,
+                thread_name_prefix="db"
+            )
+
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(
+            loop.run_in_executor(self._executor, query.execute),
+            timeout=settings.DB_QUERY_TIMEOUT_SECONDS
+        )
+
+    async def _cached_lookup(self, cache: TTLCache, key: Any, query: Any) -> Optional[Dict]:
+        """
+        Read-through lookup of at most one row
+
+        Cached rows are returned as copies. An empty result is a definite
+        not-found and is cached for LOOKUP_CACHE_NEGATIVE_TTL_SECONDS; query
+        errors propagate and are never cached.
+        """
+        cached = cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            return dict(cached) if cached is not None else None
+
+        response = await self.execute(query)
+        row = response.data[0] if response.data else None
+
+        if row is None:
+            cache.set(key, None, ttl_seconds=settings.LOOKUP_CACHE_NEGATIVE_TTL_SECONDS)
+            return None
+
+        cache.set(key, row)
+        return dict(row)
+
+    def invalidate_user(self, twilio_number: str) -> None:
+        """Call after writing a user row (or moving their Twilio number)"""
+        self.user_cache.invalidate(twilio_number)
+
+    def invalidate_voice_profile(self, user_id: str) -> None:
+        """Call after writing a user's voice profiles"""
+        self.voice_profile_cache.invalidate(user_id)
+
+    def invalidate_contact(self, user_id: str, phone_number: str) -> None:
+        """Call after writing a contact"""
+        self.contact_cache.invalidate((user_id, phone_number))
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Lookup cache counters for the /metrics endpoint"""
+        return {
+            "users": self.user_cache.get_stats(),
+            "voice_profiles": self.voice_profile_cache.get_stats(),
+            "contacts": self.contact_cache.get_stats()
+        }
+
+    async def close(self) -> None:
+        """Stop the worker pool (called on app shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
     # ========================
     # USERS
     # ========================
@@ -64,7 +176,7 @@ class DatabaseService:
             return {"id": user_id, "name": "Demo User"} if settings.DEMO_MODE else None
 
         try:
-            response = self.client.table("users").select("*").eq("id", user_id).single().execute()
+            response = await self.execute(self.client.table("users").select("*").eq("id", user_id).single())
             return response.data
         except Exception as e:
             logger.error(f"Error getting user {user_id}: {e}")
@@ -77,10 +189,13 @@ class DatabaseService:
              return {"id": "demo_user", "name": "Demo User"} if settings.DEMO_MODE else None
 
         try:
-            response = self.client.table("users").select("*").eq("twilio_phone_number", twilio_number).single().execute()
-            return response.data
+            return await self._cached_lookup(
+                self.user_cache,
+                twilio_number,
+                self.client.table("users").select("*").eq("twilio_phone_number", twilio_number).limit(1)
+            )
         except Exception as e:
-            logger.debug(f"No user found for Twilio number {twilio_number}")
+            logger.error(f"Error getting user for Twilio number {twilio_number}: {e}")
             return None
 
     # ========================
@@ -93,17 +208,17 @@ class DatabaseService:
             return None
 
         try:
-            response = (
+            return await self._cached_lookup(
+                self.contact_cache,
+                (user_id, phone_number),
                 self.client.table("contacts")
                 .select("*")
                 .eq("user_id", user_id)
                 .eq("phone_number", phone_number)
-                .single()
-                .execute()
+                .limit(1)
             )
-            return response.data
         except Exception as e:
-            logger.debug(f"No contact found for {phone_number}")
+            logger.debug(f"Contact lookup failed for {phone_number}: {e}")
             return None
 
     # ========================
@@ -134,28 +249,29 @@ class DatabaseService:
                 if key in kwargs:
                     data[key] = kwargs[key]
 
-            response = (
-                self.client.table("calls")
-                .insert(data)
-                .execute()
-            )
-            return response.data[0] if response.data else {}
+            return await self.insert_call(data)
         except Exception as e:
             logger.error(f"Error creating call record: {e}")
             return {}
 
+    async def insert_call(self, data: Dict) -> Dict:
+        """Insert a full call row and count it in the day's rollup (raises on insert errors)"""
+        response = await self.execute(self.client.table("calls").insert(data))
+        row = response.data[0] if response.data else dict(data)
+        await self._roll_up_insert(row)
+        return row
+
     async def get_call_by_sid(self, call_sid: str) -> Optional[Dict]:
         """Get call record by Twilio SID"""
         if not self.client:
             return {"id": "demo_call_id", "call_sid": call_sid} if settings.DEMO_MODE else None
 
         try:
-            response = (
+            response = await self.execute(
                 self.client.table("calls")
                 .select("*")
                 .eq("call_sid", call_sid)
                 .single()
-                .execute()
             )
             return response.data
         except Exception as e:
@@ -195,7 +311,14 @@ class DatabaseService:
                 update_data[key] = value
 
             if update_data:
-                self.client.table("calls").update(update_data).eq("call_sid", call_sid).execute()
+                if settings.ANALYTICS_ROLLUPS_ENABLED and analytics_rollups.ROLLUP_FIELDS.intersection(update_data):
+                    # Diffed against the locked row in the database (see apply_call_updates)
+                    await self.execute(self.client.rpc("apply_call_updates", {
+                        "p_updates": [{"call_sid": call_sid, **update_data}],
+                        "p_roll_up": True
+                    }))
+                else:
+                    await self.execute(self.client.table("calls").update(update_data).eq("call_sid", call_sid))
 
             # Update transcript separately if provided
             if transcript:
@@ -204,6 +327,55 @@ class DatabaseService:
         except Exception as e:
             logger.error(f"Error updating call {call_sid}: {e}")
 
+    # ========================
+    # ANALYTICS ROLLUPS
+    # ========================
+
+    async def _roll_up_insert(self, row: Dict) -> None:
+        """
+        Count a newly inserted call in its day's bucket
+
+        Updates are rolled up by the apply_call_updates function, which diffs
+        each call against its row under a lock; an insert has no prior state.
+        """
+        if not settings.ANALYTICS_ROLLUPS_ENABLED or not row.get("user_id"):
+            return
+        await self.update_analytics(
+            row["user_id"], analytics_rollups.rollup_day(row), analytics_rollups.facet_deltas(None, row)
+        )
+
+    async def update_analytics(self, user_id: str, day: str, deltas: Dict[str, Any]) -> None:
+        """
+        Atomically add counter deltas to one call_analytics row (created on first use)
+
+        Args:
+            day: ISO date of the bucket
+            deltas: {"total_calls": 1, ..., "intent_counts": {"scam": 1}}
+        """
+        if not self.client:
+            return
+
+        try:
+            await self.execute(self.client.rpc("increment_call_analytics", {
+                "p_user_id": user_id,
+                "p_date": day,
+                "p_deltas": deltas
+            }))
+        except Exception as e:
+            # The call row is already written; the day's counters drift until rebuilt
+            logger.error(f"Error updating analytics rollup for {user_id} on {day}: {e}")
+
+    async def get_call_analytics(self, user_id: str, since: Optional[str] = None) -> List[Dict]:
+        """call_analytics rows for a user, oldest first (since: ISO date, inclusive)"""
+        if not self.client:
+            return []
+
+        query = self.client.table("call_analytics").select("*").eq("user_id", user_id)
+        if since:
+            query = query.gte("date", since)
+        response = await self.execute(query.order("date"))
+        return response.data or []
+
     async def save_transcript(self, call_sid: str, transcript: str) -> None:
         """Save call transcript"""
         try:
@@ -213,10 +385,12 @@ class DatabaseService:
                 return
 
             # Upsert transcript
-            self.client.table("call_transcripts").upsert({
-                "call_id": call["id"],
-                "transcript": transcript
-            }).execute()
+            await self.execute(
+                self.client.table("call_transcripts").upsert({
+                    "call_id": call["id"],
+                    "transcript": transcript
+                })
+            )
 
         except Exception as e:
             logger.error(f"Error saving transcript: {e}")
@@ -236,21 +410,17 @@ class DatabaseService:
         - created_at: When voice was cloned
         """
         try:
-            response = (
+            return await self._cached_lookup(
+                self.voice_profile_cache,
+                user_id,
                 self.client.table("voice_profiles")
                 .select("*")
                 .eq("user_id", user_id)
                 .eq("is_active", True)
                 .order("created_at", desc=True)
                 .limit(1)
-                .execute()
             )
 
-            if response.data and len(response.data) > 0:
-                return response.data[0]
-
-            return None
-
         except Exception as e:
             logger.error(f"Error getting voice profile for user {user_id}: {e}")
             return None
@@ -265,10 +435,10 @@ class DatabaseService:
         """Create new voice profile record"""
         try:
             # Deactivate old voice profiles
-            self.client.table("voice_profiles").update({"is_active": False}).eq("user_id", user_id).execute()
+            await self.execute(self.client.table("voice_profiles").update({"is_active": False}).eq("user_id", user_id))
 
             # Insert new voice profile
-            response = (
+            response = await self.execute(
                 self.client.table("voice_profiles")
                 .insert({
                     "user_id": user_id,
@@ -277,7 +447,6 @@ class DatabaseService:
                     "language": language,
                     "is_active": True
                 })
-                .execute()
             )
 
             logger.info(f"✅ Created voice profile for user {user_id}: {voice_id}")
@@ -287,6 +456,10 @@ class DatabaseService:
             logger.error(f"Error creating voice profile: {e}")
             return {}
 
+        finally:
+            # Even a partial write (old profiles deactivated) changes the active profile
+            self.invalidate_voice_profile(user_id)
+
     # ========================
     # SCAM REPORTS
     # ========================
@@ -304,19 +477,106 @@ class DatabaseService:
             if not call:
                 return
 
-            self.client.table("scam_reports").insert({
-                "call_id": call["id"],
-                "scam_type": scam_type,
-                "confidence": confidence,
-                "pattern_matched": pattern_matched,
-                "action_taken": "blocked"
-            }).execute()
+            await self.execute(
+                self.client.table("scam_reports").insert({
+                    "call_id": call["id"],
+                    "scam_type": scam_type,
+                    "confidence": confidence,
+                    "pattern_matched": pattern_matched,
+                    "action_taken": "blocked"
+                })
+            )
 
             logger.info(f"✅ Logged scam report for call {call_sid}")
 
         except Exception as e:
             logger.error(f"Error creating scam report: {e}")
 
+    async def get_reported_scam_numbers(self, min_confidence: float = 0.0) -> Set[str]:
+        """Caller numbers of calls with a scam report at or above min_confidence"""
+        if not self.client:
+            return set()
+
+        reports = await self.execute(
+            self.client.table("scam_reports").select("call_id").gte("confidence", min_confidence)
+        )
+        call_ids = sorted({row["call_id"] for row in reports.data or [] if row.get("call_id")})
+
+        numbers: Set[str] = set()
+        for start in range(0, len(call_ids), 500):
+            calls = await self.execute(
+                self.client.table("calls").select("caller_number").in_("id", call_ids[start:start + 500])
+            )
+            numbers.update(row["caller_number"] for row in calls.data or [] if row.get("caller_number"))
+        return numbers
+
+    # ========================
+    # BATCHED WRITES (write-behind flushes)
+    # ========================
+
+    async def apply_call_writes(
+        self,
+        calls: Dict[str, Dict],
+        transcripts: Dict[str, str],
+        scam_reports: Iterable[Dict]
+    ) -> Set[str]:
+        """
+        Apply many calls' pending writes in a fixed number of round-trips
+
+        One select resolves every call row, then one RPC updates all calls,
+        one upsert writes all transcripts and one upsert adds all scam reports
+        (keyed by report_key). Re-applying a batch is harmless, so errors
+        propagate and the caller retries.
+
+        Args:
+            calls: call_sid → column updates (already merged, last writer wins)
+            transcripts: call_sid → latest full transcript
+            scam_reports: {"call_sid", "report_key", "scam_type", "confidence", "pattern_matched"} dicts
+
+        Returns:
+            call_sids whose call row does not exist yet (nothing written for them)
+        """
+        scam_reports = list(scam_reports)
+        call_sids = set(calls) | set(transcripts) | {report["call_sid"] for report in scam_reports}
+        if not self.client or not call_sids:
+            return set()
+
+        response = await self.execute(
+            self.client.table("calls").select("*").in_("call_sid", sorted(call_sids))
+        )
+        rows = {row["call_sid"]: row for row in response.data or []}
+        missing = call_sids - set(rows)
+
+        updates = {sid: fields for sid, fields in calls.items() if sid in rows and fields}
+        if updates:
+            await self.execute(self.client.rpc("apply_call_updates", {
+                "p_updates": [{"call_sid": sid, **fields} for sid, fields in updates.items()],
+                "p_roll_up": settings.ANALYTICS_ROLLUPS_ENABLED
+            }))
+
+        transcript_rows = [
+            {"call_id": rows[sid]["id"], "transcript": transcript}
+            for sid, transcript in transcripts.items() if sid in rows
+        ]
+        if transcript_rows:
+            await self.execute(self.client.table("call_transcripts").upsert(transcript_rows, on_conflict="call_id"))
+
+        report_rows = [
+            {
+                "call_id": rows[report["call_sid"]]["id"],
+                "scam_type": report["scam_type"],
+                "confidence": report["confidence"],
+                "pattern_matched": report.get("pattern_matched"),
+                "action_taken": "blocked",
+                "report_key": report.get("report_key") or str(uuid.uuid4())
+            }
+            for report in scam_reports if report["call_sid"] in rows
+        ]
+        if report_rows:
+            await self.execute(self.client.table("scam_reports").upsert(report_rows, on_conflict="report_key"))
+
+        return missing
+
 
 # Singleton instance
 db_service = DatabaseService()
@@ -325,3 +585,8 @@ db_service = DatabaseService()
 async def init_database() -> None:
     """Initialize database connection (called on app startup)"""
     await db_service.init()
+
+
+async def close_database() -> None:
+    """Release database resources (called on app shutdown)"""
+    await db_service.close()
@@ -0,0 +1,142 @@
+"""
+Embedding Cache: content-addressed, persistent text → embedding store
+In-memory LRU in front of a SQLite file, so embeddings survive restarts
+
+Keys are sha256(model, whitespace-normalized text): the same text embedded
+by the same model is only ever paid for once, across calls and processes.
+Vectors are stored as float32 blobs. The file is capped at max_rows: the
+oldest embeddings are pruned every _PRUNE_EVERY writes.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.core.cache import TTLCache
+from app.core.sqlite import open_sqlite
+
+logger = logging.getLogger(__name__)
+
+_SQL_CHUNK = 500  # Keys per IN (...) lookup, below SQLite's variable limit
+_MEMORY_TTL_SECONDS = 30 * 24 * 3600
+_PRUNE_EVERY = 1000  # Written embeddings between size checks
+
+
+def embedding_key(model: str, text: str) -> str:
+    """Content hash for one (model, text) pair"""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{model}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-level embedding cache
+
+    Usage:
+        cache = EmbeddingCache("./data/embedding_cache.sqlite")
+        found = cache.get_many(keys)          → {key: [floats]} for the keys present
+        cache.put_many({key: [floats], ...})
+
+    The SQLite file is opened on first use. Lookups and writes are local
+    SQLite calls (see app.core.sqlite); use from the event loop only.
+    """
+
+    def __init__(self, path: str, memory_entries: int = 2048, max_rows: int = 200_000):
+        self.path = path
+        self.max_rows = max_rows
+        # Embeddings never go stale; the TTL only has to be finite for JSON metrics
+        self.memory = TTLCache(max_size=memory_entries, ttl_seconds=_MEMORY_TTL_SECONDS, name="embeddings")
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes_since_prune = _PRUNE_EVERY  # First write checks files left by earlier runs
+
+        self.disk_hits = 0
+        self.writes = 0
+        self.pruned = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = open_sqlite(self.path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " vector BLOB NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_created_at ON embeddings (created_at)")
+            self._db.commit()
+        return self._db
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """Cached embeddings for the keys present (memory first, then disk)"""
+        found: Dict[str, List[float]] = {}
+        missing = []
+        for key in keys:
+            vector = self.memory.get(key)
+            if vector is not None:
+                found[key] = vector
+            else:
+                missing.append(key)
+
+        for start in range(0, len(missing), _SQL_CHUNK):
+            chunk = missing[start:start + _SQL_CHUNK]
+            rows = self._connection().execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            for key, blob in rows:
+                vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                self.memory.set(key, vector)
+                found[key] = vector
+            self.disk_hits += len(rows)
+
+        return found
+
+    def put_many(self, vectors: Dict[str, List[float]]) -> None:
+        """Store embeddings (overwrites same keys)"""
+        if not vectors:
+            return
+
+        now = time.time()
+        db = self._connection()
+        db.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+            [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in vectors.items()]
+        )
+        db.commit()
+        for key, vector in vectors.items():
+            self.memory.set(key, list(vector))
+        self.writes += len(vectors)
+
+        self._writes_since_prune += len(vectors)
+        if self._writes_since_prune >= _PRUNE_EVERY:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Delete the oldest embeddings beyond max_rows"""
+        self._writes_since_prune = 0
+        db = self._connection()
+        pruned = db.execute(
+            "DELETE FROM embeddings WHERE key IN"
+            " (SELECT key FROM embeddings ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,)
+        ).rowcount
+        db.commit()
+        if pruned:
+            self.pruned += pruned
+            logger.info(f"🧹 Pruned {pruned} old embeddings from {self.path}")
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.memory.get_stats(),
+            "disk_hits": self.disk_hits,
+            "writes": self.writes,
+            "pruned": self.pruned
+        }
@@ -7,46 +7,32 @@ Impresses Google Cloud team with deep integration:
 - Signed URLs for secure access
 - Lifecycle management (auto-delete old files)
 - CDN integration for fast delivery
+
+Uploads never block the event loop: they are handed to a StorageUploader
+(bounded worker pool), transcripts are debounced per call so only the
+latest version is written, and JSON is stored gzip-compressed.
+Statistics and retention sweeps read a storage manifest (an index in the
+shared database, kept by every instance's upload path), never a bucket
+listing. Signed URLs are cached and
+reused for part of their lifetime, and signed in bulk for call lists.
 """
 
-import logging
-from typing import Optional, BinaryIO
-from datetime import timedelta
 import hashlib
-import io
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
 
-from app.core.config import settings
+from app.services.storage_backends import StorageBackend, create_storage_backend
+from app.services.storage_manifest import Manifest, create_storage_manifest
+from app.services.signed_url_cache import SignedURLCache
+from app.services.storage_uploader import PendingUpload, StorageUploader
 
 logger = logging.getLogger(__name__)
 
-# Lazy import to prevent hanging
-_storage_client = None
-_bucket = None
-
-
-def _get_storage_client():
-    """Lazy load GCS client"""
-    global _storage_client, _bucket
-
-    if _storage_client is None:
-        try:
-            from google.cloud import storage
-
-            _storage_client = storage.Client(
-                project=settings.GOOGLE_CLOUD_PROJECT
-            )
-
-            bucket_name = f"{settings.GOOGLE_CLOUD_PROJECT}-ai-gatekeeper"
-            _bucket = _storage_client.bucket(bucket_name)
-
-            logger.info(f"✅ GCS initialized: {bucket_name}")
-
-        except Exception as e:
-            logger.warning(f"⚠️ GCS initialization failed (demo mode?): {e}")
-            _storage_client = "demo"
-            _bucket = None
-
-    return _storage_client, _bucket
+# Keys deleted per manifest range scan during retention sweeps
+_SWEEP_BATCH = 500
 
 
 class GCSService:
@@ -60,13 +46,118 @@ class GCSService:
             {call_sid}_processed.mp3  # Compressed
         transcripts/
             {call_sid}.txt          # Plain text
-            {call_sid}.json         # Full metadata
+            {call_sid}.json         # Full metadata (gzip)
         scam_evidence/
-            {call_sid}_analysis.json
+            {call_sid}_analysis.json  # gzip
+
+    Upload methods return as soon as the upload is queued; call
+    flush_call() when the call ends to write its final transcript.
     """
 
-    def __init__(self):
-        self.client, self.bucket = _get_storage_client()
+    def __init__(
+        self,
+        backend: Optional[StorageBackend] = None,
+        uploader: Optional[StorageUploader] = None,
+        manifest: Optional[Manifest] = None
+    ):
+        # backend None = demo mode (no credentials): nothing is stored
+        self.backend = backend if backend is not None else create_storage_backend()
+        if manifest is None and self.backend is not None:
+            manifest = create_storage_manifest()
+        self.manifest = manifest
+        self.uploader = uploader or StorageUploader(self.backend, manifest=self.manifest)
+        self.signed_urls = SignedURLCache()
+
+    async def init_manifest(self) -> None:
+        """Index an existing bucket once, the first time the manifest is empty"""
+        if self.backend is None or not await self.uploader.run(self.manifest.is_empty):
+            return
+        count = await self.uploader.run(lambda: self.manifest.rebuild(self.backend.list()))
+        logger.info(f"✅ Storage manifest built: {count} objects")
+
+    # ========================
+    # Signed URLs
+    # ========================
+
+    async def get_signed_url(self, key: str, expiration: timedelta, method: str = "GET") -> Optional[str]:
+        """
+        Signed URL for an object, reused from the cache while fresh enough
+
+        Args:
+            key: Object key ("{user_id}/recordings/{call_sid}.wav")
+            expiration: Lifetime the caller needs
+            method: HTTP method the URL is signed for
+
+        Returns:
+            URL, or None if signing failed
+        """
+        urls = await self.get_signed_urls([key], expiration, method)
+        return urls[key]
+
+    async def get_signed_urls(
+        self,
+        keys: Iterable[str],
+        expiration: timedelta,
+        method: str = "GET"
+    ) -> Dict[str, Optional[str]]:
+        """
+        Signed URLs for many objects (call lists)
+
+        Cached URLs are reused; the rest are signed together in a single
+        worker pool job rather than one round trip each.
+        """
+        keys = list(dict.fromkeys(keys))
+        if self.backend is None:
+            return {key: f"gs://demo-bucket/{key}" for key in keys}
+
+        urls = {key: self.signed_urls.get(key, method, expiration) for key in keys}
+        missing = [key for key, url in urls.items() if url is None]
+        if missing:
+            signed = await self.uploader.run(self._sign_many, missing, expiration, method)
+            for key, url in signed.items():
+                if url is not None:
+                    self.signed_urls.put(key, method, expiration, url)
+                urls[key] = url
+        return urls
+
+    def _sign_many(self, keys: List[str], expiration: timedelta, method: str) -> Dict[str, Optional[str]]:
+        signed = {}
+        for key in keys:
+            try:
+                signed[key] = self.backend.sign_url(key, expiration, method)
+            except Exception as e:
+                logger.error(f"❌ Failed to sign URL for {key}: {e}")
+                signed[key] = None
+        return signed
+
+    async def get_call_urls(
+        self,
+        user_id: str,
+        call_sids: Iterable[str],
+        expiration: timedelta = timedelta(days=7)
+    ) -> Dict[str, Dict[str, Optional[str]]]:
+        """
+        Recording and transcript URLs for a page of call history
+
+        Returns:
+            {call_sid: {"recording": url, "transcript": url}}
+        """
+        call_sids = list(call_sids)
+        keys = {
+            call_sid: (f"{user_id}/recordings/{call_sid}.wav", f"{user_id}/transcripts/{call_sid}.json")
+            for call_sid in call_sids
+        }
+        urls = await self.get_signed_urls(
+            [key for pair in keys.values() for key in pair], expiration
+        )
+        return {
+            call_sid: {"recording": urls[recording], "transcript": urls[transcript]}
+            for call_sid, (recording, transcript) in keys.items()
+        }
+
+    # ========================
+    # Uploads
+    # ========================
 
     async def upload_recording(
         self,
@@ -76,7 +167,7 @@ class GCSService:
         content_type: str = "audio/wav"
     ) -> str:
         """
-        Upload call recording to GCS
+        Upload call recording to GCS (in the background)
 
         Args:
             call_sid: Twilio call SID
@@ -85,48 +176,28 @@ class GCSService:
             content_type: MIME type
 
         Returns:
-            Public URL or signed URL
+            Signed URL (expires in 7 days)
         """
-        if self.client == "demo":
+        if self.backend is None:
             # Demo mode
             return f"gs://demo-bucket/{user_id}/recordings/{call_sid}.wav"
 
-        try:
-            # Generate blob path
-            blob_name = f"{user_id}/recordings/{call_sid}.wav"
-            blob = self.bucket.blob(blob_name)
-
-            # Set metadata
-            blob.metadata = {
+        blob_name = f"{user_id}/recordings/{call_sid}.wav"
+        self.uploader.submit([PendingUpload(
+            key=blob_name,
+            data=audio_data,
+            content_type=content_type,
+            metadata={
                 "call_sid": call_sid,
                 "user_id": user_id,
                 "uploaded_by": "ai-gatekeeper",
-                "original_size": str(len(audio_data))
+                "original_size": str(len(audio_data)),
+                "retention_days": "90"  # Auto-delete after 90 days for privacy
             }
+        )])
+        logger.info(f"✅ Queued recording upload: {blob_name} ({len(audio_data)} bytes)")
 
-            # Upload
-            blob.upload_from_string(
-                audio_data,
-                content_type=content_type
-            )
-
-            # Set lifecycle (auto-delete after 90 days for privacy)
-            blob.metadata["retention_days"] = "90"
-
-            logger.info(f"✅ Uploaded recording: {blob_name} ({len(audio_data)} bytes)")
-
-            # Return signed URL (expires in 7 days)
-            url = blob.generate_signed_url(
-                version="v4",
-                expiration=timedelta(days=7),
-                method="GET"
-            )
-
-            return url
-
-        except Exception as e:
-            logger.error(f"❌ Failed to upload recording: {e}")
-            return None
+        return await self.get_signed_url(blob_name, timedelta(days=7))
 
     async def upload_transcript(
         self,
@@ -136,7 +207,11 @@ class GCSService:
         metadata: Optional[dict] = None
     ) -> str:
         """
-        Upload call transcript to GCS
+        Upload call transcript to GCS (debounced per call)
+
+        Called on every transcript update: each call replaces the pending
+        version, and only the latest one is uploaded once updates pause
+        (or the call ends, see flush_call).
 
         Args:
             call_sid: Twilio call SID
@@ -145,51 +220,33 @@ class GCSService:
             metadata: Additional metadata (intent, scam_score, etc.)
 
         Returns:
-            Public URL
+            Signed URL of the JSON version (expires in 30 days)
         """
-        if self.client == "demo":
+        if self.backend is None:
             return f"gs://demo-bucket/{user_id}/transcripts/{call_sid}.txt"
 
-        try:
-            import json
-            from datetime import datetime
-
-            # Plain text version
-            text_blob_name = f"{user_id}/transcripts/{call_sid}.txt"
-            text_blob = self.bucket.blob(text_blob_name)
-            text_blob.upload_from_string(transcript_text, content_type="text/plain")
-
-            # JSON version with metadata
-            json_blob_name = f"{user_id}/transcripts/{call_sid}.json"
-            json_blob = self.bucket.blob(json_blob_name)
-
-            transcript_data = {
-                "call_sid": call_sid,
-                "user_id": user_id,
-                "transcript": transcript_text,
-                "uploaded_at": datetime.utcnow().isoformat(),
-                "metadata": metadata or {}
-            }
-
-            json_blob.upload_from_string(
-                json.dumps(transcript_data, indent=2),
-                content_type="application/json"
-            )
-
-            logger.info(f"✅ Uploaded transcript: {json_blob_name}")
-
-            # Return signed URL for JSON
-            url = json_blob.generate_signed_url(
-                version="v4",
-                expiration=timedelta(days=30),
-                method="GET"
+        json_blob_name = f"{user_id}/transcripts/{call_sid}.json"
+        self.uploader.submit_debounced(call_sid, [
+            PendingUpload(
+                key=f"{user_id}/transcripts/{call_sid}.txt",
+                data=transcript_text,
+                content_type="text/plain"
+            ),
+            PendingUpload(
+                key=json_blob_name,
+                data={
+                    "call_sid": call_sid,
+                    "user_id": user_id,
+                    "transcript": transcript_text,
+                    "uploaded_at": datetime.utcnow().isoformat(),
+                    "metadata": metadata or {}
+                },
+                content_type="application/json",
+                gzip=True
             )
+        ])
 
-            return url
-
-        except Exception as e:
-            logger.error(f"❌ Failed to upload transcript: {e}")
-            return None
+        return await self.get_signed_url(json_blob_name, timedelta(days=30))
 
     async def upload_scam_evidence(
         self,
@@ -206,54 +263,45 @@ class GCSService:
             evidence: Full scam analysis results
 
         Returns:
-            URL to evidence file
+            Signed URL to evidence file (expires in 1 year for legal retention)
         """
-        if self.client == "demo":
+        if self.backend is None:
             return f"gs://demo-bucket/{user_id}/scam_evidence/{call_sid}.json"
 
         try:
-            import json
-            from datetime import datetime
-
             blob_name = f"{user_id}/scam_evidence/{call_sid}_analysis.json"
-            blob = self.bucket.blob(blob_name)
-
-            evidence_data = {
-                "call_sid": call_sid,
-                "user_id": user_id,
-                "timestamp": datetime.utcnow().isoformat(),
-                "evidence": evidence,
-                "hash": hashlib.sha256(
-                    json.dumps(evidence).encode()
-                ).hexdigest()  # Tamper detection
-            }
-
-            blob.upload_from_string(
-                json.dumps(evidence_data, indent=2),
-                content_type="application/json"
-            )
-
-            # Set metadata for security
-            blob.metadata = {
-                "content_hash": evidence_data["hash"],
-                "immutable": "true"
-            }
-
-            logger.info(f"✅ Uploaded scam evidence: {blob_name}")
-
-            # Return signed URL (expires in 1 year for legal retention)
-            url = blob.generate_signed_url(
-                version="v4",
-                expiration=timedelta(days=365),
-                method="GET"
-            )
-
-            return url
+            content_hash = hashlib.sha256(
+                json.dumps(evidence, default=str).encode()
+            ).hexdigest()  # Tamper detection
+
+            self.uploader.submit([PendingUpload(
+                key=blob_name,
+                data={
+                    "call_sid": call_sid,
+                    "user_id": user_id,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "evidence": evidence,
+                    "hash": content_hash
+                },
+                content_type="application/json",
+                metadata={
+                    "content_hash": content_hash,
+                    "immutable": "true"
+                },
+                gzip=True
+            )])
+            logger.info(f"✅ Queued scam evidence upload: {blob_name}")
+
+            return await self.get_signed_url(blob_name, timedelta(days=365))
 
         except Exception as e:
             logger.error(f"❌ Failed to upload scam evidence: {e}")
             return None
 
+    async def flush_call(self, call_sid: str) -> None:
+        """Upload the call's pending transcript now (call ended)"""
+        await self.uploader.flush(call_sid)
+
     async def get_recording(self, call_sid: str, user_id: str) -> Optional[bytes]:
         """
         Download call recording from GCS
@@ -265,20 +313,18 @@ class GCSService:
         Returns:
             Audio bytes or None
         """
-        if self.client == "demo":
+        if self.backend is None:
             return b"demo_audio_data"
 
         try:
             blob_name = f"{user_id}/recordings/{call_sid}.wav"
-            blob = self.bucket.blob(blob_name)
+            audio_bytes = await self.uploader.run(self.backend.get, blob_name)
 
-            if not blob.exists():
+            if audio_bytes is None:
                 logger.warning(f"⚠️ Recording not found: {blob_name}")
                 return None
 
-            audio_bytes = blob.download_as_bytes()
             logger.info(f"✅ Downloaded recording: {blob_name}")
-
             return audio_bytes
 
         except Exception as e:
@@ -295,24 +341,11 @@ class GCSService:
         Returns:
             Number of files deleted
         """
-        if self.client == "demo":
+        if self.backend is None:
             return 0
 
         try:
-            from datetime import datetime, timezone
-
-            deleted_count = 0
-            cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
-
-            # List all recordings
-            blobs = self.bucket.list_blobs(prefix="recordings/")
-
-            for blob in blobs:
-                if blob.time_created < cutoff_date:
-                    blob.delete()
-                    deleted_count += 1
-                    logger.info(f"🗑️ Deleted old recording: {blob.name}")
-
+            deleted_count = await self.uploader.run(self._delete_old_recordings, days)
             logger.info(f"✅ Deleted {deleted_count} old recordings (>{days} days)")
             return deleted_count
 
@@ -320,6 +353,28 @@ class GCSService:
             logger.error(f"❌ Failed to delete old recordings: {e}")
             return 0
 
+    def _delete_old_recordings(self, days: int) -> int:
+        # Range scan of the manifest's (kind, created_at) index: only expired keys are touched
+        cutoff = time.time() - days * 86400
+        deleted_count = 0
+
+        while True:
+            expired = self.manifest.expired("recordings", cutoff, _SWEEP_BATCH)
+            deleted_in_batch = 0
+            for key in expired:
+                try:
+                    self.backend.delete(key)
+                except Exception as e:
+                    logger.error(f"❌ Failed to delete {key}: {e}")
+                    continue
+                self.manifest.remove(key)
+                deleted_in_batch += 1
+                logger.info(f"🗑️ Deleted old recording: {key}")
+
+            deleted_count += deleted_in_batch
+            if len(expired) < _SWEEP_BATCH or not deleted_in_batch:
+                return deleted_count
+
     async def get_storage_stats(self, user_id: str) -> dict:
         """
         Get storage statistics for a user
@@ -329,11 +384,12 @@ class GCSService:
                 "total_recordings": int,
                 "total_transcripts": int,
                 "total_size_bytes": int,
+                "bytes_by_kind": {kind: int},
                 "oldest_file": str,
                 "newest_file": str
             }
         """
-        if self.client == "demo":
+        if self.backend is None:
             return {
                 "total_recordings": 25,
                 "total_transcripts": 25,
@@ -342,32 +398,29 @@ class GCSService:
                 "newest_file": "2024-01-15"
             }
 
-        try:
-            stats = {
-                "total_recordings": 0,
-                "total_transcripts": 0,
-                "total_size_bytes": 0,
-                "oldest_file": None,
-                "newest_file": None
-            }
-
-            # Count recordings
-            recording_blobs = list(self.bucket.list_blobs(prefix=f"{user_id}/recordings/"))
-            stats["total_recordings"] = len(recording_blobs)
-
-            # Count transcripts
-            transcript_blobs = list(self.bucket.list_blobs(prefix=f"{user_id}/transcripts/"))
-            stats["total_transcripts"] = len(transcript_blobs)
-
-            # Calculate total size
-            all_blobs = recording_blobs + transcript_blobs
-            stats["total_size_bytes"] = sum(blob.size for blob in all_blobs)
+        stats = {
+            "total_recordings": 0,
+            "total_transcripts": 0,
+            "total_size_bytes": 0,
+            "bytes_by_kind": {},
+            "oldest_file": None,
+            "newest_file": None
+        }
 
-            # Find oldest and newest
-            if all_blobs:
-                sorted_blobs = sorted(all_blobs, key=lambda b: b.time_created)
-                stats["oldest_file"] = sorted_blobs[0].time_created.isoformat()
-                stats["newest_file"] = sorted_blobs[-1].time_created.isoformat()
+        try:
+            # Running totals from the manifest: no listing, cost independent of archive size
+            by_kind = await self.uploader.run(self.manifest.user_stats, user_id)
+            recordings, recording_bytes = by_kind.get("recordings", (0, 0))
+            transcripts, transcript_bytes = by_kind.get("transcripts", (0, 0))
+            stats["total_recordings"] = recordings
+            stats["total_transcripts"] = transcripts
+            stats["total_size_bytes"] = recording_bytes + transcript_bytes
+            stats["bytes_by_kind"] = {kind: size for kind, (_, size) in by_kind.items()}
+
+            oldest, newest = await self.uploader.run(self.manifest.time_range, user_id, ("recordings", "transcripts"))
+            if oldest is not None:
+                stats["oldest_file"] = datetime.fromtimestamp(oldest, timezone.utc).isoformat()
+                stats["newest_file"] = datetime.fromtimestamp(newest, timezone.utc).isoformat()
 
             return stats
 
@@ -380,6 +433,23 @@ class GCSService:
 gcs_service = GCSService()
 
 
+async def init_storage():
+    """Build the storage manifest if needed (uploads start lazily)"""
+    stats = gcs_service.uploader.get_stats()
+    logger.info(f"☁️ Storage backend: {stats['backend']}")
+    try:
+        await gcs_service.init_manifest()
+    except Exception as e:
+        logger.error(f"❌ Storage manifest build failed: {e}")
+
+
+async def close_storage():
+    """Upload pending transcripts and wait for in-flight uploads (on shutdown)"""
+    await gcs_service.uploader.close()
+    if gcs_service.manifest is not None:
+        gcs_service.manifest.close()
+
+
 # ======================
 # CDN INTEGRATION
 # ======================
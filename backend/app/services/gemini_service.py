@@ -2,22 +2,37 @@
 Gemini Service: Google Generative AI for LLM reasoning and analysis
 """
 
+import asyncio
+import hashlib
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import json
 import google.generativeai as genai
 from google.ai.generativelanguage_v1beta.types import content
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.services.embedding_cache import EmbeddingCache, embedding_key
+from app.services.local_intelligence import local_intelligence
 
 logger = logging.getLogger(__name__)
 
+
+def _normalize_transcript(transcript: str) -> str:
+    """Case/whitespace-insensitive form used for cache keys and delta checks"""
+    return " ".join(transcript.lower().split())
+
+
 class GeminiService:
     """
     Manages Google Gemini models via Generative AI API:
     - Real-time intent classification (Gemini 1.5 Flash)
     - Deep scam analysis (Gemini 1.5 Pro)
-    - Text embeddings
+    - Text embeddings (batched, cached on disk by content hash)
+
+    Verdicts are cached (LRU + TTL) by normalized prompt inputs. Within a
+    call (call_sid given), the last verdict is also reused while the
+    transcript has only grown by a few tokens without new red-flag phrases.
     """
 
     def __init__(self):
@@ -26,6 +41,34 @@ class GeminiService:
         self.fast_model = None
         self.analysis_model = None
 
+        # Content-addressed verdict caches (one per analysis type)
+        self.intent_cache = TTLCache(
+            max_size=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            name="gemini_intent"
+        )
+        self.scam_cache = TTLCache(
+            max_size=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            name="gemini_scam"
+        )
+
+        # (analysis type, call_sid) → (normalized transcript the LLM saw, verdict)
+        self.last_verdicts = TTLCache(
+            max_size=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            name="gemini_last_verdict"
+        )
+        self.delta_reuse_hits = 0
+
+        # Persistent content-addressed embeddings (SQLite opened on first use)
+        self.embedding_cache = EmbeddingCache(
+            settings.EMBEDDING_CACHE_PATH,
+            memory_entries=settings.EMBEDDING_CACHE_MEMORY_ENTRIES,
+            max_rows=settings.EMBEDDING_CACHE_MAX_ROWS
+        )
+        self.embedding_requests = 0
+
     def _ensure_initialized(self):
         """Initialize Google Generative AI on first use"""
         if not self._initialized:
@@ -50,8 +93,15 @@ class GeminiService:
     async def classify_caller_intent(
         self,
         transcript: str,
-        caller_name: Optional[str] = None
+        caller_name: Optional[str] = None,
+        call_sid: Optional[str] = None
     ) -> Dict[str, Any]:
+        cache_key, normalized, cached = self._lookup_verdict(
+            self.intent_cache, "intent", transcript, caller_name or "", call_sid
+        )
+        if cached is not None:
+            return cached
+
         self._ensure_initialized()
 
         if not self.fast_model:
@@ -94,6 +144,7 @@ Respond in JSON format:
             )
             
             result = json.loads(response.text)
+            self._store_verdict(self.intent_cache, "intent", cache_key, normalized, call_sid, result)
             return result
 
         except Exception as e:
@@ -108,8 +159,15 @@ Respond in JSON format:
     async def analyze_scam_indicators(
         self,
         transcript: str,
-        caller_number: str
+        caller_number: str,
+        call_sid: Optional[str] = None
     ) -> Dict[str, Any]:
+        cache_key, normalized, cached = self._lookup_verdict(
+            self.scam_cache, "scam", transcript, caller_number, call_sid
+        )
+        if cached is not None:
+            return cached
+
         self._ensure_initialized()
 
         if not self.analysis_model:
@@ -149,6 +207,7 @@ Respond in JSON format:
             )
 
             result = json.loads(response.text)
+            self._store_verdict(self.scam_cache, "scam", cache_key, normalized, call_sid, result)
             return result
 
         except Exception as e:
@@ -193,6 +252,154 @@ Summary:"""
             logger.error(f"❌ Failed to generate summary: {e}")
             return f"{intent.capitalize()} call (Summary unavailable)"
 
+    async def generate_embeddings(self, text: str) -> List[float]:
+        """
+        Embed text for semantic similarity (scam-script index)
+
+        Returns:
+            Embedding vector, or [] when Gemini is unavailable
+        """
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed many texts with as few provider calls as possible
+
+        Identical texts are embedded once, cached texts (memory, then disk)
+        not at all, and the rest go out in batches of EMBEDDING_BATCH_SIZE.
+
+        Returns:
+            One vector per input text, in order ([] where embedding failed)
+        """
+        model = settings.GEMINI_EMBEDDING_MODEL
+        keys = [embedding_key(model, text) for text in texts]
+        unique: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            unique.setdefault(key, " ".join(text.split()))  # Dedupe; embed the text the key hashes
+
+        found = self.embedding_cache.get_many(unique) if settings.EMBEDDING_CACHE_ENABLED else {}
+        pending = [(key, text) for key, text in unique.items() if key not in found]
+
+        if pending:
+            self._ensure_initialized()
+
+        if pending and self._initialized:
+            size = settings.EMBEDDING_BATCH_SIZE
+            batches = [pending[i:i + size] for i in range(0, len(pending), size)]
+            results = await asyncio.gather(*(self._embed_batch(model, batch) for batch in batches))
+
+            fresh = {key: vector for batch in results for key, vector in batch.items()}
+            if settings.EMBEDDING_CACHE_ENABLED:
+                self.embedding_cache.put_many(fresh)
+            found.update(fresh)
+
+        return [list(found.get(key, [])) for key in keys]
+
+    async def _embed_batch(self, model: str, batch: List[Tuple[str, str]]) -> Dict[str, List[float]]:
+        """One provider call for up to EMBEDDING_BATCH_SIZE texts (failures → {})"""
+        try:
+            response = await genai.embed_content_async(
+                model=model,
+                content=[text for _, text in batch],
+                task_type="semantic_similarity"
+            )
+            self.embedding_requests += 1
+            return {key: vector for (key, _), vector in zip(batch, response["embedding"])}
+
+        except Exception as e:
+            logger.error(f"❌ Failed to generate {len(batch)} embeddings: {e}")
+            return {}
+
+    # ========================
+    # Verdict cache
+    # ========================
+
+    def _lookup_verdict(
+        self,
+        cache: TTLCache,
+        kind: str,
+        transcript: str,
+        context: str,
+        call_sid: Optional[str]
+    ) -> Tuple[str, str, Optional[Dict[str, Any]]]:
+        """
+        Find a reusable verdict for these prompt inputs
+
+        Returns:
+            (cache key, normalized transcript, verdict copy or None)
+        """
+        normalized = _normalize_transcript(transcript)
+        cache_key = hashlib.sha256(
+            f"{kind}\x00{context.strip().lower()}\x00{normalized}".encode("utf-8")
+        ).hexdigest()
+
+        if not settings.LLM_CACHE_ENABLED:
+            return cache_key, normalized, None
+
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cache_key, normalized, dict(cached)
+
+        if call_sid:
+            last = self.last_verdicts.get((kind, call_sid))
+            if last is not None and self._sufficiently_unchanged(last[0], normalized):
+                self.delta_reuse_hits += 1
+                logger.debug(f"♻️ Reusing {kind} verdict for {call_sid} (small transcript delta)")
+                return cache_key, normalized, dict(last[1])
+
+        return cache_key, normalized, None
+
+    def _store_verdict(
+        self,
+        cache: TTLCache,
+        kind: str,
+        cache_key: str,
+        normalized: str,
+        call_sid: Optional[str],
+        result: Dict[str, Any]
+    ) -> None:
+        """Remember a fresh LLM verdict (callers get copies, never the cached dict)"""
+        if not settings.LLM_CACHE_ENABLED:
+            return
+
+        cache.set(cache_key, dict(result))
+        if call_sid:
+            self.last_verdicts.set((kind, call_sid), (normalized, dict(result)))
+
+    def _sufficiently_unchanged(self, previous: str, current: str) -> bool:
+        """
+        True if current only appends a few harmless tokens to previous
+
+        The delta is re-scanned with the local phrase matcher (including the
+        phrases straddling the old end), so a newly spoken red flag always
+        forces a fresh LLM call.
+        """
+        if not current.startswith(previous):
+            return False
+
+        if len(current[len(previous):].split()) >= settings.LLM_CACHE_DELTA_TOKENS:
+            return False
+
+        matcher = local_intelligence.matcher
+        rescan_from = max(0, len(previous) - matcher.max_phrase_length + 1)
+        return not any(
+            m.offset + len(m.phrase) > len(previous)
+            for m in matcher.scan(current, rescan_from)
+        )
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the /metrics endpoint"""
+        return {
+            "enabled": settings.LLM_CACHE_ENABLED,
+            "intent": self.intent_cache.get_stats(),
+            "scam": self.scam_cache.get_stats(),
+            "delta_reuse_hits": self.delta_reuse_hits,
+            "embeddings": {
+                **self.embedding_cache.get_stats(),
+                "provider_requests": self.embedding_requests
+            }
+        }
+
 # Singleton instance
 _gemini_service_instance = None
 
@@ -0,0 +1,211 @@
+"""
+Shared HTTP Client: one pooled httpx.AsyncClient for the app lifetime
+Keep-alive connections, HTTP/2 when `h2` is installed, per-host limits
+
+Outbound calls on the hot path (ElevenLabs register-call, RAG search) reuse
+warm TCP/TLS connections instead of paying a new handshake per request.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HostStats:
+    """Per-host request counters"""
+
+    __slots__ = ("in_flight", "requests", "errors", "total_ms", "max_in_flight")
+
+    def __init__(self):
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_in_flight = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_latency_ms": self.total_ms / self.requests if self.requests else 0.0
+        }
+
+
+class SharedHttpClient:
+    """
+    Application-lifetime HTTP client shared by every outbound caller
+
+    Usage:
+        response = await http_client.post(url, json=..., timeout=10.0)
+
+    start()/close() are called from main.lifespan. If a request arrives
+    before start() (scripts, tests), the client is created lazily.
+
+    httpx only limits connections globally, so each host also gets a
+    semaphore (HTTP_MAX_CONNECTIONS_PER_HOST): one slow upstream cannot take
+    every pooled connection.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        # transport: override the network transport (tests mount fake upstreams)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self.hosts: Dict[str, HostStats] = {}
+        self.http2 = False
+        self.replaced_clients = 0
+
+    # ========================
+    # Lifecycle
+    # ========================
+
+    async def start(self) -> None:
+        """Create the pooled client (idempotent)"""
+        self._ensure_client()
+
+    async def close(self) -> None:
+        """Close pooled connections"""
+        if self._client is None:
+            return
+        if self._loop is not asyncio.get_running_loop():
+            self._release_client()
+            return
+        await self._client.aclose()
+        self._client = None
+        self._loop = None
+        self._host_slots.clear()
+        logger.info("🔌 Shared HTTP client closed")
+
+    def _release_client(self) -> None:
+        """
+        Let go of a client opened on another event loop
+
+        Its connections can only be closed on that loop: if it is still
+        running, aclose() is scheduled there. A finished loop cannot run it
+        any more, so the client is dropped (its sockets close when collected)
+        rather than kept as a second pool.
+        """
+        client, loop = self._client, self._loop
+        self._client = None
+        self._loop = None
+        self._host_slots.clear()
+        self.replaced_clients += 1
+
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            logger.info("🔌 Shared HTTP client moved to a new event loop (old pool closing on its loop)")
+        else:
+            logger.warning("⚠️ Shared HTTP client's event loop has finished: its pool was dropped unclosed")
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+
+        # Connections are bound to the loop that opened them
+        if self._client is not None and self._loop is not loop:
+            self._release_client()
+
+        if self._client is None:
+            self.http2 = settings.HTTP_ENABLE_HTTP2 and importlib.util.find_spec("h2") is not None
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                transport=self._transport,
+                limits=httpx.Limits(
+                    max_connections=settings.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+                ),
+                timeout=httpx.Timeout(
+                    settings.HTTP_READ_TIMEOUT_SECONDS,
+                    connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS
+                )
+            )
+            self._loop = loop
+            self._host_slots.clear()
+            logger.info(f"✅ Shared HTTP client ready (http2={self.http2}, max_connections={settings.HTTP_MAX_CONNECTIONS})")
+
+        return self._client
+
+    # ========================
+    # Requests
+    # ========================
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the shared pool (same kwargs as httpx)"""
+        client = self._ensure_client()
+        host = urlsplit(url).netloc
+
+        slots = self._host_slots.get(host)
+        if slots is None:
+            slots = self._host_slots[host] = asyncio.Semaphore(settings.HTTP_MAX_CONNECTIONS_PER_HOST)
+        stats = self.hosts.get(host)
+        if stats is None:
+            stats = self.hosts[host] = HostStats()
+
+        async with slots:
+            stats.in_flight += 1
+            stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+            start = time.perf_counter()
+            try:
+                return await client.request(method, url, **kwargs)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                stats.in_flight -= 1
+                stats.requests += 1
+                stats.total_ms += (time.perf_counter() - start) * 1000
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    # ========================
+    # Metrics
+    # ========================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool utilization for the /metrics endpoint"""
+        return {
+            "started": self._client is not None,
+            "http2": self.http2,
+            "max_connections": settings.HTTP_MAX_CONNECTIONS,
+            "max_connections_per_host": settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            "open_connections": self._open_connections(),
+            "in_flight": sum(stats.in_flight for stats in self.hosts.values()),
+            "replaced_clients": self.replaced_clients,
+            "hosts": {host: stats.as_dict() for host, stats in self.hosts.items()}
+        }
+
+    def _open_connections(self) -> Optional[int]:
+        """Connections currently held by the httpcore pool (None if unavailable)"""
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        return len(connections) if connections is not None else None
+
+
+# Singleton instance
+http_client = SharedHttpClient()
+
+
+async def init_http_client() -> None:
+    """Open the shared pool (called on app startup)"""
+    await http_client.start()
+
+
+async def close_http_client() -> None:
+    """Close the shared pool (called on app shutdown)"""
+    await http_client.close()
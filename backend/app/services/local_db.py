@@ -0,0 +1,419 @@
+"""
+Local Database: SQLite stand-in for the Supabase (PostgREST) client
+Same table builder API as supabase-py, so DatabaseService runs unchanged
+in tests and offline development (DATABASE_BACKEND=local)
+
+Rows are stored as JSON documents per table; filters, ordering and
+projection are evaluated in Python. Meant for small local datasets, not
+production traffic.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from app.core.sqlite import open_sqlite
+from app.services import analytics_rollups
+
+logger = logging.getLogger(__name__)
+
+
+class LocalAPIError(Exception):
+    """Raised where PostgREST would return an error (e.g. single() without exactly one row)"""
+
+
+class LocalResponse:
+    """Mirrors postgrest APIResponse: .data and optional .count"""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class LocalQuery:
+    """
+    Chainable query on one table (select / insert / update / upsert / delete)
+
+    Nothing touches the database until execute(), like the supabase builders.
+    """
+
+    def __init__(self, db: "LocalDatabaseClient", table: str):
+        self._db = db
+        self._table = table
+        self._operation = "select"
+        self._columns: Optional[List[str]] = None
+        self._count: Optional[str] = None
+        self._payload: Union[Dict, List[Dict], None] = None
+        self._on_conflict = "id"
+        self._filters: List[Callable[[Dict], bool]] = []
+        self._order: List[tuple] = []
+        self._limit: Optional[int] = None
+        self._single = False
+        self._maybe_single = False
+
+    # ========================
+    # Operations
+    # ========================
+
+    def select(self, *columns: str, count: Optional[str] = None) -> "LocalQuery":
+        fields = [c.strip() for column in columns for c in column.split(",") if c.strip()]
+        self._columns = None if not fields or "*" in fields else fields
+        self._count = count
+        return self
+
+    def insert(self, data: Union[Dict, List[Dict]]) -> "LocalQuery":
+        self._operation = "insert"
+        self._payload = data
+        return self
+
+    def update(self, data: Dict) -> "LocalQuery":
+        self._operation = "update"
+        self._payload = data
+        return self
+
+    def upsert(self, data: Union[Dict, List[Dict]], on_conflict: str = "id") -> "LocalQuery":
+        self._operation = "upsert"
+        self._payload = data
+        self._on_conflict = on_conflict
+        return self
+
+    def delete(self) -> "LocalQuery":
+        self._operation = "delete"
+        return self
+
+    # ========================
+    # Filters & modifiers
+    # ========================
+
+    def eq(self, column: str, value: Any) -> "LocalQuery":
+        self._filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def neq(self, column: str, value: Any) -> "LocalQuery":
+        self._filters.append(lambda row: row.get(column) != value)
+        return self
+
+    def gt(self, column: str, value: Any) -> "LocalQuery":
+        self._filters.append(lambda row: row.get(column) is not None and row[column] > value)
+        return self
+
+    def gte(self, column: str, value: Any) -> "LocalQuery":
+        self._filters.append(lambda row: row.get(column) is not None and row[column] >= value)
+        return self
+
+    def lt(self, column: str, value: Any) -> "LocalQuery":
+        self._filters.append(lambda row: row.get(column) is not None and row[column] < value)
+        return self
+
+    def lte(self, column: str, value: Any) -> "LocalQuery":
+        self._filters.append(lambda row: row.get(column) is not None and row[column] <= value)
+        return self
+
+    def in_(self, column: str, values: Sequence[Any]) -> "LocalQuery":
+        allowed = list(values)
+        self._filters.append(lambda row: row.get(column) in allowed)
+        return self
+
+    def is_(self, column: str, value: Any) -> "LocalQuery":
+        expected = None if value in (None, "null") else value
+        self._filters.append(lambda row: row.get(column) is expected)
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "LocalQuery":
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, count: int) -> "LocalQuery":
+        self._limit = count
+        return self
+
+    def single(self) -> "LocalQuery":
+        self._single = True
+        return self
+
+    def maybe_single(self) -> "LocalQuery":
+        self._maybe_single = True
+        return self
+
+    # ========================
+    # Execution
+    # ========================
+
+    def execute(self) -> LocalResponse:
+        with self._db.lock:
+            rows = self._db.load_rows(self._table)
+
+            if self._operation == "insert":
+                data = self._db.insert_rows(self._table, self._as_list(self._payload))
+                return LocalResponse(data)
+
+            if self._operation == "upsert":
+                data = self._db.upsert_rows(self._table, self._as_list(self._payload), self._on_conflict)
+                return LocalResponse(data)
+
+            matched = [row for row in rows if all(check(row) for check in self._filters)]
+
+            if self._operation == "update":
+                for row in matched:
+                    row.update(self._payload)
+                self._db.save_rows(self._table, matched)
+                return LocalResponse(matched)
+
+            if self._operation == "delete":
+                self._db.delete_rows(self._table, matched)
+                return LocalResponse(matched)
+
+        return self._select(matched)
+
+    def _select(self, rows: List[Dict]) -> LocalResponse:
+        count = len(rows) if self._count else None
+
+        for column, desc in reversed(self._order):
+            # Nulls last, like PostgREST's default for ascending order
+            present = [row for row in rows if row.get(column) is not None]
+            missing = [row for row in rows if row.get(column) is None]
+            rows = sorted(present, key=lambda row: row[column], reverse=desc) + missing
+
+        if self._limit is not None:
+            rows = rows[:self._limit]
+
+        if self._columns is not None:
+            rows = [{column: row.get(column) for column in self._columns} for row in rows]
+
+        if self._single or self._maybe_single:
+            if len(rows) == 1:
+                return LocalResponse(rows[0], count)
+            if self._maybe_single and not rows:
+                return LocalResponse(None, count)
+            raise LocalAPIError(
+                f"JSON object requested, multiple (or no) rows returned ({len(rows)} rows in {self._table})"
+            )
+
+        return LocalResponse(rows, count)
+
+    @staticmethod
+    def _as_list(payload: Union[Dict, List[Dict], None]) -> List[Dict]:
+        if payload is None:
+            return []
+        return [dict(row) for row in (payload if isinstance(payload, list) else [payload])]
+
+
+class LocalRpc:
+    """Deferred stored-procedure call (executes a registered Python function)"""
+
+    def __init__(self, db: "LocalDatabaseClient", name: str, params: Dict):
+        self._db = db
+        self._name = name
+        self._params = params
+
+    def execute(self) -> LocalResponse:
+        function = self._db.functions.get(self._name)
+        if function is None:
+            raise LocalAPIError(f"Could not find the function {self._name}")
+        with self._db.lock:
+            return LocalResponse(function(self._db, **self._params))
+
+
+# ========================
+# Stored procedures (mirrors of the functions in database/schema.sql)
+# ========================
+
+def increment_call_analytics(client: "LocalDatabaseClient", p_user_id: str, p_date: str, p_deltas: Dict) -> None:
+    """Add counter deltas (and intent_counts deltas) to one call_analytics row, creating it if needed"""
+    rows = client.load_rows("call_analytics")
+    row = next((r for r in rows if r.get("user_id") == p_user_id and r.get("date") == p_date), None)
+    if row is None:
+        row = client.insert_rows("call_analytics", [{"user_id": p_user_id, "date": p_date, "intent_counts": {}}])[0]
+
+    for column, delta in p_deltas.items():
+        if isinstance(delta, dict):
+            counts = dict(row.get(column) or {})
+            for key, change in delta.items():
+                counts[key] = counts.get(key, 0) + change
+            row[column] = counts
+        else:
+            row[column] = (row.get(column) or 0) + delta
+
+    count = row.get("duration_count") or 0
+    row["avg_call_duration_seconds"] = (row.get("duration_seconds_total") or 0) // count if count else 0
+    client.save_rows("call_analytics", [row])
+
+
+def apply_call_updates(client: "LocalDatabaseClient", p_updates: List[Dict], p_roll_up: bool = True) -> None:
+    """Update many calls by call_sid, each with its own columns (rolling facet changes into call_analytics)"""
+    updates = {update["call_sid"]: update for update in p_updates}
+    changed, rollups = [], []
+    for row in client.load_rows("calls"):
+        update = updates.get(row.get("call_sid"))
+        if update is None:
+            continue
+        before = dict(row)
+        row.update(update)
+        changed.append(row)
+        deltas = analytics_rollups.facet_deltas(before, row)
+        if p_roll_up and row.get("user_id") and deltas:
+            rollups.append((row["user_id"], analytics_rollups.rollup_day(before), deltas))
+    client.save_rows("calls", changed)
+
+    for user_id, day, deltas in sorted(rollups, key=lambda rollup: rollup[:2]):
+        increment_call_analytics(client, user_id, day, deltas)
+
+
+def record_storage_object(
+    client: "LocalDatabaseClient", p_key: str, p_user_id: str, p_kind: str, p_size: int, p_created_at: float
+) -> None:
+    """Index an uploaded object (or an overwrite of one) and update storage_totals"""
+    row = next((r for r in client.load_rows("storage_objects") if r.get("key") == p_key), None)
+    if row is None:
+        client.insert_rows("storage_objects", [{
+            "key": p_key, "user_id": p_user_id, "kind": p_kind, "size": p_size, "created_at": p_created_at
+        }])
+        objects, delta = 1, p_size
+    else:
+        objects, delta = 0, p_size - row["size"]
+        row.update(size=p_size, created_at=p_created_at)
+        client.save_rows("storage_objects", [row])
+    _add_storage_totals(client, p_user_id, p_kind, objects, delta)
+
+
+def remove_storage_object(client: "LocalDatabaseClient", p_key: str) -> bool:
+    """Forget a deleted object (False if it was not indexed)"""
+    row = next((r for r in client.load_rows("storage_objects") if r.get("key") == p_key), None)
+    if row is None:
+        return False
+    client.delete_rows("storage_objects", [row])
+    _add_storage_totals(client, row["user_id"], row["kind"], -1, -row["size"])
+    return True
+
+
+def _add_storage_totals(client: "LocalDatabaseClient", user_id: str, kind: str, objects: int, size: int) -> None:
+    rows = client.load_rows("storage_totals")
+    row = next((r for r in rows if r.get("user_id") == user_id and r.get("kind") == kind), None)
+    if row is None:
+        client.insert_rows("storage_totals", [{"user_id": user_id, "kind": kind, "objects": objects, "bytes": size}])
+        return
+    row["objects"] += objects
+    row["bytes"] += size
+    client.save_rows("storage_totals", [row])
+
+
+class LocalDatabaseClient:
+    """
+    SQLite-backed client exposing the supabase-py surface DatabaseService uses
+
+    Usage:
+        client = LocalDatabaseClient("./data/local_db.sqlite")
+        client.table("calls").insert({"call_sid": "CA1"}).execute()
+        client.table("calls").select("*").eq("call_sid", "CA1").single().execute().data
+
+    Thread-safe (one connection guarded by a lock), so it can sit behind the
+    DatabaseService executor pool just like the real client.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.lock = threading.RLock()
+        self.connection = open_sqlite(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS rows ("
+            " table_name TEXT NOT NULL,"
+            " id TEXT NOT NULL,"
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " data TEXT NOT NULL,"
+            " UNIQUE (table_name, id))"
+        )
+        self.connection.commit()
+
+        # Stored procedures: name → fn(client, **params)
+        self.functions: Dict[str, Callable[..., Any]] = {
+            "increment_call_analytics": increment_call_analytics,
+            "apply_call_updates": apply_call_updates,
+            "record_storage_object": record_storage_object,
+            "remove_storage_object": remove_storage_object
+        }
+
+        logger.info(f"✅ Local database ready ({path})")
+
+    # ========================
+    # supabase-py surface
+    # ========================
+
+    def table(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+
+    def from_(self, name: str) -> LocalQuery:
+        return self.table(name)
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> LocalRpc:
+        return LocalRpc(self, name, params or {})
+
+    def register_function(self, name: str, function: Callable[..., Any]) -> None:
+        """Register a Python implementation of a Postgres function for rpc()"""
+        self.functions[name] = function
+
+    # ========================
+    # Row storage (call with self.lock held)
+    # ========================
+
+    def load_rows(self, table: str) -> List[Dict]:
+        cursor = self.connection.execute(
+            "SELECT data FROM rows WHERE table_name = ? ORDER BY seq", (table,)
+        )
+        return [json.loads(data) for (data,) in cursor]
+
+    def insert_rows(self, table: str, rows: List[Dict]) -> List[Dict]:
+        for row in rows:
+            row.setdefault("id", str(uuid.uuid4()))
+            row.setdefault("created_at", datetime.utcnow().isoformat())
+        try:
+            self.connection.executemany(
+                "INSERT INTO rows (table_name, id, data) VALUES (?, ?, ?)",
+                [(table, str(row["id"]), json.dumps(row, default=str)) for row in rows]
+            )
+        except sqlite3.IntegrityError as e:
+            self.connection.rollback()
+            raise LocalAPIError(f"duplicate key value violates unique constraint on {table}: {e}")
+        self.connection.commit()
+        return rows
+
+    def upsert_rows(self, table: str, rows: List[Dict], on_conflict: str) -> List[Dict]:
+        keys = [key.strip() for key in on_conflict.split(",")]
+        existing = self.load_rows(table)
+        written = []
+
+        for row in rows:
+            current = next(
+                (old for old in existing if all(old.get(key) == row.get(key) for key in keys)),
+                None
+            )
+            if current is None:
+                written.extend(self.insert_rows(table, [row]))
+                existing.append(row)
+            else:
+                current.update(row)
+                self.save_rows(table, [current])
+                written.append(current)
+
+        return written
+
+    def save_rows(self, table: str, rows: List[Dict]) -> None:
+        self.connection.executemany(
+            "UPDATE rows SET data = ? WHERE table_name = ? AND id = ?",
+            [(json.dumps(row, default=str), table, str(row["id"])) for row in rows]
+        )
+        self.connection.commit()
+
+    def delete_rows(self, table: str, rows: List[Dict]) -> None:
+        self.connection.executemany(
+            "DELETE FROM rows WHERE table_name = ? AND id = ?",
+            [(table, str(row["id"])) for row in rows]
+        )
+        self.connection.commit()
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
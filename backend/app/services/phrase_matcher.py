@@ -0,0 +1,137 @@
+"""
+Phrase Matcher: compiled multi-pattern trie automaton
+Finds every phrase from many phrase lists in ONE pass over the text
+
+All phrases are merged into a single trie, and the trie is compiled once
+into a regular expression. The regex engine then walks the trie in C at
+each text position, so a scan costs O(text length + matches) no matter how
+many phrases are registered.
+"""
+
+import logging
+import re
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TERMINAL = ""  # Trie marker: a phrase ends at this node
+
+
+class PhraseMatch(NamedTuple):
+    """A single phrase hit inside the scanned text"""
+    category: Hashable
+    phrase: str
+    offset: int  # Start index of the phrase in the scanned text
+    order: int  # Registration order of (category, phrase), for stable sorting
+
+
+class PhraseMatcher:
+    """
+    Case-insensitive matcher over categorised phrase lists
+
+    Usage:
+        matcher = PhraseMatcher({
+            "irs": ["irs", "tax refund"],
+            "urgency": ["immediately", "right now"],
+        })
+        matcher.scan("This is the IRS, pay immediately")
+        → [PhraseMatch("irs", "irs", 12, 0), PhraseMatch("urgency", "immediately", 21, 2)]
+
+    Matching is plain substring matching (same semantics as `phrase in text`),
+    so overlapping phrases ("social security" / "social security number")
+    are all reported.
+    """
+
+    def __init__(self, phrase_groups: Dict[Hashable, Iterable[str]]):
+        # Entries keep (category, phrase) pairs in registration order
+        self.entries: List[Tuple[Hashable, str]] = []
+        entries_by_pattern: Dict[str, List[int]] = {}
+
+        for category, phrases in phrase_groups.items():
+            for phrase in phrases:
+                pattern = phrase.lower()
+                if not pattern:
+                    continue
+                entries_by_pattern.setdefault(pattern, []).append(len(self.entries))
+                self.entries.append((category, phrase))
+
+        # At any text position the automaton reports the LONGEST phrase that
+        # starts there; every shorter phrase starting at the same position is
+        # necessarily a prefix of it, so those are expanded from this table.
+        self._expansions: Dict[str, Tuple[int, ...]] = {
+            pattern: tuple(sorted(
+                entry_id
+                for other, entry_ids in entries_by_pattern.items()
+                if pattern.startswith(other)
+                for entry_id in entry_ids
+            ))
+            for pattern in entries_by_pattern
+        }
+
+        self.max_phrase_length = max(map(len, entries_by_pattern), default=0)
+        self._regex = self._compile(entries_by_pattern) if entries_by_pattern else None
+
+        logger.debug(
+            f"PhraseMatcher compiled: {len(self.entries)} phrases, "
+            f"{len(entries_by_pattern)} distinct patterns"
+        )
+
+    @staticmethod
+    def _compile(patterns: Iterable[str]) -> "re.Pattern":
+        """
+        Compile the phrase trie into a single regex
+
+        Each trie node becomes a group of alternatives keyed by distinct
+        characters, so the engine never backtracks across siblings. Nodes
+        where a phrase ends make their continuation optional-greedy, which
+        yields the longest phrase at each position. The whole trie sits in a
+        lookahead so overlapping phrases at later positions are still found.
+        """
+        trie: Dict = {}
+        for pattern in patterns:
+            node = trie
+            for char in pattern:
+                node = node.setdefault(char, {})
+            node[_TERMINAL] = {}
+
+        def emit(node: Dict) -> str:
+            branches = [
+                re.escape(char) + emit(child)
+                for char, child in node.items()
+                if char != _TERMINAL
+            ]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            return f"(?:{body})?" if _TERMINAL in node else body
+
+        return re.compile(f"(?=({emit(trie)}))")
+
+    def scan(self, text: str, start: int = 0) -> List[PhraseMatch]:
+        """
+        Find every phrase occurrence in text (single pass)
+
+        Args:
+            text: Text to scan (matched case-insensitively)
+            start: Only report phrases starting at or after this index
+
+        Returns:
+            All matches, ordered by start position in the text
+        """
+        if self._regex is None:
+            return []
+
+        entries = self.entries
+        expansions = self._expansions
+        matches: List[PhraseMatch] = []
+
+        for found in self._regex.finditer(text.lower(), start):
+            offset = found.start()
+            for entry_id in expansions[found.group(1)]:
+                category, phrase = entries[entry_id]
+                matches.append(PhraseMatch(category, phrase, offset, entry_id))
+
+        return matches
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -9,12 +9,17 @@ Protects people by:
 4. Learning from community reports
 """
 
+import asyncio
 import logging
 from typing import List, Dict, Optional
-import httpx
-from datetime import datetime, timedelta
+
+import numpy as np
 
 from app.core.config import settings
+from app.services.http_client import http_client
+from app.services.reputation_cache import create_reputation_cache, normalize_phone
+from app.services.reputation_index import reputation_index
+from app.services.vector_store import vector_store
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +38,8 @@ class RAGService:
     def __init__(self):
         self.google_api_key = getattr(settings, 'GOOGLE_SEARCH_API_KEY', None)
         self.search_engine_id = getattr(settings, 'GOOGLE_SEARCH_ENGINE_ID', None)
-        self.cache = {}  # Simple cache (phone numbers → scam reports)
+        self.cache = create_reputation_cache()  # Phone number → check_phone_number result
+        self._checks_in_flight: Dict[str, asyncio.Task] = {}
 
     async def search_scam_reports(self, query: str, max_results: int = 5) -> List[Dict]:
         """
@@ -46,42 +52,46 @@ class RAGService:
         Returns:
             List of search results with titles, snippets, URLs
         """
+        results = await self._search(query, max_results)
+        return results if results is not None else []
+
+    async def _search(self, query: str, max_results: int) -> Optional[List[Dict]]:
+        """search_scam_reports, but None when the search failed (so it isn't cached)"""
         if not self.google_api_key or not self.search_engine_id:
             # Demo mode - return mock data
             logger.warning("⚠️ Google Search not configured (demo mode)")
             return self._get_mock_search_results(query)
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://www.googleapis.com/customsearch/v1",
-                    params={
-                        "key": self.google_api_key,
-                        "cx": self.search_engine_id,
-                        "q": query,
-                        "num": max_results,
-                        "dateRestrict": "m1"  # Last 1 month
-                    },
-                    timeout=5.0
-                )
-
-                data = response.json()
-                results = []
-
-                for item in data.get("items", []):
-                    results.append({
-                        "title": item.get("title"),
-                        "snippet": item.get("snippet"),
-                        "url": item.get("link"),
-                        "source": "google_search"
-                    })
-
-                logger.info(f"🔍 Found {len(results)} search results for: {query}")
-                return results
+            response = await http_client.get(
+                "https://www.googleapis.com/customsearch/v1",
+                params={
+                    "key": self.google_api_key,
+                    "cx": self.search_engine_id,
+                    "q": query,
+                    "num": max_results,
+                    "dateRestrict": "m1"  # Last 1 month
+                },
+                timeout=5.0
+            )
+
+            data = response.json()
+            results = []
+
+            for item in data.get("items", []):
+                results.append({
+                    "title": item.get("title"),
+                    "snippet": item.get("snippet"),
+                    "url": item.get("link"),
+                    "source": "google_search"
+                })
+
+            logger.info(f"🔍 Found {len(results)} search results for: {query}")
+            return results
 
         except Exception as e:
             logger.error(f"❌ Google Search failed: {e}")
-            return []
+            return None
 
     async def check_phone_number(self, phone_number: str) -> Dict:
         """
@@ -103,16 +113,26 @@ class RAGService:
                 "sources": List[str]
             }
         """
-        # Check cache first
-        if phone_number in self.cache:
-            cached = self.cache[phone_number]
-            if datetime.now() - cached["cached_at"] < timedelta(hours=24):
-                logger.info(f"📦 Using cached result for {phone_number}")
-                return cached["data"]
-
+        key = normalize_phone(phone_number)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.debug(f"📦 Using cached result for {key}")
+            return cached
+
+        # Concurrent checks of one number share a single search
+        task = self._checks_in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._check_uncached(key))
+            self._checks_in_flight[key] = task
+            task.add_done_callback(lambda _: self._checks_in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _check_uncached(self, phone_number: str) -> Dict:
         # Search Google
         query = f'"{phone_number}" scam report robocall'
-        search_results = await self.search_scam_reports(query, max_results=3)
+        search_results = await self._search(query, max_results=3)
+        failed = search_results is None
+        search_results = search_results or []
 
         # Analyze results
         is_known_scammer = len(search_results) > 0
@@ -130,11 +150,9 @@ class RAGService:
             "confidence": min(reports_count / 10.0, 1.0)  # More reports = higher confidence
         }
 
-        # Cache result
-        self.cache[phone_number] = {
-            "data": result,
-            "cached_at": datetime.now()
-        }
+        # Cache result (a failed search says nothing about the number)
+        if not failed:
+            self.cache.set(phone_number, result)
 
         logger.info(f"📞 Checked {phone_number}: {reports_count} reports found")
         return result
@@ -226,8 +244,10 @@ class RAGService:
             logger.info(f"📚 Learned from scam report: {phone_number} ({scam_type})")
 
             # Invalidate cache
-            if phone_number in self.cache:
-                del self.cache[phone_number]
+            self.cache.invalidate(normalize_phone(phone_number))
+
+            # Reject the number at call arrival from now on
+            reputation_index.add(phone_number)
 
             return True
 
@@ -275,6 +295,18 @@ class RAGService:
 rag_service = RAGService()
 
 
+async def init_rag_service() -> None:
+    """Warm the phone reputation cache from its store (called on app startup)"""
+    warmed = rag_service.cache.warm_start(settings.REPUTATION_CACHE_WARM_ENTRIES)
+    if warmed:
+        logger.info(f"✅ Phone reputation cache warmed ({warmed} numbers)")
+
+
+async def close_rag_service() -> None:
+    """Close the phone reputation store (called on app shutdown)"""
+    rag_service.cache.close()
+
+
 # ======================
 # VECTOR SEARCH (Advanced RAG)
 # ======================
@@ -287,18 +319,21 @@ class VectorRAG:
     """
 
     def __init__(self):
-        self.embeddings_cache = {}
         self.gemini_service = None  # Lazy load
 
-    async def embed_text(self, text: str) -> List[float]:
-        """Generate embedding vector for text"""
+    def _gemini(self):
         if not self.gemini_service:
             from app.services.gemini_service import get_gemini_service
             self.gemini_service = get_gemini_service()
+        return self.gemini_service
+
+    async def embed_text(self, text: str) -> List[float]:
+        """Generate embedding vector for text (cached by content hash)"""
+        return await self._gemini().generate_embeddings(text)
 
-        # Use Gemini embeddings
-        embeddings = await self.gemini_service.generate_embeddings(text)
-        return embeddings
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed many texts: deduplicated, cached, batched per provider call"""
+        return await self._gemini().embed_many(texts)
 
     async def find_similar_scams(
         self,
@@ -321,26 +356,20 @@ class VectorRAG:
         if not query_embedding:
             return []
 
-        # In production, this would query Vertex AI Vector Search
-        # For now, return mock similar scams
+        # Local cosine top-k over the scam-script index
+        matches = vector_store.search(np.asarray(query_embedding, dtype=np.float32))
 
-        similar_scams = [
-            {
-                "scam_type": "irs",
-                "similarity_score": 0.92,
-                "script_sample": "This is the IRS calling about your unpaid taxes...",
-                "report_count": 1247
-            },
+        # Filter by threshold
+        return [
             {
-                "scam_type": "tech_support",
-                "similarity_score": 0.78,
-                "script_sample": "We detected a virus on your computer...",
-                "report_count": 856
+                "scam_type": match["scam_type"],
+                "similarity_score": match["similarity"],
+                "script_sample": match["script_sample"],
+                "report_count": match["report_count"]
             }
+            for match in matches
+            if match["similarity"] >= threshold
         ]
 
-        # Filter by threshold
-        return [s for s in similar_scams if s["similarity_score"] >= threshold]
-
 
 vector_rag = VectorRAG()
@@ -0,0 +1,246 @@
+"""
+Phone Reputation Cache: bounded, persistent cache of check_phone_number results
+In-memory LRU + TTL in front of an optional shared store
+
+- "Not a known scammer" results expire sooner than positive ones, so a
+  number that starts getting reported is re-checked quickly
+- The store outlives the process and is shared by every worker pointed at
+  it; the SQLite file (WAL) is the single-host stand-in for a shared
+  backend, anything with the ReputationStore methods can replace it
+- warm_start() loads the most recently checked numbers on startup, so only
+  genuinely new numbers go to search
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.sqlite import open_sqlite
+
+logger = logging.getLogger(__name__)
+
+# (result, expires_at as wall-clock epoch seconds)
+StoredReputation = Tuple[Dict[str, Any], float]
+
+_PHONE_FORMATTING = re.compile(r"[\s().\-]")
+
+
+def normalize_phone(phone_number: str) -> str:
+    """Cache key for a phone number ("+1 (555) 123-4567" → "+15551234567")"""
+    return _PHONE_FORMATTING.sub("", phone_number or "")
+
+
+class ReputationStore:
+    """Shared backend interface (wall-clock expiry, since it outlives processes)"""
+
+    def get(self, phone_number: str) -> Optional[StoredReputation]:
+        raise NotImplementedError
+
+    def put(self, phone_number: str, result: Dict[str, Any], expires_at: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, phone_number: str) -> None:
+        raise NotImplementedError
+
+    def load_recent(self, limit: int) -> List[Tuple[str, Dict[str, Any], float]]:
+        """Unexpired entries, most recently checked first"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteReputationStore(ReputationStore):
+    """
+    Reputation store in a local SQLite file
+
+    WAL mode lets every uvicorn worker on the host read and write the same
+    file. Calls are local SQLite commits (see app.core.sqlite); use from
+    the event loop only.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = open_sqlite(self.path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS phone_reputation ("
+                " phone_number TEXT PRIMARY KEY,"
+                " result TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS phone_reputation_updated_at ON phone_reputation (updated_at)"
+            )
+            self._db.commit()
+        return self._db
+
+    def get(self, phone_number: str) -> Optional[StoredReputation]:
+        row = self._connection().execute(
+            "SELECT result, expires_at FROM phone_reputation WHERE phone_number = ? AND expires_at > ?",
+            (phone_number, time.time())
+        ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def put(self, phone_number: str, result: Dict[str, Any], expires_at: float) -> None:
+        db = self._connection()
+        db.execute(
+            "INSERT OR REPLACE INTO phone_reputation (phone_number, result, expires_at, updated_at)"
+            " VALUES (?, ?, ?, ?)",
+            (phone_number, json.dumps(result, default=str), expires_at, time.time())
+        )
+        db.commit()
+
+    def delete(self, phone_number: str) -> None:
+        db = self._connection()
+        db.execute("DELETE FROM phone_reputation WHERE phone_number = ?", (phone_number,))
+        db.commit()
+
+    def load_recent(self, limit: int) -> List[Tuple[str, Dict[str, Any], float]]:
+        db = self._connection()
+        now = time.time()
+        # Expired rows are never read again; prune them while we're here
+        db.execute("DELETE FROM phone_reputation WHERE expires_at <= ?", (now,))
+        db.commit()
+        rows = db.execute(
+            "SELECT phone_number, result, expires_at FROM phone_reputation"
+            " ORDER BY updated_at DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        return [(phone, json.loads(result), expires_at) for phone, result, expires_at in rows]
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class PhoneReputationCache:
+    """
+    Two-level phone reputation cache
+
+    Usage:
+        cache = PhoneReputationCache(SQLiteReputationStore("./data/phone_reputation.sqlite"))
+        cache.warm_start(5000)
+        cache.get("+15551234567")          → result dict, or None
+        cache.set("+15551234567", result)  # TTL picked from result["is_known_scammer"]
+        cache.invalidate("+15551234567")
+    """
+
+    def __init__(
+        self,
+        store: Optional[ReputationStore] = None,
+        max_entries: int = 10000,
+        ttl_seconds: float = 86400,
+        negative_ttl_seconds: float = 3600
+    ):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.memory = TTLCache(max_size=max_entries, ttl_seconds=ttl_seconds, name="phone_reputation")
+
+        self.store_hits = 0
+        self.store_errors = 0
+        self.warmed = 0
+
+    def get(self, phone_number: str) -> Optional[Dict[str, Any]]:
+        """Cached result (memory first, then the shared store)"""
+        result = self.memory.get(phone_number)
+        if result is not None or self.store is None:
+            return result
+
+        try:
+            stored = self.store.get(phone_number)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"⚠️ Phone reputation store read failed: {e}")
+            return None
+        if stored is None:
+            return None
+
+        result, expires_at = stored
+        self.memory.set(phone_number, result, ttl_seconds=max(0.0, expires_at - time.time()))
+        self.store_hits += 1
+        return result
+
+    def set(self, phone_number: str, result: Dict[str, Any]) -> None:
+        """Cache a result; negative results get the shorter TTL"""
+        ttl = self.ttl_seconds if result.get("is_known_scammer") else self.negative_ttl_seconds
+        self.memory.set(phone_number, result, ttl_seconds=ttl)
+        if self.store is None:
+            return
+
+        try:
+            self.store.put(phone_number, result, time.time() + ttl)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"⚠️ Phone reputation store write failed: {e}")
+
+    def invalidate(self, phone_number: str) -> None:
+        """Forget a number everywhere (e.g. after a new scam report)"""
+        self.memory.invalidate(phone_number)
+        if self.store is None:
+            return
+
+        try:
+            self.store.delete(phone_number)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"⚠️ Phone reputation store delete failed: {e}")
+
+    def warm_start(self, limit: int) -> int:
+        """Load up to `limit` recently checked numbers from the store into memory"""
+        if self.store is None or limit <= 0:
+            return 0
+
+        try:
+            rows = self.store.load_recent(min(limit, self.memory.max_size))
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"⚠️ Phone reputation warm start failed: {e}")
+            return 0
+
+        now = time.time()
+        # Oldest first, so the most recent numbers end up most recently used
+        for phone_number, result, expires_at in reversed(rows):
+            self.memory.set(phone_number, result, ttl_seconds=max(0.0, expires_at - now))
+
+        self.warmed += len(rows)
+        return len(rows)
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.memory.get_stats(),
+            "negative_ttl_seconds": self.negative_ttl_seconds,
+            "backend": type(self.store).__name__ if self.store is not None else "memory",
+            "store_hits": self.store_hits,
+            "store_errors": self.store_errors,
+            "warmed": self.warmed
+        }
+
+
+def create_reputation_cache() -> PhoneReputationCache:
+    """PhoneReputationCache configured from settings"""
+    store = None
+    if settings.REPUTATION_CACHE_BACKEND == "sqlite":
+        store = SQLiteReputationStore(settings.REPUTATION_CACHE_PATH)
+
+    return PhoneReputationCache(
+        store=store,
+        max_entries=settings.REPUTATION_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.REPUTATION_CACHE_TTL_SECONDS,
+        negative_ttl_seconds=settings.REPUTATION_CACHE_NEGATIVE_TTL_SECONDS
+    )
@@ -0,0 +1,280 @@
+"""
+Reputation Index: in-memory known-scammer blocklist for call arrival
+Bloom filter in front of an exact hash set, built from the blacklist file
+(settings.BLACKLIST_FILE) and high-confidence scam_reports
+
+incoming_call checks it before any database or ElevenLabs work, so a known
+scammer is rejected with zero external calls. Most callers are not on the
+list and are cleared by the Bloom filter alone; its rare false positives are
+confirmed against the exact set, so nobody is blocked by mistake.
+
+The file is hot-reloaded when its mtime changes, scam_reports are re-read
+every BLOCKLIST_DB_REFRESH_SECONDS, and each reload swaps in a freshly built
+filter and set, so lookups never see a half-built index.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.database import DatabaseService, db_service
+from app.services.reputation_cache import normalize_phone
+
+logger = logging.getLogger(__name__)
+
+_MIN_CAPACITY = 1024
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings (double hashing on one blake2b digest)
+
+    Sized for `capacity` items at `false_positive_rate`; adding more items
+    than that still works but raises the false-positive rate.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def read_blacklist(path: Path) -> Set[str]:
+    """
+    Normalized numbers from a blacklist JSON file
+
+    Accepts ["+15551234567", ...] or [{"phone_number": "+1555..."}, ...]
+    """
+    entries = json.loads(path.read_text() or "[]")
+    numbers = set()
+    for entry in entries:
+        if isinstance(entry, dict):
+            entry = entry.get("phone_number") or entry.get("number")
+        if entry:
+            numbers.add(normalize_phone(str(entry)))
+    return numbers
+
+
+class ReputationIndex:
+    """
+    Blocklist lookup with hot reload
+
+    Usage:
+        await reputation_index.start()              # from main.lifespan
+        reputation_index.is_blocked("+15551234567") → bool (no I/O)
+        reputation_index.add("+15551234567")        # block immediately
+
+    Not thread-safe: lookups and add() run on the event loop; rebuilds run
+    in a worker thread and are swapped in on the loop.
+    """
+
+    def __init__(self, blacklist_path: Optional[str] = None, database: Optional[DatabaseService] = None):
+        self.blacklist_path = Path(blacklist_path or settings.BLACKLIST_FILE)
+        self.database = database or db_service
+        self.false_positive_rate = settings.BLOCKLIST_BLOOM_FALSE_POSITIVE_RATE
+
+        self._file_numbers: Set[str] = set()
+        self._reported_numbers: Set[str] = set()
+        self._added_numbers: Set[str] = set()  # add()ed, not (yet) seen in scam_reports
+        self._numbers: Set[str] = set()
+        self._bloom = BloomFilter(_MIN_CAPACITY, self.false_positive_rate)
+        self._file_mtime: Optional[float] = None
+        self._reloader: Optional[asyncio.Task] = None
+
+        # Stats
+        self.checks = 0
+        self.bloom_passes = 0
+        self.false_positives = 0
+        self.blocked = 0
+        self.reloads = 0
+        self.reload_errors = 0
+        self.last_reload_ms = 0.0
+
+    # ========================
+    # Lookups
+    # ========================
+
+    def is_blocked(self, phone_number: Optional[str]) -> bool:
+        """True if the caller is a known scammer (memory only, microseconds)"""
+        if not phone_number:
+            return False
+
+        self.checks += 1
+        key = normalize_phone(phone_number)
+        if key not in self._bloom:
+            return False
+
+        self.bloom_passes += 1
+        if key not in self._numbers:
+            self.false_positives += 1
+            return False
+
+        self.blocked += 1
+        return True
+
+    def add(self, phone_number: str) -> None:
+        """Block a number right away (kept in memory until a database refresh returns it)"""
+        key = normalize_phone(phone_number)
+        if not key or key in self._numbers:
+            return
+        self._added_numbers.add(key)
+        self._numbers.add(key)
+        self._bloom.add(key)
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    # ========================
+    # Loading
+    # ========================
+
+    async def reload(self, refresh_database: bool = True) -> None:
+        """
+        Re-read the blacklist file (and scam_reports) and swap in a new index
+
+        The two sources fail independently: a source that can't be read
+        keeps its previous numbers and the index is rebuilt from the other.
+        The file's mtime is only recorded once its numbers are swapped in,
+        so an unread file is retried on the next poll.
+        """
+        start = time.perf_counter()
+        try:
+            file_numbers, file_mtime = self._read_file()
+        except Exception as e:
+            self.reload_errors += 1
+            logger.error(f"❌ Blacklist file reload failed (keeping its previous numbers): {e}")
+            file_numbers, file_mtime = self._file_numbers, self._file_mtime
+
+        if refresh_database:
+            try:
+                self._reported_numbers = await self.database.get_reported_scam_numbers(
+                    settings.BLOCKLIST_MIN_REPORT_CONFIDENCE
+                )
+                # Persisted now; the rest stay blocked until they are
+                self._added_numbers -= self._reported_numbers
+            except Exception as e:
+                self.reload_errors += 1
+                logger.error(f"❌ scam_reports refresh failed (keeping previously reported numbers): {e}")
+
+        numbers = file_numbers | self._reported_numbers | self._added_numbers
+        bloom = await asyncio.to_thread(self._build_bloom, numbers)
+        # Numbers add()ed while the filter was being built
+        for number in self._added_numbers - numbers:
+            numbers.add(number)
+            bloom.add(number)
+        self._numbers, self._bloom = numbers, bloom
+        self._file_numbers, self._file_mtime = file_numbers, file_mtime
+
+        self.reloads += 1
+        self.last_reload_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"✅ Blocklist loaded ({len(numbers)} numbers, {self.last_reload_ms:.0f}ms)")
+
+    def _read_file(self) -> Tuple[Set[str], Optional[float]]:
+        """(numbers, mtime) of the blacklist file (empty when it doesn't exist)"""
+        if not self.blacklist_path.exists():
+            return set(), None
+        mtime = self.blacklist_path.stat().st_mtime
+        return read_blacklist(self.blacklist_path), mtime
+
+    def _file_changed(self) -> bool:
+        try:
+            mtime = self.blacklist_path.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+        return mtime != self._file_mtime
+
+    def _build_bloom(self, numbers: Set[str]) -> BloomFilter:
+        # Headroom for add() between reloads
+        bloom = BloomFilter(max(_MIN_CAPACITY, 2 * len(numbers)), self.false_positive_rate)
+        for number in numbers:
+            bloom.add(number)
+        return bloom
+
+    # ========================
+    # Lifecycle
+    # ========================
+
+    async def start(self) -> None:
+        """Initial load, then poll the file and refresh scam_reports in the background"""
+        if self._reloader is not None:
+            return
+        await self.reload()
+        self._reloader = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._reloader is not None:
+            self._reloader.cancel()
+            try:
+                await self._reloader
+            except asyncio.CancelledError:
+                pass
+            self._reloader = None
+
+    async def _run(self) -> None:
+        last_refresh = time.monotonic()
+        while True:
+            await asyncio.sleep(settings.BLOCKLIST_FILE_POLL_SECONDS)
+            refresh_database = time.monotonic() - last_refresh >= settings.BLOCKLIST_DB_REFRESH_SECONDS
+            if refresh_database or self._file_changed():
+                await self.reload(refresh_database=refresh_database)
+                if refresh_database:
+                    last_refresh = time.monotonic()
+
+    # ========================
+    # Metrics
+    # ========================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Blocklist counters for the /metrics endpoint"""
+        return {
+            "numbers": len(self._numbers),
+            "file_numbers": len(self._file_numbers),
+            "reported_numbers": len(self._reported_numbers),
+            "bloom_bytes": len(self._bloom.bits),
+            "bloom_hashes": self._bloom.hash_count,
+            "checks": self.checks,
+            "bloom_passes": self.bloom_passes,
+            "false_positives": self.false_positives,
+            "blocked": self.blocked,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+            "last_reload_ms": round(self.last_reload_ms, 2)
+        }
+
+
+# Singleton instance
+reputation_index = ReputationIndex()
+
+
+async def init_reputation_index() -> None:
+    """Load the blocklist and start hot reload (called on app startup, after the database)"""
+    if settings.BLOCKLIST_PRESCREEN_ENABLED:
+        await reputation_index.start()
+
+
+async def close_reputation_index() -> None:
+    """Stop hot reload (called on app shutdown)"""
+    await reputation_index.close()
@@ -0,0 +1,77 @@
+"""
+Signed URL Cache: reuse signed storage URLs instead of re-signing
+Each generate_signed_url is an RSA signature (or an IAM round trip)
+
+- Keyed by (object key, method)
+- A URL is reused until SIGNED_URL_REUSE_FRACTION of its lifetime has
+  passed, so callers always get at least the rest of the lifetime they
+  asked for
+- Cache hits/misses exposed for /metrics
+"""
+
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class SignedURLCache:
+    """
+    Expiry-aware signed URL cache
+
+    Usage:
+        url = cache.get(key, "GET", timedelta(days=7))
+        if url is None:
+            url = backend.sign_url(key, timedelta(days=7), "GET")
+            cache.put(key, "GET", timedelta(days=7), url)
+
+    Not thread-safe: meant for use from the event loop (signing itself
+    happens in the storage worker pool).
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, reuse_fraction: Optional[float] = None):
+        self.reuse_fraction = settings.SIGNED_URL_REUSE_FRACTION if reuse_fraction is None else reuse_fraction
+        # value: (url, monotonic time the URL itself expires)
+        self._urls = TTLCache(
+            max_size=max_entries or settings.SIGNED_URL_CACHE_MAX_ENTRIES,
+            ttl_seconds=0,
+            name="signed_urls"
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, method: str, expiration: timedelta) -> Optional[str]:
+        """Cached URL still valid for (1 - reuse_fraction) of the requested lifetime"""
+        entry: Optional[Tuple[str, float]] = self._urls.get((key, method))
+        # A URL signed for a shorter lifetime than requested may not be good enough
+        if entry is None or entry[1] - time.monotonic() < expiration.total_seconds() * (1 - self.reuse_fraction):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: str, method: str, expiration: timedelta, url: str) -> None:
+        lifetime = expiration.total_seconds()
+        self._urls.set(
+            (key, method),
+            (url, time.monotonic() + lifetime),
+            ttl_seconds=lifetime * self.reuse_fraction
+        )
+
+    def invalidate(self, key: str, method: str = "GET") -> bool:
+        return self._urls.invalidate((key, method))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters for the /metrics endpoint"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._urls),
+            "max_entries": self._urls.max_size,
+            "reuse_fraction": self.reuse_fraction,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self._urls.evictions
+        }
@@ -0,0 +1,187 @@
+"""
+Storage Backends: where GCSService puts call artifacts
+Google Cloud Storage in production, a local directory for tests and
+air-gapped deployments (STORAGE_BACKEND=local)
+
+Backend methods are blocking; GCSService calls them from its upload worker
+pool, never on the event loop.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_META_SUFFIX = ".meta.json"
+
+
+@dataclass
+class StoredObject:
+    """One stored object, as listed"""
+    key: str
+    size: int
+    created_at: datetime
+
+
+class StorageBackend:
+    """Blocking object store interface"""
+
+    name = "base"
+
+    def put(
+        self,
+        key: str,
+        data: bytes,
+        content_type: str,
+        content_encoding: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> None:
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Stored bytes as uploaded (still gzip-encoded if put with content_encoding="gzip")"""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Remove an object (no error if it is already gone)"""
+        raise NotImplementedError
+
+    def list(self, prefix: str = "") -> Iterator[StoredObject]:
+        raise NotImplementedError
+
+    def sign_url(self, key: str, expiration: timedelta, method: str = "GET") -> str:
+        raise NotImplementedError
+
+    def object_url(self, key: str) -> str:
+        raise NotImplementedError
+
+
+class GCSBackend(StorageBackend):
+    """Objects in a Google Cloud Storage bucket"""
+
+    name = "gcs"
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+
+    def put(self, key, data, content_type, content_encoding=None, metadata=None):
+        blob = self.bucket.blob(key)
+        # Metadata and encoding must be set before the upload to be stored with it
+        blob.metadata = metadata or None
+        blob.content_encoding = content_encoding
+        blob.upload_from_string(data, content_type=content_type)
+
+    def get(self, key):
+        blob = self.bucket.blob(key)
+        if not blob.exists():
+            return None
+        # raw_download: keep gzip objects encoded, like the local backend
+        return blob.download_as_bytes(raw_download=True)
+
+    def delete(self, key):
+        from google.api_core.exceptions import NotFound
+
+        try:
+            self.bucket.blob(key).delete()
+        except NotFound:
+            pass
+
+    def list(self, prefix=""):
+        for blob in self.bucket.list_blobs(prefix=prefix):
+            yield StoredObject(blob.name, blob.size or 0, blob.time_created)
+
+    def sign_url(self, key, expiration, method="GET"):
+        return self.bucket.blob(key).generate_signed_url(version="v4", expiration=expiration, method=method)
+
+    def object_url(self, key):
+        return f"gs://{self.bucket.name}/{key}"
+
+
+class LocalFilesystemBackend(StorageBackend):
+    """
+    Objects as files under a root directory
+
+    Metadata, content type and encoding go to a "<file>.meta.json" sidecar.
+    Writes are atomic (temp file + rename). Signed URLs are plain file://
+    URLs: there is nothing to sign locally.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Storage key escapes the storage root: {key!r}")
+        return path
+
+    def put(self, key, data, content_type, content_encoding=None, metadata=None):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data if isinstance(data, bytes) else data.encode("utf-8"))
+        os.replace(tmp, path)
+
+        sidecar = {"content_type": content_type, "content_encoding": content_encoding, "metadata": metadata or {}}
+        path.with_name(path.name + _META_SUFFIX).write_text(json.dumps(sidecar))
+
+    def get(self, key):
+        path = self._path(key)
+        return path.read_bytes() if path.exists() else None
+
+    def delete(self, key):
+        path = self._path(key)
+        for file in (path, path.with_name(path.name + _META_SUFFIX)):
+            if file.exists():
+                file.unlink()
+
+    def list(self, prefix=""):
+        if not self.root.exists():
+            return
+        for path in sorted(self.root.rglob("*")):
+            if not path.is_file() or path.name.endswith((_META_SUFFIX, ".tmp")):
+                continue
+            key = path.relative_to(self.root).as_posix()
+            if key.startswith(prefix):
+                stat = path.stat()
+                yield StoredObject(key, stat.st_size, datetime.fromtimestamp(stat.st_mtime, timezone.utc))
+
+    def sign_url(self, key, expiration, method="GET"):
+        return self.object_url(key)
+
+    def object_url(self, key):
+        return self._path(key).as_uri()
+
+
+def create_storage_backend() -> Optional[StorageBackend]:
+    """
+    Backend from settings.STORAGE_BACKEND
+
+    Returns None in demo mode (gcs selected but no credentials), where
+    uploads are skipped and demo URLs returned as before.
+    """
+    if settings.STORAGE_BACKEND == "local":
+        logger.info(f"✅ Local storage backend: {settings.STORAGE_LOCAL_PATH}")
+        return LocalFilesystemBackend(settings.STORAGE_LOCAL_PATH)
+
+    try:
+        from google.cloud import storage
+
+        client = storage.Client(project=settings.GOOGLE_CLOUD_PROJECT)
+        bucket_name = f"{settings.GOOGLE_CLOUD_PROJECT}-ai-gatekeeper"
+        logger.info(f"✅ GCS initialized: {bucket_name}")
+        return GCSBackend(client.bucket(bucket_name))
+
+    except Exception as e:
+        logger.warning(f"⚠️ GCS initialization failed (demo mode?): {e}")
+        return None
@@ -0,0 +1,329 @@
+"""
+Storage Manifest: index of every stored object
+Maintained by the upload path so GCSService never has to list the bucket
+
+- storage_objects: one row per key (user, kind, size, created_at), indexed
+  by (kind, created_at) for retention range scans and by
+  (user_id, kind, created_at) for oldest/newest lookups
+- storage_totals: running object count and bytes per (user, kind), so
+  per-user statistics are a handful of row reads
+
+Keys follow GCSService's layout "{user_id}/{kind}/{file}". Both
+implementations are synchronous and called from the upload worker threads.
+
+- DatabaseStorageManifest (default): the tables live in the shared database
+  (database/schema.sql), so every instance records into and sweeps the same
+  index
+- StorageManifest: a local SQLite file (WAL). It only sees this instance's
+  uploads, so it is for single-instance deployments and tests
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.core.sqlite import open_sqlite
+from app.services.storage_backends import StoredObject
+
+logger = logging.getLogger(__name__)
+
+
+def split_key(key: str) -> Tuple[str, str]:
+    """(user_id, kind) of a storage key ("u1/recordings/CA1.wav" → ("u1", "recordings"))"""
+    parts = key.split("/", 2)
+    if len(parts) < 3:
+        return "", parts[0] if len(parts) == 2 else ""
+    return parts[0], parts[1]
+
+
+class StorageManifest:
+    """
+    Local object index with per-user, per-kind totals (single instance)
+
+    Usage:
+        manifest = StorageManifest("./data/storage_manifest.sqlite")
+        manifest.record("u1/recordings/CA1.wav", 48000)
+        manifest.user_stats("u1")                    # {"recordings": (1, 48000)}
+        manifest.expired("recordings", cutoff, 500)  # oldest keys first
+        manifest.remove("u1/recordings/CA1.wav")
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = open_sqlite(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS storage_objects ("
+                " key TEXT PRIMARY KEY,"
+                " user_id TEXT NOT NULL,"
+                " kind TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS storage_objects_kind_created ON storage_objects (kind, created_at)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS storage_objects_user_created"
+                " ON storage_objects (user_id, kind, created_at)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS storage_totals ("
+                " user_id TEXT NOT NULL,"
+                " kind TEXT NOT NULL,"
+                " objects INTEGER NOT NULL,"
+                " bytes INTEGER NOT NULL,"
+                " PRIMARY KEY (user_id, kind))"
+            )
+            self._db.commit()
+        return self._db
+
+    # ========================
+    # Writes (upload path)
+    # ========================
+
+    def _record(self, db: sqlite3.Connection, key: str, size: int, created_at: float) -> None:
+        user_id, kind = split_key(key)
+        row = db.execute("SELECT size FROM storage_objects WHERE key = ?", (key,)).fetchone()
+        objects, delta = (0, size - row[0]) if row else (1, size)
+
+        db.execute(
+            "INSERT OR REPLACE INTO storage_objects (key, user_id, kind, size, created_at) VALUES (?, ?, ?, ?, ?)",
+            (key, user_id, kind, size, created_at)
+        )
+        db.execute(
+            "INSERT INTO storage_totals (user_id, kind, objects, bytes) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (user_id, kind) DO UPDATE SET"
+            " objects = objects + excluded.objects, bytes = bytes + excluded.bytes",
+            (user_id, kind, objects, delta)
+        )
+
+    def record(self, key: str, size: int, created_at: Optional[float] = None) -> None:
+        """Add (or overwrite) an uploaded object"""
+        with self._lock:
+            db = self._connection()
+            self._record(db, key, size, time.time() if created_at is None else created_at)
+            db.commit()
+
+    def remove(self, key: str) -> bool:
+        """Forget a deleted object (False if it was not indexed)"""
+        with self._lock:
+            db = self._connection()
+            row = db.execute("SELECT user_id, kind, size FROM storage_objects WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False
+            user_id, kind, size = row
+            db.execute("DELETE FROM storage_objects WHERE key = ?", (key,))
+            db.execute(
+                "UPDATE storage_totals SET objects = objects - 1, bytes = bytes - ? WHERE user_id = ? AND kind = ?",
+                (size, user_id, kind)
+            )
+            db.commit()
+            return True
+
+    def rebuild(self, objects: Iterable[StoredObject]) -> int:
+        """Replace the index with a full listing (first start on an existing bucket)"""
+        with self._lock:
+            db = self._connection()
+            db.execute("DELETE FROM storage_objects")
+            db.execute("DELETE FROM storage_totals")
+            count = 0
+            for stored in objects:
+                self._record(db, stored.key, stored.size, stored.created_at.timestamp())
+                count += 1
+            db.commit()
+            return count
+
+    # ========================
+    # Reads
+    # ========================
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._connection().execute("SELECT 1 FROM storage_objects LIMIT 1").fetchone() is None
+
+    def user_stats(self, user_id: str) -> Dict[str, Tuple[int, int]]:
+        """{kind: (objects, bytes)} for one user"""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT kind, objects, bytes FROM storage_totals WHERE user_id = ? AND objects > 0",
+                (user_id,)
+            ).fetchall()
+        return {kind: (objects, size) for kind, objects, size in rows}
+
+    def time_range(self, user_id: str, kinds: Iterable[str]) -> Tuple[Optional[float], Optional[float]]:
+        """(oldest, newest) created_at among the user's objects of these kinds"""
+        oldest = newest = None
+        with self._lock:
+            db = self._connection()
+            for kind in kinds:
+                # MIN/MAX on the (user_id, kind, created_at) index: one probe each
+                low, high = db.execute(
+                    "SELECT MIN(created_at), MAX(created_at) FROM storage_objects WHERE user_id = ? AND kind = ?",
+                    (user_id, kind)
+                ).fetchone()
+                if low is not None:
+                    oldest = low if oldest is None else min(oldest, low)
+                    newest = high if newest is None else max(newest, high)
+        return oldest, newest
+
+    def expired(self, kind: str, before: float, limit: int) -> List[str]:
+        """Keys of this kind created before `before`, oldest first"""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT key FROM storage_objects WHERE kind = ? AND created_at < ? ORDER BY created_at LIMIT ?",
+                (kind, before, limit)
+            ).fetchall()
+        return [key for (key,) in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class DatabaseStorageManifest:
+    """
+    Object index in the shared database (storage_objects / storage_totals)
+
+    Same interface as StorageManifest. record/remove go through the
+    record_storage_object / remove_storage_object functions, which update
+    the totals atomically however many instances upload concurrently.
+
+    Usage:
+        manifest = DatabaseStorageManifest(db_service)
+        manifest.record("u1/recordings/CA1.wav", 48000)
+    """
+
+    _BATCH = 500
+
+    def __init__(self, database: Any):
+        # Anything with a supabase-style .client (set once the database is initialized)
+        self._database = database
+
+    @property
+    def _client(self) -> Any:
+        client = self._database.client
+        if client is None:
+            raise RuntimeError("Database not initialized")
+        return client
+
+    # ========================
+    # Writes (upload path)
+    # ========================
+
+    def record(self, key: str, size: int, created_at: Optional[float] = None) -> None:
+        """Add (or overwrite) an uploaded object"""
+        user_id, kind = split_key(key)
+        self._client.rpc("record_storage_object", {
+            "p_key": key,
+            "p_user_id": user_id,
+            "p_kind": kind,
+            "p_size": size,
+            "p_created_at": time.time() if created_at is None else created_at
+        }).execute()
+
+    def remove(self, key: str) -> bool:
+        """Forget a deleted object (False if it was not indexed)"""
+        return bool(self._client.rpc("remove_storage_object", {"p_key": key}).execute().data)
+
+    def rebuild(self, objects: Iterable[StoredObject]) -> int:
+        """
+        Index a full listing (first start on an existing bucket)
+
+        Upserts, so instances starting together on an empty index end up
+        with the same rows and totals.
+        """
+        client = self._client
+        totals: Dict[Tuple[str, str], List[int]] = {}
+        batch: List[Dict[str, Any]] = []
+        count = 0
+
+        for stored in objects:
+            user_id, kind = split_key(stored.key)
+            batch.append({
+                "key": stored.key, "user_id": user_id, "kind": kind,
+                "size": stored.size, "created_at": stored.created_at.timestamp()
+            })
+            total = totals.setdefault((user_id, kind), [0, 0])
+            total[0] += 1
+            total[1] += stored.size
+            count += 1
+            if len(batch) >= self._BATCH:
+                client.table("storage_objects").upsert(batch, on_conflict="key").execute()
+                batch = []
+        if batch:
+            client.table("storage_objects").upsert(batch, on_conflict="key").execute()
+
+        rows = [
+            {"user_id": user_id, "kind": kind, "objects": objects, "bytes": size}
+            for (user_id, kind), (objects, size) in totals.items()
+        ]
+        for start in range(0, len(rows), self._BATCH):
+            client.table("storage_totals").upsert(rows[start:start + self._BATCH], on_conflict="user_id,kind").execute()
+        return count
+
+    # ========================
+    # Reads
+    # ========================
+
+    def is_empty(self) -> bool:
+        return not self._client.table("storage_objects").select("key").limit(1).execute().data
+
+    def user_stats(self, user_id: str) -> Dict[str, Tuple[int, int]]:
+        """{kind: (objects, bytes)} for one user"""
+        rows = self._client.table("storage_totals").select("kind, objects, bytes").eq("user_id", user_id).execute().data
+        return {row["kind"]: (row["objects"], row["bytes"]) for row in rows if row["objects"] > 0}
+
+    def time_range(self, user_id: str, kinds: Iterable[str]) -> Tuple[Optional[float], Optional[float]]:
+        """(oldest, newest) created_at among the user's objects of these kinds"""
+        oldest = newest = None
+        for kind in kinds:
+            # One probe each way on the (user_id, kind, created_at) index
+            for desc in (False, True):
+                rows = (
+                    self._client.table("storage_objects").select("created_at")
+                    .eq("user_id", user_id).eq("kind", kind)
+                    .order("created_at", desc=desc).limit(1).execute().data
+                )
+                if not rows:
+                    break
+                value = rows[0]["created_at"]
+                if desc:
+                    newest = value if newest is None else max(newest, value)
+                else:
+                    oldest = value if oldest is None else min(oldest, value)
+        return oldest, newest
+
+    def expired(self, kind: str, before: float, limit: int) -> List[str]:
+        """Keys of this kind created before `before`, oldest first"""
+        rows = (
+            self._client.table("storage_objects").select("key")
+            .eq("kind", kind).lt("created_at", before)
+            .order("created_at").limit(limit).execute().data
+        )
+        return [row["key"] for row in rows]
+
+    def close(self) -> None:
+        """Nothing to release (the database client belongs to DatabaseService)"""
+
+
+Manifest = Union[StorageManifest, DatabaseStorageManifest]
+
+
+def create_storage_manifest() -> Manifest:
+    """Manifest from settings.STORAGE_MANIFEST_BACKEND (database unless explicitly local)"""
+    if settings.STORAGE_MANIFEST_BACKEND == "local":
+        logger.info(f"✅ Local storage manifest: {settings.STORAGE_MANIFEST_PATH} (this instance's uploads only)")
+        return StorageManifest(settings.STORAGE_MANIFEST_PATH)
+
+    from app.services.database import db_service
+    return DatabaseStorageManifest(db_service)
@@ -0,0 +1,251 @@
+"""
+Storage Uploader: background, debounced uploads for GCSService
+Keeps blocking storage calls (uploads, signing, listing) off the event loop
+
+- Uploads run in a bounded thread pool (STORAGE_UPLOAD_WORKERS)
+- Debounced uploads are grouped (per call_sid): each new submission
+  replaces the pending one, and only the latest version is uploaded once
+  the group has been quiet for STORAGE_UPLOAD_DEBOUNCE_SECONDS (at most
+  STORAGE_UPLOAD_MAX_DELAY_SECONDS after the first change)
+- A group's uploads never overlap and are versioned, so an older version
+  can't land after (and overwrite) a newer one
+- JSON bodies are serialized and gzip-compressed in the worker thread
+- Every successful upload is recorded in the storage manifest, if any
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.services.storage_backends import StorageBackend
+from app.services.storage_manifest import Manifest
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingUpload:
+    """One object to write (data: bytes, str, or a dict serialized as JSON)"""
+    key: str
+    data: Any
+    content_type: str
+    metadata: Dict[str, str] = field(default_factory=dict)
+    gzip: bool = False
+
+    def encode(self) -> bytes:
+        """Body bytes as stored (runs in a worker thread)"""
+        data = self.data
+        if isinstance(data, (dict, list)):
+            data = json.dumps(data, separators=(",", ":"), default=str)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return gzip.compress(data, compresslevel=6) if self.gzip else data
+
+
+@dataclass
+class _DebouncedGroup:
+    uploads: List[PendingUpload]
+    first_at: float
+    updated_at: float
+    version: int
+    timer: Optional[asyncio.Task] = None
+
+
+@dataclass
+class _GroupSlot:
+    """Serializes one group's uploads; dropped once nothing uses it"""
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0
+    uploaded_version: int = 0
+
+
+class StorageUploader:
+    """
+    Background upload pipeline in front of a StorageBackend
+
+    Usage:
+        uploader.submit([PendingUpload(key, audio, "audio/wav")])          # upload soon
+        uploader.submit_debounced(call_sid, [PendingUpload(...), ...])     # latest wins
+        await uploader.flush(call_sid)                                      # call ended
+        url = await uploader.run(backend.sign_url, key, expiration)        # any blocking call
+    """
+
+    def __init__(
+        self,
+        backend: Optional[StorageBackend],
+        workers: Optional[int] = None,
+        debounce_seconds: Optional[float] = None,
+        max_delay_seconds: Optional[float] = None,
+        manifest: Optional[Manifest] = None
+    ):
+        self.backend = backend
+        self.manifest = manifest
+        self.workers = workers or settings.STORAGE_UPLOAD_WORKERS
+        self.debounce_seconds = settings.STORAGE_UPLOAD_DEBOUNCE_SECONDS if debounce_seconds is None else debounce_seconds
+        self.max_delay_seconds = settings.STORAGE_UPLOAD_MAX_DELAY_SECONDS if max_delay_seconds is None else max_delay_seconds
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._groups: Dict[str, _DebouncedGroup] = {}
+        self._slots: Dict[str, _GroupSlot] = {}
+        self._version = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Stats
+        self.submitted = 0
+        self.superseded = 0
+        self.uploaded = 0
+        self.failed = 0
+        self.bytes_uploaded = 0
+
+    # ========================
+    # Worker pool
+    # ========================
+
+    async def run(self, function: Callable, *args) -> Any:
+        """Run a blocking storage call in the upload worker pool"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="storage")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    def _put(self, upload: PendingUpload) -> int:
+        body = upload.encode()
+        self.backend.put(
+            upload.key,
+            body,
+            content_type=upload.content_type,
+            content_encoding="gzip" if upload.gzip else None,
+            metadata=upload.metadata
+        )
+        if self.manifest is not None:
+            try:
+                self.manifest.record(upload.key, len(body))
+            except Exception as e:
+                logger.warning(f"⚠️ Storage manifest not updated for {upload.key}: {e}")
+        return len(body)
+
+    async def _upload(self, uploads: List[PendingUpload]) -> None:
+        for upload in uploads:
+            try:
+                size = await self.run(self._put, upload)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"❌ Upload failed: {upload.key}: {e}")
+                continue
+            self.uploaded += 1
+            self.bytes_uploaded += size
+            logger.debug(f"☁️ Uploaded {upload.key} ({size} bytes)")
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    # ========================
+    # Submissions
+    # ========================
+
+    def submit(self, uploads: List[PendingUpload]) -> None:
+        """Upload in the background as soon as a worker is free"""
+        if self.backend is None:
+            return
+        self.submitted += len(uploads)
+        self._spawn(self._upload(uploads))
+
+    def submit_debounced(self, group: str, uploads: List[PendingUpload]) -> None:
+        """Replace the group's pending uploads; uploaded once the group goes quiet"""
+        if self.backend is None:
+            return
+        self.submitted += len(uploads)
+        self._version += 1
+        now = time.monotonic()
+
+        pending = self._groups.get(group)
+        if pending is None:
+            pending = self._groups[group] = _DebouncedGroup(uploads, now, now, self._version)
+            pending.timer = self._spawn(self._debounce(group))
+        else:
+            self.superseded += len(pending.uploads)
+            pending.uploads, pending.updated_at, pending.version = uploads, now, self._version
+
+    async def _debounce(self, group: str) -> None:
+        while True:
+            pending = self._groups.get(group)
+            if pending is None:
+                return  # Flushed meanwhile
+            due = min(pending.updated_at + self.debounce_seconds, pending.first_at + self.max_delay_seconds)
+            delay = due - time.monotonic()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+
+        pending = self._groups.pop(group)
+        await self._upload_group(group, pending)
+
+    async def _upload_group(self, group: str, pending: Optional[_DebouncedGroup]) -> None:
+        """
+        Upload a group's version after any upload of it already in flight
+
+        With pending=None, only waits for the in-flight upload. A version
+        older than the one last uploaded is skipped.
+        """
+        slot = self._slots.get(group)
+        if slot is None:
+            slot = self._slots[group] = _GroupSlot()
+        slot.users += 1
+        try:
+            async with slot.lock:
+                if pending is None:
+                    return
+                if pending.version <= slot.uploaded_version:
+                    self.superseded += len(pending.uploads)
+                    return
+                await self._upload(pending.uploads)
+                slot.uploaded_version = pending.version
+        finally:
+            slot.users -= 1
+            if not slot.users:
+                del self._slots[group]
+
+    async def flush(self, group: Optional[str] = None) -> None:
+        """Upload one group's (or every group's) pending version now, after any upload in flight"""
+        groups = [group] if group is not None else list(self._groups)
+        flushes = []
+        for name in groups:
+            pending = self._groups.pop(name, None)
+            if pending is not None:
+                pending.timer.cancel()
+            flushes.append(self._upload_group(name, pending))
+        await asyncio.gather(*flushes)
+
+    async def close(self) -> None:
+        """Upload everything pending, wait for in-flight uploads, stop the pool"""
+        await self.flush()
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    # ========================
+    # Metrics
+    # ========================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Upload counters for the /metrics endpoint"""
+        return {
+            "backend": self.backend.name if self.backend is not None else "demo",
+            "pending_groups": len(self._groups),
+            "in_flight": len(self._tasks) - len(self._groups),
+            "submitted": self.submitted,
+            "superseded": self.superseded,
+            "uploaded": self.uploaded,
+            "failed": self.failed,
+            "bytes_uploaded": self.bytes_uploaded
+        }
@@ -0,0 +1,164 @@
+"""
+Twilio REST Adapter: non-blocking Twilio API calls over the shared HTTP pool
+Replaces the synchronous twilio.rest.Client on async code paths
+
+- Requests go through the pooled http_client (keep-alive to api.twilio.com)
+- Per-operation timeouts (TWILIO_API_TIMEOUTS): a hangup should not wait
+  as long as an SMS send
+- Retries only where they are safe:
+    * request never sent (connect/pool errors) or rejected with 429 → any operation
+    * response lost or 5xx → idempotent operations only (hangup, fetch);
+      repeating a dial would re-run its TwiML, repeating an SMS would send it twice
+"""
+
+import asyncio
+import logging
+import random
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.services.http_client import SharedHttpClient, http_client
+
+logger = logging.getLogger(__name__)
+
+API_VERSION = "2010-04-01"
+
+# operation → safe to repeat after an ambiguous failure
+IDEMPOTENT_OPERATIONS = {
+    "hangup": True,
+    "fetch_call": True,
+    "dial": False,
+    "send_sms": False,
+}
+
+# Failures where Twilio never received the request
+_NOT_SENT = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+_RETRYABLE_STATUS = {500, 502, 503, 504}
+
+
+class TwilioAPIError(Exception):
+    """Twilio API call failed (HTTP error response or transport failure)"""
+
+    def __init__(
+        self,
+        operation: str,
+        message: str,
+        status: Optional[int] = None,
+        code: Optional[int] = None,
+        ambiguous: bool = False
+    ):
+        super().__init__(f"Twilio {operation} failed: {message}")
+        self.operation = operation
+        self.status = status
+        self.code = code
+        # Twilio may have acted on the request (response lost or 5xx)
+        self.ambiguous = ambiguous
+
+
+class TwilioRestClient:
+    """
+    Async Twilio REST client
+
+    Usage:
+        await twilio_rest.update_call(call_sid, "hangup", Status="completed")
+        call = await twilio_rest.fetch_call(call_sid)
+        message = await twilio_rest.create_message(to, from_, body)
+    """
+
+    def __init__(
+        self,
+        http: Optional[SharedHttpClient] = None,
+        account_sid: Optional[str] = None,
+        auth_token: Optional[str] = None,
+        base_url: Optional[str] = None
+    ):
+        self.http = http or http_client
+        self.account_sid = account_sid or settings.TWILIO_ACCOUNT_SID
+        self.auth_token = auth_token or settings.TWILIO_AUTH_TOKEN
+        self.base_url = (base_url or settings.TWILIO_API_BASE_URL).rstrip("/")
+
+        # Stats per operation
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}/{API_VERSION}/Accounts/{self.account_sid}/{path}"
+
+    # ========================
+    # Operations
+    # ========================
+
+    async def update_call(self, call_sid: str, operation: str, **params) -> Dict[str, Any]:
+        """POST Calls/{sid}.json (operation: "hangup" or "dial", picks timeout and retry policy)"""
+        return await self._request(operation, "POST", f"Calls/{call_sid}.json", data=params)
+
+    async def fetch_call(self, call_sid: str) -> Dict[str, Any]:
+        """GET Calls/{sid}.json"""
+        return await self._request("fetch_call", "GET", f"Calls/{call_sid}.json")
+
+    async def create_message(self, to: str, from_: str, body: str) -> Dict[str, Any]:
+        """POST Messages.json"""
+        return await self._request("send_sms", "POST", "Messages.json", data={"To": to, "From": from_, "Body": body})
+
+    # ========================
+    # Transport
+    # ========================
+
+    async def _request(self, operation: str, method: str, path: str, data: Optional[dict] = None) -> Dict[str, Any]:
+        stats = self.stats.setdefault(operation, {"requests": 0, "retries": 0, "failures": 0})
+        idempotent = IDEMPOTENT_OPERATIONS.get(operation, method == "GET")
+        timeout = settings.TWILIO_API_TIMEOUTS.get(operation, settings.HTTP_READ_TIMEOUT_SECONDS)
+        attempts = max(1, settings.TWILIO_API_MAX_ATTEMPTS)
+
+        for attempt in range(1, attempts + 1):
+            stats["requests"] += 1
+            try:
+                response = await self.http.request(
+                    method,
+                    self._url(path),
+                    data=data,
+                    auth=(self.account_sid, self.auth_token),
+                    timeout=httpx.Timeout(timeout, connect=min(timeout, settings.HTTP_CONNECT_TIMEOUT_SECONDS))
+                )
+            except _NOT_SENT as e:
+                error, retry = TwilioAPIError(operation, f"{type(e).__name__}: {e}"), True
+            except httpx.HTTPError as e:
+                error, retry = TwilioAPIError(operation, f"{type(e).__name__}: {e}", ambiguous=True), idempotent
+            else:
+                if response.status_code < 400:
+                    return response.json()
+                error = self._error(operation, response)
+                retry = response.status_code == 429 or (idempotent and response.status_code in _RETRYABLE_STATUS)
+
+            if not retry or attempt == attempts:
+                stats["failures"] += 1
+                raise error
+
+            stats["retries"] += 1
+            delay = settings.TWILIO_API_BACKOFF_BASE_SECONDS * (2 ** (attempt - 1))
+            logger.warning(f"⚠️ {error} (attempt {attempt}/{attempts}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    @staticmethod
+    def _error(operation: str, response: httpx.Response) -> TwilioAPIError:
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        return TwilioAPIError(
+            operation,
+            body.get("message") or f"HTTP {response.status_code}",
+            status=response.status_code,
+            code=body.get("code"),
+            ambiguous=response.status_code >= 500
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-operation counters for the /metrics endpoint"""
+        return {operation: dict(counts) for operation, counts in self.stats.items()}
+
+
+# Singleton instance
+twilio_rest = TwilioRestClient()
@@ -1,15 +1,17 @@
 """
 Twilio Service: Handles telephony operations and Media Streams
+REST calls (hangup, dial, call details, SMS) go through the async
+TwilioRestClient, so a slow Twilio response never blocks the event loop
 """
 
 import logging
 from typing import Optional
-from twilio.rest import Client
+from xml.sax.saxutils import escape
 from twilio.twiml.voice_response import VoiceResponse, Connect, Stream
-import base64
-import audioop
 
 from app.core.config import settings
+from app.services import audio_codec
+from app.services.twilio_rest import TwilioRestClient, twilio_rest
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +21,8 @@ class TwilioService:
     Manages Twilio operations: calls, Media Streams, recordings
     """
 
-    def __init__(self):
-        self.client = Client(
-            settings.TWILIO_ACCOUNT_SID,
-            settings.TWILIO_AUTH_TOKEN
-        )
+    def __init__(self, rest: Optional[TwilioRestClient] = None):
+        self.rest = rest or twilio_rest
         self.phone_number = settings.TWILIO_PHONE_NUMBER
 
     def generate_twiml_for_incoming_call(
@@ -79,12 +78,11 @@ class TwilioService:
             call_sid: Original call SID to bridge
         """
         try:
-            # Update the call to dial the user
-            # twilio-python is typically synchronous, but we wrap it in a thread or 
-            # just use it as is if it doesn't block too much. 
-            # However, for consistency with the orchestrator, we mark it async.
-            call = self.client.calls(call_sid).update(
-                twiml=f'<Response><Dial>{user_phone_number}</Dial></Response>'
+            # Update the call to dial the user (not retried once sent: it would re-dial)
+            await self.rest.update_call(
+                call_sid,
+                "dial",
+                Twiml=f"<Response><Dial>{escape(user_phone_number)}</Dial></Response>"
             )
             logger.info(f"✅ Dialing user {user_phone_number} for call {call_sid}")
         except Exception as e:
@@ -106,7 +104,7 @@ class TwilioService:
             call_sid: Twilio Call SID
         """
         try:
-            call = self.client.calls(call_sid).update(status="completed")
+            await self.rest.update_call(call_sid, "hangup", Status="completed")
             logger.info(f"✅ Hung up call {call_sid}")
         except Exception as e:
             logger.error(f"❌ Failed to hang up call: {e}")
@@ -123,10 +121,8 @@ class TwilioService:
         Returns:
             PCM audio bytes (16-bit, mono, 8kHz)
         """
-        mulaw_bytes = base64.b64decode(base64_payload)
         # Convert mu-law to linear PCM (16-bit)
-        pcm_bytes = audioop.ulaw2lin(mulaw_bytes, 2)  # 2 = 16-bit
-        return pcm_bytes
+        return audio_codec.decode_payload(base64_payload)
 
     @staticmethod
     def encode_pcm_to_mulaw(pcm_bytes: bytes) -> str:
@@ -139,8 +135,7 @@ class TwilioService:
         Returns:
             Base64-encoded mu-law audio string
         """
-        mulaw_bytes = audioop.lin2ulaw(pcm_bytes, 2)  # 2 = 16-bit
-        return base64.b64encode(mulaw_bytes).decode('utf-8')
+        return audio_codec.encode_payload(pcm_bytes)
 
     @staticmethod
     def calculate_audio_energy(pcm_bytes: bytes) -> float:
@@ -154,7 +149,7 @@ class TwilioService:
             Energy level (0.0 - 1.0)
         """
         try:
-            rms = audioop.rms(pcm_bytes, 2)  # 2 = 16-bit
+            rms = audio_codec.rms(pcm_bytes)
             # Normalize to 0-1 range (assuming max RMS ~5000 for speech)
             normalized = min(rms / 5000.0, 1.0)
             return normalized
@@ -162,7 +157,7 @@ class TwilioService:
             logger.debug(f"Error calculating audio energy: {e}")
             return 0.0
 
-    def get_call_details(self, call_sid: str) -> dict:
+    async def get_call_details(self, call_sid: str) -> dict:
         """
         Retrieve call details from Twilio
 
@@ -173,37 +168,38 @@ class TwilioService:
             Dict with call metadata
         """
         try:
-            call = self.client.calls(call_sid).fetch()
+            call = await self.rest.fetch_call(call_sid)
             return {
-                "sid": call.sid,
-                "from": call.from_,
-                "to": call.to,
-                "status": call.status,
-                "duration": call.duration,
-                "start_time": call.start_time,
-                "end_time": call.end_time,
+                "sid": call.get("sid"),
+                "from": call.get("from"),
+                "to": call.get("to"),
+                "status": call.get("status"),
+                "duration": call.get("duration"),
+                "start_time": call.get("start_time"),
+                "end_time": call.get("end_time"),
             }
         except Exception as e:
             logger.error(f"❌ Failed to fetch call details: {e}")
             return {}
 
-    def send_sms(self, to_number: str, message: str) -> None:
+    async def send_sms(self, to_number: str, message: str) -> Optional[str]:
         """
         Send SMS notification (e.g., scam alert to user)
 
         Args:
             to_number: Recipient phone number
             message: SMS body
+
+        Returns:
+            Message SID
         """
         try:
-            self.client.messages.create(
-                body=message,
-                from_=self.phone_number,
-                to=to_number
-            )
+            sent = await self.rest.create_message(to_number, self.phone_number, message)
             logger.info(f"✅ Sent SMS to {to_number}")
+            return sent.get("sid")
         except Exception as e:
             logger.error(f"❌ Failed to send SMS: {e}")
+            raise
 
 
 # Singleton instance
@@ -0,0 +1,268 @@
+"""
+Vector Index: on-disk, memory-mapped embedding index (NumPy only)
+Cosine top-k over unit-normalized float32 rows, exact or IVF-partitioned
+
+Files under the index directory (for name "scam_scripts"):
+- scam_scripts.f32          row-major float32 matrix, appended on add()
+- scam_scripts.meta.jsonl   one JSON metadata object per row
+- scam_scripts.manifest.json  {"dim", "count"}: rows past count are ignored
+- scam_scripts.ivf.npz      optional IVF partition (centroids + row lists)
+
+The manifest is rewritten last, so a crash mid-append leaves a shorter but
+consistent index. Rows are normalized on insert, making cosine similarity
+a single matrix product; the matrix is memory-mapped, so startup does not
+read the corpus and the OS page cache keeps hot pages resident.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (similarity, metadata) per result, best first
+SearchHit = Tuple[float, Dict[str, Any]]
+
+_KMEANS_ITERATIONS = 10
+_ASSIGN_CHUNK_ROWS = 8192
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Unit-normalize rows as float32 (zero rows stay zero)"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class VectorIndex:
+    """
+    Append-only cosine index
+
+    Usage:
+        index = VectorIndex("./data/vector_store", "scam_scripts")
+        index.load()
+        index.add(embeddings, [{"scam_type": "irs", "text": "..."}])
+        hits = index.search(query_embedding, top_k=5)[0]   # [(0.93, {...}), ...]
+
+    Searches are exact until build_ivf() is called; then each query only
+    scores the rows in its `probes` nearest partitions. Rows added after
+    the build are assigned to their nearest partition.
+    """
+
+    def __init__(self, directory: str, name: str = "index"):
+        self.directory = Path(directory)
+        self.name = name
+        self.dim = 0
+        self.count = 0
+        self.metadata: List[Dict[str, Any]] = []
+
+        self._matrix: Optional[np.ndarray] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments: Optional[np.ndarray] = None
+        self._list_rows: List[np.ndarray] = []  # Row ids per IVF list
+        self._lock = threading.Lock()
+
+    # ========================
+    # Files
+    # ========================
+
+    def _path(self, suffix: str) -> Path:
+        return self.directory / f"{self.name}{suffix}"
+
+    @property
+    def has_ivf(self) -> bool:
+        return self._centroids is not None
+
+    def load(self) -> "VectorIndex":
+        """Memory-map an existing index (no-op for a new one)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest_path = self._path(".manifest.json")
+        if not manifest_path.exists():
+            return self
+
+        manifest = json.loads(manifest_path.read_text())
+        self.dim, self.count = manifest["dim"], manifest["count"]
+
+        # Drop anything a crashed append wrote past the manifest
+        vectors_path = self._path(".f32")
+        if vectors_path.stat().st_size > self.count * self.dim * 4:
+            os.truncate(vectors_path, self.count * self.dim * 4)
+        with open(self._path(".meta.jsonl"), encoding="utf-8") as f:
+            self.metadata = [json.loads(f.readline()) for _ in range(self.count)]
+            trailing = f.readline()
+        if trailing:
+            self._write_metadata(self.metadata, mode="w")
+
+        self._remap()
+        self._load_ivf()
+        logger.info(f"✅ Vector index {self.name} loaded ({self.count} × {self.dim}, ivf={self.has_ivf})")
+        return self
+
+    def _remap(self) -> None:
+        if self.count == 0:
+            self._matrix = np.empty((0, self.dim), dtype=np.float32)
+            return
+        self._matrix = np.memmap(self._path(".f32"), dtype=np.float32, mode="r", shape=(self.count, self.dim))
+
+    def _write_metadata(self, rows: Sequence[Dict[str, Any]], mode: str) -> None:
+        with open(self._path(".meta.jsonl"), mode, encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, default=str) + "\n")
+
+    def _write_manifest(self) -> None:
+        tmp = self._path(".manifest.json.tmp")
+        tmp.write_text(json.dumps({"dim": self.dim, "count": self.count}))
+        os.replace(tmp, self._path(".manifest.json"))
+
+    # ========================
+    # Writes
+    # ========================
+
+    def add(self, vectors: np.ndarray, metadata: Sequence[Dict[str, Any]]) -> None:
+        """Append rows (normalized here) with one metadata dict each (blocking file I/O; run off the event loop)"""
+        vectors = normalize(vectors)
+        if len(vectors) != len(metadata):
+            raise ValueError(f"{len(vectors)} vectors but {len(metadata)} metadata rows")
+        if len(vectors) == 0:
+            return
+
+        with self._lock:
+            if self.dim == 0:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Vector index {self.name} has dim {self.dim}, got {vectors.shape[1]}")
+
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self._path(".f32"), "ab") as f:
+                f.write(vectors.tobytes())
+            self._write_metadata(metadata, mode="a")
+
+            self.count += len(vectors)
+            self.metadata.extend(metadata)
+            self._write_manifest()
+            self._remap()
+
+            if self.has_ivf:
+                self._set_ivf(self._centroids, np.concatenate([self._assignments, self._assign(vectors)]))
+                self._save_ivf()
+
+    # ========================
+    # Search
+    # ========================
+
+    def search(self, queries: np.ndarray, top_k: int = 5, probes: int = 8) -> List[List[SearchHit]]:
+        """
+        Cosine top-k for one or many queries
+
+        Args:
+            queries: (dim,) or (n_queries, dim) embeddings (normalized here)
+            probes: IVF partitions scanned per query (ignored for exact search)
+
+        Returns:
+            One best-first hit list per query
+        """
+        queries = normalize(queries)
+        matrix, list_rows, centroids = self._matrix, self._list_rows, self._centroids
+        if matrix is None or len(matrix) == 0:
+            return [[] for _ in range(len(queries))]
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"Vector index {self.name} has dim {self.dim}, got {queries.shape[1]}")
+
+        if centroids is None:
+            return [self._top_k(scores, None, top_k) for scores in queries @ matrix.T]
+
+        # IVF: score only rows in the nearest partitions
+        nearest = np.argsort(-(queries @ centroids.T), axis=1)[:, :probes]
+        results = []
+        for query, lists in zip(queries, nearest):
+            rows = np.concatenate([list_rows[i] for i in lists])
+            results.append(self._top_k(matrix[rows] @ query, rows, top_k))
+        return results
+
+    def _top_k(self, scores: np.ndarray, rows: Optional[np.ndarray], top_k: int) -> List[SearchHit]:
+        if len(scores) > top_k:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best])]
+        return [
+            (float(scores[i]), self.metadata[int(rows[i]) if rows is not None else int(i)])
+            for i in best
+        ]
+
+    # ========================
+    # IVF partition
+    # ========================
+
+    def build_ivf(self, n_lists: Optional[int] = None, seed: int = 0) -> None:
+        """
+        Partition rows with spherical k-means (CPU-heavy; run off the event loop)
+
+        n_lists defaults to sqrt(count), the usual IVF sizing.
+        """
+        matrix = self._matrix
+        if matrix is None or len(matrix) == 0:
+            return
+
+        n_lists = max(1, min(n_lists or int(np.sqrt(len(matrix))), len(matrix)))
+        rng = np.random.default_rng(seed)
+        centroids = np.array(matrix[rng.choice(len(matrix), n_lists, replace=False)])
+
+        for _ in range(_KMEANS_ITERATIONS):
+            assignments = self._assign(matrix, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, matrix)
+            filled = np.bincount(assignments, minlength=n_lists) > 0
+            centroids[filled] = normalize(sums[filled])  # Empty lists keep their centroid
+
+        with self._lock:
+            assignments = self._assign(matrix, centroids)
+            # Rows appended while k-means ran
+            if self.count > len(matrix):
+                assignments = np.concatenate([assignments, self._assign(self._matrix[len(matrix):], centroids)])
+            self._set_ivf(centroids, assignments)
+            self._save_ivf()
+
+        logger.info(f"✅ Vector index {self.name}: IVF built ({n_lists} lists over {self.count} rows)")
+
+    def _set_ivf(self, centroids: np.ndarray, assignments: np.ndarray) -> None:
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.cumsum(np.bincount(assignments, minlength=len(centroids)))[:-1]
+        self._list_rows = np.split(order, bounds)
+        self._centroids, self._assignments = centroids, assignments
+
+    def _assign(self, vectors: np.ndarray, centroids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Nearest centroid per row (chunked to bound the score matrix)"""
+        centroids = self._centroids if centroids is None else centroids
+        return np.concatenate([
+            np.argmax(np.asarray(vectors[start:start + _ASSIGN_CHUNK_ROWS]) @ centroids.T, axis=1)
+            for start in range(0, len(vectors), _ASSIGN_CHUNK_ROWS)
+        ]).astype(np.int32)
+
+    def _save_ivf(self) -> None:
+        tmp = self._path(".ivf.tmp.npz")
+        np.savez(tmp, centroids=self._centroids, assignments=self._assignments)
+        os.replace(tmp, self._path(".ivf.npz"))
+
+    def _load_ivf(self) -> None:
+        path = self._path(".ivf.npz")
+        if not path.exists():
+            return
+        with np.load(path) as ivf:
+            centroids, assignments = ivf["centroids"], ivf["assignments"]
+        if len(assignments) != self.count or centroids.shape[1] != self.dim:
+            logger.warning(f"⚠️ Vector index {self.name}: stale IVF partition ignored")
+            return
+        self._set_ivf(centroids, assignments)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "rows": self.count,
+            "dim": self.dim,
+            "ivf_lists": len(self._centroids) if self.has_ivf else 0
+        }
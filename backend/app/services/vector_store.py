@@ -1,46 +1,99 @@
 """
-Vector Store Service: Scam detection using Vertex AI Vector Search
-Stores embeddings of known scam scripts for similarity matching
+Vector Store Service: Scam detection by similarity to known scam scripts
+Embeddings of known scam scripts live in a local memory-mapped index
+(app/services/vector_index.py) under settings.VECTOR_DB_PATH
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Optional
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from app.core.config import settings
+from app.services.vector_index import VectorIndex
 
 logger = logging.getLogger(__name__)
 
 
+# Known scam scripts embedded into an empty index on first startup
+SEED_SCAM_SCRIPTS = [
+    ("irs", "This is the IRS calling about your unpaid taxes. There is a warrant for your arrest unless you pay today with gift cards."),
+    ("irs", "You owe back taxes and legal action will be taken within 24 hours. Press one to speak to an officer."),
+    ("tech_support", "This is Microsoft support. We detected a virus on your computer. Please give us remote access to fix it."),
+    ("tech_support", "Your Apple account has been suspended due to suspicious activity. We need to verify your password."),
+    ("social_security", "Your social security number has been suspended due to fraudulent activity. Confirm your SSN to reactivate it."),
+    ("grandparent", "Grandma, it's me. I'm in trouble and got arrested. I need bail money right away, please don't tell mom and dad."),
+    ("lottery", "Congratulations, you won the lottery! To claim your prize you just need to pay the processing fee by wire transfer."),
+    ("bank", "This is your bank's fraud department. Your account is locked. Read me the code we just texted you to unlock it."),
+    ("utility", "Your electricity will be disconnected in one hour unless you pay the overdue balance now with a prepaid card."),
+    ("crypto", "I'm calling about an exclusive bitcoin investment with guaranteed returns. Send cryptocurrency today to secure your spot."),
+]
+
+
 class VectorStoreService:
     """
     Manages vector embeddings for scam detection
 
-    Uses Vertex AI Vector Search to find similar scam scripts
-
     Flow:
-    1. Seed database with known scam transcripts
+    1. Seed the index with known scam transcripts (first startup)
     2. Generate embeddings using Gemini
-    3. Store in Vertex AI Vector Search
-    4. Query with incoming call transcripts
+    3. Store them in the local index (normalized, memory-mapped)
+    4. Query with incoming call transcripts (cosine top-k, sub-millisecond)
     5. Return similarity scores
+
+    Only embedding the query goes over the network; the search is local.
     """
 
     def __init__(self):
-        self.index_endpoint = None  # settings.VECTOR_SEARCH_INDEX_ENDPOINT if it exists
+        self.index = VectorIndex(settings.VECTOR_DB_PATH, settings.VECTOR_DB_COLLECTION)
         self.threshold = getattr(settings, 'SCAM_SIMILARITY_THRESHOLD', 0.85)
         self.gemini_service = None  # Lazy load
+        self._loaded = False
+
+        self.searches = 0
+        self.search_ms_total = 0.0
 
     async def init(self) -> None:
         """Initialize vector store (called on app startup)"""
         try:
-            # TODO: Connect to Vertex AI Vector Search
-            # For MVP, we'll use simple in-memory storage
+            await asyncio.to_thread(self._ensure_loaded)
+
+            if self.index.count == 0:
+                await self._seed()
 
-            logger.info("✅ Vector store initialized (in-memory mode)")
+            if self.index.count >= settings.VECTOR_INDEX_IVF_MIN_ROWS and not self.index.has_ivf:
+                await asyncio.to_thread(self.index.build_ivf, settings.VECTOR_INDEX_IVF_LISTS or None)
+
+            logger.info(f"✅ Vector store initialized ({self.index.count} scam scripts)")
 
         except Exception as e:
             logger.error(f"❌ Failed to initialize vector store: {e}")
 
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.index.load()
+            self._loaded = True
+
+    async def _seed(self) -> None:
+        """Embed SEED_SCAM_SCRIPTS into an empty index (skipped without embeddings)"""
+        added = await self.add_scam_scripts(SEED_SCAM_SCRIPTS, source="seed")
+        if not added:
+            logger.warning("⚠️ Vector store empty: embeddings unavailable, seeding skipped")
+            return
+        logger.info(f"🌱 Seeded vector store with {added} scam scripts")
+
+    def _gemini(self):
+        if not self.gemini_service:
+            from app.services.gemini_service import get_gemini_service
+            self.gemini_service = get_gemini_service()
+        return self.gemini_service
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        embedding = await self._gemini().generate_embeddings(text)
+        return np.asarray(embedding, dtype=np.float32) if embedding else None
+
     async def query_similar_scams(
         self,
         transcript: str,
@@ -63,11 +116,43 @@ class VectorStoreService:
                 }
             ]
         """
-        # TODO: Implement vector search
-        # For MVP, return empty list
+        await asyncio.to_thread(self._ensure_loaded)
+        if self.index.count == 0 or not transcript.strip():
+            return []
 
-        logger.debug("[VectorStore] Query similar scams (not implemented)")
-        return []
+        embedding = await self._embed(transcript)
+        if embedding is None:
+            return []
+
+        return self.search(embedding, top_k)
+
+    def search(self, embedding: np.ndarray, top_k: int = 5) -> List[Dict]:
+        """Local top-k over the index for an already-embedded query"""
+        self._ensure_loaded()
+        start = time.perf_counter()
+        try:
+            hits = self.index.search(embedding, top_k=top_k, probes=settings.VECTOR_INDEX_IVF_PROBES)[0]
+        except ValueError as e:
+            # e.g. GEMINI_EMBEDDING_MODEL changed without rebuilding the index
+            logger.error(f"❌ Vector search failed: {e}")
+            return []
+        self.searches += 1
+        self.search_ms_total += (time.perf_counter() - start) * 1000
+
+        return [
+            {
+                "scam_type": meta.get("scam_type"),
+                "similarity": round(score, 4),
+                "script_sample": meta.get("text", "")[:200],
+                "report_count": meta.get("report_count", 1)
+            }
+            for score, meta in hits
+        ]
+
+    async def max_similarity(self, transcript: str) -> float:
+        """Similarity (0.0-1.0) of the closest known scam script"""
+        matches = await self.query_similar_scams(transcript, top_k=1)
+        return max(0.0, matches[0]["similarity"]) if matches else 0.0
 
     async def add_scam_script(
         self,
@@ -81,8 +166,43 @@ class VectorStoreService:
             scam_type: Type of scam (irs, tech_support, etc.)
             transcript: Scam script text
         """
-        # TODO: Generate embedding and store
-        logger.debug(f"[VectorStore] Add scam script: {scam_type}")
+        if not await self.add_scam_scripts([(scam_type, transcript)]):
+            logger.warning(f"⚠️ Scam script not indexed (no embedding): {scam_type}")
+            return
+        logger.debug(f"[VectorStore] Added scam script: {scam_type}")
+
+    async def add_scam_scripts(self, scripts: Sequence[Tuple[str, str]], source: str = "report") -> int:
+        """
+        Bulk ingest (scam_type, transcript) pairs with batched embedding calls
+
+        Returns:
+            Number of scripts indexed (scripts whose embedding failed are skipped)
+        """
+        await asyncio.to_thread(self._ensure_loaded)
+        embeddings = await self._gemini().embed_many([text for _, text in scripts])
+        rows = [
+            (embedding, {"scam_type": scam_type, "text": text, "source": source})
+            for (scam_type, text), embedding in zip(scripts, embeddings)
+            if embedding
+        ]
+        if not rows:
+            return 0
+
+        # File appends, manifest rewrite and IVF assignment/save: off the event loop
+        await asyncio.to_thread(
+            self.index.add,
+            np.asarray([embedding for embedding, _ in rows], dtype=np.float32),
+            [meta for _, meta in rows]
+        )
+        return len(rows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Index size and local search latency for the /metrics endpoint"""
+        return {
+            **self.index.get_stats(),
+            "searches": self.searches,
+            "avg_search_ms": round(self.search_ms_total / self.searches, 4) if self.searches else 0.0
+        }
 
 
 # Singleton instance
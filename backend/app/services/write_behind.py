@@ -0,0 +1,448 @@
+"""
+Write-Behind Queue: batched persistence for in-call writes
+Call updates, transcripts and scam reports are merged per call_sid in memory
+and flushed to the database in a few batched round-trips
+
+- Repeated writes to one call merge: last writer wins per column and for the
+  transcript; scam reports accumulate
+- A flush runs every WRITE_BEHIND_FLUSH_INTERVAL_MS, or as soon as
+  WRITE_BEHIND_MAX_BATCH calls are pending
+- Every pending write is mirrored to a local SQLite spool and replayed on
+  start(), so a crash or restart between enqueue and flush loses nothing
+- A failing batch is bisected so one bad call can't hold back the rest; a
+  call that keeps failing is moved to the spool's dead_writes table after
+  WRITE_BEHIND_MAX_ATTEMPTS flushes
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.sqlite import open_sqlite
+from app.services.database import DatabaseService, db_service
+
+logger = logging.getLogger(__name__)
+
+
+class PendingWrites:
+    """Everything not yet flushed for one call"""
+
+    __slots__ = ("call", "transcript", "scam_reports", "version", "attempts")
+
+    def __init__(self, version: int = 0):
+        self.call: Dict[str, Any] = {}
+        self.transcript: Optional[str] = None
+        self.scam_reports: List[Dict[str, Any]] = []
+        self.version = version
+        self.attempts = 0
+
+    def merge(self, newer: "PendingWrites") -> "PendingWrites":
+        """Fold newer writes on top of these (newer wins)"""
+        self.call.update(newer.call)
+        if newer.transcript is not None:
+            self.transcript = newer.transcript
+        self.scam_reports.extend(newer.scam_reports)
+        self.version = max(self.version, newer.version)
+        return self
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "call": self.call,
+            "transcript": self.transcript,
+            "scam_reports": self.scam_reports,
+            "attempts": self.attempts
+        }, default=str)
+
+    @classmethod
+    def from_json(cls, payload: str, version: int) -> "PendingWrites":
+        data = json.loads(payload)
+        pending = cls(version)
+        pending.call = data.get("call") or {}
+        pending.transcript = data.get("transcript")
+        pending.scam_reports = data.get("scam_reports") or []
+        pending.attempts = data.get("attempts", 0)
+        return pending
+
+
+class WriteBehindQueue:
+    """
+    In-process write-behind buffer in front of DatabaseService
+
+    Usage:
+        await write_behind.update_call(call_sid, intent="scam", action_taken="blocked")
+        await write_behind.save_transcript(call_sid, transcript)
+        await write_behind.create_scam_report(call_sid, scam_type="scam", confidence=0.9, pattern_matched="...")
+
+    start()/close() are called from main.lifespan; close() flushes. Until
+    start() (scripts, tests) or with WRITE_BEHIND_ENABLED off, writes go
+    straight to the database like before.
+
+    Spool writes are local SQLite commits (see app.core.sqlite) made
+    on the event loop: tens of microseconds, versus a network round-trip
+    per write without the queue.
+    """
+
+    def __init__(
+        self,
+        database: Optional[DatabaseService] = None,
+        spool_path: Optional[str] = None,
+        flush_interval_ms: Optional[int] = None,
+        max_batch: Optional[int] = None
+    ):
+        self.database = database or db_service
+        self.spool_path = spool_path or settings.WRITE_BEHIND_SPOOL_PATH
+        self.flush_interval = (flush_interval_ms or settings.WRITE_BEHIND_FLUSH_INTERVAL_MS) / 1000
+        self.max_batch = max_batch or settings.WRITE_BEHIND_MAX_BATCH
+
+        self._pending: Dict[str, PendingWrites] = {}
+        self._version = 0
+        self._spool: Optional[sqlite3.Connection] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+        # Stats
+        self.enqueued = 0
+        self.merged = 0
+        self.flushes = 0
+        self.flushed_calls = 0
+        self.failed_flushes = 0
+        self.dropped_calls = 0
+        self.dead_lettered_calls = 0
+        self.replayed_calls = 0
+        self.last_flush_ms = 0.0
+
+    # ========================
+    # Lifecycle
+    # ========================
+
+    @property
+    def running(self) -> bool:
+        return self._flusher is not None and not self._flusher.done()
+
+    async def start(self) -> None:
+        """Open the spool, replay anything left by the previous run and start flushing"""
+        if self.running or not settings.WRITE_BEHIND_ENABLED:
+            return
+
+        self._open_spool()
+        self._replay_spool()
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flusher = asyncio.create_task(self._run())
+
+        if self._pending:
+            self._wake.set()
+        logger.info(f"✅ Write-behind queue started (every {self.flush_interval * 1000:.0f}ms or {self.max_batch} calls)")
+
+    async def close(self, flush: bool = True) -> None:
+        """
+        Stop flushing; with flush=False pending writes stay in the spool
+        and are replayed by the next start()
+        """
+        if self._flusher is not None:
+            # Let an in-progress flush finish: its batch is already out of _pending
+            async with self._flush_lock:
+                self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+
+        if flush and self._flush_lock is not None:
+            await self.flush()
+
+        self._pending.clear()
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+            logger.info("🔌 Write-behind queue closed")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    # ========================
+    # Writes
+    # ========================
+
+    async def update_call(self, call_sid: str, **fields) -> None:
+        """Queue column updates for a call (same columns as DatabaseService.update_call)"""
+        if not self.running:
+            await self.database.update_call(call_sid, updates=dict(fields))
+            return
+
+        pending = PendingWrites()
+        pending.call = dict(fields)
+        self._enqueue(call_sid, pending)
+
+    async def save_transcript(self, call_sid: str, transcript: str) -> None:
+        """Queue the latest full transcript (replaces any queued one)"""
+        if not self.running:
+            await self.database.save_transcript(call_sid, transcript)
+            return
+
+        pending = PendingWrites()
+        pending.transcript = transcript
+        self._enqueue(call_sid, pending)
+
+    async def create_scam_report(
+        self,
+        call_sid: str,
+        scam_type: str,
+        confidence: float,
+        pattern_matched: str
+    ) -> None:
+        """Queue a scam report (reports are never merged)"""
+        if not self.running:
+            await self.database.create_scam_report(call_sid, scam_type, confidence, pattern_matched)
+            return
+
+        pending = PendingWrites()
+        pending.scam_reports.append({
+            "call_sid": call_sid,
+            "report_key": uuid.uuid4().hex,  # Spooled with the report: retried flushes upsert, never duplicate
+            "scam_type": scam_type,
+            "confidence": confidence,
+            "pattern_matched": pattern_matched
+        })
+        self._enqueue(call_sid, pending)
+
+    def _enqueue(self, call_sid: str, newer: PendingWrites) -> None:
+        self._version += 1
+        newer.version = self._version
+        self.enqueued += 1
+
+        current = self._pending.get(call_sid)
+        if current is None:
+            self._pending[call_sid] = current = newer
+        else:
+            current.merge(newer)
+            self.merged += 1
+
+        self._spool_put(call_sid, current)
+
+        if len(self._pending) >= self.max_batch:
+            self._wake.set()
+
+    # ========================
+    # Flushing
+    # ========================
+
+    async def flush(self) -> int:
+        """
+        Write everything pending in one batch
+
+        Returns:
+            Number of calls written
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending = self._pending, {}
+            start = time.perf_counter()
+
+            missing, failed = await self._apply(batch)
+            for call_sid, error in failed.items():
+                pending = batch.pop(call_sid)
+                pending.attempts += 1
+                if pending.attempts >= settings.WRITE_BEHIND_MAX_ATTEMPTS:
+                    self._dead_letter(call_sid, pending, error)
+                else:
+                    # Back under anything queued meanwhile; retried next flush
+                    self._requeue(call_sid, pending)
+            if failed:
+                self.failed_flushes += 1
+                logger.error(f"❌ Write-behind flush failed for {len(failed)} calls: {next(iter(failed.values()))}")
+            else:
+                self.flushes += 1
+            self.last_flush_ms = (time.perf_counter() - start) * 1000
+
+            # Writes for calls whose row isn't inserted yet wait for a later flush
+            for call_sid in missing:
+                pending = batch.pop(call_sid)
+                pending.attempts += 1
+                if pending.attempts >= settings.WRITE_BEHIND_MAX_ATTEMPTS:
+                    self.dropped_calls += 1
+                    self._spool_delete(call_sid, pending.version)
+                    logger.warning(f"⚠️ Dropping queued writes for unknown call {call_sid}")
+                else:
+                    self._requeue(call_sid, pending)
+
+            for call_sid, pending in batch.items():
+                self._spool_delete(call_sid, pending.version)
+
+            self.flushed_calls += len(batch)
+            return len(batch)
+
+    async def _apply(self, batch: Dict[str, PendingWrites]) -> Tuple[Set[str], Dict[str, str]]:
+        """
+        Write a batch, bisecting it when it fails to isolate the bad calls
+
+        Returns:
+            (call_sids without a call row yet, failed call_sid → error)
+        """
+        try:
+            return await self._write(batch), {}
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        if len(batch) == 1:
+            return set(), dict.fromkeys(batch, error)
+        return await self._bisect(batch, error)
+
+    async def _bisect(self, batch: Dict[str, PendingWrites], error: str) -> Tuple[Set[str], Dict[str, str]]:
+        """
+        Retry a failed batch as two halves, recursing into a failing half
+
+        When both halves fail the database itself is the likely problem:
+        the whole batch counts as failed without splitting further (a few
+        round-trips per flush during an outage, not one per call).
+        """
+        items = list(batch.items())
+        middle = len(items) // 2
+        missing: Set[str] = set()
+        failed_halves = []
+        for half in (dict(items[:middle]), dict(items[middle:])):
+            try:
+                missing |= await self._write(half)
+            except Exception as e:
+                failed_halves.append((half, f"{type(e).__name__}: {e}"))
+
+        if len(failed_halves) == 2:
+            return missing, dict.fromkeys(batch, error)
+
+        failed: Dict[str, str] = {}
+        for half, half_error in failed_halves:
+            if len(half) == 1:
+                failed.update(dict.fromkeys(half, half_error))
+            else:
+                half_missing, half_failed = await self._bisect(half, half_error)
+                missing |= half_missing
+                failed.update(half_failed)
+        return missing, failed
+
+    async def _write(self, batch: Dict[str, PendingWrites]) -> Set[str]:
+        return set(await self.database.apply_call_writes(
+            calls={sid: pending.call for sid, pending in batch.items() if pending.call},
+            transcripts={sid: pending.transcript for sid, pending in batch.items() if pending.transcript is not None},
+            scam_reports=[report for pending in batch.values() for report in pending.scam_reports]
+        ))
+
+    def _requeue(self, call_sid: str, older: PendingWrites) -> None:
+        newer = self._pending.get(call_sid)
+        self._pending[call_sid] = older.merge(newer) if newer is not None else older
+        self._spool_put(call_sid, self._pending[call_sid])
+
+    # ========================
+    # Spool (durability)
+    # ========================
+
+    def _open_spool(self) -> None:
+        if self._spool is not None:
+            return
+
+        self._spool = open_sqlite(self.spool_path)
+        self._spool.execute(
+            "CREATE TABLE IF NOT EXISTS pending_writes ("
+            " call_sid TEXT PRIMARY KEY,"
+            " version INTEGER NOT NULL,"
+            " payload TEXT NOT NULL)"
+        )
+        self._spool.execute(
+            "CREATE TABLE IF NOT EXISTS dead_writes ("
+            " call_sid TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " error TEXT NOT NULL,"
+            " failed_at REAL NOT NULL)"
+        )
+        self._spool.commit()
+
+    def _replay_spool(self) -> None:
+        rows = self._spool.execute("SELECT call_sid, payload FROM pending_writes").fetchall()
+        for call_sid, payload in rows:
+            self._version += 1
+            pending = PendingWrites.from_json(payload, self._version)
+            self._pending[call_sid] = pending
+            # Renumber so deletes after the next flush match
+            self._spool_put(call_sid, pending)
+
+        if rows:
+            self.replayed_calls += len(rows)
+            logger.info(f"♻️ Replaying {len(rows)} spooled call writes")
+
+    def _spool_put(self, call_sid: str, pending: PendingWrites) -> None:
+        if self._spool is None:
+            return
+        self._spool.execute(
+            "INSERT OR REPLACE INTO pending_writes (call_sid, version, payload) VALUES (?, ?, ?)",
+            (call_sid, pending.version, pending.to_json())
+        )
+        self._spool.commit()
+
+    def _spool_delete(self, call_sid: str, version: int) -> None:
+        """Forget a flushed entry unless the call was written again since"""
+        if self._spool is None:
+            return
+        self._spool.execute(
+            "DELETE FROM pending_writes WHERE call_sid = ? AND version = ?",
+            (call_sid, version)
+        )
+        self._spool.commit()
+
+    def _dead_letter(self, call_sid: str, pending: PendingWrites, error: str) -> None:
+        """Give up on a call that keeps failing (kept in the spool for inspection/manual replay)"""
+        self.dead_lettered_calls += 1
+        if self._spool is not None:
+            self._spool.execute(
+                "INSERT INTO dead_writes (call_sid, payload, error, failed_at) VALUES (?, ?, ?, ?)",
+                (call_sid, pending.to_json(), error, time.time())
+            )
+            self._spool.commit()
+        self._spool_delete(call_sid, pending.version)
+        logger.error(f"❌ Dead-lettered queued writes for {call_sid} after {pending.attempts} attempts: {error}")
+
+    # ========================
+    # Metrics
+    # ========================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue counters for the /metrics endpoint"""
+        return {
+            "running": self.running,
+            "pending_calls": len(self._pending),
+            "enqueued": self.enqueued,
+            "merged": self.merged,
+            "flushes": self.flushes,
+            "flushed_calls": self.flushed_calls,
+            "failed_flushes": self.failed_flushes,
+            "dropped_calls": self.dropped_calls,
+            "dead_lettered_calls": self.dead_lettered_calls,
+            "replayed_calls": self.replayed_calls,
+            "last_flush_ms": round(self.last_flush_ms, 2)
+        }
+
+
+# Singleton instance
+write_behind = WriteBehindQueue()
+
+
+async def init_write_behind() -> None:
+    """Start the write-behind queue (called on app startup, after the database)"""
+    await write_behind.start()
+
+
+async def close_write_behind() -> None:
+    """Flush and stop the write-behind queue (called on app shutdown, before the database)"""
+    await write_behind.close()
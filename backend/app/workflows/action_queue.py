@@ -0,0 +1,430 @@
+"""
+Action Queue: durable, retrying execution of workflow actions off the call path
+SQLite-backed job table + dead-letter table (local stand-in for a broker)
+
+- The call path only enqueues; a dispatcher runs jobs in the background
+- Jobs are keyed by (call_sid, workflow, action id or position): enqueueing
+  the same action for the same call twice is a no-op
+- Each action type has its own concurrency limit, so a slow Calendar or
+  MCP backend can't starve SMS/email
+- Failures retry with exponential backoff + jitter, up to
+  ACTION_QUEUE_MAX_ATTEMPTS, then move to dead_letters. Ambiguous failures
+  of actions that must not repeat (an SMS that may have been sent: the
+  executor returns retryable=False, or a notification timed out) are
+  dead-lettered at once
+- Jobs left running by a crash are picked up again on start()
+- Finished jobs are pruned after ACTION_QUEUE_DONE_RETENTION_HOURS (on
+  start() and hourly from the dispatcher)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import sqlite3
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.core.sqlite import open_sqlite
+from app.workflows.engine import (
+    NON_IDEMPOTENT_ACTIONS, ActionType, CallContext, WorkflowAction, WorkflowEngine, workflow_engine
+)
+
+logger = logging.getLogger(__name__)
+
+_CLAIM_BATCH = 100
+_PRUNE_INTERVAL_SECONDS = 3600
+
+
+class ActionQueue:
+    """
+    Durable job queue for ActionExecutor work
+
+    Usage:
+        await action_queue.start()                       # main.lifespan
+        await action_queue.enqueue(action, context)      → job key, or None if already queued
+        await action_queue.close()
+
+    SQLite calls are local commits (see app.core.sqlite) made on the
+    event loop, like the write-behind spool.
+    """
+
+    def __init__(self, engine: Optional[WorkflowEngine] = None, path: Optional[str] = None):
+        self.engine = engine or workflow_engine
+        self.path = path or settings.ACTION_QUEUE_PATH
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._running_by_type: Dict[str, int] = {}
+        self._last_prune = 0.0
+
+        # Stats
+        self.enqueued = 0
+        self.duplicates = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.recovered = 0
+
+    @staticmethod
+    def job_key(
+        context: CallContext,
+        action: WorkflowAction,
+        workflow_id: Optional[str] = None,
+        index: Optional[int] = None
+    ) -> str:
+        """
+        Idempotency key: one job per action per call
+
+        Actions without an id are told apart by their position in the
+        workflow, or (enqueued outside a workflow) by a hash of their params,
+        so two same-type actions never share a key.
+        """
+        scope = f"{context.call_sid}:{workflow_id}" if workflow_id else context.call_sid
+        if action.id:
+            name = action.id
+        elif index is not None:
+            name = f"{action.type.value}#{index}"
+        else:
+            params = json.dumps(action.params, sort_keys=True, default=str)
+            name = f"{action.type.value}:{hashlib.sha1(params.encode()).hexdigest()[:12]}"
+        return f"{scope}:{name}"
+
+    # ========================
+    # Lifecycle
+    # ========================
+
+    @property
+    def running(self) -> bool:
+        return self._dispatcher is not None and not self._dispatcher.done()
+
+    async def start(self) -> None:
+        """Open the job table, recover interrupted jobs and start dispatching"""
+        if self.running:
+            return
+
+        self._open()
+        self._recover()
+        self._wake = asyncio.Event()
+        self._dispatcher = asyncio.create_task(self._run())
+        self._wake.set()
+        logger.info(f"✅ Action queue started ({self.path})")
+
+    async def close(self) -> None:
+        """Stop dispatching; jobs still running are retried by the next start()"""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            logger.info("🔌 Action queue closed")
+
+    def _open(self) -> None:
+        if self._db is not None:
+            return
+
+        self._db = open_sqlite(self.path)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS action_jobs ("
+            " job_key TEXT PRIMARY KEY,"
+            " action_type TEXT NOT NULL,"
+            " action TEXT NOT NULL,"
+            " context TEXT NOT NULL,"
+            " status TEXT NOT NULL,"  # pending, running, done, dead
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_run_at REAL NOT NULL,"
+            " last_error TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS action_jobs_due ON action_jobs (status, next_run_at);"
+            "CREATE TABLE IF NOT EXISTS dead_letters ("
+            " job_key TEXT PRIMARY KEY,"
+            " action_type TEXT NOT NULL,"
+            " action TEXT NOT NULL,"
+            " context TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL,"
+            " last_error TEXT,"
+            " failed_at REAL NOT NULL);"
+        )
+        self._db.commit()
+
+    def _recover(self) -> None:
+        now = time.time()
+        recovered = self._db.execute(
+            "UPDATE action_jobs SET status = 'pending', next_run_at = ?, updated_at = ? WHERE status = 'running'",
+            (now, now)
+        ).rowcount
+        self._db.commit()
+        self._prune()
+
+        if recovered:
+            self.recovered += recovered
+            logger.info(f"♻️ Re-queued {recovered} interrupted action jobs")
+
+    def _prune(self) -> None:
+        """Forget finished jobs past the idempotency window (dead_letters are kept)"""
+        now = time.time()
+        self._last_prune = now
+        pruned = self._db.execute(
+            "DELETE FROM action_jobs WHERE status IN ('done', 'dead') AND updated_at < ?",
+            (now - settings.ACTION_QUEUE_DONE_RETENTION_HOURS * 3600,)
+        ).rowcount
+        self._db.commit()
+        if pruned:
+            logger.info(f"🧹 Pruned {pruned} finished action jobs")
+
+    # ========================
+    # Enqueue
+    # ========================
+
+    async def enqueue(
+        self,
+        action: WorkflowAction,
+        context: CallContext,
+        workflow_id: Optional[str] = None,
+        index: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Queue an action for a call
+
+        Args:
+            workflow_id / index: the workflow the action belongs to and its
+                position in it (see job_key)
+
+        Returns:
+            The job key, or None if this action was already queued for the call
+        """
+        if self._db is None:
+            raise RuntimeError("Action queue not started")
+
+        key = self.job_key(context, action, workflow_id, index)
+        now = time.time()
+        payload = {
+            "type": action.type.value,
+            "params": action.params,
+            "id": action.id,
+            "timeout": action.timeout
+        }
+        inserted = self._db.execute(
+            "INSERT OR IGNORE INTO action_jobs"
+            " (job_key, action_type, action, context, status, next_run_at, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, 'pending', ?, ?, ?)",
+            (key, action.type.value, json.dumps(payload, default=str),
+             json.dumps(asdict(context), default=str), now, now, now)
+        ).rowcount
+        self._db.commit()
+
+        if not inserted:
+            self.duplicates += 1
+            logger.debug(f"Action job {key} already queued")
+            return None
+
+        self.enqueued += 1
+        self._wake.set()
+        return key
+
+    # ========================
+    # Dispatch
+    # ========================
+
+    def _limit(self, action_type: str) -> int:
+        return settings.ACTION_QUEUE_TYPE_CONCURRENCY.get(action_type, settings.ACTION_QUEUE_CONCURRENCY)
+
+    async def _run(self) -> None:
+        while True:
+            if time.time() - self._last_prune >= _PRUNE_INTERVAL_SECONDS:
+                self._prune()
+            delay = self._dispatch_due()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def _dispatch_due(self) -> float:
+        """Start every due job its type has room for; returns seconds until the next check"""
+        now = time.time()
+        rows = self._db.execute(
+            "SELECT * FROM action_jobs WHERE status = 'pending' AND next_run_at <= ?"
+            " ORDER BY next_run_at LIMIT ?",
+            (now, _CLAIM_BATCH)
+        ).fetchall()
+
+        claimed, saturated = [], False
+        for row in rows:
+            action_type = row["action_type"]
+            if self._running_by_type.get(action_type, 0) >= self._limit(action_type):
+                saturated = True
+                continue
+            self._running_by_type[action_type] = self._running_by_type.get(action_type, 0) + 1
+            claimed.append(row)
+
+        if claimed:
+            self._db.executemany(
+                "UPDATE action_jobs SET status = 'running', updated_at = ? WHERE job_key = ?",
+                [(now, row["job_key"]) for row in claimed]
+            )
+            self._db.commit()
+            for row in claimed:
+                task = asyncio.create_task(self._execute(row))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+        next_due = self._db.execute(
+            "SELECT MIN(next_run_at) FROM action_jobs WHERE status = 'pending'"
+        ).fetchone()[0]
+        if next_due is None or saturated:
+            # A finishing job wakes the dispatcher to fill the freed slot
+            return settings.ACTION_QUEUE_POLL_SECONDS
+        return min(settings.ACTION_QUEUE_POLL_SECONDS, max(0.0, next_due - now))
+
+    async def _execute(self, row: sqlite3.Row) -> None:
+        key, action_type = row["job_key"], row["action_type"]
+        attempts = row["attempts"] + 1
+        timeout = settings.WORKFLOW_ACTION_TIMEOUT_SECONDS
+        error = None
+        retryable = True
+
+        try:
+            payload = json.loads(row["action"])
+            action = WorkflowAction(
+                type=ActionType(payload["type"]),
+                params=payload.get("params") or {},
+                id=payload.get("id"),
+                timeout=payload.get("timeout")
+            )
+            context = CallContext(**json.loads(row["context"]))
+            timeout = action.timeout or timeout
+
+            result = await asyncio.wait_for(self.engine._execute_action(action, context), timeout=timeout)
+            if not result.get("success", False):
+                error = result.get("message") or "Action reported failure"
+                retryable = result.get("retryable", True)
+
+        except asyncio.TimeoutError:
+            error = f"Timed out after {timeout}s"
+            retryable = ActionType(action_type) not in NON_IDEMPOTENT_ACTIONS
+        except asyncio.CancelledError:
+            # Shutdown: left 'running', re-queued by the next start()
+            raise
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        finally:
+            self._running_by_type[action_type] -= 1
+
+        if self._db is None:
+            return
+        if error is None:
+            self._finish(key, attempts)
+        elif not retryable or attempts >= settings.ACTION_QUEUE_MAX_ATTEMPTS:
+            self._dead_letter(row, attempts, error)
+        else:
+            self._retry(key, attempts, error)
+        self._wake.set()
+
+    def _finish(self, key: str, attempts: int) -> None:
+        self._db.execute(
+            "UPDATE action_jobs SET status = 'done', attempts = ?, last_error = NULL, updated_at = ? WHERE job_key = ?",
+            (attempts, time.time(), key)
+        )
+        self._db.commit()
+        self.succeeded += 1
+
+    def _retry(self, key: str, attempts: int, error: str) -> None:
+        delay = min(
+            settings.ACTION_QUEUE_BACKOFF_MAX_SECONDS,
+            settings.ACTION_QUEUE_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1)
+        )
+        delay *= random.uniform(0.5, 1.0)  # Jitter: retries of one outage don't land together
+        now = time.time()
+        self._db.execute(
+            "UPDATE action_jobs SET status = 'pending', attempts = ?, next_run_at = ?, last_error = ?, updated_at = ?"
+            " WHERE job_key = ?",
+            (attempts, now + delay, error, now, key)
+        )
+        self._db.commit()
+        self.retried += 1
+        logger.warning(f"⚠️ Action job {key} failed (attempt {attempts}), retrying in {delay:.1f}s: {error}")
+
+    def _dead_letter(self, row: sqlite3.Row, attempts: int, error: str) -> None:
+        # The job row stays (status 'dead') so the key can't be enqueued again
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO dead_letters (job_key, action_type, action, context, attempts, last_error, failed_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (row["job_key"], row["action_type"], row["action"], row["context"], attempts, error, now)
+        )
+        self._db.execute(
+            "UPDATE action_jobs SET status = 'dead', attempts = ?, last_error = ?, updated_at = ? WHERE job_key = ?",
+            (attempts, error, now, row["job_key"])
+        )
+        self._db.commit()
+        self.dead_lettered += 1
+        logger.error(f"❌ Action job {row['job_key']} dead-lettered after {attempts} attempts: {error}")
+
+    # ========================
+    # Inspection
+    # ========================
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent dead-lettered jobs"""
+        if self._db is None:
+            return []
+        rows = self._db.execute(
+            "SELECT * FROM dead_letters ORDER BY failed_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue counters for the /metrics endpoint"""
+        counts = {}
+        if self._db is not None:
+            counts = dict(self._db.execute(
+                "SELECT status, COUNT(*) FROM action_jobs GROUP BY status"
+            ).fetchall())
+        return {
+            "running": self.running,
+            "jobs": counts,
+            "in_flight_by_type": {t: n for t, n in self._running_by_type.items() if n},
+            "enqueued": self.enqueued,
+            "duplicates": self.duplicates,
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "recovered": self.recovered
+        }
+
+
+# Singleton instance
+action_queue = ActionQueue()
+
+
+async def init_action_queue() -> None:
+    """Start the action queue and route workflow side-effects through it (called on app startup)"""
+    if not settings.ACTION_QUEUE_ENABLED:
+        return
+    await action_queue.start()
+    action_queue.engine.action_queue = action_queue
+
+
+async def close_action_queue() -> None:
+    """Stop the action queue (called on app shutdown)"""
+    action_queue.engine.action_queue = None
+    await action_queue.close()
@@ -0,0 +1,106 @@
+"""
+Workflow Conditions: action conditions compiled once, evaluated per call
+A restricted expression language instead of eval() on raw strings
+
+Allowed: comparisons (==, !=, <, <=, >, >=, in, not in, is, is not),
+and/or/not, unary minus, literals (numbers, strings, True/False/None and
+tuples/lists of them) and the variables in CONDITION_VARIABLES.
+Anything else (calls, attribute access, subscripts, arithmetic,
+comprehensions, unknown names) is rejected when the workflow is loaded.
+
+    is_emergency or (intent == "doctor" and intent_confidence >= 0.8)
+    caller_name in ("Mom", "Dad")
+"""
+
+import ast
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Variable → description (values are built by condition_variables)
+CONDITION_VARIABLES = {
+    "intent": "Classified intent (friend, sales, scam, ...)",
+    "confidence": "Intent confidence (0.0-1.0)",
+    "intent_confidence": "Same as confidence",
+    "scam_score": "Scam score (0.0-1.0)",
+    "is_emergency": "Emergency detected",
+    "caller_name": "Matched contact name, or None",
+    "caller_number": "Caller phone number",
+    "if_missed": "An earlier ring action in this workflow did not reach the user",
+}
+
+_RING_ACTIONS = frozenset({"ring_user", "ring_user_immediately"})
+
+_ALLOWED_NODES = (
+    ast.Expression,
+    ast.BoolOp, ast.And, ast.Or,
+    ast.UnaryOp, ast.Not, ast.USub,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.In, ast.NotIn, ast.Is, ast.IsNot,
+    ast.Name, ast.Load,
+    ast.Constant, ast.Tuple, ast.List,
+)
+
+_NO_BUILTINS = {"__builtins__": {}}
+
+Condition = Callable[[Dict[str, Any]], bool]
+
+
+class InvalidConditionError(ValueError):
+    """A condition uses syntax or names outside the allowed language"""
+
+
+def compile_condition(expression: str) -> Condition:
+    """
+    Validate and compile a condition
+
+    Returns:
+        Callable taking the condition_variables() dict and returning a bool
+
+    Raises:
+        InvalidConditionError: the expression is not in the allowed language
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise InvalidConditionError(f"Invalid condition {expression!r}: {e.msg}") from None
+
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise InvalidConditionError(
+                f"Invalid condition {expression!r}: {type(node).__name__} is not allowed"
+            )
+        if isinstance(node, ast.Name) and node.id not in CONDITION_VARIABLES:
+            raise InvalidConditionError(
+                f"Invalid condition {expression!r}: unknown variable {node.id!r} "
+                f"(known: {', '.join(CONDITION_VARIABLES)})"
+            )
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, str, bool, type(None))):
+            raise InvalidConditionError(f"Invalid condition {expression!r}: unsupported literal {node.value!r}")
+
+    # Only names, literals and operators remain, so the compiled code can't
+    # reach builtins, attributes or anything outside the variables dict
+    code = compile(tree, "<condition>", "eval")
+
+    def condition(variables: Dict[str, Any]) -> bool:
+        return bool(eval(code, _NO_BUILTINS, variables))
+
+    condition.expression = expression
+    condition.variables = frozenset(node.id for node in ast.walk(tree) if isinstance(node, ast.Name))
+    return condition
+
+
+def condition_variables(context: Any, results: Optional[List[Dict]] = None) -> Dict[str, Any]:
+    """Variables for one evaluation (context: CallContext, results: actions run so far)"""
+    rings = [result for result in results or [] if result["action"] in _RING_ACTIONS]
+    return {
+        "intent": context.intent,
+        "confidence": context.intent_confidence,
+        "intent_confidence": context.intent_confidence,
+        "scam_score": context.scam_score,
+        "is_emergency": context.is_emergency,
+        "caller_name": context.caller_name,
+        "caller_number": context.caller_number,
+        "if_missed": bool(rings) and not any(result["success"] for result in rings),
+    }
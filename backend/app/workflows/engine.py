@@ -5,10 +5,14 @@ Routes calls to different workflows based on category (personal, business, emerg
 
 import logging
 import asyncio
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Any, Optional, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 
+from app.core.config import settings
+from app.services.phrase_matcher import PhraseMatcher
+from app.workflows.conditions import Condition, InvalidConditionError, compile_condition, condition_variables
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,6 +60,21 @@ class ActionType(str, Enum):
     AI_SUMMARIZE = "ai_summarize"
 
 
+# Actions that route the live call: they keep their declared order
+ROUTING_ACTIONS = frozenset({
+    ActionType.RING_USER, ActionType.RING_USER_IMMEDIATELY,
+    ActionType.TRANSFER_TO_VOICEMAIL, ActionType.HANGUP
+})
+RING_ACTIONS = frozenset({ActionType.RING_USER, ActionType.RING_USER_IMMEDIATELY})
+
+# Notifications: repeating one after an ambiguous failure (timeout) could send it twice
+NON_IDEMPOTENT_ACTIONS = frozenset({ActionType.SEND_SMS, ActionType.SEND_SMS_ALERT, ActionType.SEND_EMAIL})
+
+# Actions that must happen during the call; everything else may be queued
+# (unless another action depends on it, see WorkflowEngine._run_actions)
+INLINE_ACTIONS = ROUTING_ACTIONS | {ActionType.VOICE_ORB_ALERT}
+
+
 @dataclass
 class WorkflowTrigger:
     """Conditions that trigger a workflow"""
@@ -72,9 +91,18 @@ class WorkflowAction:
     """Single action in a workflow"""
     type: ActionType
     params: Dict[str, Any]
-    condition: Optional[str] = None  # Execute only if condition met
+    condition: Optional[str] = None  # Execute only if condition met (see app/workflows/conditions.py)
     on_success: Optional[str] = None  # Next action if successful
     on_failure: Optional[str] = None  # Next action if failed
+    id: Optional[str] = None  # Name for depends_on (defaults to the action type)
+    depends_on: List[str] = field(default_factory=list)  # Action ids/types that must finish first
+    timeout: Optional[float] = None  # Seconds (default WORKFLOW_ACTION_TIMEOUT_SECONDS)
+    compiled_condition: Optional[Condition] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Parsed and validated once; raises InvalidConditionError
+        if self.condition and self.compiled_condition is None:
+            self.compiled_condition = compile_condition(self.condition)
 
 
 @dataclass
@@ -87,6 +115,73 @@ class Workflow:
     actions: List[WorkflowAction]
     priority: int = 5  # 1-10 (10 = highest priority)
     enabled: bool = True
+    parallel: bool = True  # False: run actions one after another, in order
+    dependencies: List[Tuple[int, ...]] = field(default_factory=list, repr=False, compare=False)
+    has_dependents: FrozenSet[int] = field(default_factory=frozenset, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.dependencies = plan_dependencies(self)
+        self.has_dependents = frozenset(index for waits in self.dependencies for index in waits)
+
+
+def plan_dependencies(workflow: Workflow) -> List[Tuple[int, ...]]:
+    """
+    Indices of the actions each action waits for ("parallel unless ordered")
+
+    - depends_on: the named actions (by id, else by type; a type names
+      every action of that type)
+    - routing actions (ring, voicemail, hangup) keep their declared order
+    - a condition reading if_missed waits for earlier ring actions
+    - parallel=False: each action waits for the previous one
+
+    Raises:
+        ValueError: unknown depends_on name or a dependency cycle
+    """
+    actions = workflow.actions
+    names: Dict[str, List[int]] = {}
+    for index, action in enumerate(actions):
+        names.setdefault(action.id or action.type.value, []).append(index)
+
+    dependencies = []
+    last_routing = None
+    for index, action in enumerate(actions):
+        waits = set()
+        for name in action.depends_on:
+            if name not in names:
+                raise ValueError(f"Workflow {workflow.id}: action {index} depends on unknown action {name!r}")
+            waits.update(names[name])
+
+        if not workflow.parallel and index > 0:
+            waits.add(index - 1)
+        if action.type in ROUTING_ACTIONS:
+            if last_routing is not None:
+                waits.add(last_routing)
+            last_routing = index
+        if action.compiled_condition and "if_missed" in action.compiled_condition.variables:
+            waits.update(i for i in range(index) if actions[i].type in RING_ACTIONS)
+
+        waits.discard(index)
+        dependencies.append(tuple(sorted(waits)))
+
+    # Kahn's algorithm: every action must become runnable
+    remaining = [len(waits) for waits in dependencies]
+    ready = [index for index, count in enumerate(remaining) if count == 0]
+    dependents: Dict[int, List[int]] = {}
+    for index, waits in enumerate(dependencies):
+        for dependency in waits:
+            dependents.setdefault(dependency, []).append(index)
+    visited = 0
+    while ready:
+        index = ready.pop()
+        visited += 1
+        for dependent in dependents.get(index, ()):
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+    if visited != len(actions):
+        raise ValueError(f"Workflow {workflow.id}: action dependencies form a cycle")
+
+    return dependencies
 
 
 @dataclass
@@ -104,6 +199,74 @@ class CallContext:
     metadata: Dict[str, Any]
 
 
+class TriggerIndex:
+    """
+    Workflow triggers compiled for matching in one transcript pass
+
+    - intent → workflows triggered by it
+    - one PhraseMatcher over every workflow's trigger keywords
+    - contact name → workflows triggered by it
+    - emergency workflows
+
+    Scores are the same as scoring each workflow on its own: +10 intent
+    (at or above its confidence threshold), +2 per trigger keyword found,
+    +15 contact, +100 emergency. Built from the enabled workflows at
+    registration time; rebuild after changing a registered workflow.
+    """
+
+    def __init__(self, workflows: List[Workflow]):
+        self.workflows = [workflow for workflow in workflows if workflow.enabled]
+        self.by_intent: Dict[str, List[int]] = {}
+        self.by_contact: Dict[str, List[int]] = {}
+        self.emergency: List[int] = []
+
+        keywords: Dict[int, List[str]] = {}
+        for position, workflow in enumerate(self.workflows):
+            triggers = workflow.triggers
+            if triggers.intent:
+                self.by_intent.setdefault(triggers.intent, []).append(position)
+            for contact in triggers.contacts or []:
+                self.by_contact.setdefault(contact, []).append(position)
+            if triggers.keywords:
+                keywords[position] = triggers.keywords
+            if workflow.category == WorkflowCategory.EMERGENCY:
+                self.emergency.append(position)
+
+        self.keyword_matcher = PhraseMatcher(keywords)
+
+    def scores(self, context: CallContext) -> Dict[int, float]:
+        """Match score per workflow position (only workflows that scored)"""
+        scores: Dict[int, float] = {}
+
+        for position in self.by_intent.get(context.intent, ()):
+            if context.intent_confidence >= self.workflows[position].triggers.confidence_threshold:
+                scores[position] = scores.get(position, 0.0) + 10.0
+
+        # Each trigger keyword counts once, however often it occurs
+        found = {(match.category, match.order) for match in self.keyword_matcher.scan(context.transcript)}
+        for position, _ in found:
+            scores[position] = scores.get(position, 0.0) + 2.0
+
+        if context.caller_name:
+            for position in self.by_contact.get(context.caller_name, ()):
+                scores[position] = scores.get(position, 0.0) + 15.0  # High priority for known contacts
+
+        if context.is_emergency:
+            for position in self.emergency:
+                scores[position] = scores.get(position, 0.0) + 100.0  # Always prioritize emergency
+
+        return scores
+
+    def best_match(self, context: CallContext) -> Optional[Workflow]:
+        """Highest (score, priority) workflow; earliest registered wins ties"""
+        best = None
+        for position, score in sorted(self.scores(context).items()):
+            key = (score, self.workflows[position].priority)
+            if best is None or key > best[0]:
+                best = (key, self.workflows[position])
+        return best[1] if best else None
+
+
 class WorkflowEngine:
     """
     Executes workflows based on call category
@@ -111,24 +274,45 @@ class WorkflowEngine:
     Flow:
     1. Call comes in → ADK agents classify intent
     2. Match intent to workflow (based on triggers)
-    3. Execute actions sequentially or in parallel
+    3. Execute actions as a dependency DAG (parallel unless ordered)
     4. Log results, update Voice Orb
     """
 
     def __init__(self):
         self.workflows: Dict[str, Workflow] = {}
         self.action_executors = {}  # Lazy-loaded
+        self.action_queue = None  # ActionQueue, attached by init_action_queue
+        self.trigger_index = TriggerIndex([])
 
     def register_workflow(self, workflow: Workflow) -> None:
         """Register a new workflow"""
+        self._add_workflow(workflow)
+        self.rebuild_trigger_index()
+
+    def _add_workflow(self, workflow: Workflow) -> None:
         self.workflows[workflow.id] = workflow
         logger.info(f"✅ Registered workflow: {workflow.name} ({workflow.category})")
 
+    def rebuild_trigger_index(self) -> None:
+        """Recompile trigger matching (after registering or editing workflows)"""
+        self.trigger_index = TriggerIndex(list(self.workflows.values()))
+
     def load_workflows_from_config(self, config: Dict) -> None:
-        """Load workflows from JSON configuration"""
-        for wf_id, wf_data in config.get("workflows", {}).items():
-            workflow = self._parse_workflow_config(wf_id, wf_data)
-            self.register_workflow(workflow)
+        """
+        Load workflows from JSON configuration
+
+        Raises:
+            InvalidConditionError: an action condition is invalid
+            ValueError: unknown depends_on name or a dependency cycle
+            (nothing is registered in either case)
+        """
+        workflows = [
+            self._parse_workflow_config(wf_id, wf_data)
+            for wf_id, wf_data in config.get("workflows", {}).items()
+        ]
+        for workflow in workflows:
+            self._add_workflow(workflow)
+        self.rebuild_trigger_index()
 
     def _parse_workflow_config(self, wf_id: str, config: Dict) -> Workflow:
         """Parse JSON config into Workflow object"""
@@ -141,15 +325,21 @@ class WorkflowEngine:
             time_of_day=config["triggers"].get("time_of_day")
         )
 
-        # Parse actions
-        actions = [
-            WorkflowAction(
-                type=ActionType(action["type"]),
-                params=action.get("params", action.get("data", {})),
-                condition=action.get("condition")
-            )
-            for action in config.get("actions", [])
-        ]
+        # Parse actions (conditions are compiled here)
+        try:
+            actions = [
+                WorkflowAction(
+                    type=ActionType(action["type"]),
+                    params=action.get("params", action.get("data", {})),
+                    condition=action.get("condition"),
+                    id=action.get("id"),
+                    depends_on=self._as_list(action.get("depends_on")),
+                    timeout=action.get("timeout")
+                )
+                for action in config.get("actions", [])
+            ]
+        except InvalidConditionError as e:
+            raise InvalidConditionError(f"Workflow {wf_id}: {e}") from None
 
         return Workflow(
             id=wf_id,
@@ -158,9 +348,16 @@ class WorkflowEngine:
             triggers=triggers,
             actions=actions,
             priority=config.get("priority", 5),
-            enabled=config.get("enabled", True)
+            enabled=config.get("enabled", True),
+            parallel=config.get("parallel", True)
         )
 
+    @staticmethod
+    def _as_list(value: Any) -> List[str]:
+        if not value:
+            return []
+        return [value] if isinstance(value, str) else list(value)
+
     async def execute_for_call(self, context: CallContext) -> Dict[str, Any]:
         """
         Execute appropriate workflow for a call
@@ -198,31 +395,8 @@ class WorkflowEngine:
 
         logger.info(f"✅ Matched workflow: {workflow.name}")
 
-        # Execute actions
-        results = []
-        for action in workflow.actions:
-            # Check condition (if any)
-            if action.condition and not self._evaluate_condition(action.condition, context):
-                logger.debug(f"Skipping action {action.type} (condition not met)")
-                continue
-
-            # Execute action
-            try:
-                result = await self._execute_action(action, context)
-                results.append({
-                    "action": action.type.value,
-                    "success": result.get("success", False),
-                    "data": result
-                })
-                logger.info(f"  ✓ {action.type.value}: {result.get('message', 'OK')}")
-
-            except Exception as e:
-                logger.error(f"  ✗ {action.type.value} failed: {e}")
-                results.append({
-                    "action": action.type.value,
-                    "success": False,
-                    "error": str(e)
-                })
+        # Execute actions (independent ones concurrently)
+        results = await self._run_actions(workflow, context)
 
         execution_time = int((time.time() - start_time) * 1000)
 
@@ -230,73 +404,115 @@ class WorkflowEngine:
             "workflow_executed": workflow.id,
             "workflow_name": workflow.name,
             "category": workflow.category.value,
-            "actions_completed": [r["action"] for r in results if r["success"]],
+            "actions_completed": [r["action"] for r in results if r["success"] and not r.get("queued")],
+            "actions_queued": [r["action"] for r in results if r.get("queued")],
             "actions_failed": [r["action"] for r in results if not r["success"]],
             "final_action": self._determine_final_action(results),
             "execution_time_ms": execution_time,
             "results": results
         }
 
-    def _match_workflow(self, context: CallContext) -> Optional[Workflow]:
-        """Find best matching workflow for call context"""
-        matches = []
-
-        for workflow in self.workflows.values():
-            if not workflow.enabled:
-                continue
-
-            score = self._calculate_match_score(workflow, context)
-            if score > 0:
-                matches.append((score, workflow))
+    async def _run_actions(self, workflow: Workflow, context: CallContext) -> List[Dict]:
+        """
+        Run a workflow's actions as a DAG (see plan_dependencies)
 
-        if not matches:
-            return None
+        Each action starts once the actions it depends on have finished,
+        successful or not. At most WORKFLOW_MAX_PARALLEL_ACTIONS run at once,
+        each under its timeout. Results come back in declared order, skipped
+        actions left out.
 
-        # Return highest priority match
-        matches.sort(key=lambda x: (x[0], x[1].priority), reverse=True)
-        return matches[0][1]
+        With the action queue attached, only actions nothing depends on are
+        queued: a queued action "finishes" when it is enqueued, so its
+        dependents would otherwise run concurrently with it.
+        """
+        actions = workflow.actions
+        finished = [asyncio.Event() for _ in actions]
+        results: List[Optional[Dict]] = [None] * len(actions)
+        semaphore = asyncio.Semaphore(settings.WORKFLOW_MAX_PARALLEL_ACTIONS)
 
-    def _calculate_match_score(self, workflow: Workflow, context: CallContext) -> float:
-        """Calculate how well a workflow matches the context"""
-        score = 0.0
-        triggers = workflow.triggers
+        async def run(index: int) -> None:
+            action = actions[index]
+            try:
+                for dependency in workflow.dependencies[index]:
+                    await finished[dependency].wait()
+
+                # Check condition (if any) against the actions finished so far
+                done = [result for result in results if result is not None]
+                if action.compiled_condition and not self._evaluate_condition(action, context, done):
+                    logger.debug(f"Skipping action {action.type} (condition not met)")
+                    return
+
+                if (
+                    self.action_queue is not None
+                    and action.type not in INLINE_ACTIONS
+                    and index not in workflow.has_dependents
+                ):
+                    results[index] = await self._queue_action(action, context, workflow.id, index)
+                    return
+
+                async with semaphore:
+                    results[index] = await self._run_action(action, context)
+            finally:
+                finished[index].set()
+
+        await asyncio.gather(*(run(index) for index in range(len(actions))))
+        return [result for result in results if result is not None]
+
+    async def _queue_action(self, action: WorkflowAction, context: CallContext, workflow_id: str, index: int) -> Dict:
+        """Hand an action to the durable queue (runs after the call path returns)"""
+        try:
+            job_key = await self.action_queue.enqueue(action, context, workflow_id, index)
+        except Exception as e:
+            logger.error(f"  ✗ {action.type.value} could not be queued, running inline: {e}")
+            return await self._run_action(action, context)
 
-        # Intent match
-        if triggers.intent and triggers.intent == context.intent:
-            if context.intent_confidence >= triggers.confidence_threshold:
-                score += 10.0
+        logger.info(f"  ⏳ {action.type.value}: queued")
+        return {
+            "action": action.type.value,
+            "success": True,
+            "queued": True,
+            "data": {"job_key": job_key, "duplicate": job_key is None}
+        }
 
-        # Keyword match
-        if triggers.keywords:
-            transcript_lower = context.transcript.lower()
-            matched_keywords = sum(1 for kw in triggers.keywords if kw.lower() in transcript_lower)
-            score += matched_keywords * 2.0
+    async def _run_action(self, action: WorkflowAction, context: CallContext) -> Dict:
+        """Execute one action under its timeout, as a result entry"""
+        timeout = action.timeout or settings.WORKFLOW_ACTION_TIMEOUT_SECONDS
+        try:
+            result = await asyncio.wait_for(self._execute_action(action, context), timeout=timeout)
+            logger.info(f"  ✓ {action.type.value}: {result.get('message', 'OK')}")
+            return {
+                "action": action.type.value,
+                "success": result.get("success", False),
+                "data": result
+            }
 
-        # Contact match
-        if triggers.contacts and context.caller_name:
-            if context.caller_name in triggers.contacts:
-                score += 15.0  # High priority for known contacts
+        except asyncio.TimeoutError:
+            logger.error(f"  ✗ {action.type.value} timed out after {timeout}s")
+            return {
+                "action": action.type.value,
+                "success": False,
+                "error": f"Timed out after {timeout}s"
+            }
 
-        # Emergency override
-        if context.is_emergency and workflow.category == WorkflowCategory.EMERGENCY:
-            score += 100.0  # Always prioritize emergency
+        except Exception as e:
+            logger.error(f"  ✗ {action.type.value} failed: {e}")
+            return {
+                "action": action.type.value,
+                "success": False,
+                "error": str(e)
+            }
 
-        return score
+    def _match_workflow(self, context: CallContext) -> Optional[Workflow]:
+        """Find best matching workflow for call context"""
+        return self.trigger_index.best_match(context)
 
-    def _evaluate_condition(self, condition: str, context: CallContext) -> bool:
-        """Evaluate a condition string (simple Python expression)"""
+    def _evaluate_condition(self, action: WorkflowAction, context: CallContext, results: List[Dict]) -> bool:
+        """Evaluate an action's precompiled condition"""
         try:
-            # Safe evaluation with limited context
-            safe_vars = {
-                "intent": context.intent,
-                "confidence": context.intent_confidence,
-                "scam_score": context.scam_score,
-                "is_emergency": context.is_emergency,
-                "caller_name": context.caller_name
-            }
-            return eval(condition, {"__builtins__": {}}, safe_vars)
+            return action.compiled_condition(condition_variables(context, results))
         except Exception as e:
-            logger.error(f"Failed to evaluate condition '{condition}': {e}")
+            # e.g. comparing caller_name None with a string using <
+            logger.error(f"Failed to evaluate condition '{action.condition}': {e}")
             return False
 
     async def _execute_action(self, action: WorkflowAction, context: CallContext) -> Dict:
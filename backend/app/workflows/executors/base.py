@@ -28,7 +28,8 @@ class ActionExecutor(ABC):
             {
                 "success": bool,
                 "message": str,
-                "data": Any
+                "data": Any,
+                "retryable": bool  # Optional; False when repeating could act twice
             }
         """
         pass
@@ -48,7 +48,7 @@ class RingUserExecutor(ActionExecutor):
             logger.info(f"📞 Ringing user at {user_phone} (priority: {priority})")
 
             # Dial the user via Twilio
-            self.twilio_service.dial_user(user_phone, context.call_sid)
+            await self.twilio_service.dial_user(user_phone, context.call_sid)
 
             return {
                 "success": True,
@@ -92,7 +92,7 @@ class HangupExecutor(ActionExecutor):
             logger.info(f"📵 Hanging up call (reason: {reason})")
 
             # Terminate call via Twilio
-            self.twilio_service.hangup_call(context.call_sid)
+            await self.twilio_service.hangup_call(context.call_sid)
 
             return {
                 "success": True,
@@ -52,7 +52,7 @@ class SendSMSExecutor(ActionExecutor):
                 }
 
             # Send SMS
-            self.twilio_service.send_sms(to_number, message)
+            await self.twilio_service.send_sms(to_number, message)
 
             logger.info(f"✅ SMS sent to {to_number}")
 
@@ -70,7 +70,9 @@ class SendSMSExecutor(ActionExecutor):
             return {
                 "success": False,
                 "message": f"SMS error: {str(e)}",
-                "data": None
+                "data": None,
+                # The SMS may have gone out: sending again could text twice
+                "retryable": not getattr(e, "ambiguous", False)
             }
 
     def _get_template(self, template_name: str, context) -> str:
@@ -0,0 +1,67 @@
+"""
+Microbenchmark: mu-law ↔ PCM transcoding throughput (frames/sec on one core)
+
+Run from backend/:
+    python -m benchmarks.bench_audio_codec
+
+A Twilio call produces 50 frames/sec per direction (20ms frames of 160
+samples), so concurrent calls per core ≈ frames/sec ÷ 100.
+"""
+
+import base64
+import os
+import time
+
+import numpy as np
+
+from app.services import audio_codec
+from app.services.audio_codec import FRAME_SAMPLES, MulawCodec
+
+FRAMES = 20000
+BATCH = 200  # e.g. one frame from each of 200 live calls
+
+
+def _rate(label: str, frames: int, run) -> None:
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    per_sec = frames / elapsed
+    print(f"{label:<42} {per_sec:>12,.0f} frames/s   (~{per_sec / 100:,.0f} calls/core)")
+
+
+def main() -> None:
+    mulaw_frames = [os.urandom(FRAME_SAMPLES) for _ in range(FRAMES)]
+    payloads = [base64.b64encode(frame).decode() for frame in mulaw_frames]
+    pcm_frames = [audio_codec.ulaw2lin(frame) for frame in mulaw_frames]
+    codec = MulawCodec()
+
+    print(f"{FRAMES} frames × {FRAME_SAMPLES} samples\n")
+
+    _rate("decode payload (MulawCodec, reused buffer)", FRAMES,
+          lambda: [codec.decode_payload(p) for p in payloads])
+    _rate("encode payload (MulawCodec, reused buffer)", FRAMES,
+          lambda: [codec.encode_payload(p) for p in pcm_frames])
+
+    batches = [mulaw_frames[i:i + BATCH] for i in range(0, FRAMES, BATCH)]
+    pcm_out = np.empty((BATCH, FRAME_SAMPLES), dtype=np.int16)
+    mulaw_out = np.empty((BATCH, FRAME_SAMPLES), dtype=np.uint8)
+    _rate(f"decode_frames (batches of {BATCH})", FRAMES,
+          lambda: [audio_codec.decode_frames(batch, out=pcm_out) for batch in batches])
+    _rate(f"encode_frames (batches of {BATCH})", FRAMES,
+          lambda: [audio_codec.encode_frames(pcm_out, out=mulaw_out) for _ in batches])
+
+    try:
+        import audioop  # Removed in Python 3.13
+    except ImportError:
+        print("\naudioop not available, skipping baseline")
+        return
+
+    print()
+    _rate("baseline: b64decode + audioop.ulaw2lin", FRAMES,
+          lambda: [audioop.ulaw2lin(base64.b64decode(p), 2) for p in payloads])
+    _rate("baseline: audioop.lin2ulaw + b64encode", FRAMES,
+          lambda: [base64.b64encode(audioop.lin2ulaw(p, 2)).decode() for p in pcm_frames])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Microbenchmark: workflow action condition evaluation (µs/evaluation on one core)
+
+Run from backend/:
+    python -m benchmarks.bench_conditions
+
+Compares eval() on the raw condition string (what the engine did per
+action) with the precompiled condition, both including the variables dict.
+"""
+
+import time
+
+from app.workflows.conditions import compile_condition, condition_variables
+from app.workflows.engine import CallContext
+
+ITERATIONS = 100_000
+CONDITIONS = (
+    "intent_confidence < 0.8",
+    "if_missed",
+    'is_emergency or (intent == "doctor" and intent_confidence >= 0.8)',
+    'caller_name in ("Mom", "Dad", "Spouse") and not scam_score > 0.5',
+)
+
+
+def _per_evaluation_us(function) -> float:
+    function()
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        function()
+    return (time.perf_counter() - start) * 1_000_000 / ITERATIONS
+
+
+def main() -> None:
+    context = CallContext(
+        call_sid="CA1", user_id="u1", caller_number="+15551234567", caller_name="Mom",
+        intent="doctor", intent_confidence=0.9, transcript="", scam_score=0.1,
+        is_emergency=False, metadata={}
+    )
+    results = [{"action": "ring_user", "success": True}]
+
+    print(f"{'condition':<66} {'eval(str)':>10} {'compiled':>10}")
+    for expression in CONDITIONS:
+        compiled = compile_condition(expression)
+        raw = _per_evaluation_us(
+            lambda: eval(expression, {"__builtins__": {}}, condition_variables(context, results))
+        )
+        fast = _per_evaluation_us(lambda: compiled(condition_variables(context, results)))
+        print(f"{expression:<66} {raw:>8.2f}µs {fast:>8.2f}µs")
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS // 10):
+        compile_condition(CONDITIONS[2])
+    print(f"\ncompile once (load time) {(time.perf_counter() - start) * 1_000_000 / (ITERATIONS // 10):.2f}µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Microbenchmark: local scam analysis latency (ms/transcript on one core)
+
+Run from backend/:
+    python -m benchmarks.bench_local_intelligence
+
+Compares analyze_fast (one PhraseMatcher pass) with a naive scan that runs
+`phrase in transcript` once per phrase, on transcripts up to 10k characters.
+"""
+
+import time
+
+from app.services.local_intelligence import LocalIntelligence
+
+ITERATIONS = 200
+LENGTHS = (500, 2_000, 10_000)
+
+
+def _per_call_ms(function) -> float:
+    function()
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        function()
+    return (time.perf_counter() - start) * 1000 / ITERATIONS
+
+
+def main() -> None:
+    intelligence = LocalIntelligence()
+    phrases = [phrase for group in intelligence.scam_keywords.values() for phrase in group] + [
+        *intelligence.urgency_phrases, *intelligence.money_phrases,
+        *intelligence.pii_phrases, *intelligence.threat_phrases,
+    ]
+
+    def naive(transcript: str) -> int:
+        lower = transcript.lower()
+        return sum(1 for phrase in phrases if phrase in lower)
+
+    print(f"{'length':>8} {'naive scan':>12} {'analyze_fast':>14}")
+    for length in LENGTHS:
+        transcript = ("Caller: Hi, just checking in about dinner on Friday. " * (length // 50 + 1))[:length]
+        slow = _per_call_ms(lambda: naive(transcript))
+        fast = _per_call_ms(lambda: intelligence.analyze_fast(transcript))
+        print(f"{length:>8} {slow:>10.3f}ms {fast:>12.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Microbenchmark: scam-script similarity search latency (ms/query on one core)
+
+Run from backend/:
+    python -m benchmarks.bench_vector_index
+
+Uses clustered random vectors at Gemini text-embedding-004 width (768);
+real embeddings cluster by topic, uniform noise would understate IVF recall.
+Query embedding (network) is not included: this is the local search only.
+"""
+
+import tempfile
+import time
+
+import numpy as np
+
+from app.services.vector_index import VectorIndex
+
+DIM = 768
+QUERIES = 200
+SIZES = (1_000, 10_000, 50_000)
+TOPICS = 500
+
+
+def _clustered(rng: np.random.Generator, centers: np.ndarray, count: int) -> np.ndarray:
+    topics = rng.integers(len(centers), size=count)
+    return (centers[topics] + 0.6 * rng.standard_normal((count, DIM)) / np.sqrt(DIM)).astype(np.float32)
+
+
+def _latency(label: str, index: VectorIndex, queries: np.ndarray, **kwargs) -> None:
+    index.search(queries[0], **kwargs)  # Warm the page cache
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query, **kwargs)
+    per_query_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"{label:<36} {per_query_ms:>8.3f} ms/query")
+
+
+def _recall(index: VectorIndex, queries: np.ndarray, exact: list, **kwargs) -> float:
+    found = index.search(queries, **kwargs)
+    hits = sum(
+        len({id(meta) for _, meta in approx} & {id(meta) for _, meta in truth})
+        for approx, truth in zip(found, exact)
+    )
+    return hits / sum(len(truth) for truth in exact)
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((TOPICS, DIM)) / np.sqrt(DIM)
+    queries = _clustered(rng, centers, QUERIES)
+
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            index = VectorIndex(directory, "bench")
+            index.add(_clustered(rng, centers, size), [{"row": i} for i in range(size)])
+            index = VectorIndex(directory, "bench").load()  # Memory-mapped, as at startup
+
+            print(f"{size:,} rows × {DIM}")
+            _latency("  exact top-5", index, queries, top_k=5)
+            start = time.perf_counter()
+            exact = index.search(queries, top_k=5)
+            batch_ms = (time.perf_counter() - start) * 1000 / QUERIES
+            print(f"{f'  exact top-5 (batch of {QUERIES})':<36} {batch_ms:>8.3f} ms/query")
+
+            start = time.perf_counter()
+            index.build_ivf()
+            print(f"  ivf build ({int(np.sqrt(size))} lists)          {time.perf_counter() - start:>8.2f} s")
+            _latency("  ivf top-5 (8 probes)", index, queries, top_k=5, probes=8)
+            print(f"  ivf recall@5 vs exact              {_recall(index, queries, exact, top_k=5):>8.2f}\n")
+
+
+if __name__ == "__main__":
+    main()
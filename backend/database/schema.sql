@@ -61,6 +61,7 @@ CREATE TABLE calls (
     intent TEXT, -- friend, sales, appointment, scam, unknown
     scam_score FLOAT DEFAULT 0.0, -- 0.0-1.0
     passed_through BOOLEAN DEFAULT false,
+    action_taken TEXT, -- screening, assisting, screened, blocked
     started_at TIMESTAMP DEFAULT now(),
     ended_at TIMESTAMP,
     duration_seconds INTEGER
@@ -100,6 +101,7 @@ CREATE TABLE scam_reports (
     confidence FLOAT NOT NULL, -- Vector similarity score
     pattern_matched TEXT, -- Which scam script matched
     action_taken TEXT, -- blocked, flagged, passed_with_warning
+    report_key TEXT UNIQUE, -- Idempotency key set by the write-behind queue (retried flushes upsert on it)
     reported_at TIMESTAMP DEFAULT now()
 );
 
@@ -121,14 +123,47 @@ CREATE TABLE call_analytics (
     sales_blocked INTEGER DEFAULT 0,
     contacts_passed INTEGER DEFAULT 0,
     unknown_screened INTEGER DEFAULT 0,
+    calls_blocked INTEGER DEFAULT 0, -- action_taken = blocked
+    calls_screened INTEGER DEFAULT 0, -- action_taken = screened
+    duration_seconds_total BIGINT DEFAULT 0,
+    duration_count INTEGER DEFAULT 0, -- calls with a known duration
     avg_call_duration_seconds INTEGER DEFAULT 0,
+    intent_counts JSONB DEFAULT '{}'::jsonb, -- intent → calls
     created_at TIMESTAMP DEFAULT now(),
+    updated_at TIMESTAMP DEFAULT now(),
     UNIQUE(user_id, date)
 );
 
 -- Index for date range queries
 CREATE INDEX idx_analytics_user_date ON call_analytics(user_id, date DESC);
 
+-- ============================================================================
+-- STORAGE OBJECTS (Index of the recordings bucket)
+-- ============================================================================
+
+-- One row per stored object, kept by the upload path of every instance
+-- (see app/services/storage_manifest.py); keys are "{user_id}/{kind}/{file}"
+CREATE TABLE storage_objects (
+    key TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    kind TEXT NOT NULL, -- recordings, transcripts, scam_evidence
+    size BIGINT NOT NULL,
+    created_at DOUBLE PRECISION NOT NULL -- epoch seconds
+);
+
+-- Retention sweeps (range scan) and oldest/newest lookups
+CREATE INDEX idx_storage_objects_kind_created ON storage_objects(kind, created_at);
+CREATE INDEX idx_storage_objects_user_created ON storage_objects(user_id, kind, created_at);
+
+-- Running totals per (user, kind), kept by record/remove_storage_object()
+CREATE TABLE storage_totals (
+    user_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    objects BIGINT NOT NULL DEFAULT 0,
+    bytes BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, kind)
+);
+
 -- ============================================================================
 -- ROW LEVEL SECURITY (RLS)
 -- ============================================================================
@@ -140,6 +175,8 @@ ALTER TABLE calls ENABLE ROW LEVEL SECURITY;
 ALTER TABLE call_transcripts ENABLE ROW LEVEL SECURITY;
 ALTER TABLE scam_reports ENABLE ROW LEVEL SECURITY;
 ALTER TABLE call_analytics ENABLE ROW LEVEL SECURITY;
+ALTER TABLE storage_objects ENABLE ROW LEVEL SECURITY; -- Backend (service role) only
+ALTER TABLE storage_totals ENABLE ROW LEVEL SECURITY;
 
 -- Policy: Users can only see their own data
 CREATE POLICY users_policy ON users
@@ -197,6 +234,252 @@ CREATE TRIGGER contacts_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at();
 
+-- Function: Add per-call deltas to a user's day of call_analytics
+-- Called by the backend on every call write (see app/services/analytics_rollups.py).
+-- p_deltas: {"total_calls": 1, "scams_blocked": 0, ..., "intent_counts": {"scam": 1}}
+CREATE OR REPLACE FUNCTION increment_call_analytics(p_user_id UUID, p_date DATE, p_deltas JSONB)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO call_analytics (user_id, date)
+    VALUES (p_user_id, p_date)
+    ON CONFLICT (user_id, date) DO NOTHING;
+
+    -- Single UPDATE: the row lock serializes concurrent increments
+    UPDATE call_analytics SET
+        total_calls = total_calls + COALESCE((p_deltas->>'total_calls')::int, 0),
+        scams_blocked = scams_blocked + COALESCE((p_deltas->>'scams_blocked')::int, 0),
+        sales_blocked = sales_blocked + COALESCE((p_deltas->>'sales_blocked')::int, 0),
+        contacts_passed = contacts_passed + COALESCE((p_deltas->>'contacts_passed')::int, 0),
+        unknown_screened = unknown_screened + COALESCE((p_deltas->>'unknown_screened')::int, 0),
+        calls_blocked = calls_blocked + COALESCE((p_deltas->>'calls_blocked')::int, 0),
+        calls_screened = calls_screened + COALESCE((p_deltas->>'calls_screened')::int, 0),
+        duration_seconds_total = duration_seconds_total + COALESCE((p_deltas->>'duration_seconds_total')::bigint, 0),
+        duration_count = duration_count + COALESCE((p_deltas->>'duration_count')::int, 0),
+        avg_call_duration_seconds = CASE
+            WHEN duration_count + COALESCE((p_deltas->>'duration_count')::int, 0) > 0
+            THEN (duration_seconds_total + COALESCE((p_deltas->>'duration_seconds_total')::bigint, 0))
+                 / (duration_count + COALESCE((p_deltas->>'duration_count')::int, 0))
+            ELSE 0
+        END,
+        intent_counts = (
+            SELECT COALESCE(jsonb_object_agg(intent, total), '{}'::jsonb)
+            FROM (
+                SELECT key AS intent, SUM(value::int) AS total
+                FROM (
+                    SELECT key, value FROM jsonb_each_text(intent_counts)
+                    UNION ALL
+                    SELECT key, value FROM jsonb_each_text(COALESCE(p_deltas->'intent_counts', '{}'::jsonb))
+                ) merged
+                GROUP BY key
+            ) summed
+        ),
+        updated_at = now()
+    WHERE user_id = p_user_id AND date = p_date;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function: A call's contribution to its day's call_analytics row
+-- Must match call_facets() in app/services/analytics_rollups.py.
+CREATE OR REPLACE FUNCTION call_facets(c calls)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'total_calls', 1,
+        'scams_blocked', (COALESCE(NULLIF(c.intent, ''), 'unknown') = 'scam' AND c.status IS NOT DISTINCT FROM 'blocked')::int,
+        'sales_blocked', (COALESCE(NULLIF(c.intent, ''), 'unknown') = 'sales' AND c.status IS NOT DISTINCT FROM 'blocked')::int,
+        'contacts_passed', COALESCE(c.passed_through, false)::int,
+        'unknown_screened', (COALESCE(NULLIF(c.intent, ''), 'unknown') = 'unknown'
+            AND c.status IS DISTINCT FROM 'blocked' AND NOT COALESCE(c.passed_through, false))::int,
+        'calls_blocked', (c.action_taken IS NOT DISTINCT FROM 'blocked')::int,
+        'calls_screened', (c.action_taken IS NOT DISTINCT FROM 'screened')::int,
+        'duration_seconds_total', COALESCE(c.duration_seconds, 0),
+        'duration_count', (COALESCE(c.duration_seconds, 0) > 0)::int,
+        'intent_counts', jsonb_build_object(COALESCE(NULLIF(c.intent, ''), 'unknown'), 1)
+    );
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Function: Counter changes turning one call_facets() value into another (zeros dropped)
+CREATE OR REPLACE FUNCTION call_facet_deltas(p_before JSONB, p_after JSONB)
+RETURNS JSONB AS $$
+    SELECT COALESCE((
+        SELECT jsonb_object_agg(key, delta)
+        FROM (
+            SELECT key, SUM(value) AS delta
+            FROM (
+                SELECT key, value::bigint AS value FROM jsonb_each_text(p_after - 'intent_counts')
+                UNION ALL
+                SELECT key, -value::bigint FROM jsonb_each_text(p_before - 'intent_counts')
+            ) counters
+            GROUP BY key
+        ) summed
+        WHERE delta <> 0
+    ), '{}'::jsonb) || COALESCE((
+        SELECT jsonb_build_object('intent_counts', jsonb_object_agg(key, delta))
+        FROM (
+            SELECT key, SUM(value) AS delta
+            FROM (
+                SELECT key, value::int AS value FROM jsonb_each_text(p_after->'intent_counts')
+                UNION ALL
+                SELECT key, -value::int FROM jsonb_each_text(p_before->'intent_counts')
+            ) intents
+            GROUP BY key
+        ) summed
+        WHERE delta <> 0
+        HAVING COUNT(*) > 0
+    ), '{}'::jsonb);
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Function: Apply many per-call updates in one round-trip (write-behind flushes, update_call)
+-- p_updates: [{"call_sid": "CA...", "status": "blocked", "scam_score": 0.9}, ...]
+-- Keys missing from an element keep the row's current value.
+-- With p_roll_up, each call's facet change is diffed against the row as
+-- locked here (FOR UPDATE), so concurrent writers on any instance never
+-- double count. Calls are locked in call_sid order, then analytics rows in
+-- (user, day) order, so concurrent batches can't deadlock.
+CREATE OR REPLACE FUNCTION apply_call_updates(p_updates JSONB, p_roll_up BOOLEAN DEFAULT true)
+RETURNS VOID AS $$
+DECLARE
+    item JSONB;
+    old_row calls;
+    new_row calls;
+    deltas JSONB;
+    rollups JSONB := '[]'::jsonb;
+    bucket JSONB;
+BEGIN
+    FOR item IN SELECT value FROM jsonb_array_elements(p_updates) ORDER BY value->>'call_sid' LOOP
+        SELECT * INTO old_row FROM calls WHERE call_sid = item->>'call_sid' FOR UPDATE;
+        IF NOT FOUND THEN
+            CONTINUE;
+        END IF;
+
+        UPDATE calls AS c SET
+            caller_name = r.caller_name,
+            status = r.status,
+            intent = r.intent,
+            scam_score = r.scam_score,
+            passed_through = r.passed_through,
+            action_taken = r.action_taken,
+            started_at = r.started_at,
+            ended_at = r.ended_at,
+            duration_seconds = r.duration_seconds
+        FROM jsonb_populate_record(old_row, item - 'call_sid') AS r
+        WHERE c.call_sid = old_row.call_sid
+        RETURNING c.* INTO new_row;
+
+        IF p_roll_up AND new_row.user_id IS NOT NULL THEN
+            deltas := call_facet_deltas(call_facets(old_row), call_facets(new_row));
+            IF deltas <> '{}'::jsonb THEN
+                rollups := rollups || jsonb_build_object(
+                    'user_id', new_row.user_id,
+                    'day', COALESCE(old_row.started_at, now())::date,
+                    'deltas', deltas
+                );
+            END IF;
+        END IF;
+    END LOOP;
+
+    FOR bucket IN SELECT value FROM jsonb_array_elements(rollups) ORDER BY value->>'user_id', value->>'day' LOOP
+        PERFORM increment_call_analytics((bucket->>'user_id')::uuid, (bucket->>'day')::date, bucket->'deltas');
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function: Rebuild a user's call_analytics from the calls table
+-- One-off backfill (e.g. after adding the rollup columns), not used on the hot path.
+-- Facet rules must match call_facets() in app/services/analytics_rollups.py.
+CREATE OR REPLACE FUNCTION rebuild_call_analytics(p_user_id UUID)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM call_analytics WHERE user_id = p_user_id;
+
+    INSERT INTO call_analytics (
+        user_id, date, total_calls, scams_blocked, sales_blocked, contacts_passed,
+        unknown_screened, calls_blocked, calls_screened, duration_seconds_total,
+        duration_count, avg_call_duration_seconds, intent_counts
+    )
+    SELECT
+        p_user_id,
+        day,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE intent = 'scam' AND status = 'blocked'),
+        COUNT(*) FILTER (WHERE intent = 'sales' AND status = 'blocked'),
+        COUNT(*) FILTER (WHERE passed_through),
+        COUNT(*) FILTER (WHERE intent = 'unknown' AND status IS DISTINCT FROM 'blocked' AND NOT passed_through),
+        COUNT(*) FILTER (WHERE action_taken = 'blocked'),
+        COUNT(*) FILTER (WHERE action_taken = 'screened'),
+        COALESCE(SUM(duration_seconds) FILTER (WHERE duration_seconds > 0), 0),
+        COUNT(*) FILTER (WHERE duration_seconds > 0),
+        COALESCE(AVG(duration_seconds) FILTER (WHERE duration_seconds > 0), 0)::int,
+        (
+            SELECT jsonb_object_agg(i.intent, i.calls)
+            FROM (
+                SELECT COALESCE(NULLIF(c2.intent, ''), 'unknown') AS intent, COUNT(*) AS calls
+                FROM calls c2
+                WHERE c2.user_id = p_user_id AND COALESCE(c2.started_at, now())::date = per_call.day
+                GROUP BY 1
+            ) i
+        )
+    FROM (
+        SELECT
+            COALESCE(started_at, now())::date AS day,
+            COALESCE(NULLIF(intent, ''), 'unknown') AS intent,
+            status,
+            COALESCE(passed_through, false) AS passed_through,
+            action_taken,
+            duration_seconds
+        FROM calls
+        WHERE user_id = p_user_id
+    ) per_call
+    GROUP BY day;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function: Index an uploaded object (or an overwrite of one) and update storage_totals
+CREATE OR REPLACE FUNCTION record_storage_object(
+    p_key TEXT, p_user_id TEXT, p_kind TEXT, p_size BIGINT, p_created_at DOUBLE PRECISION
+)
+RETURNS VOID AS $$
+DECLARE
+    old_size BIGINT;
+BEGIN
+    INSERT INTO storage_objects (key, user_id, kind, size, created_at)
+    VALUES (p_key, p_user_id, p_kind, p_size, p_created_at)
+    ON CONFLICT (key) DO NOTHING;
+
+    IF FOUND THEN
+        old_size := NULL;
+    ELSE
+        -- Overwrite: the row lock serializes concurrent uploads of one key
+        SELECT size INTO old_size FROM storage_objects WHERE key = p_key FOR UPDATE;
+        UPDATE storage_objects SET size = p_size, created_at = p_created_at WHERE key = p_key;
+    END IF;
+
+    INSERT INTO storage_totals (user_id, kind, objects, bytes)
+    VALUES (p_user_id, p_kind, CASE WHEN old_size IS NULL THEN 1 ELSE 0 END, p_size - COALESCE(old_size, 0))
+    ON CONFLICT (user_id, kind) DO UPDATE SET
+        objects = storage_totals.objects + EXCLUDED.objects,
+        bytes = storage_totals.bytes + EXCLUDED.bytes;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function: Forget a deleted object (false if it was not indexed)
+CREATE OR REPLACE FUNCTION remove_storage_object(p_key TEXT)
+RETURNS BOOLEAN AS $$
+DECLARE
+    removed storage_objects%ROWTYPE;
+BEGIN
+    DELETE FROM storage_objects WHERE key = p_key RETURNING * INTO removed;
+    IF NOT FOUND THEN
+        RETURN false;
+    END IF;
+
+    UPDATE storage_totals SET
+        objects = objects - 1,
+        bytes = bytes - removed.size
+    WHERE user_id = removed.user_id AND kind = removed.kind;
+    RETURN true;
+END;
+$$ LANGUAGE plpgsql;
+
 -- ============================================================================
 -- SEED DATA (Example)
 -- ============================================================================
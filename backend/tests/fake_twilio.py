@@ -0,0 +1,140 @@
+"""
+Fake Twilio REST server for tests
+The Calls and Messages endpoints TwilioRestClient uses, served by uvicorn
+on 127.0.0.1 (a real socket, so timeouts and pooling behave as in production)
+
+    with FakeTwilio() as twilio:
+        twilio.add_call("CA1")
+        twilio.fail("Calls/CA1.json", 503)     # next request to it gets a 503
+        twilio.delay = 0.5                     # slow every response
+        client = TwilioRestClient(base_url=twilio.url, account_sid=twilio.account_sid, ...)
+"""
+
+import asyncio
+import base64
+import itertools
+import socket
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+ACCOUNT_SID = "ACtest"
+AUTH_TOKEN = "secret"
+
+
+class FakeTwilio:
+    """Fake Twilio API with per-path failure injection and a global delay"""
+
+    def __init__(self, account_sid: str = ACCOUNT_SID, auth_token: str = AUTH_TOKEN):
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.calls: Dict[str, dict] = {}
+        self.messages: List[dict] = []
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.delay = 0.0
+        self._failures: Dict[str, deque] = defaultdict(deque)
+        self._sids = itertools.count(1)
+
+        self.app = FastAPI()
+        prefix = f"/2010-04-01/Accounts/{account_sid}"
+        self.app.add_api_route(prefix + "/Calls/{call_sid}.json", self._fetch_call, methods=["GET"])
+        self.app.add_api_route(prefix + "/Calls/{call_sid}.json", self._update_call, methods=["POST"])
+        self.app.add_api_route(prefix + "/Messages.json", self._create_message, methods=["POST"])
+
+        port = self._free_port()
+        self.url = f"http://127.0.0.1:{port}"
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @staticmethod
+    def _free_port() -> int:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    # ========================
+    # Test controls
+    # ========================
+
+    def add_call(self, call_sid: str, **fields) -> None:
+        self.calls[call_sid] = {"sid": call_sid, "status": "in-progress", "from": "+15551230000", "to": "+15559870000", **fields}
+
+    def fail(self, path: str, *statuses: int) -> None:
+        """Answer the next requests to path ("Calls/CA1.json") with these statuses"""
+        self._failures[path].extend(statuses)
+
+    def __enter__(self) -> "FakeTwilio":
+        self._thread.start()
+        deadline = time.monotonic() + 5
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake Twilio server did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+    # ========================
+    # Endpoints
+    # ========================
+
+    async def _handle(self, request: Request, path: str):
+        """Common auth / delay / injected failure handling (None = carry on)"""
+        self.requests[path] += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if not self._authorized(request):
+            return JSONResponse({"code": 20003, "message": "Authenticate", "status": 401}, status_code=401)
+        if self._failures[path]:
+            status = self._failures[path].popleft()
+            return JSONResponse({"code": 20500, "message": "Injected failure", "status": status}, status_code=status)
+        return None
+
+    def _authorized(self, request: Request) -> bool:
+        scheme, _, encoded = request.headers.get("authorization", "").partition(" ")
+        expected = base64.b64encode(f"{self.account_sid}:{self.auth_token}".encode()).decode()
+        return scheme == "Basic" and encoded == expected
+
+    def _not_found(self, call_sid: str):
+        return JSONResponse(
+            {"code": 20404, "message": f"The requested resource /Calls/{call_sid}.json was not found", "status": 404},
+            status_code=404
+        )
+
+    async def _fetch_call(self, call_sid: str, request: Request):
+        error = await self._handle(request, f"Calls/{call_sid}.json")
+        if error is not None:
+            return error
+        if call_sid not in self.calls:
+            return self._not_found(call_sid)
+        return self.calls[call_sid]
+
+    async def _update_call(self, call_sid: str, request: Request):
+        error = await self._handle(request, f"Calls/{call_sid}.json")
+        if error is not None:
+            return error
+        if call_sid not in self.calls:
+            return self._not_found(call_sid)
+        form = await request.form()
+        call = self.calls[call_sid]
+        if "Status" in form:
+            call["status"] = form["Status"]
+        if "Twiml" in form:
+            call["twiml"] = form["Twiml"]
+        return call
+
+    async def _create_message(self, request: Request):
+        error = await self._handle(request, "Messages.json")
+        if error is not None:
+            return error
+        form = await request.form()
+        message = {"sid": f"SM{next(self._sids):032d}", "to": form["To"], "from": form["From"], "body": form["Body"], "status": "queued"}
+        self.messages.append(message)
+        return JSONResponse(message, status_code=201)
@@ -0,0 +1,276 @@
+"""
+Action queue tests
+Enqueue-only call path, idempotency, per-type concurrency, retry/backoff,
+dead-lettering and crash recovery (fake executors, SQLite in tmp_path)
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.twilio_rest import TwilioAPIError
+from app.workflows.action_queue import ActionQueue
+from app.workflows.engine import ActionType, CallContext, WorkflowAction, WorkflowEngine
+from app.workflows.executors.notification_actions import SendSMSExecutor
+
+
+class FakeExecutor:
+    """Sleeps, tracks concurrency, fails the first `failures` calls"""
+
+    def __init__(self, delay=0.0, failures=0):
+        self.delay, self.failures = delay, failures
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def execute(self, context, params):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if self.calls <= self.failures:
+            return {"success": False, "message": "upstream 503"}
+        return {"success": True, "message": "sent"}
+
+
+def _context(call_sid="CA1"):
+    return CallContext(
+        call_sid=call_sid, user_id="u1", caller_number="+15551234567", caller_name="Mom",
+        intent="unknown", intent_confidence=0.9, transcript="", scam_score=0.0,
+        is_emergency=False, metadata={}
+    )
+
+
+def _engine(**executors) -> WorkflowEngine:
+    engine = WorkflowEngine()
+    engine.action_executors.update(executors)
+    return engine
+
+
+async def _drain(queue: ActionQueue, timeout: float = 3.0) -> None:
+    """Wait until no job is pending or running"""
+    async def idle():
+        while queue.get_stats()["jobs"].get("pending") or queue.get_stats()["jobs"].get("running"):
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(idle(), timeout)
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "ACTION_QUEUE_BACKOFF_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "ACTION_QUEUE_POLL_SECONDS", 0.05)
+
+
+@pytest.mark.asyncio
+async def test_call_path_only_enqueues(tmp_path):
+    sms, ring = FakeExecutor(delay=0.3), FakeExecutor()
+    engine = _engine(send_sms=sms, ring_user=ring)
+    engine.load_workflows_from_config({"workflows": {"wf": {
+        "category": "unknown", "triggers": {"intent": "unknown"},
+        "actions": [{"type": "ring_user"}, {"type": "send_sms"}]
+    }}})
+    queue = ActionQueue(engine, str(tmp_path / "jobs.sqlite"))
+    await queue.start()
+    engine.action_queue = queue
+
+    result = await engine.execute_for_call(_context())
+    assert result["actions_completed"] == ["ring_user"]  # Routing stays inline
+    assert result["actions_queued"] == ["send_sms"]
+    assert result["final_action"] == "passed_through"
+    assert sms.calls <= 1 and sms.active <= 1  # Not awaited by the call path
+
+    await _drain(queue)
+    assert sms.calls == 1
+    assert queue.succeeded == 1
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_actions_with_dependents_run_before_them(tmp_path):
+    order = []
+
+    class OrderedExecutor(FakeExecutor):
+        def __init__(self, name, delay):
+            super().__init__(delay=delay)
+            self.name = name
+
+        async def execute(self, context, params):
+            order.append(("start", self.name))
+            result = await super().execute(context, params)
+            order.append(("end", self.name))
+            return result
+
+    engine = _engine(send_email=OrderedExecutor("send_email", 0.1), google_sheets=OrderedExecutor("google_sheets", 0))
+    engine.load_workflows_from_config({"workflows": {"wf": {
+        "category": "unknown", "triggers": {"intent": "unknown"},
+        "actions": [{"type": "google_sheets", "depends_on": "send_email"}, {"type": "send_email"}]
+    }}})
+    queue = ActionQueue(engine, str(tmp_path / "jobs.sqlite"))
+    await queue.start()
+    engine.action_queue = queue
+
+    result = await engine.execute_for_call(_context())
+    assert result["actions_completed"] == ["send_email"]  # Has a dependent: inline
+    assert result["actions_queued"] == ["google_sheets"]
+
+    await _drain(queue)
+    assert order == [("start", "send_email"), ("end", "send_email"), ("start", "google_sheets"), ("end", "google_sheets")]
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_same_action_for_same_call_is_queued_once(tmp_path):
+    sms = FakeExecutor()
+    queue = ActionQueue(_engine(send_sms=sms), str(tmp_path / "jobs.sqlite"))
+    await queue.start()
+    action = WorkflowAction(type=ActionType.SEND_SMS, params={"template": "missed_call"}, id="notify")
+
+    assert await queue.enqueue(action, _context()) == "CA1:notify"
+    assert await queue.enqueue(action, _context()) is None
+    assert await queue.enqueue(action, _context("CA2")) == "CA2:notify"
+
+    await _drain(queue)
+    assert sms.calls == 2
+    assert queue.job_key(_context(), action, workflow_id="wf") == "CA1:wf:notify"
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_per_type_concurrency_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ACTION_QUEUE_TYPE_CONCURRENCY", {"google_sheets": 1})
+    sheets, email = FakeExecutor(delay=0.05), FakeExecutor(delay=0.05)
+    queue = ActionQueue(_engine(google_sheets=sheets, send_email=email), str(tmp_path / "jobs.sqlite"))
+    await queue.start()
+
+    for i in range(4):
+        await queue.enqueue(WorkflowAction(type=ActionType.GOOGLE_SHEETS_LOG, params={}), _context(f"CA{i}"))
+        await queue.enqueue(WorkflowAction(type=ActionType.SEND_EMAIL, params={}), _context(f"CA{i}"))
+
+    await _drain(queue)
+    assert (sheets.calls, email.calls) == (4, 4)
+    assert sheets.max_active == 1
+    assert email.max_active > 1
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_retries_with_backoff_then_dead_letters(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ACTION_QUEUE_MAX_ATTEMPTS", 3)
+    flaky, broken = FakeExecutor(failures=2), FakeExecutor(failures=100)
+    queue = ActionQueue(_engine(send_sms=flaky, send_email=broken), str(tmp_path / "jobs.sqlite"))
+    await queue.start()
+
+    await queue.enqueue(WorkflowAction(type=ActionType.SEND_SMS, params={}), _context())
+    await queue.enqueue(WorkflowAction(type=ActionType.SEND_EMAIL, params={}), _context())
+    await _drain(queue)
+
+    assert flaky.calls == 3 and queue.succeeded == 1
+    assert broken.calls == 3 and queue.dead_lettered == 1
+    [dead] = queue.dead_letters()
+    assert dead["job_key"].startswith("CA1:send_email:")
+    assert (dead["attempts"], dead["last_error"]) == (3, "upstream 503")
+
+    # A dead job's key stays claimed
+    assert await queue.enqueue(WorkflowAction(type=ActionType.SEND_EMAIL, params={}), _context()) is None
+    await queue.close()
+
+
+class FailingTwilio:
+    """send_sms raises the given errors in turn"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.sends = 0
+
+    async def send_sms(self, to_number, message):
+        self.sends += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "SM1"
+
+
+@pytest.mark.asyncio
+async def test_ambiguous_sms_failure_is_not_repeated(tmp_path):
+    lost, throttled = SendSMSExecutor(), SendSMSExecutor()
+    lost.twilio_service = FailingTwilio(TwilioAPIError("send_sms", "ReadTimeout", ambiguous=True))
+    throttled.twilio_service = FailingTwilio(TwilioAPIError("send_sms", "Too many requests", status=429))
+    queue = ActionQueue(_engine(send_sms=lost, send_sms_alert=throttled), str(tmp_path / "jobs.sqlite"))
+    await queue.start()
+
+    await queue.enqueue(WorkflowAction(type=ActionType.SEND_SMS, params={"to": "+15550001111"}), _context())
+    await queue.enqueue(WorkflowAction(type=ActionType.SEND_SMS_ALERT, params={"to": "+15550001111"}), _context())
+    await _drain(queue)
+
+    assert lost.twilio_service.sends == 1  # May have been delivered: dead-lettered, not resent
+    [dead] = queue.dead_letters()
+    assert dead["attempts"] == 1 and "ReadTimeout" in dead["last_error"]
+    assert throttled.twilio_service.sends == 2 and queue.succeeded == 1  # Rejected before sending: retried
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_same_type_actions_without_ids_are_all_queued(tmp_path):
+    sms = FakeExecutor()
+    engine = _engine(send_sms=sms)
+    engine.load_workflows_from_config({"workflows": {"wf": {
+        "category": "unknown", "triggers": {"intent": "unknown"},
+        "actions": [
+            {"type": "send_sms", "params": {"to": "user"}},
+            {"type": "send_sms", "params": {"to": "caregiver"}}
+        ]
+    }}})
+    queue = ActionQueue(engine, str(tmp_path / "jobs.sqlite"))
+    await queue.start()
+    engine.action_queue = queue
+
+    result = await engine.execute_for_call(_context())
+    keys = [r["data"]["job_key"] for r in result["results"]]
+    assert keys == ["CA1:wf:send_sms#0", "CA1:wf:send_sms#1"]
+
+    await _drain(queue)
+    assert sms.calls == 2
+
+    # Re-running the workflow for the same call is still a no-op
+    result = await engine.execute_for_call(_context())
+    assert all(r["data"]["duplicate"] for r in result["results"])
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_prunes_finished_jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ACTION_QUEUE_DONE_RETENTION_HOURS", 0)
+    queue = ActionQueue(_engine(send_sms=FakeExecutor()), str(tmp_path / "jobs.sqlite"))
+    await queue.start()
+    await queue.enqueue(WorkflowAction(type=ActionType.SEND_SMS, params={}), _context())
+    await _drain(queue)
+    assert queue.get_stats()["jobs"] == {"done": 1}
+
+    queue._last_prune = 0.0  # Prune interval elapsed
+    queue._wake.set()
+    await asyncio.sleep(0.05)
+    assert queue.get_stats()["jobs"] == {}
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_interrupted_jobs_run_after_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    slow = FakeExecutor(delay=10)
+    queue = ActionQueue(_engine(send_sms=slow), path)
+    await queue.start()
+    await queue.enqueue(WorkflowAction(type=ActionType.SEND_SMS, params={"to": "+1555"}), _context())
+    while not slow.calls:
+        await asyncio.sleep(0.01)
+    await queue.close()  # Shutdown mid-job
+
+    fast = FakeExecutor()
+    restarted = ActionQueue(_engine(send_sms=fast), path)
+    await restarted.start()
+    await _drain(restarted)
+    assert restarted.recovered == 1
+    assert fast.calls == 1 and restarted.succeeded == 1
+    await restarted.close()
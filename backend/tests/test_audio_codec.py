@@ -0,0 +1,56 @@
+"""
+Audio codec tests
+NumPy mu-law tables must match audioop bit-for-bit
+"""
+
+import base64
+import os
+import warnings
+
+import numpy as np
+import pytest
+
+from app.services import audio_codec
+from app.services.audio_codec import FRAME_SAMPLES, MulawCodec
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    audioop = pytest.importorskip("audioop")  # Removed in Python 3.13
+
+ALL_PCM = np.arange(-32768, 32768, dtype=np.int16).tobytes()
+ALL_MULAW = bytes(range(256))
+
+
+def test_tables_match_audioop():
+    assert audio_codec.lin2ulaw(ALL_PCM) == audioop.lin2ulaw(ALL_PCM, 2)
+    assert audio_codec.ulaw2lin(ALL_MULAW) == audioop.ulaw2lin(ALL_MULAW, 2)
+
+
+def test_rms_matches_audioop():
+    pcm = os.urandom(FRAME_SAMPLES * 2)
+    assert audio_codec.rms(pcm) == audioop.rms(pcm, 2)
+    assert audio_codec.rms(b"") == 0
+
+
+def test_codec_payload_roundtrip_reuses_buffers():
+    codec = MulawCodec()
+    frame = os.urandom(FRAME_SAMPLES)
+    payload = base64.b64encode(frame).decode()
+
+    pcm = codec.decode_payload(payload)
+    assert bytes(pcm) == audioop.ulaw2lin(frame, 2)
+    assert codec.encode_payload(pcm) == base64.b64encode(audioop.lin2ulaw(bytes(pcm), 2)).decode()
+
+    # Same scratch buffer for the next frame: no per-frame allocation
+    assert np.shares_memory(np.frombuffer(codec.decode(frame), np.int16), codec._pcm)
+
+
+def test_batched_frames_match_single_frame_codec():
+    frames = [os.urandom(FRAME_SAMPLES) for _ in range(8)]
+
+    pcm = audio_codec.decode_frames(frames)
+    mulaw = audio_codec.encode_frames(pcm)
+
+    assert pcm.shape == (8, FRAME_SAMPLES)
+    assert pcm.tobytes() == audioop.ulaw2lin(b"".join(frames), 2)
+    assert mulaw.tobytes() == audioop.lin2ulaw(pcm.tobytes(), 2)
@@ -0,0 +1,237 @@
+"""
+Database layer tests
+DatabaseService against the local SQLite stand-in (DATABASE_BACKEND=local)
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.database import DatabaseService
+from app.services.local_db import LocalAPIError, LocalDatabaseClient
+
+
+@pytest.fixture
+def db():
+    service = DatabaseService()
+    service.client = LocalDatabaseClient(":memory:")
+    yield service
+    asyncio.run(service.close())
+
+
+# ============================================================================
+# LOCAL STAND-IN (PostgREST builder API)
+# ============================================================================
+
+def test_local_client_filters_orders_and_limits():
+    client = LocalDatabaseClient(":memory:")
+    client.table("calls").insert([
+        {"user_id": "u1", "call_sid": "CA1", "scam_score": 0.9, "started_at": "2026-01-01"},
+        {"user_id": "u1", "call_sid": "CA2", "scam_score": 0.1, "started_at": "2026-01-03"},
+        {"user_id": "u2", "call_sid": "CA3", "scam_score": 0.5, "started_at": "2026-01-02"},
+    ]).execute()
+
+    response = (
+        client.table("calls")
+        .select("call_sid", count="exact")
+        .in_("user_id", ["u1", "u2"])
+        .gte("scam_score", 0.5)
+        .order("started_at", desc=True)
+        .limit(1)
+        .execute()
+    )
+
+    assert response.data == [{"call_sid": "CA3"}]
+    assert response.count == 2
+
+
+def test_local_client_creates_its_directory(tmp_path):
+    client = LocalDatabaseClient(str(tmp_path / "data" / "local_db.sqlite"))  # Fresh checkout: no data/ yet
+    client.table("calls").insert({"call_sid": "CA1"}).execute()
+
+    assert client.table("calls").select("call_sid").execute().data == [{"call_sid": "CA1"}]
+    assert client.connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    client.close()
+
+
+def test_local_client_upsert_and_single():
+    client = LocalDatabaseClient(":memory:")
+    client.table("call_transcripts").upsert({"call_id": "c1", "transcript": "hi"}, on_conflict="call_id").execute()
+    client.table("call_transcripts").upsert({"call_id": "c1", "transcript": "hi there"}, on_conflict="call_id").execute()
+
+    row = client.table("call_transcripts").select("*").eq("call_id", "c1").single().execute().data
+
+    assert row["transcript"] == "hi there"
+    with pytest.raises(LocalAPIError):
+        client.table("call_transcripts").select("*").eq("call_id", "missing").single().execute()
+
+
+# ============================================================================
+# DATABASE SERVICE
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_call_lifecycle(db):
+    await db.create_call(user_id="u1", caller_number="+15551234567", call_sid="CA1")
+    await db.update_call("CA1", status="completed", scam_score=0.2, transcript="Hello")
+
+    call = await db.get_call_by_sid("CA1")
+    transcript = await db.execute(db.client.table("call_transcripts").select("*").eq("call_id", call["id"]))
+
+    assert call["status"] == "completed"
+    assert call["scam_score"] == 0.2
+    assert transcript.data[0]["transcript"] == "Hello"
+
+
+@pytest.mark.asyncio
+async def test_queries_do_not_block_event_loop(db):
+    """Slow queries run on the worker pool while the loop keeps ticking"""
+
+    class SlowQuery:
+        def execute(self):
+            time.sleep(0.1)
+            return "done"
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticking = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    results = await asyncio.gather(*(db.execute(SlowQuery()) for _ in range(4)))
+    elapsed = time.perf_counter() - start
+    ticking.cancel()
+
+    assert results == ["done"] * 4
+    assert elapsed < 0.3  # Ran concurrently, not 4 × 0.1s back to back
+    assert ticks >= 5
+
+
+# ============================================================================
+# READ-THROUGH LOOKUP CACHE
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_user_lookup_is_cached_including_not_found(db):
+    db.client.table("users").insert({"id": "u1", "twilio_phone_number": "+15550000001"}).execute()
+
+    first = await db.get_user_by_twilio_number("+15550000001")
+    first["mutated"] = True
+    second = await db.get_user_by_twilio_number("+15550000001")
+    assert await db.get_user_by_twilio_number("+15559999999") is None
+    assert await db.get_user_by_twilio_number("+15559999999") is None
+
+    stats = db.get_cache_stats()["users"]
+    assert second["id"] == "u1" and "mutated" not in second
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+
+
+@pytest.mark.asyncio
+async def test_lookup_errors_are_not_cached(db):
+    """A failed query returns None but the next lookup retries the database"""
+    db.client.table("contacts").insert({"user_id": "u1", "phone_number": "+15551112222", "name": "Mom"}).execute()
+    execute, queries = db.execute, []
+
+    async def flaky_execute(query):
+        queries.append(query)
+        if len(queries) == 1:
+            raise ConnectionError("connection dropped")
+        return await execute(query)
+
+    db.execute = flaky_execute
+    assert await db.get_contact_by_phone("u1", "+15551112222") is None
+
+    contact = await db.get_contact_by_phone("u1", "+15551112222")
+    assert len(queries) == 2  # The error was not cached: second lookup reached the database
+    assert contact["name"] == "Mom"
+
+
+@pytest.mark.asyncio
+async def test_create_voice_profile_invalidates_cached_profile(db):
+    await db.create_voice_profile("u1", voice_id="v1", voice_name="First")
+    assert (await db.get_voice_profile("u1"))["voice_id"] == "v1"
+
+    await db.create_voice_profile("u1", voice_id="v2", voice_name="Second")
+
+    assert (await db.get_voice_profile("u1"))["voice_id"] == "v2"
+
+
+# ============================================================================
+# ANALYTICS ROLLUPS
+# ============================================================================
+
+async def _rollup(db, user_id="u1"):
+    rows = await db.get_call_analytics(user_id)
+    assert len(rows) == 1
+    return rows[0]
+
+
+@pytest.mark.asyncio
+async def test_call_writes_roll_up_without_double_counting(db):
+    await db.create_call(user_id="u1", caller_number="+15551234567", call_sid="CA1", intent="unknown")
+    await db.update_call("CA1", status="screening", scam_score=0.4)
+    await db.update_call("CA1", status="blocked", intent="scam")
+    await db.update_call("CA1", updates={"duration_seconds": 90})
+    await db.update_call("CA1", status="blocked")  # No facet change: no RPC, no drift
+
+    row = await _rollup(db)
+
+    assert row["total_calls"] == 1
+    assert row["scams_blocked"] == 1
+    assert row["unknown_screened"] == 0
+    assert row["intent_counts"] == {"unknown": 0, "scam": 1}
+    assert (row["duration_seconds_total"], row["duration_count"], row["avg_call_duration_seconds"]) == (90, 1, 90)
+
+
+@pytest.mark.asyncio
+async def test_rollup_diffs_against_stored_row_on_cold_cache(db):
+    await db.create_call(user_id="u1", caller_number="+15551234567", call_sid="CA1", intent="sales")
+
+    restarted = DatabaseService()  # New process: no in-memory rollup state
+    restarted.client = db.client
+    await restarted.update_call("CA1", status="blocked")
+
+    row = await _rollup(db)
+    assert (row["total_calls"], row["sales_blocked"]) == (1, 1)
+    await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_rollup_stays_exact_across_instances(db):
+    """Deltas are computed against the stored row, not per-process state"""
+    other = DatabaseService()  # Second worker/instance sharing the database
+    other.client = db.client
+    await db.create_call(user_id="u1", caller_number="+15551234567", call_sid="CA1", intent="unknown")
+
+    await db.update_call("CA1", status="blocked", intent="scam")
+    await other.update_call("CA1", intent="sales")
+    await db.update_call("CA1", status="blocked", intent="scam")
+
+    row = await _rollup(db)
+    assert (row["total_calls"], row["scams_blocked"], row["sales_blocked"]) == (1, 1, 0)
+    assert row["intent_counts"] == {"unknown": 0, "scam": 1, "sales": 0}
+    await other.close()
+
+
+@pytest.mark.asyncio
+async def test_dashboard_reads_rollups(db, monkeypatch):
+    from app.routers import analytics
+
+    monkeypatch.setattr(analytics, "db_service", db)
+    await db.create_call(user_id="u1", caller_number="+1", call_sid="CA1", intent="scam", status="blocked")
+    await db.create_call(user_id="u1", caller_number="+2", call_sid="CA2", intent="scam", status="ended")
+    await db.update_call("CA2", updates={"duration_seconds": 30})
+    db.client.table("calls").insert({"user_id": "u1", "call_sid": "CA3"}).execute()  # Not counted: bypasses rollups
+
+    stats = await analytics.get_dashboard_stats(user_id="u1")
+
+    assert stats["total_calls"] == 2
+    assert stats["today_calls"] == 2
+    assert stats["scams_blocked"] == 1
+    assert stats["block_rate"] == 0.5
+    assert stats["avg_call_duration"] == 30
@@ -0,0 +1,90 @@
+"""
+Shared HTTP client tests
+Pool reuse, per-host concurrency limits and metrics (fake transport, no network)
+"""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.http_client import SharedHttpClient
+
+
+@pytest.mark.asyncio
+async def test_requests_share_one_client_and_record_stats():
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.host)
+        return httpx.Response(200, text="<Response/>")
+
+    client = SharedHttpClient(transport=httpx.MockTransport(handler))
+    await client.start()
+    first = client._client
+
+    response = await client.post("https://api.elevenlabs.io/v1/convai/twilio/register-call", json={})
+    await client.get("https://www.googleapis.com/customsearch/v1")
+
+    stats = client.get_stats()
+    assert response.text == "<Response/>"
+    assert client._client is first
+    assert seen == ["api.elevenlabs.io", "www.googleapis.com"]
+    assert stats["hosts"]["api.elevenlabs.io"]["requests"] == 1
+    assert stats["in_flight"] == 0
+
+    await client.close()
+    assert client.get_stats()["started"] is False
+
+
+@pytest.mark.asyncio
+async def test_per_host_limit_caps_concurrency(monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_MAX_CONNECTIONS_PER_HOST", 2)
+    active = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return httpx.Response(200)
+
+    client = SharedHttpClient(transport=httpx.MockTransport(handler))
+    await asyncio.gather(*(client.get("https://slow.example.com/") for _ in range(6)))
+
+    assert peak == 2
+    assert client.get_stats()["hosts"]["slow.example.com"]["max_in_flight"] == 2
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_client_from_another_loop_is_released():
+    client = SharedHttpClient(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+
+    # Opened on a loop that is still running elsewhere: closed on that loop
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(client.start(), other).result(timeout=5)
+    stale = client._client
+
+    await client.get("https://api.example.com/")
+    await asyncio.sleep(0.05)
+    assert stale.is_closed and client._client is not stale
+    other.call_soon_threadsafe(other.stop)
+    thread.join(timeout=5)
+    other.close()
+
+    # Opened on a loop that has finished: dropped, not reused
+    thread = threading.Thread(target=asyncio.run, args=(client.start(),))
+    thread.start()
+    thread.join(timeout=5)
+    await client.get("https://api.example.com/")
+    await asyncio.sleep(0.05)  # The first test-loop client closes here
+
+    assert client.get_stats()["replaced_clients"] == 3
+    await client.close()
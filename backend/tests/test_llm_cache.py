@@ -0,0 +1,163 @@
+"""
+LLM result cache tests
+TTLCache behaviour and Gemini verdict reuse (fake model, no API calls)
+"""
+
+import time
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.services.gemini_service import GeminiService
+
+
+class FakeModel:
+    """Stands in for genai.GenerativeModel and counts requests"""
+
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        self.calls += 1
+        return self
+
+
+def make_service():
+    service = GeminiService()
+    service._initialized = True
+    service.fast_model = FakeModel('{"intent": "sales", "confidence": 0.9, "reasoning": "", "should_pass_through": false}')
+    service.analysis_model = FakeModel('{"is_scam": false, "scam_type": null, "confidence": 0.2, "red_flags": [], "recommendation": "allow"}')
+    return service
+
+
+# ============================================================================
+# TTL CACHE
+# ============================================================================
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(max_size=10, ttl_seconds=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.get_stats()["expirations"] == 1
+    assert cache.get_stats()["misses"] == 1
+
+
+# ============================================================================
+# GEMINI VERDICT CACHE
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_identical_prompt_inputs_hit_cache():
+    """Whitespace/case differences normalize to the same cache key"""
+    service = make_service()
+
+    first = await service.classify_caller_intent("Hi, I'm calling about  your car warranty")
+    first["next_question"] = "mutated by caller"
+    second = await service.classify_caller_intent("hi, i'm calling about your car warranty")
+
+    assert service.fast_model.calls == 1
+    assert "next_question" not in second
+    assert service.get_cache_stats()["intent"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_small_harmless_delta_reuses_call_verdict():
+    """A few appended words without red flags reuse the call's last verdict"""
+    service = make_service()
+
+    await service.analyze_scam_indicators("Hello, this is Dana from the dentist", "+15551234567", call_sid="CA1")
+    await service.analyze_scam_indicators("Hello, this is Dana from the dentist office, hi", "+15551234567", call_sid="CA1")
+
+    assert service.analysis_model.calls == 1
+    assert service.get_cache_stats()["delta_reuse_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_new_red_flag_forces_fresh_verdict():
+    """A red-flag phrase in the delta always goes back to the LLM"""
+    service = make_service()
+
+    await service.analyze_scam_indicators("Hello, this is Dana from the", "+15551234567", call_sid="CA2")
+    await service.analyze_scam_indicators("Hello, this is Dana from the IRS", "+15551234567", call_sid="CA2")
+
+    assert service.analysis_model.calls == 2
+
+
+# ============================================================================
+# EMBEDDINGS
+# ============================================================================
+
+class FakeEmbedder:
+    """Stands in for genai.embed_content_async and records each batch"""
+
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, model, content, task_type=None):
+        self.batches.append(list(content))
+        return {"embedding": [[float(len(text)), 1.0] for text in content]}
+
+
+@pytest.fixture
+def embedder(monkeypatch, tmp_path):
+    from app.services import gemini_service
+
+    monkeypatch.setattr(gemini_service.settings, "EMBEDDING_CACHE_PATH", str(tmp_path / "embeddings.sqlite"))
+    monkeypatch.setattr(gemini_service.settings, "EMBEDDING_BATCH_SIZE", 2)
+    fake = FakeEmbedder()
+    monkeypatch.setattr(gemini_service.genai, "embed_content_async", fake)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_embed_many_dedupes_and_batches(embedder):
+    service = make_service()
+
+    vectors = await service.embed_many(["irs", "gift cards", "irs", "  gift   cards ", "bail"])
+
+    assert vectors[0] == vectors[2] == [3.0, 1.0]
+    assert vectors[1] == vectors[3] == [10.0, 1.0]
+    assert sorted(len(batch) for batch in embedder.batches) == [1, 2]  # 3 unique texts, batches of 2
+
+
+@pytest.mark.asyncio
+async def test_embeddings_persist_across_restarts(embedder):
+    first = make_service()
+    await first.embed_many(["irs", "bail"])
+    first.embedding_cache.close()
+
+    restarted = make_service()
+    assert await restarted.generate_embeddings("irs") == [3.0, 1.0]
+    assert await restarted.embed_many(["bail", "warrant"]) == [[4.0, 1.0], [7.0, 1.0]]
+
+    assert embedder.batches == [["irs", "bail"], ["warrant"]]
+    assert restarted.get_cache_stats()["embeddings"]["disk_hits"] == 2
+
+
+def test_embedding_file_is_capped(tmp_path):
+    from app.services.embedding_cache import _PRUNE_EVERY, EmbeddingCache
+
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"), memory_entries=1, max_rows=10)
+    for batch in range(3):
+        cache.put_many({f"k{batch}-{i}": [float(i)] for i in range(_PRUNE_EVERY // 2)})
+        time.sleep(0.001)  # Distinct created_at per batch
+
+    rows = cache._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    assert rows <= 10 + _PRUNE_EVERY
+    assert cache.get_stats()["pruned"] > 0
+    assert f"k2-{_PRUNE_EVERY // 2 - 1}" in cache.get_many([f"k2-{_PRUNE_EVERY // 2 - 1}"])  # Newest kept
+    cache.close()
@@ -0,0 +1,142 @@
+"""
+Local intelligence tests
+Phrase matcher correctness and fast-path scam scoring (no API calls)
+"""
+
+from app.services.phrase_matcher import PhraseMatcher
+from app.services.local_intelligence import LocalIntelligence
+
+
+# ============================================================================
+# PHRASE MATCHER
+# ============================================================================
+
+def test_matcher_reports_every_category_with_offset():
+    """One scan returns hits from every phrase list with their offsets"""
+    matcher = PhraseMatcher({
+        "irs": ["irs", "tax refund"],
+        "urgency": ["immediately"],
+    })
+
+    matches = matcher.scan("This is the IRS, pay IMMEDIATELY")
+
+    assert [(m.category, m.phrase, m.offset) for m in matches] == [
+        ("irs", "irs", 12),
+        ("urgency", "immediately", 21),
+    ]
+
+
+def test_matcher_finds_overlapping_phrases():
+    """Prefixes, suffixes and repeated phrases are all reported"""
+    matcher = PhraseMatcher({
+        "ssa": ["social security", "social security number", "security"],
+        "legal": ["warrant", "arrest warrant"],
+    })
+
+    found = {(m.phrase, m.offset) for m in matcher.scan("social security number, arrest warrant")}
+
+    assert found == {
+        ("social security", 0),
+        ("social security number", 0),
+        ("security", 7),
+        ("arrest warrant", 24),
+        ("warrant", 31),
+    }
+
+
+def test_matcher_same_phrase_in_several_categories():
+    """A phrase listed under two categories yields one hit per category"""
+    matcher = PhraseMatcher({"financial": ["wire transfer"], "money": ["wire transfer"]})
+
+    assert {m.category for m in matcher.scan("send a wire transfer")} == {"financial", "money"}
+
+
+# ============================================================================
+# FAST ANALYSIS
+# ============================================================================
+
+def test_analyze_fast_flags_scam_with_offsets():
+    """Keyword + pattern hits produce red flags and match offsets"""
+    intelligence = LocalIntelligence()
+
+    result = intelligence.analyze_fast("This is the IRS. There is a warrant. Pay with a gift card immediately.")
+
+    assert result["is_scam"] is True
+    assert result["scam_type"] == "irs"
+    assert "irs:irs" in result["red_flags"]
+    assert "urgency_language" in result["red_flags"]
+    assert {"category": "irs", "phrase": "irs", "offset": 12} in result["matches"]
+
+
+def test_analyze_fast_handles_long_transcripts():
+    """10k-character transcripts are scanned end to end (timing: benchmarks/bench_local_intelligence.py)"""
+    intelligence = LocalIntelligence()
+    benign = ("Caller: Hi, just checking in about dinner on Friday. " * 200)[:10000]
+    scam = benign[:-100] + " Pay with a gift card or there is a warrant."
+
+    assert intelligence.analyze_fast(benign)["is_scam"] is False
+    assert "warrant" in " ".join(intelligence.analyze_fast(scam)["red_flags"])
+
+
+# ============================================================================
+# INCREMENTAL (STREAMING) ANALYSIS
+# ============================================================================
+
+def test_incremental_matches_full_analysis():
+    """Feeding a growing transcript gives the same verdict as a full re-scan"""
+    intelligence = LocalIntelligence()
+    updates = [
+        "Hello, this is the social sec",
+        "Hello, this is the social security administration. Your ben",
+        "Hello, this is the social security administration. Your benefits suspended, call 555-123-4567",
+        "Hello, this is the social security administration. Your benefits suspended, call 555-123-4567 immediately.",
+    ]
+
+    for transcript in updates:
+        incremental = intelligence.analyze_incremental("CA_stream", transcript)
+        full = intelligence.analyze_fast(transcript)
+
+        assert incremental["scam_score"] == full["scam_score"]
+        assert incremental["red_flags"] == full["red_flags"]
+        assert incremental["matches"] == full["matches"]
+
+
+def test_incremental_only_scans_new_suffix():
+    """Each update reports how much new text it had to scan"""
+    intelligence = LocalIntelligence()
+
+    first = intelligence.analyze_incremental("CA_delta", "Hi there, ")
+    second = intelligence.analyze_incremental("CA_delta", "Hi there, it's the IRS")
+    repeat = intelligence.analyze_incremental("CA_delta", "Hi there, it's the IRS")
+
+    assert first["new_chars"] == 10
+    assert second["new_chars"] == 12
+    assert repeat["new_chars"] == 0
+    assert "irs:irs" in repeat["red_flags"]
+
+
+def test_end_stream_evicts_call_state():
+    """call_ended drops the per-call state; a rewritten transcript starts over"""
+    intelligence = LocalIntelligence()
+    intelligence.analyze_incremental("CA_end", "Pay with gift cards")
+
+    intelligence.end_stream("CA_end")
+    result = intelligence.analyze_incremental("CA_end", "Hello")
+
+    assert result["new_chars"] == 5
+    assert result["red_flags"] == []
+
+
+def test_late_update_after_call_end_does_not_recreate_stream():
+    """Analyses finishing after call_ended are stateless; tombstones expire"""
+    intelligence = LocalIntelligence()
+    intelligence.analyze_incremental("CA_late", "Pay with gift cards")
+    intelligence.end_stream("CA_late")
+
+    result = intelligence.analyze_incremental("CA_late", "Pay with gift cards now")
+    assert result["red_flags"] == intelligence.analyze_fast("Pay with gift cards now")["red_flags"]
+    assert "CA_late" not in intelligence._streams
+
+    intelligence.ENDED_STREAM_TTL_SECONDS = 0
+    intelligence.end_stream("CA_other")
+    assert list(intelligence._ended) == []
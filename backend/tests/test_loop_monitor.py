@@ -0,0 +1,108 @@
+"""
+Event loop monitor tests
+Lag histogram, blocking call-site capture and the runtime /debug/loop switch
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.loop_monitor import LagHistogram, LoopMonitor, loop_monitor
+from app.routers import debug
+
+
+def blocking_handler():
+    time.sleep(0.25)  # The kind of sync call hiding in an async path
+
+
+def test_histogram_buckets_and_percentiles():
+    histogram = LagHistogram()
+    for value in [0.5] * 98 + [30, 4000]:
+        histogram.observe(value)
+
+    stats = histogram.as_dict()
+    assert stats["buckets"]["le_1ms"] == 98
+    assert stats["buckets"]["le_50ms"] == 1
+    assert stats["buckets"]["gt_2500ms"] == 1
+    assert (stats["p50_ms"], stats["p99_ms"], stats["max_ms"]) == (1, 50, 4000)
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_site_is_captured():
+    monitor = LoopMonitor()
+    await monitor.enable(interval_ms=10, threshold_ms=50)
+    await asyncio.sleep(0.05)
+
+    blocking_handler()
+    await asyncio.sleep(0.05)
+    await monitor.disable()
+
+    stats = monitor.get_stats()
+    assert stats["stalls"] >= 1
+    assert stats["lag"]["max_ms"] >= 200
+    [site] = [site for site in stats["top_sites"] if "blocking_handler" in site["site"]]
+    assert site["count"] == 1 and site["max_ms"] >= 200
+    assert any("time.sleep(0.25)" in line for line in site["last_stack"])
+
+
+@pytest.mark.asyncio
+async def test_idle_loop_records_lag_but_no_stalls():
+    monitor = LoopMonitor()
+    await monitor.enable(interval_ms=5, threshold_ms=100)
+    await asyncio.sleep(0.1)
+    await monitor.disable()
+
+    stats = monitor.get_stats()
+    assert stats["enabled"] is False
+    assert stats["lag"]["count"] >= 5
+    assert stats["stalls"] == 0 and stats["top_sites"] == []
+
+
+@pytest.fixture
+def debug_client(monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG_ADMIN_TOKEN", "s3cret")
+    app = FastAPI()
+    app.include_router(debug.router, prefix="/debug")
+
+    with TestClient(app, headers={"X-Admin-Token": "s3cret"}) as client:
+        yield client
+    loop_monitor.reset()
+
+
+def test_debug_endpoint_switches_monitor_at_runtime(debug_client):
+    client = debug_client
+    assert client.get("/debug/loop").json()["enabled"] is False
+
+    response = client.post("/debug/loop", json={"enabled": True, "sample_interval_ms": 10, "block_threshold_ms": 40})
+    assert response.json()["enabled"] is True
+    assert response.json()["block_threshold_ms"] == 40
+
+    time.sleep(0.1)
+    assert client.get("/debug/loop").json()["lag"]["count"] > 0
+
+    assert client.post("/debug/loop", json={"enabled": False, "reset": True}).json()["enabled"] is False
+    assert client.get("/debug/loop").json()["lag"]["count"] == 0
+
+
+def test_debug_endpoint_requires_admin_token_and_sane_settings(debug_client, monkeypatch):
+    assert debug_client.get("/debug/loop", headers={"X-Admin-Token": "wrong"}).status_code == 401
+    assert debug_client.post("/debug/loop", json={"enabled": True, "sample_interval_ms": 0.001}).status_code == 422
+
+    monkeypatch.setattr(settings, "DEBUG_ADMIN_TOKEN", None)  # No token configured: nothing gets in
+    assert debug_client.get("/debug/loop").status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_concurrent_enable_leaves_one_sampler():
+    monitor = LoopMonitor()
+    await asyncio.gather(*(monitor.enable(interval_ms=5, threshold_ms=50) for _ in range(5)))
+
+    samplers = [task for task in asyncio.all_tasks() if task.get_coro().__qualname__ == "LoopMonitor._sample"]
+    assert samplers == [monitor._task]
+    await monitor.disable()
+    assert not [thread for thread in threading.enumerate() if thread.name == "loop-monitor"]
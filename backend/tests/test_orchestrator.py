@@ -0,0 +1,176 @@
+"""
+Orchestrator tests
+Cascade tiers: the local score decides clear-cut calls before any Gemini call
+Single-flight: concurrent analyses of one call coalesce
+"""
+
+import asyncio
+
+import pytest
+
+from app.agents.orchestrator import CallContext, GatekeeperOrchestrator, SingleFlight
+
+
+class FakeScamDetector:
+    """Stands in for the Gemini-backed ScamDetectorAgent and counts calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def run(self, transcript, caller_number, call_sid=None):
+        self.calls += 1
+        return {"is_scam": False, "scam_type": None, "confidence": 0.5,
+                "red_flags": [], "recommendation": "flag"}
+
+
+class FakeScreener:
+    """Stands in for the Gemini-backed ScreenerAgent and counts calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def classify_intent(self, transcript, caller_name=None, call_sid=None):
+        self.calls += 1
+        return {"intent": "friend", "confidence": 0.9, "reasoning": "",
+                "should_pass_through": True, "next_question": None}
+
+
+def make_orchestrator():
+    orchestrator = GatekeeperOrchestrator()
+    orchestrator.agents["scam_detector"] = FakeScamDetector()
+    orchestrator.agents["screener"] = FakeScreener()
+    return orchestrator
+
+
+def make_context(call_sid, transcript):
+    return CallContext(user_id="user_1", user_name="Sarah", caller_number="+15551234567",
+                       call_sid=call_sid, transcript=transcript)
+
+
+@pytest.mark.asyncio
+async def test_cascade_blocks_obvious_scam_without_llm():
+    """A decisive local score skips both Gemini agents"""
+    orchestrator = make_orchestrator()
+    transcript = ("This is the IRS. There is a warrant for your arrest. "
+                  "Pay with gift cards immediately and confirm your social security number.")
+
+    analysis = await orchestrator.analyze_call_parallel(make_context("CA_scam", transcript))
+
+    assert analysis["tier"] == "local_scam"
+    assert analysis["scam"]["is_scam"] is True
+    assert analysis["intent"]["intent"] == "scam"
+    assert orchestrator.agents["scam_detector"].calls == 0
+    assert orchestrator.agents["screener"].calls == 0
+
+
+@pytest.mark.asyncio
+async def test_cascade_benign_call_only_classifies_intent():
+    """No local scam signals: intent is still classified, scam LLM is skipped"""
+    orchestrator = make_orchestrator()
+
+    analysis = await orchestrator.analyze_call_parallel(
+        make_context("CA_benign", "Hi, it's Mike, just calling about dinner on Friday.")
+    )
+
+    assert analysis["tier"] == "local_benign"
+    assert analysis["intent"]["intent"] == "friend"
+    assert orchestrator.agents["scam_detector"].calls == 0
+    assert orchestrator.agents["screener"].calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cascade_escalates_uncertain_band():
+    """Scores between the thresholds reach both Gemini agents and are counted"""
+    orchestrator = make_orchestrator()
+
+    analysis = await orchestrator.analyze_call_parallel(
+        make_context("CA_unsure", "Hello, I'm calling about your bitcoin account.")
+    )
+
+    assert analysis["tier"] == "llm"
+    assert orchestrator.agents["scam_detector"].calls == 1
+    assert orchestrator.agents["screener"].calls == 1
+    assert orchestrator.get_stats()["tiers"]["llm"] == 1
+
+
+# ============================================================================
+# SINGLE-FLIGHT
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_burst_into_one_rerun():
+    """A burst during an in-flight run costs one follow-up run on the newest input"""
+    flights = SingleFlight()
+    release = asyncio.Event()
+    seen = []
+
+    async def analyze(transcript):
+        seen.append(transcript)
+        await release.wait()
+        return transcript
+
+    first = asyncio.create_task(flights.run("CA1", analyze, "t1"))
+    await asyncio.sleep(0)
+    burst = [asyncio.create_task(flights.run("CA1", analyze, f"t{i}")) for i in range(2, 6)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(first, *burst)
+
+    assert seen == ["t1", "t5"]
+    assert results == [("t1", True), ("t5", False), ("t5", False), ("t5", False), ("t5", True)]
+    assert flights.get_stats() == {"name": "single_flight", "in_flight": 0, "runs": 2, "coalesced": 4}
+
+
+@pytest.mark.asyncio
+async def test_single_flight_keys_are_independent_and_errors_propagate():
+    """Different calls run concurrently; a failing run raises to its waiters only"""
+    flights = SingleFlight()
+
+    async def analyze(transcript):
+        if transcript == "boom":
+            raise ValueError("analysis failed")
+        return transcript
+
+    ok, failed = await asyncio.gather(
+        flights.run("CA1", analyze, "fine"),
+        flights.run("CA2", analyze, "boom"),
+        return_exceptions=True
+    )
+
+    assert ok == ("fine", True)
+    assert isinstance(failed, ValueError)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_without_key_is_not_coalesced():
+    flights = SingleFlight()
+
+    async def analyze(transcript):
+        await asyncio.sleep(0.01)
+        return transcript
+
+    results = await asyncio.gather(flights.run(None, analyze, "a"), flights.run(None, analyze, "b"))
+
+    assert results == [("a", True), ("b", True)]
+    assert flights.get_stats()["coalesced"] == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancelled_run_releases_waiters():
+    flights = SingleFlight()
+
+    async def analyze(transcript):
+        await asyncio.sleep(10)
+
+    first = asyncio.create_task(flights.run("CA1", analyze, "t1"))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(flights.run("CA1", analyze, "t2"))
+    await asyncio.sleep(0)
+
+    [driver] = flights._tasks
+    driver.cancel()
+    results = await asyncio.gather(first, waiter, return_exceptions=True)
+
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert flights.get_stats()["in_flight"] == 0 and not flights._tasks
@@ -0,0 +1,123 @@
+"""
+Outbound audio queue tests
+Ordering, coalescing, drop-oldest backpressure and barge-in clear
+"""
+
+import asyncio
+import base64
+import json
+
+import pytest
+
+from app.routers.telephony import OutboundAudioQueue, get_outbound_audio_stats
+
+
+class FakeSocket:
+    """Collects messages; optionally blocks until released (slow Twilio socket)"""
+
+    def __init__(self, blocked=False):
+        self.messages = []
+        self.release = asyncio.Event()
+        if not blocked:
+            self.release.set()
+
+    async def send_text(self, text):
+        await self.release.wait()
+        self.messages.append(json.loads(text))
+
+    def payloads(self):
+        return [base64.b64decode(m["media"]["payload"]) for m in self.messages if m["event"] == "media"]
+
+
+async def drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_adjacent_frames_are_coalesced_in_order():
+    socket = FakeSocket()
+    queue = OutboundAudioQueue(max_buffered_ms=1000, coalesce_ms=40)  # 40ms = 320 bytes
+    queue.start(socket.send_text, "MZ123")
+
+    for i in range(5):
+        queue.put(bytes([i]) * 160)
+    await drain()
+
+    assert socket.payloads() == [bytes([0]) * 160 + bytes([1]) * 160,
+                                 bytes([2]) * 160 + bytes([3]) * 160,
+                                 bytes([4]) * 160]
+    assert socket.messages[0]["streamSid"] == "MZ123"
+    assert queue.depth_bytes == 0
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_socket_drops_oldest_audio():
+    socket = FakeSocket(blocked=True)
+    queue = OutboundAudioQueue(max_buffered_ms=60, coalesce_ms=20)  # Room for 3 frames
+    queue.start(socket.send_text, "MZ123")
+
+    queue.put(bytes([0]) * 160)
+    await drain()  # Frame 0 is now in flight, stuck on the socket
+    for i in range(1, 6):
+        queue.put(bytes([i]) * 160)
+
+    assert queue.depth_bytes == 480
+    assert queue.get_stats()["dropped_bytes"] == 320
+
+    socket.release.set()
+    await drain()
+
+    assert [p[0] for p in socket.payloads()] == [0, 3, 4, 5]
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_barge_in_clears_queue_and_sends_clear_event():
+    socket = FakeSocket(blocked=True)
+    queue = OutboundAudioQueue(max_buffered_ms=1000, coalesce_ms=20)
+    queue.start(socket.send_text, "MZ123")
+
+    queue.put(bytes([0]) * 160)
+    await drain()
+    queue.put(bytes([1]) * 160)
+    queue.put(bytes([2]) * 160)
+
+    queue.clear()
+    assert queue.depth_bytes == 0
+
+    socket.release.set()
+    await drain()
+
+    assert [m["event"] for m in socket.messages] == ["media", "clear"]
+    assert queue.get_stats()["cleared_bytes"] == 320
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_send_stops_writer_and_reports_it():
+    errors = []
+
+    async def broken_send(text):
+        raise RuntimeError("socket closed")
+
+    async def on_error(error):
+        errors.append(str(error))
+
+    before = get_outbound_audio_stats()
+    queue = OutboundAudioQueue(max_buffered_ms=1000, coalesce_ms=20)
+    queue.start(broken_send, "MZ123", on_error=on_error)
+    queue.put(bytes([0]) * 160)
+    queue.put(bytes([1]) * 160)
+    await drain()
+
+    assert errors == ["socket closed"]
+    assert queue.started is False
+    assert (queue.depth_bytes, queue.get_stats()["dropped_bytes"], queue.writer_failures) == (0, 160, 1)
+
+    await queue.close()
+    await queue.close()  # Counted once
+    after = get_outbound_audio_stats()
+    assert after["writer_failures"] - before["writer_failures"] == 1
+    assert after["dropped_bytes"] - before["dropped_bytes"] == 160
@@ -0,0 +1,107 @@
+"""
+Phone reputation cache tests
+Negative TTLs, persistence across processes, warm start and RAGService lookups
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.rag_service import RAGService
+from app.services.reputation_cache import PhoneReputationCache, SQLiteReputationStore, normalize_phone
+
+SCAMMER = {"is_known_scammer": True, "reports_count": 3, "latest_report": "IRS scam", "sources": [], "confidence": 0.3}
+CLEAN = {"is_known_scammer": False, "reports_count": 0, "latest_report": None, "sources": [], "confidence": 0.0}
+
+
+class FakeSearch:
+    """Stands in for RAGService._search, counting calls"""
+
+    def __init__(self, results=None):
+        self.results = results
+        self.queries = []
+
+    async def __call__(self, query, max_results):
+        self.queries.append(query)
+        await asyncio.sleep(0)
+        return self.results
+
+
+def _service(tmp_path, search: FakeSearch) -> RAGService:
+    service = RAGService()
+    service.cache = PhoneReputationCache(SQLiteReputationStore(str(tmp_path / "reputation.sqlite")))
+    service._search = search
+    return service
+
+
+def test_negative_results_expire_sooner(tmp_path):
+    cache = PhoneReputationCache(
+        SQLiteReputationStore(str(tmp_path / "reputation.sqlite")),
+        ttl_seconds=3600,
+        negative_ttl_seconds=0.05
+    )
+    cache.set("+15550000001", SCAMMER)
+    cache.set("+15550000002", CLEAN)
+
+    time.sleep(0.1)
+    assert cache.get("+15550000001") == SCAMMER
+    assert cache.get("+15550000002") is None
+    assert cache.store.get("+15550000002") is None
+
+
+def test_store_is_shared_and_warm_starts(tmp_path):
+    path = str(tmp_path / "reputation.sqlite")
+    worker_a = PhoneReputationCache(SQLiteReputationStore(path))
+    worker_a.set("+15550000001", SCAMMER)
+    worker_a.set("+15550000002", CLEAN)
+
+    # Another worker reads through to the shared file
+    worker_b = PhoneReputationCache(SQLiteReputationStore(path))
+    assert worker_b.get("+15550000001") == SCAMMER
+    assert worker_b.store_hits == 1
+
+    # A restarted worker warms its memory without per-number store reads
+    restarted = PhoneReputationCache(SQLiteReputationStore(path), max_entries=10)
+    assert restarted.warm_start(100) == 2
+    assert restarted.get("+15550000002") == CLEAN
+    assert restarted.store_hits == 0
+
+    worker_a.invalidate("+15550000001")
+    assert PhoneReputationCache(SQLiteReputationStore(path)).get("+15550000001") is None
+
+
+def test_memory_is_bounded(tmp_path):
+    cache = PhoneReputationCache(max_entries=3)
+    for i in range(10):
+        cache.set(f"+1555000000{i}", CLEAN)
+
+    assert len(cache.memory) == 3
+    assert cache.get("+15550000009") == CLEAN
+    assert cache.get("+15550000000") is None
+
+
+@pytest.mark.asyncio
+async def test_check_phone_number_searches_each_number_once(tmp_path):
+    search = FakeSearch([{"title": "t", "snippet": "IRS scam", "url": "https://example.com"}])
+    service = _service(tmp_path, search)
+
+    results = await asyncio.gather(*[service.check_phone_number("+1 (555) 000-0001") for _ in range(5)])
+    assert all(result["is_known_scammer"] for result in results)
+    assert len(search.queries) == 1
+
+    await service.check_phone_number("+15550000001")
+    assert len(search.queries) == 1
+    assert service.cache.get(normalize_phone("+1 555.000.0001"))["reports_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_search_is_not_cached(tmp_path):
+    search = FakeSearch(None)
+    service = _service(tmp_path, search)
+
+    result = await service.check_phone_number("+15550000001")
+    assert result["is_known_scammer"] is False
+
+    await service.check_phone_number("+15550000001")
+    assert len(search.queries) == 2
@@ -0,0 +1,139 @@
+"""
+Reputation index tests
+Bloom filter accuracy, loading from the blacklist file and scam_reports,
+hot reload, and rejection at call arrival
+"""
+
+import json
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import telephony_optimized
+from app.services.database import DatabaseService
+from app.services.local_db import LocalDatabaseClient
+from app.services.reputation_index import BloomFilter, ReputationIndex
+
+
+class LocalDatabase(DatabaseService):
+    def __init__(self):
+        super().__init__()
+        self.client = LocalDatabaseClient(":memory:")
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=5000, false_positive_rate=0.01)
+    members = [f"+1555{i:07d}" for i in range(5000)]
+    for number in members:
+        bloom.add(number)
+
+    assert all(number in bloom for number in members)
+    false_positives = sum(f"+1666{i:07d}" in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.03
+
+
+@pytest.mark.asyncio
+async def test_loads_blacklist_file_and_scam_reports(tmp_path):
+    db = LocalDatabase()
+    for sid, number, confidence in (("CA1", "+15550000001", 0.95), ("CA2", "+15550000002", 0.4)):
+        await db.create_call(user_id="u1", caller_number=number, call_sid=sid)
+        await db.create_scam_report(sid, scam_type="irs", confidence=confidence, pattern_matched="warrant")
+
+    blacklist = tmp_path / "blacklist.json"
+    blacklist.write_text(json.dumps(["+1 (555) 000-0003", {"phone_number": "+15550000004"}]))
+
+    index = ReputationIndex(str(blacklist), database=db)
+    await index.reload()
+
+    assert index.is_blocked("+15550000001")
+    assert not index.is_blocked("+15550000002")  # Report below BLOCKLIST_MIN_REPORT_CONFIDENCE
+    assert index.is_blocked("+15550000003")
+    assert index.is_blocked("+1 555 000 0004")
+    assert not index.is_blocked("+15559999999")
+    assert len(index) == 3
+
+
+@pytest.mark.asyncio
+async def test_added_numbers_survive_database_refresh_until_reported(tmp_path):
+    db = LocalDatabase()
+    index = ReputationIndex(str(tmp_path / "missing.json"), database=db)
+    await index.reload()
+
+    index.add("+15550000009")
+    await index.reload()  # scam_reports doesn't have it yet
+    assert index.is_blocked("+15550000009")
+
+    await db.create_call(user_id="u1", caller_number="+15550000009", call_sid="CA9")
+    await db.create_scam_report("CA9", scam_type="irs", confidence=0.95, pattern_matched="warrant")
+    await index.reload()
+    assert index.is_blocked("+15550000009")
+    assert index._added_numbers == set()  # Now backed by the database
+
+
+@pytest.mark.asyncio
+async def test_blacklist_file_hot_reload(tmp_path):
+    blacklist = tmp_path / "blacklist.json"
+    blacklist.write_text(json.dumps(["+15550000001"]))
+    index = ReputationIndex(str(blacklist), database=LocalDatabase())
+    await index.reload()
+    assert not index._file_changed()
+
+    blacklist.write_text(json.dumps(["+15550000002"]))
+    stat = blacklist.stat()
+    os.utime(blacklist, (stat.st_atime, stat.st_mtime + 10))
+    assert index._file_changed()
+
+    index.add("+15550000009")
+    await index.reload(refresh_database=False)
+    assert not index.is_blocked("+15550000001")
+    assert index.is_blocked("+15550000002")
+    assert index.is_blocked("+15550000009")  # Kept until the next database refresh
+
+
+@pytest.mark.asyncio
+async def test_blacklist_file_applies_while_database_is_down(tmp_path, monkeypatch):
+    db = LocalDatabase()
+    await db.create_call(user_id="u1", caller_number="+15550000001", call_sid="CA1")
+    await db.create_scam_report("CA1", scam_type="irs", confidence=0.95, pattern_matched="warrant")
+    blacklist = tmp_path / "blacklist.json"
+    blacklist.write_text(json.dumps(["+15550000002"]))
+    index = ReputationIndex(str(blacklist), database=db)
+    await index.reload()
+
+    async def database_down(*args, **kwargs):
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(db, "get_reported_scam_numbers", database_down)
+    blacklist.write_text(json.dumps(["+15550000002", "+15550000003"]))
+    stat = blacklist.stat()
+    os.utime(blacklist, (stat.st_atime, stat.st_mtime + 10))
+    await index.reload()
+
+    assert index.is_blocked("+15550000003")  # File applied without the database
+    assert index.is_blocked("+15550000001")  # Previous scam_reports kept
+    assert index.reload_errors == 1
+    assert not index._file_changed()
+
+
+def test_incoming_call_rejects_blocklisted_caller_without_io(tmp_path, monkeypatch):
+    index = ReputationIndex(str(tmp_path / "missing.json"), database=LocalDatabase())
+    index.add("+15550000001")
+    monkeypatch.setattr(telephony_optimized, "reputation_index", index)
+
+    async def unexpected_lookup(*args, **kwargs):
+        raise AssertionError("database touched for a blocklisted caller")
+
+    monkeypatch.setattr(telephony_optimized.db_service, "get_user_by_twilio_number", unexpected_lookup)
+
+    app = FastAPI()
+    app.include_router(telephony_optimized.router)
+    response = TestClient(app).post(
+        "/api/telephony/incoming",
+        data={"CallSid": "CA1", "From": "+15550000001", "To": "+15557654321"}
+    )
+
+    assert response.status_code == 200
+    assert "<Reject" in response.text
+    assert index.blocked == 1
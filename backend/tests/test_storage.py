@@ -0,0 +1,296 @@
+"""
+Storage upload pipeline tests
+Per-call debouncing, gzip JSON, worker-pool uploads, flush on close and
+manifest-backed stats/retention, signed URL reuse (LocalFilesystemBackend
+in tmp_path)
+"""
+
+import asyncio
+import gzip
+import json
+import threading
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.gcs_service import GCSService
+from app.services.signed_url_cache import SignedURLCache
+from app.services.storage_backends import LocalFilesystemBackend
+from app.services.local_db import LocalDatabaseClient
+from app.services.storage_manifest import DatabaseStorageManifest, StorageManifest
+from app.services.storage_uploader import PendingUpload, StorageUploader
+
+
+class CountingBackend(LocalFilesystemBackend):
+    """Local backend recording each put and the thread it ran on"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.puts = []
+        self.threads = set()
+        self.listings = 0
+        self.signatures = 0
+
+    def put(self, key, data, content_type, content_encoding=None, metadata=None):
+        self.puts.append(key)
+        self.threads.add(threading.get_ident())
+        super().put(key, data, content_type, content_encoding, metadata)
+
+    def list(self, prefix=""):
+        self.listings += 1
+        return super().list(prefix)
+
+    def sign_url(self, key, expiration, method="GET"):
+        self.signatures += 1
+        return f"{super().sign_url(key, expiration, method)}?sig={self.signatures}"
+
+
+def _service(tmp_path, debounce=0.05, max_delay=5.0) -> GCSService:
+    backend = CountingBackend(str(tmp_path / "objects"))
+    manifest = StorageManifest(str(tmp_path / "manifest.sqlite"))
+    uploader = StorageUploader(backend, workers=2, debounce_seconds=debounce, max_delay_seconds=max_delay, manifest=manifest)
+    return GCSService(backend=backend, uploader=uploader, manifest=manifest)
+
+
+@pytest.mark.asyncio
+async def test_transcript_updates_upload_final_version_once(tmp_path):
+    service = _service(tmp_path)
+
+    for i in range(10):
+        await service.upload_transcript("CA1", "u1", f"turn {i}", metadata={"scam_score": i / 10})
+    await asyncio.sleep(0.2)
+
+    assert sorted(service.backend.puts) == ["u1/transcripts/CA1.json", "u1/transcripts/CA1.txt"]
+    assert service.backend.get("u1/transcripts/CA1.txt") == b"turn 9"
+    assert service.uploader.superseded == 18
+    await service.uploader.close()
+
+
+@pytest.mark.asyncio
+async def test_transcript_json_is_gzip_compressed(tmp_path):
+    service = _service(tmp_path)
+    await service.upload_transcript("CA1", "u1", "hello " * 200, metadata={"intent": "friend"})
+    await service.flush_call("CA1")
+
+    raw = service.backend.get("u1/transcripts/CA1.json")
+    data = json.loads(gzip.decompress(raw))
+    assert data["transcript"] == "hello " * 200
+    assert data["metadata"] == {"intent": "friend"}
+    assert len(raw) < len("hello " * 200)
+
+    sidecar = json.loads((tmp_path / "objects/u1/transcripts/CA1.json.meta.json").read_text())
+    assert (sidecar["content_type"], sidecar["content_encoding"]) == ("application/json", "gzip")
+    await service.uploader.close()
+
+
+@pytest.mark.asyncio
+async def test_max_delay_bounds_a_busy_call(tmp_path):
+    service = _service(tmp_path, debounce=0.05, max_delay=0.15)
+
+    for i in range(12):  # Never quiet for a full debounce period
+        await service.upload_transcript("CA1", "u1", f"turn {i}")
+        await asyncio.sleep(0.03)
+
+    assert "u1/transcripts/CA1.txt" in service.backend.puts
+    await service.uploader.close()
+
+
+@pytest.mark.asyncio
+async def test_uploads_run_off_the_event_loop(tmp_path):
+    service = _service(tmp_path)
+    url = await service.upload_recording("CA1", "u1", b"RIFF" + b"\0" * 1000)
+    await service.upload_scam_evidence("CA1", "u1", {"red_flags": ["gift cards"]})
+    await service.uploader.close()
+
+    assert url.startswith("file://")
+    assert threading.get_ident() not in service.backend.threads
+    assert await service.get_recording("CA1", "u1") == b"RIFF" + b"\0" * 1000
+    assert (await service.get_storage_stats("u1"))["total_recordings"] == 1
+    await service.uploader.close()
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_uploads(tmp_path):
+    backend = LocalFilesystemBackend(str(tmp_path))
+    uploader = StorageUploader(backend, workers=1, debounce_seconds=60, max_delay_seconds=60)
+    uploader.submit_debounced("CA1", [PendingUpload("u1/transcripts/CA1.txt", "final", "text/plain")])
+
+    await uploader.close()
+    assert backend.get("u1/transcripts/CA1.txt") == b"final"
+    assert uploader.get_stats()["pending_groups"] == 0
+
+
+class SlowFirstPutBackend(LocalFilesystemBackend):
+    """The first put stalls until released (an older upload still in flight)"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.release = threading.Event()
+        self.stalled = threading.Event()
+
+    def put(self, key, data, content_type, content_encoding=None, metadata=None):
+        if not self.stalled.is_set():
+            self.stalled.set()
+            self.release.wait(5)
+        super().put(key, data, content_type, content_encoding, metadata)
+
+
+@pytest.mark.asyncio
+async def test_older_upload_never_overwrites_final_version(tmp_path):
+    backend = SlowFirstPutBackend(str(tmp_path))
+    uploader = StorageUploader(backend, workers=2, debounce_seconds=0.01, max_delay_seconds=60)
+    uploader.submit_debounced("CA1", [PendingUpload("u1/transcripts/CA1.txt", "turn 1", "text/plain")])
+    await asyncio.get_running_loop().run_in_executor(None, backend.stalled.wait, 5)
+
+    # Debounced upload of turn 1 is stuck in a worker; the call ends with turn 2
+    uploader.submit_debounced("CA1", [PendingUpload("u1/transcripts/CA1.txt", "turn 2", "text/plain")])
+    flush = asyncio.create_task(uploader.flush("CA1"))
+    await asyncio.sleep(0.05)
+    assert not flush.done()  # Waits for the in-flight upload
+
+    backend.release.set()
+    await flush
+    assert backend.get("u1/transcripts/CA1.txt") == b"turn 2"
+    await uploader.close()
+
+
+@pytest.mark.asyncio
+async def test_stats_come_from_the_manifest(tmp_path):
+    service = _service(tmp_path)
+    await service.upload_recording("CA1", "u1", b"a" * 1000)
+    await service.upload_recording("CA2", "u1", b"b" * 500)
+    await service.upload_recording("CA3", "u2", b"c" * 700)
+    await service.upload_transcript("CA1", "u1", "short")
+    await service.flush_call("CA1")
+    await service.upload_transcript("CA1", "u1", "a longer final transcript")  # Overwrite
+    await service.uploader.close()
+
+    stats = await service.get_storage_stats("u1")
+    assert (stats["total_recordings"], stats["total_transcripts"]) == (2, 2)
+    on_disk = sum(stored.size for stored in LocalFilesystemBackend(str(tmp_path / "objects")).list("u1/"))
+    assert stats["total_size_bytes"] == on_disk
+    assert stats["bytes_by_kind"]["recordings"] == 1500
+    assert stats["oldest_file"] <= stats["newest_file"]
+    assert service.backend.listings == 0
+
+
+@pytest.mark.asyncio
+async def test_retention_sweep_touches_only_expired_keys(tmp_path):
+    service = _service(tmp_path)
+    for i in range(5):
+        await service.upload_recording(f"CA{i}", "u1", b"x" * 100)
+    await service.uploader.close()
+
+    old = time.time() - 100 * 86400
+    for key in ("u1/recordings/CA0.wav", "u1/recordings/CA1.wav"):
+        service.manifest.record(key, 100, created_at=old)
+
+    assert await service.delete_old_recordings(days=90) == 2
+    assert service.backend.listings == 0
+    assert service.backend.get("u1/recordings/CA0.wav") is None
+    assert service.backend.get("u1/recordings/CA2.wav") is not None
+    assert (await service.get_storage_stats("u1"))["total_recordings"] == 3
+    await service.uploader.close()
+
+
+@pytest.mark.asyncio
+async def test_manifest_is_built_from_an_existing_bucket(tmp_path):
+    backend = LocalFilesystemBackend(str(tmp_path / "objects"))
+    backend.put("u1/recordings/CA1.wav", b"x" * 300, "audio/wav")
+    backend.put("u1/transcripts/CA1.txt", b"hi", "text/plain")
+
+    service = GCSService(backend=backend, manifest=StorageManifest(str(tmp_path / "manifest.sqlite")))
+    await service.init_manifest()
+
+    stats = await service.get_storage_stats("u1")
+    assert (stats["total_recordings"], stats["total_transcripts"], stats["total_size_bytes"]) == (1, 1, 302)
+    await service.uploader.close()
+
+
+@pytest.mark.asyncio
+async def test_database_manifest_is_shared_across_instances(tmp_path):
+    database = SimpleNamespace(client=LocalDatabaseClient())
+    instances = []
+    for _ in range(2):
+        backend = CountingBackend(str(tmp_path / "objects"))  # Same bucket
+        manifest = DatabaseStorageManifest(database)
+        uploader = StorageUploader(backend, workers=2, manifest=manifest)
+        instances.append(GCSService(backend=backend, uploader=uploader, manifest=manifest))
+    first, second = instances
+
+    await first.upload_recording("CA1", "u1", b"a" * 1000)
+    await second.upload_recording("CA2", "u1", b"b" * 500)
+    for service in instances:
+        await service.uploader.close()
+
+    stats = await first.get_storage_stats("u1")
+    assert (stats["total_recordings"], stats["total_size_bytes"]) == (2, 1500)
+
+    # An overwrite adjusts the totals; a sweep on one instance reaches the other's uploads
+    second.manifest.record("u1/recordings/CA2.wav", 200, created_at=time.time() - 100 * 86400)
+    assert (await first.get_storage_stats("u1"))["total_size_bytes"] == 1200
+    assert await first.delete_old_recordings(days=90) == 1
+    assert first.backend.get("u1/recordings/CA2.wav") is None
+    assert (await second.get_storage_stats("u1"))["total_size_bytes"] == 1000
+    assert first.backend.listings == second.backend.listings == 0
+
+
+@pytest.mark.asyncio
+async def test_manifest_reads_stay_off_the_event_loop(tmp_path):
+    service = _service(tmp_path)
+    threads = set()
+    for name in ("is_empty", "user_stats", "time_range"):
+        method = getattr(service.manifest, name)
+        setattr(service.manifest, name, lambda *args, method=method: threads.add(threading.get_ident()) or method(*args))
+
+    await service.init_manifest()
+    await service.get_storage_stats("u1")
+    assert threads and threading.get_ident() not in threads
+    await service.uploader.close()
+
+
+@pytest.mark.asyncio
+async def test_signed_urls_are_reused_per_object_and_method(tmp_path):
+    service = _service(tmp_path)
+    week = timedelta(days=7)
+
+    first = await service.get_signed_url("u1/recordings/CA1.wav", week)
+    assert await service.get_signed_url("u1/recordings/CA1.wav", week) == first
+    assert await service.get_signed_url("u1/recordings/CA1.wav", week, method="PUT") != first
+    assert service.backend.signatures == 2
+
+    # A cached 7-day URL is not handed out where 30 days were asked for
+    assert await service.get_signed_url("u1/recordings/CA1.wav", timedelta(days=30)) != first
+    assert service.backend.signatures == 3
+    await service.uploader.close()
+
+
+@pytest.mark.asyncio
+async def test_signed_url_is_resigned_after_reuse_fraction(tmp_path):
+    service = _service(tmp_path)
+    service.signed_urls = SignedURLCache(reuse_fraction=0.5)
+    lifetime = timedelta(seconds=0.2)
+
+    first = await service.get_signed_url("u1/recordings/CA1.wav", lifetime)
+    assert await service.get_signed_url("u1/recordings/CA1.wav", lifetime) == first
+    await asyncio.sleep(0.12)
+    assert await service.get_signed_url("u1/recordings/CA1.wav", lifetime) != first
+    await service.uploader.close()
+
+
+@pytest.mark.asyncio
+async def test_call_history_urls_signed_in_bulk_and_cached(tmp_path):
+    service = _service(tmp_path)
+    call_sids = [f"CA{i}" for i in range(50)]
+
+    urls = await service.get_call_urls("u1", call_sids)
+    assert set(urls) == set(call_sids)
+    assert urls["CA7"]["recording"].split("?")[0].endswith("u1/recordings/CA7.wav")
+    assert service.backend.signatures == 100
+
+    assert await service.get_call_urls("u1", call_sids) == urls
+    assert service.backend.signatures == 100
+    assert service.signed_urls.get_stats()["hits"] == 100
+    await service.uploader.close()
@@ -0,0 +1,113 @@
+"""
+Twilio REST adapter tests
+Operations, idempotency-aware retries, per-operation timeouts and
+non-blocking behaviour (against the local fake Twilio server)
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from app.core.config import settings
+from app.services.http_client import SharedHttpClient
+from app.services.twilio_rest import TwilioAPIError, TwilioRestClient
+from app.services.twilio_service import TwilioService
+from fake_twilio import FakeTwilio
+
+
+@pytest.fixture
+def twilio():
+    with FakeTwilio() as server:
+        server.add_call("CA1")
+        yield server
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "TWILIO_API_BACKOFF_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "TWILIO_API_MAX_ATTEMPTS", 3)
+
+
+@pytest_asyncio.fixture
+async def service(twilio):
+    http = SharedHttpClient()
+    rest = TwilioRestClient(http=http, account_sid=twilio.account_sid, auth_token=twilio.auth_token, base_url=twilio.url)
+    yield TwilioService(rest=rest)
+    await http.close()
+
+
+@pytest.mark.asyncio
+async def test_operations_against_fake_twilio(twilio, service):
+    await service.dial_user("+15550001111", "CA1")
+    assert twilio.calls["CA1"]["twiml"] == "<Response><Dial>+15550001111</Dial></Response>"
+
+    await service.end_call("CA1")
+    details = await service.get_call_details("CA1")
+    assert (details["sid"], details["status"], details["from"]) == ("CA1", "completed", "+15551230000")
+
+    sid = await service.send_sms("+15550001111", "Missed call from Mom")
+    assert twilio.messages == [{
+        "sid": sid, "to": "+15550001111", "from": settings.TWILIO_PHONE_NUMBER,
+        "body": "Missed call from Mom", "status": "queued"
+    }]
+    assert service.rest.http.get_stats()["hosts"][twilio.url.split("//")[1]]["requests"] == 4
+
+
+@pytest.mark.asyncio
+async def test_idempotent_operations_retry_on_5xx(twilio, service):
+    twilio.fail("Calls/CA1.json", 503, 502)
+    await service.hangup_call("CA1")
+
+    assert twilio.calls["CA1"]["status"] == "completed"
+    assert twilio.requests["Calls/CA1.json"] == 3
+    assert service.rest.get_stats()["hangup"] == {"requests": 3, "retries": 2, "failures": 0}
+
+
+@pytest.mark.asyncio
+async def test_sms_is_not_repeated_after_5xx_but_retried_after_429(twilio, service):
+    twilio.fail("Messages.json", 503)
+    with pytest.raises(TwilioAPIError) as error:
+        await service.send_sms("+15550001111", "hello")
+    assert (error.value.status, error.value.code) == (503, 20500)
+    assert twilio.requests["Messages.json"] == 1
+
+    twilio.fail("Messages.json", 429)
+    assert await service.send_sms("+15550001111", "hello")
+    assert twilio.requests["Messages.json"] == 3
+
+
+@pytest.mark.asyncio
+async def test_per_operation_timeouts(twilio, service, monkeypatch):
+    monkeypatch.setattr(settings, "TWILIO_API_TIMEOUTS", {"dial": 0.1, "hangup": 0.1})
+    twilio.delay = 0.3
+
+    # A lost dial response is ambiguous: not retried (it would dial twice)
+    with pytest.raises(TwilioAPIError):
+        await service.dial_user("+15550001111", "CA1")
+    assert twilio.requests["Calls/CA1.json"] == 1
+
+    # A hangup is safe to repeat
+    with pytest.raises(TwilioAPIError):
+        await service.hangup_call("CA1")
+    assert twilio.requests["Calls/CA1.json"] == 1 + 3
+
+    assert (await service.get_call_details("CA2")) == {}  # fetch_call keeps its own (default) timeout
+
+
+@pytest.mark.asyncio
+async def test_slow_twilio_does_not_block_the_event_loop(twilio, service):
+    twilio.delay = 0.3
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.gather(*(service.hangup_call("CA1") for _ in range(5)))
+    task.cancel()
+
+    assert ticks >= 15  # Loop kept running for the whole ~0.3s (5 hangups concurrently)
@@ -0,0 +1,146 @@
+"""
+Vector index tests
+Exact and IVF cosine top-k, persistence, and the scam-script vector store
+"""
+
+import hashlib
+import threading
+
+import numpy as np
+import pytest
+
+from app.agents.scam_detector_agent import ScamDetectorAgent
+from app.services.vector_index import VectorIndex, normalize
+from app.services.vector_store import VectorStoreService
+
+DIM = 32
+
+
+def _vectors(count: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((count, DIM)).astype(np.float32)
+
+
+def test_exact_search_matches_brute_force(tmp_path):
+    vectors = _vectors(500)
+    index = VectorIndex(str(tmp_path), "scams")
+    index.add(vectors, [{"row": i} for i in range(500)])
+
+    queries = _vectors(3, seed=1)
+    results = index.search(queries, top_k=5)
+
+    expected = np.argsort(-(normalize(queries) @ normalize(vectors).T), axis=1)[:, :5]
+    for hits, rows in zip(results, expected):
+        assert [meta["row"] for _, meta in hits] == rows.tolist()
+        assert hits[0][0] >= hits[-1][0]
+
+
+def test_index_persists_and_ignores_rows_past_manifest(tmp_path):
+    index = VectorIndex(str(tmp_path), "scams")
+    index.add(_vectors(10), [{"row": i} for i in range(10)])
+
+    # A crashed append: bytes written, manifest never updated
+    with open(tmp_path / "scams.f32", "ab") as f:
+        f.write(_vectors(2, seed=5).tobytes())
+    with open(tmp_path / "scams.meta.jsonl", "a") as f:
+        f.write('{"row": 10}\n')
+
+    reopened = VectorIndex(str(tmp_path), "scams").load()
+    reopened.add(_vectors(1, seed=9), [{"row": "new"}])
+
+    assert reopened.count == 11
+    assert reopened.search(_vectors(1, seed=9)[0], top_k=1)[0][0][1] == {"row": "new"}
+    assert VectorIndex(str(tmp_path), "scams").load().count == 11
+
+
+def test_ivf_finds_clustered_neighbours_and_tracks_new_rows(tmp_path):
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((20, DIM))
+    topics = rng.integers(20, size=2000)
+    vectors = (centers[topics] + 0.1 * rng.standard_normal((2000, DIM))).astype(np.float32)
+
+    index = VectorIndex(str(tmp_path), "scams")
+    index.add(vectors, [{"row": i} for i in range(2000)])
+    exact = index.search(vectors[:20], top_k=5)
+    index.build_ivf(n_lists=20)
+    approx = index.search(vectors[:20], top_k=5, probes=3)
+
+    recall = np.mean([
+        len({m["row"] for _, m in a} & {m["row"] for _, m in e}) / 5 for a, e in zip(approx, exact)
+    ])
+    assert recall >= 0.9
+
+    index.add(centers[:1].astype(np.float32), [{"row": "center"}])
+    reopened = VectorIndex(str(tmp_path), "scams").load()
+    assert reopened.has_ivf
+    assert reopened.search(centers[0], top_k=1, probes=3)[0][0][1] == {"row": "center"}
+
+
+class FakeEmbeddings:
+    """Bag-of-words hashing embedder: shared words → similar vectors"""
+
+    async def generate_embeddings(self, text):
+        vector = np.zeros(256, dtype=np.float32)
+        for word in text.lower().split():
+            vector[int(hashlib.md5(word.strip(".,!?").encode()).hexdigest(), 16) % 256] += 1
+        return vector.tolist()
+
+    async def embed_many(self, texts):
+        return [await self.generate_embeddings(text) for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_vector_store_seeds_and_scores_transcripts(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.VECTOR_DB_PATH", str(tmp_path))
+    store = VectorStoreService()
+    store.gemini_service = FakeEmbeddings()
+    await store.init()
+
+    scam = await store.query_similar_scams(
+        "this is microsoft support we detected a virus on your computer give us remote access", top_k=1
+    )
+    benign = await store.max_similarity("hey it's sam, running late for dinner tonight")
+
+    assert store.index.count > 0
+    assert scam[0]["scam_type"] == "tech_support"
+    assert scam[0]["similarity"] > benign
+
+
+@pytest.mark.asyncio
+async def test_vector_store_appends_off_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.VECTOR_DB_PATH", str(tmp_path))
+    store = VectorStoreService()
+    store.gemini_service = FakeEmbeddings()
+    threads = []
+    add = store.index.add
+    monkeypatch.setattr(store.index, "add", lambda *args: threads.append(threading.get_ident()) or add(*args))
+
+    assert await store.add_scam_scripts([("irs", "pay the irs now"), ("bank", "verify your bank pin")]) == 2
+    assert store.index.count == 2
+    assert threads and threading.get_ident() not in threads
+
+
+class AllowingGemini:
+    """LLM stand-in that never spots the scam"""
+
+    async def analyze_scam_indicators(self, transcript, caller_number, call_sid=None):
+        return {"is_scam": False, "scam_type": None, "confidence": 0.1, "red_flags": [], "recommendation": "allow"}
+
+
+@pytest.mark.asyncio
+async def test_scam_detector_scores_with_vector_similarity(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.VECTOR_DB_PATH", str(tmp_path))
+    monkeypatch.setattr("app.agents.scam_detector_agent.get_gemini_service", lambda: AllowingGemini())
+    store = VectorStoreService()
+    store.gemini_service = FakeEmbeddings()
+    await store.add_scam_scripts([("parcel", "your parcel is held at the depot pay the release fee today")])
+
+    agent = ScamDetectorAgent()
+    agent.vector_db = store
+    scam = await agent.run("your parcel is held at the depot pay the release fee today", "+15550100")
+    benign = await agent.run("hey it's sam, running late for dinner tonight", "+15550101")
+
+    assert scam["vector_similarity"] >= store.threshold
+    assert scam["is_scam"] and scam["recommendation"] == "block"
+    assert scam["confidence"] == scam["vector_similarity"]
+    assert benign["vector_similarity"] < store.threshold
+    assert benign["recommendation"] == "allow"
@@ -0,0 +1,274 @@
+"""
+Workflow engine tests
+Compiled trigger index against per-workflow scoring, compiled action
+conditions, and DAG action execution with fake executors
+"""
+
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+
+import pytest
+
+from app.workflows.conditions import InvalidConditionError, compile_condition, condition_variables
+from app.workflows.engine import CallContext, WorkflowCategory, WorkflowEngine
+
+DEFAULT_WORKFLOWS = Path(__file__).parent.parent / "app" / "workflows" / "default_workflows.json"
+
+WORKFLOWS = {
+    "workflows": {
+        "family_emergency": {
+            "category": "emergency", "priority": 10,
+            "triggers": {"keywords": ["emergency", "hospital", "accident"], "contacts": ["Mom", "Dad"], "confidence": ">0.6"}
+        },
+        "friend": {
+            "category": "personal_friend", "priority": 8,
+            "triggers": {"intent": "friend", "confidence": ">0.8", "contacts": ["Alex"]}
+        },
+        "doctor": {
+            "category": "personal_doctor", "priority": 9,
+            "triggers": {"intent": "doctor", "keywords": ["appointment", "doctor", "prescription", "hospital"]}
+        },
+        "appointment": {
+            "category": "appointment", "priority": 7,
+            "triggers": {"intent": "appointment", "confidence": ">0.5", "keywords": ["appointment", "schedule", "reschedule"]}
+        },
+        "sales": {
+            "category": "business_sales", "priority": 3,
+            "triggers": {"intent": "sales", "keywords": ["offer", "discount", "limited time", "offer"]}
+        },
+        "scam": {
+            "category": "scam", "priority": 10,
+            "triggers": {"intent": "scam", "confidence": ">0.7", "keywords": ["gift card", "warrant", "irs"]}
+        },
+        "partnership": {
+            "category": "business_partnership", "priority": 7,
+            "triggers": {"intent": "business", "keywords": ["partnership", "offer"], "contacts": ["Alex"]}
+        },
+    }
+}
+
+
+def _linear_match(engine: WorkflowEngine, context: CallContext):
+    """The original per-workflow scoring loop, as a reference"""
+    matches = []
+    for workflow in engine.workflows.values():
+        if not workflow.enabled:
+            continue
+        triggers, score = workflow.triggers, 0.0
+        if triggers.intent and triggers.intent == context.intent:
+            if context.intent_confidence >= triggers.confidence_threshold:
+                score += 10.0
+        if triggers.keywords:
+            score += 2.0 * sum(1 for kw in triggers.keywords if kw.lower() in context.transcript.lower())
+        if triggers.contacts and context.caller_name in triggers.contacts:
+            score += 15.0
+        if context.is_emergency and workflow.category == WorkflowCategory.EMERGENCY:
+            score += 100.0
+        if score > 0:
+            matches.append((score, workflow))
+
+    matches.sort(key=lambda x: (x[0], x[1].priority), reverse=True)
+    return matches[0][1] if matches else None
+
+
+def _context(intent="unknown", confidence=0.9, transcript="", caller_name=None, is_emergency=False):
+    return CallContext(
+        call_sid="CA1", user_id="u1", caller_number="+15551234567", caller_name=caller_name,
+        intent=intent, intent_confidence=confidence, transcript=transcript,
+        scam_score=0.0, is_emergency=is_emergency, metadata={}
+    )
+
+
+def _engine() -> WorkflowEngine:
+    engine = WorkflowEngine()
+    engine.load_workflows_from_config(WORKFLOWS)
+    return engine
+
+
+def test_trigger_index_matches_linear_scoring():
+    engine = _engine()
+    keywords = sorted({kw for wf in engine.workflows.values() for kw in wf.triggers.keywords or []})
+    intents = sorted({wf.triggers.intent for wf in engine.workflows.values() if wf.triggers.intent}) + ["unknown"]
+    contacts = sorted({c for wf in engine.workflows.values() for c in wf.triggers.contacts or []}) + [None, "Stranger"]
+
+    rng = random.Random(0)
+    for _ in range(500):
+        words = rng.sample(keywords, rng.randint(0, 4)) + ["hello", "there"]
+        rng.shuffle(words)
+        context = _context(
+            intent=rng.choice(intents),
+            confidence=rng.random(),
+            transcript=" ".join(w.upper() if rng.random() < 0.3 else w for w in words),
+            caller_name=rng.choice(contacts),
+            is_emergency=rng.random() < 0.1
+        )
+        expected = _linear_match(engine, context)
+        actual = engine._match_workflow(context)
+        assert (actual and actual.id) == (expected and expected.id), context
+
+
+def test_registration_recompiles_and_skips_disabled_workflows():
+    engine = _engine()
+    context = _context(transcript="calling about the hospital bill")
+    before = engine._match_workflow(context)
+    assert before is not None
+
+    before.enabled = False
+    engine.rebuild_trigger_index()
+    assert engine._match_workflow(context) is not before
+
+
+# ============================================================================
+# CONDITIONS
+# ============================================================================
+
+def test_conditions_compile_and_evaluate():
+    condition = compile_condition('is_emergency or (intent == "doctor" and intent_confidence >= 0.8)')
+    assert condition(condition_variables(_context(intent="doctor", confidence=0.9)))
+    assert not condition(condition_variables(_context(intent="doctor", confidence=0.5)))
+    assert condition(condition_variables(_context(is_emergency=True)))
+
+    in_family = compile_condition('caller_name in ("Mom", "Dad") and not scam_score > 0.5')
+    assert in_family(condition_variables(_context(caller_name="Mom")))
+    assert not in_family(condition_variables(_context(caller_name="Alex")))
+
+    if_missed = compile_condition("if_missed")
+    assert not if_missed(condition_variables(_context(), []))
+    assert if_missed(condition_variables(_context(), [{"action": "ring_user", "success": False}]))
+    assert not if_missed(condition_variables(_context(), [{"action": "ring_user", "success": True}]))
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os').system('true')",
+    "().__class__.__bases__",
+    "intent[0] == 'f'",
+    "scam_score * 100 > 50",
+    "[x for x in intent]",
+    "unknown_variable > 1",
+    "confidence >",
+])
+def test_invalid_conditions_rejected_at_load(expression):
+    with pytest.raises(InvalidConditionError):
+        compile_condition(expression)
+
+    engine = WorkflowEngine()
+    config = {"workflows": {
+        "ok": {"category": "unknown", "triggers": {}, "actions": []},
+        "bad": {"category": "unknown", "triggers": {}, "actions": [
+            {"type": "send_sms", "params": {}, "condition": expression}
+        ]}
+    }}
+    with pytest.raises(InvalidConditionError, match="Workflow bad"):
+        engine.load_workflows_from_config(config)
+    assert engine.workflows == {}
+
+
+def test_default_workflow_conditions_compile():
+    config = json.loads(DEFAULT_WORKFLOWS.read_text())
+    conditions = [
+        action["condition"]
+        for workflow in config["workflows"].values()
+        for action in workflow.get("actions", [])
+        if action.get("condition")
+    ]
+    assert conditions
+    for condition in conditions:
+        compile_condition(condition)
+
+
+# ============================================================================
+# ACTION DAG
+# ============================================================================
+
+class SleepyExecutor:
+    """Fake executor: sleeps, records start/end order"""
+
+    def __init__(self, name, log, delay=0.05, success=True):
+        self.name, self.log, self.delay, self.success = name, log, delay, success
+
+    async def execute(self, context, params):
+        self.log.append(("start", self.name))
+        await asyncio.sleep(self.delay)
+        self.log.append(("end", self.name))
+        return {"success": self.success, "message": self.name}
+
+
+def _dag_engine(actions, log, delays=None, parallel=True, failing=()):
+    engine = WorkflowEngine()
+    engine.load_workflows_from_config({"workflows": {"wf": {
+        "category": "unknown", "parallel": parallel,
+        "triggers": {"intent": "unknown"}, "actions": actions
+    }}})
+    for action in actions:
+        name = action["type"]
+        engine.action_executors[name] = SleepyExecutor(
+            name, log, (delays or {}).get(name, 0.05), success=name not in failing
+        )
+    return engine
+
+
+@pytest.mark.asyncio
+async def test_independent_actions_run_concurrently():
+    log = []
+    engine = _dag_engine(
+        [{"type": "send_sms"}, {"type": "send_email"}, {"type": "google_sheets"}, {"type": "mcp_task"}],
+        log, delays={"send_sms": 0.2, "send_email": 0.2, "google_sheets": 0.2, "mcp_task": 0.2}
+    )
+
+    start = time.perf_counter()
+    result = await engine.execute_for_call(_context())
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5  # ~ the slowest action, not the 0.8s sum
+    assert result["actions_completed"] == ["send_sms", "send_email", "google_sheets", "mcp_task"]
+
+
+@pytest.mark.asyncio
+async def test_dependencies_routing_order_and_if_missed():
+    log = []
+    engine = _dag_engine([
+        {"type": "ring_user"},
+        {"type": "send_sms", "condition": "if_missed"},
+        {"type": "google_sheets", "depends_on": "send_email"},
+        {"type": "send_email"},
+        {"type": "hangup"},
+    ], log, failing={"ring_user"})
+
+    result = await engine.execute_for_call(_context())
+
+    assert log.index(("start", "send_sms")) > log.index(("end", "ring_user"))
+    assert log.index(("start", "hangup")) > log.index(("end", "ring_user"))
+    assert log.index(("start", "google_sheets")) > log.index(("end", "send_email"))
+    assert log.index(("start", "send_email")) < log.index(("end", "ring_user"))
+    assert result["actions_failed"] == ["ring_user"]
+    assert result["final_action"] == "blocked"
+
+
+@pytest.mark.asyncio
+async def test_sequential_workflow_and_action_timeout():
+    log = []
+    engine = _dag_engine(
+        [{"type": "send_sms", "timeout": 0.05}, {"type": "send_email"}],
+        log, delays={"send_sms": 1.0}, parallel=False
+    )
+
+    result = await engine.execute_for_call(_context())
+
+    assert log == [("start", "send_sms"), ("start", "send_email"), ("end", "send_email")]
+    assert result["actions_failed"] == ["send_sms"]
+    assert "Timed out" in result["results"][0]["error"]
+
+
+def test_dependency_cycles_and_unknown_names_rejected():
+    engine = WorkflowEngine()
+    for actions in (
+        [{"type": "send_sms", "depends_on": "send_email"}, {"type": "send_email", "depends_on": ["send_sms"]}],
+        [{"type": "send_sms", "depends_on": "nope"}],
+    ):
+        with pytest.raises(ValueError, match="Workflow wf"):
+            engine.load_workflows_from_config({"workflows": {"wf": {
+                "category": "unknown", "triggers": {}, "actions": actions
+            }}})
@@ -0,0 +1,203 @@
+"""
+Write-behind queue tests
+Merged per-call writes, batched flushes and spool replay against the local SQLite stand-in
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.database import DatabaseService
+from app.services.local_db import LocalDatabaseClient
+from app.services.write_behind import WriteBehindQueue
+
+
+class CountingDatabase(DatabaseService):
+    """DatabaseService on the local backend that counts round-trips"""
+
+    def __init__(self):
+        super().__init__()
+        self.client = LocalDatabaseClient(":memory:")
+        self.round_trips = 0
+
+    async def execute(self, query):
+        self.round_trips += 1
+        return await super().execute(query)
+
+
+@pytest.fixture
+def db():
+    return CountingDatabase()
+
+
+def _queue(db, spool_path=":memory:"):
+    # Long interval: tests flush explicitly
+    return WriteBehindQueue(database=db, spool_path=spool_path, flush_interval_ms=60_000, max_batch=1000)
+
+
+@pytest.mark.asyncio
+async def test_updates_merge_per_call_and_flush_in_one_batch(db):
+    for sid in ("CA1", "CA2"):
+        await db.create_call(user_id="u1", caller_number="+15551234567", call_sid=sid)
+    queue = _queue(db)
+    await queue.start()
+
+    for words in range(1, 11):
+        await queue.save_transcript("CA1", " ".join(["hello"] * words))
+        await queue.save_transcript("CA2", "hi")
+    await queue.update_call("CA1", intent="scam", scam_score=0.5)
+    await queue.update_call("CA1", scam_score=0.95, action_taken="blocked")
+    await queue.create_scam_report("CA1", scam_type="scam", confidence=0.95, pattern_matched="gift cards")
+
+    db.round_trips = 0
+    assert await queue.flush() == 2
+    # select + call updates + transcripts + scam reports + one rollup increment
+    assert db.round_trips <= 5
+
+    call = await db.get_call_by_sid("CA1")
+    transcripts = (await db.execute(db.client.table("call_transcripts").select("*"))).data
+    reports = (await db.execute(db.client.table("scam_reports").select("*"))).data
+    assert (call["intent"], call["scam_score"], call["action_taken"]) == ("scam", 0.95, "blocked")
+    assert sorted(t["transcript"] for t in transcripts) == sorted(["hi", " ".join(["hello"] * 10)])
+    assert len(reports) == 1
+    assert queue.get_stats()["merged"] == 21
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_spooled_writes_survive_restart(db, tmp_path):
+    await db.create_call(user_id="u1", caller_number="+15551234567", call_sid="CA1")
+    spool = str(tmp_path / "spool.sqlite")
+
+    crashed = _queue(db, spool)
+    await crashed.start()
+    await crashed.update_call("CA1", status="blocked")
+    await crashed.save_transcript("CA1", "send gift cards")
+    await crashed.close(flush=False)  # Process dies before the flush
+
+    restarted = _queue(db, spool)
+    await restarted.start()
+    assert restarted.get_stats()["replayed_calls"] == 1
+    await restarted.close()  # Final flush
+
+    assert (await db.get_call_by_sid("CA1"))["status"] == "blocked"
+    reopened = _queue(db, spool)
+    await reopened.start()
+    assert reopened.get_stats()["replayed_calls"] == 0
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_writes_wait_for_call_row_and_failed_flush_is_retried(db):
+    queue = _queue(db)
+    await queue.start()
+    await queue.update_call("CA1", status="screening")
+
+    # Call row not inserted yet: nothing written, kept for the next flush
+    assert await queue.flush() == 0
+    assert queue.get_stats()["pending_calls"] == 1
+
+    await db.create_call(user_id="u1", caller_number="+15551234567", call_sid="CA1")
+
+    async def failing(*args, **kwargs):
+        raise ConnectionError("database unavailable")
+
+    original, db.apply_call_writes = db.apply_call_writes, failing
+    await queue.update_call("CA1", intent="sales")
+    assert await queue.flush() == 0
+    assert queue.get_stats()["failed_flushes"] == 1
+
+    db.apply_call_writes = original
+    assert await queue.flush() == 1
+    call = await db.get_call_by_sid("CA1")
+    assert (call["status"], call["intent"]) == ("screening", "sales")
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_not_started_writes_through(db):
+    await db.create_call(user_id="u1", caller_number="+15551234567", call_sid="CA1")
+    queue = _queue(db)
+
+    await queue.update_call("CA1", status="ended")
+
+    assert (await db.get_call_by_sid("CA1"))["status"] == "ended"
+    assert queue.get_stats()["enqueued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_bad_call_is_isolated_and_dead_lettered(db, monkeypatch):
+    monkeypatch.setattr(settings, "WRITE_BEHIND_MAX_ATTEMPTS", 2)
+    for sid in ("CA1", "CA2", "CA3", "CA4"):
+        await db.create_call(user_id="u1", caller_number="+15551234567", call_sid=sid)
+    queue = _queue(db)
+    await queue.start()
+
+    original = db.apply_call_writes
+
+    async def poisoned(calls, transcripts, scam_reports):
+        if "CA3" in calls:
+            raise ValueError("invalid input syntax")
+        return await original(calls, transcripts, scam_reports)
+
+    db.apply_call_writes = poisoned
+    for sid in ("CA1", "CA2", "CA3", "CA4"):
+        await queue.update_call(sid, intent="sales")
+
+    assert await queue.flush() == 3
+    assert queue.get_stats()["pending_calls"] == 1
+    assert await queue.flush() == 0
+
+    stats = queue.get_stats()
+    assert (stats["pending_calls"], stats["dead_lettered_calls"]) == (0, 1)
+    assert (await db.get_call_by_sid("CA4"))["intent"] == "sales"
+    assert queue._spool.execute("SELECT call_sid FROM dead_writes").fetchall() == [("CA3",)]
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_retried_flush_does_not_duplicate_scam_reports(db):
+    await db.create_call(user_id="u1", caller_number="+15551234567", call_sid="CA1")
+    queue = _queue(db)
+    await queue.start()
+    await queue.create_scam_report("CA1", scam_type="scam", confidence=0.9, pattern_matched="gift cards")
+
+    # Reports are written, then the batch fails: the retry must not add them again
+    original = db.apply_call_writes
+
+    async def fails_after_writing(*args, **kwargs):
+        await original(*args, **kwargs)
+        raise ConnectionError("connection reset")
+
+    db.apply_call_writes = fails_after_writing
+    assert await queue.flush() == 0
+    db.apply_call_writes = original
+    assert await queue.flush() == 1
+
+    reports = (await db.execute(db.client.table("scam_reports").select("*"))).data
+    assert len(reports) == 1
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_in_progress_flush(db):
+    await db.create_call(user_id="u1", caller_number="+15551234567", call_sid="CA1")
+    queue = _queue(db)
+    await queue.start()
+
+    original = db.apply_call_writes
+    started = asyncio.Event()
+
+    async def slow(*args, **kwargs):
+        started.set()
+        await asyncio.sleep(0.05)
+        return await original(*args, **kwargs)
+
+    db.apply_call_writes = slow
+    await queue.update_call("CA1", status="ended")
+    queue._wake.set()
+    await started.wait()
+
+    await queue.close()
+    assert (await db.get_call_by_sid("CA1"))["status"] == "ended"